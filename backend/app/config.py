@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+from typing import Dict
+
 from pydantic import Field
 from pydantic_settings import BaseSettings
 
@@ -12,6 +14,60 @@ class Settings(BaseSettings):
     default_admin_email: str = Field('admin@example.com', env='STUNDENPLAN_ADMIN_EMAIL')
     default_admin_password: str = Field('admin', env='STUNDENPLAN_ADMIN_PASSWORD')
 
+    # Datenbank / SQLite-Tuning (STUNDENPLAN_DATABASE_URL, STUNDENPLAN_SQLITE_* ...)
+    database_url: str = 'sqlite:///./backend.db'
+    database_echo: bool = False
+    sqlite_tuning: bool = True
+    sqlite_journal_mode: str = 'WAL'
+    sqlite_synchronous: str = 'NORMAL'
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_mmap_size: int = 256 * 1024 * 1024
+    sqlite_cache_size_kib: int = 64 * 1024
+    sqlite_temp_store: str = 'MEMORY'
+    db_pool_size: int = 10
+    db_max_overflow: int = 20
+    db_pool_timeout: float = 30.0
+    db_pool_recycle: int = 1800
+
+    # Solver-Prozesse (STUNDENPLAN_SOLVER_*): 0 Worker = aus der Kernzahl abgeleitet
+    solver_max_workers: int = 0
+    solver_queue_size: int = 2
+    solver_queue_timeout: float = 0.0
+    solver_use_processes: bool = True
+    # Pro Account: gleichzeitige Läufe, CPU-Sekunden je Stunde (0 = unbegrenzt), Gewichte (JSON)
+    solver_account_max_concurrent: int = 1
+    solver_cpu_quota_seconds_per_hour: float = 0.0
+    solver_account_weights: Dict[int, float] = {}
+    # Obergrenzen für die CP-SAT-Parameter einer Anfrage
+    solver_max_search_workers: int = 8
+    solver_max_time_per_attempt: float = 60.0
+    solver_max_attempts: int = 20
+    solver_allow_search_log: bool = False
+    # Logger "stundenplan.solver" (DEBUG zeigt Versuche und ein erlaubtes Suchprotokoll);
+    # Suchfortschritt je Plan: höchstens ein Ereignis je Intervall, max. Ereignisse (0 = aus)
+    solver_log_level: str = 'INFO'
+    solver_progress_interval: float = 0.5
+    solver_progress_max_events: int = 200
+
+    # Ergebnis-Cache für identische Generierungen (0 Einträge = aus)
+    generation_cache_size: int = 64
+    generation_cache_ttl_seconds: float = 900.0
+
+    # Ablage für Modell-Bundles (GenerateRequest.save_bundle), je Account ein Unterordner
+    solver_bundle_dir: str = './solver_bundles'
+
+    # Prometheus-Metriken unter /metrics; bei mehreren uvicorn-Workern ein gemeinsames,
+    # vor dem Serverstart geleertes Verzeichnis angeben (leer = nur dieser Prozess)
+    metrics_enabled: bool = True
+    metrics_multiproc_dir: str = ''
+
+    # Tracing: Stufenzeiten je Request im Header Server-Timing; Traces mit Stufen oder
+    # langsamer als tracing_slow_request_ms als JSON-Zeilen in tracing_dir (leer = keine Datei)
+    tracing_enabled: bool = True
+    tracing_dir: str = './traces'
+    tracing_slow_request_ms: float = 500.0
+    tracing_server_timing_max_spans: int = 20
+
     class Config:
         env_prefix = 'STUNDENPLAN_'
         case_sensitive = False
@@ -0,0 +1,229 @@
+from __future__ import annotations
+
+import os
+import time
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from ..config import settings
+
+# prometheus_client picks its value storage on import: with a shared directory
+# every uvicorn worker writes its samples there and /metrics aggregates them.
+if settings.metrics_multiproc_dir and not os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+    Path(settings.metrics_multiproc_dir).mkdir(parents=True, exist_ok=True)
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = settings.metrics_multiproc_dir
+
+from prometheus_client import (  # noqa: E402
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 250, 500, 1000)
+MODEL_SIZE_BUCKETS = (100, 500, 1_000, 5_000, 10_000, 50_000, 100_000, 500_000, 1_000_000)
+OBJECTIVE_BUCKETS = (0, 10, 50, 100, 500, 1_000, 5_000, 10_000, 50_000, 100_000, 1_000_000)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "stundenplan_http_request_duration_seconds",
+    "Latency of HTTP requests by route template",
+    ["method", "route", "status"],
+    buckets=SECONDS_BUCKETS,
+)
+HTTP_REQUEST_DB_QUERIES = Histogram(
+    "stundenplan_http_request_db_queries",
+    "SQL statements executed per HTTP request",
+    ["method", "route"],
+    buckets=QUERY_BUCKETS,
+)
+
+SOLVER_GENERATIONS = Counter(
+    "stundenplan_solver_generations_total",
+    "Solver runs of /plans/generate by final status",
+    ["status"],
+)
+SOLVER_REJECTIONS = Counter(
+    "stundenplan_solver_rejections_total",
+    "Solves rejected by the scheduler (busy: no free place, quota: CPU quota used up)",
+    ["reason"],
+)
+SOLVER_RUNNING = Gauge(
+    "stundenplan_solver_running",
+    "Solves currently running",
+    multiprocess_mode="livesum",
+)
+SOLVER_QUEUED = Gauge(
+    "stundenplan_solver_queued",
+    "Solves waiting for a worker",
+    multiprocess_mode="livesum",
+)
+SOLVER_BUILD_SECONDS = Histogram(
+    "stundenplan_solver_build_seconds",
+    "Time to build the CP-SAT model",
+    buckets=SECONDS_BUCKETS,
+)
+SOLVER_PRESOLVE_SECONDS = Histogram(
+    "stundenplan_solver_presolve_seconds",
+    "CP-SAT presolve time, summed over all attempts",
+    buckets=SECONDS_BUCKETS,
+)
+SOLVER_SOLVE_SECONDS = Histogram(
+    "stundenplan_solver_solve_seconds",
+    "Wall time of the CP-SAT search over all attempts",
+    buckets=SECONDS_BUCKETS,
+)
+SOLVER_CPU_SECONDS = Histogram(
+    "stundenplan_solver_cpu_seconds",
+    "CPU time of the solving process",
+    buckets=SECONDS_BUCKETS,
+)
+SOLVER_MODEL_VARIABLES = Histogram(
+    "stundenplan_solver_model_variables",
+    "Variables of the built CP-SAT model",
+    buckets=MODEL_SIZE_BUCKETS,
+)
+SOLVER_MODEL_CONSTRAINTS = Histogram(
+    "stundenplan_solver_model_constraints",
+    "Constraints of the built CP-SAT model",
+    buckets=MODEL_SIZE_BUCKETS,
+)
+SOLVER_OBJECTIVE = Histogram(
+    "stundenplan_solver_objective",
+    "Objective value of feasible generations",
+    buckets=OBJECTIVE_BUCKETS,
+)
+
+CACHE_LOOKUPS = Counter(
+    "stundenplan_cache_lookups_total",
+    "Cache lookups by cache and result (hit/miss)",
+    ["cache", "result"],
+)
+
+
+class _QueryCount:
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value = 0
+
+
+# Set per HTTP request by MetricsMiddleware; sync endpoints run in a thread
+# pool with a copy of the context, which still refers to the same counter.
+_request_queries: ContextVar[Optional[_QueryCount]] = ContextVar("stundenplan_request_queries", default=None)
+
+
+def _count_query(conn, cursor, statement, parameters, context, executemany) -> None:
+    counter = _request_queries.get()
+    if counter is not None:
+        counter.value += 1
+
+
+def install_query_counter(target: Any = Engine) -> None:
+    """Count the SQL statements of ``target`` (default: all engines) per request."""
+    if not event.contains(target, "before_cursor_execute", _count_query):
+        event.listen(target, "before_cursor_execute", _count_query)
+
+
+def start_query_count() -> Tuple[_QueryCount, Any]:
+    counter = _QueryCount()
+    return counter, _request_queries.set(counter)
+
+
+def stop_query_count(token: Any) -> None:
+    _request_queries.reset(token)
+
+
+def _route_label(scope: Mapping[str, Any]) -> str:
+    # The route template keeps the label set small; unmatched paths share one label
+    return getattr(scope.get("route"), "path", None) or "<unmatched>"
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency and SQL statements per route template."""
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = 500
+
+        async def send_with_status(message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        counter, token = start_query_count()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            stop_query_count(token)
+            method, route = scope["method"], _route_label(scope)
+            HTTP_REQUEST_SECONDS.labels(method, route, str(status)).observe(elapsed)
+            HTTP_REQUEST_DB_QUERIES.labels(method, route).observe(counter.value)
+
+
+def record_cache_lookup(cache: str, hit: bool) -> None:
+    CACHE_LOOKUPS.labels(cache, "hit" if hit else "miss").inc()
+
+
+def record_solver_queue(running: int, queued: int) -> None:
+    SOLVER_RUNNING.set(running)
+    SOLVER_QUEUED.set(queued)
+
+
+def record_solver_rejection(reason: str) -> None:
+    SOLVER_REJECTIONS.labels(reason).inc()
+
+
+def _observe(histogram: Histogram, value: Any) -> None:
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        histogram.observe(value)
+
+
+def record_generation(
+    status: str,
+    objective_value: Optional[float],
+    stats: Optional[Dict[str, Any]],
+    cpu_seconds: Optional[float] = None,
+) -> None:
+    """Solver metrics of one generation from the ``SolverResult`` stats."""
+    stats = stats or {}
+    SOLVER_GENERATIONS.labels(status).inc()
+    _observe(SOLVER_BUILD_SECONDS, stats.get("build_seconds"))
+    _observe(SOLVER_PRESOLVE_SECONDS, stats.get("presolve_seconds"))
+    _observe(SOLVER_SOLVE_SECONDS, stats.get("wall_seconds"))
+    _observe(SOLVER_CPU_SECONDS, cpu_seconds)
+    _observe(SOLVER_MODEL_VARIABLES, stats.get("variables"))
+    _observe(SOLVER_MODEL_CONSTRAINTS, stats.get("constraints"))
+    _observe(SOLVER_OBJECTIVE, objective_value)
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """Exposition text of all metrics (of all workers in multiprocess mode)."""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_worker_dead(pid: Optional[int] = None) -> None:
+    """Drop the live gauges of a stopped worker from the shared directory."""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(pid or os.getpid())
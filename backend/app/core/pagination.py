@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import base64
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Iterable, List, Optional, Sequence
+
+from fastapi import HTTPException, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import tuple_
+from sqlmodel import Session, select
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+DEFAULT_PAGE_SIZE = 200
+MAX_PAGE_SIZE = 1000
+
+
+@dataclass
+class KeysetPage:
+    rows: List[Any]
+    next_cursor: Optional[str] = None
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Opaque cursor for the sort key of the last row of a page."""
+    payload = json.dumps([v.isoformat() if isinstance(v, datetime) else v for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, columns: Sequence[Any]) -> List[Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8"))
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError(cursor)
+        return [
+            datetime.fromisoformat(value) if _is_datetime(column) and value is not None else value
+            for column, value in zip(columns, values)
+        ]
+    except (ValueError, TypeError, UnicodeError, json.JSONDecodeError):
+        raise HTTPException(status_code=400, detail="Ungültiger Cursor")
+
+
+def _is_datetime(column) -> bool:
+    try:
+        return issubclass(column.type.python_type, datetime)
+    except NotImplementedError:
+        return False
+
+
+def parse_fields(fields: Optional[str], allowed: Iterable[str]) -> Optional[List[str]]:
+    """Validate a ``fields=a,b`` projection; ``id`` is always included."""
+    if not fields:
+        return None
+    allowed = list(allowed)
+    requested = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = sorted({name for name in requested if name not in allowed})
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unbekannte Felder: {', '.join(unknown)}")
+    selected = ["id"] if "id" in allowed else []
+    selected += [name for name in requested if name not in selected]
+    return selected
+
+
+def page_size(limit: Optional[int], cursor: Optional[str]) -> Optional[int]:
+    """No ``limit`` and no ``cursor`` keeps the unpaged behaviour of the list endpoints."""
+    if limit is None:
+        return DEFAULT_PAGE_SIZE if cursor else None
+    return max(1, min(int(limit), MAX_PAGE_SIZE))
+
+
+def keyset_page(
+    session: Session,
+    stmt,
+    sort_columns: Sequence[Any],
+    *,
+    limit: Optional[int],
+    cursor: Optional[str],
+    descending: bool = False,
+) -> KeysetPage:
+    """Run ``stmt`` ordered by ``sort_columns`` and return one page after ``cursor``.
+
+    The last sort column must be unique (the primary key). Rows are fetched with
+    ``limit + 1`` to detect a following page; the cursor holds the sort key of the
+    last returned row, so each page is a single index range scan.
+    """
+    size = page_size(limit, cursor)
+    key = tuple_(*sort_columns) if len(sort_columns) > 1 else sort_columns[0]
+    if cursor:
+        values = decode_cursor(cursor, sort_columns)
+        bound = tuple_(*values) if len(values) > 1 else values[0]
+        stmt = stmt.where(key < bound if descending else key > bound)
+    stmt = stmt.order_by(*[column.desc() if descending else column.asc() for column in sort_columns])
+    if size is None:
+        return KeysetPage(rows=list(session.exec(stmt).all()))
+    rows = list(session.exec(stmt.limit(size + 1)).all())
+    if len(rows) <= size:
+        return KeysetPage(rows=rows)
+    rows = rows[:size]
+    last = rows[-1]
+    names = [column.key for column in sort_columns]
+    if hasattr(last, "_mapping"):
+        return KeysetPage(rows=rows, next_cursor=encode_cursor([last._mapping[name] for name in names]))
+    return KeysetPage(rows=rows, next_cursor=encode_cursor([getattr(last, name) for name in names]))
+
+
+def list_model_page(
+    session: Session,
+    model,
+    filters: Sequence[Any],
+    response: Response,
+    *,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    sort_columns: Optional[Sequence[Any]] = None,
+    descending: bool = False,
+):
+    """Shared implementation of the paged list endpoints.
+
+    Without ``fields`` the ORM rows are returned (validated by the route's
+    response_model); with ``fields`` only those columns are selected and returned
+    as plain objects. The cursor for the next page is sent in ``X-Next-Cursor``.
+    """
+    table = model.__table__
+    columns = parse_fields(fields, table.columns.keys())
+    sort_columns = list(sort_columns or [table.c.id])
+    if columns is None:
+        stmt = select(model).where(*filters)
+        page = keyset_page(session, stmt, sort_columns, limit=limit, cursor=cursor, descending=descending)
+        if page.next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = page.next_cursor
+        return page.rows
+
+    selected = [table.c[name] for name in columns]
+    extra = [column for column in sort_columns if column.key not in columns]
+    stmt = select(*selected, *extra).where(*filters)
+    page = keyset_page(session, stmt, sort_columns, limit=limit, cursor=cursor, descending=descending)
+    # Headers already set on the injected response (e.g. ETag) carry over
+    headers = {key: value for key, value in response.headers.items() if key != "content-length"}
+    if page.next_cursor:
+        headers[NEXT_CURSOR_HEADER] = page.next_cursor
+    content = [{name: row._mapping[name] for name in columns} for row in page.rows]
+    return JSONResponse(jsonable_encoder(content), headers=headers)
@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+
+
+logger = logging.getLogger("stundenplan.tracing")
+
+SERVER_TIMING_HEADER = "Server-Timing"
+
+
+@dataclass
+class Span:
+    name: str
+    depth: int
+    start_ms: Optional[float]  # relative to the trace start; None when measured elsewhere
+    duration_ms: float = 0.0
+    queries: int = 0
+
+
+@dataclass
+class Trace:
+    """Nested stage timings and SQL statement count of one request."""
+
+    name: str
+    trace_id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    started_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    started: float = field(default_factory=time.perf_counter)
+    spans: List[Span] = field(default_factory=list)  # finished spans in start order
+    queries: int = 0
+    duration_ms: Optional[float] = None
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1000.0
+
+    def timings(self) -> List[Dict[str, Any]]:
+        return [
+            {
+                "name": s.name,
+                "depth": s.depth,
+                "start_ms": None if s.start_ms is None else round(s.start_ms, 3),
+                "duration_ms": round(s.duration_ms, 3),
+                "queries": s.queries,
+            }
+            for s in self.spans
+        ]
+
+    def server_timing(self, max_spans: int = 20) -> str:
+        """``Server-Timing`` value: total, SQL statements and the first ``max_spans`` spans."""
+        total = self.duration_ms if self.duration_ms is not None else self.elapsed_ms()
+        entries = [f"total;dur={total:.1f}", f'db;desc="{self.queries} queries"']
+        entries += [f"{s.name};dur={s.duration_ms:.1f}" for s in self.spans[:max_spans]]
+        return ", ".join(entries)
+
+    def to_record(self, **extra: Any) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "name": self.name,
+            "started_at": self.started_at.isoformat(),
+            "duration_ms": None if self.duration_ms is None else round(self.duration_ms, 3),
+            "queries": self.queries,
+            **extra,
+            "spans": self.timings(),
+        }
+
+
+_current_trace: ContextVar[Optional[Trace]] = ContextVar("stundenplan_trace", default=None)
+_current_depth: ContextVar[int] = ContextVar("stundenplan_trace_depth", default=0)
+
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+
+@contextmanager
+def span(name: str) -> Iterator[Optional[Span]]:
+    """Time the enclosed block as a child of the current span; no-op without a trace."""
+    trace = _current_trace.get()
+    if trace is None:
+        yield None
+        return
+    depth = _current_depth.get()
+    entry = Span(name=name, depth=depth, start_ms=trace.elapsed_ms())
+    # Reserve the position so that spans stay in start order
+    trace.spans.append(entry)
+    queries = trace.queries
+    token = _current_depth.set(depth + 1)
+    try:
+        yield entry
+    finally:
+        _current_depth.reset(token)
+        entry.duration_ms = trace.elapsed_ms() - entry.start_ms
+        entry.queries = trace.queries - queries
+
+
+def record_span(name: str, seconds: Optional[float]) -> None:
+    """Add a stage measured elsewhere (e.g. in a solver process) below the current span."""
+    trace = _current_trace.get()
+    if trace is None or seconds is None:
+        return
+    trace.spans.append(Span(name=name, depth=_current_depth.get(), start_ms=None, duration_ms=seconds * 1000.0))
+
+
+@contextmanager
+def start_trace(name: str) -> Iterator[Trace]:
+    """Start a trace for the enclosed block.
+
+    Inside an active trace (e.g. the request's) only a span ``name`` is opened
+    and the active trace is returned.
+    """
+    active = _current_trace.get()
+    if active is not None:
+        with span(name):
+            yield active
+        return
+    trace = Trace(name=name)
+    token = _current_trace.set(trace)
+    depth_token = _current_depth.set(0)
+    try:
+        yield trace
+    finally:
+        trace.duration_ms = trace.elapsed_ms()
+        _current_depth.reset(depth_token)
+        _current_trace.reset(token)
+
+
+def _count_query(conn, cursor, statement, parameters, context, executemany) -> None:
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.queries += 1
+
+
+def install_trace_query_counter(target: Any = Engine) -> None:
+    """Count the SQL statements of ``target`` (default: all engines) in the current trace."""
+    if not event.contains(target, "before_cursor_execute", _count_query):
+        event.listen(target, "before_cursor_execute", _count_query)
+
+
+class TraceFileSink:
+    """Appends traces as JSON lines to ``<directory>/traces-<date>-<pid>.jsonl``.
+
+    One file per process and day, so several uvicorn workers never interleave lines.
+    """
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = Path(directory)
+        self._lock = threading.Lock()
+
+    def path_for(self, when: datetime) -> Path:
+        return self.directory / f"traces-{when:%Y%m%d}-{os.getpid()}.jsonl"
+
+    def write(self, record: Dict[str, Any]) -> None:
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":"), default=str)
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with self.path_for(datetime.now(timezone.utc)).open("a", encoding="utf-8") as fh:
+                fh.write(line + "\n")
+
+
+class TracingMiddleware:
+    """ASGI middleware running every HTTP request in a ``Trace``.
+
+    Sets the ``Server-Timing`` header and writes traces with spans or slower
+    than ``slow_ms`` to ``sink``.
+    """
+
+    def __init__(self, app, sink: Optional[TraceFileSink] = None, slow_ms: float = 500.0, max_spans: int = 20) -> None:
+        self.app = app
+        self.sink = sink
+        self.slow_ms = slow_ms
+        self.max_spans = max_spans
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = 500
+
+        with start_trace(f"{scope['method']} {scope['path']}") as trace:
+
+            async def send_with_timing(message) -> None:
+                nonlocal status
+                if message["type"] == "http.response.start":
+                    status = message["status"]
+                    MutableHeaders(scope=message).append(SERVER_TIMING_HEADER, trace.server_timing(self.max_spans))
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_timing)
+            finally:
+                route = getattr(scope.get("route"), "path", None)
+                if route:
+                    trace.name = f"{scope['method']} {route}"
+        if self.sink is not None and (trace.spans or trace.duration_ms >= self.slow_ms):
+            try:
+                self.sink.write(trace.to_record(status=status))
+            except OSError:
+                logger.exception("Trace could not be written | trace_id=%s", trace.trace_id)
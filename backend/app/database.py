@@ -1,15 +1,85 @@
-from typing import Iterator
+from typing import Any, Iterator, Optional
 
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
 from sqlmodel import SQLModel, Session, create_engine
 
+from .config import settings
+
 
 # SQLite-Datei im Projektverzeichnis (einfach für lokalen Start)
-DATABASE_URL = "sqlite:///./backend.db"
+DATABASE_URL = settings.database_url
+
+_ALLOWED_JOURNAL_MODES = {"DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"}
+_ALLOWED_SYNCHRONOUS = {"OFF", "NORMAL", "FULL", "EXTRA"}
+_ALLOWED_TEMP_STORE = {"DEFAULT", "FILE", "MEMORY"}
+
+
+def _pragma_choice(value: str, allowed: set[str], fallback: str) -> str:
+    normalized = str(value or "").strip().upper()
+    return normalized if normalized in allowed else fallback
+
+
+def sqlite_pragmas(cfg: Any = settings) -> list[str]:
+    """Return the PRAGMA statements of the SQLite tuning profile."""
+    return [
+        f"PRAGMA journal_mode={_pragma_choice(cfg.sqlite_journal_mode, _ALLOWED_JOURNAL_MODES, 'WAL')}",
+        f"PRAGMA synchronous={_pragma_choice(cfg.sqlite_synchronous, _ALLOWED_SYNCHRONOUS, 'NORMAL')}",
+        f"PRAGMA busy_timeout={max(0, int(cfg.sqlite_busy_timeout_ms))}",
+        f"PRAGMA mmap_size={max(0, int(cfg.sqlite_mmap_size))}",
+        # Negative cache_size = Größe in KiB statt in Seiten
+        f"PRAGMA cache_size={-max(0, int(cfg.sqlite_cache_size_kib))}",
+        f"PRAGMA temp_store={_pragma_choice(cfg.sqlite_temp_store, _ALLOWED_TEMP_STORE, 'MEMORY')}",
+    ]
+
+
+def install_sqlite_tuning(target_engine: Engine, cfg: Any = settings) -> None:
+    """Apply the tuning PRAGMAs on every new DBAPI connection of ``target_engine``."""
+    statements = sqlite_pragmas(cfg)
 
-engine = create_engine(
-    DATABASE_URL,
-    echo=False,  # Für Debugging auf True setzen
-)
+    @event.listens_for(target_engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+        cursor = dbapi_connection.cursor()
+        try:
+            for stmt in statements:
+                cursor.execute(stmt)
+        finally:
+            cursor.close()
+
+
+def build_engine(url: Optional[str] = None, cfg: Any = settings, tuned: Optional[bool] = None) -> Engine:
+    """Create the application engine with pool and SQLite settings from ``cfg``.
+
+    File-based SQLite databases get a QueuePool sized for multi-threaded uvicorn
+    workers plus the WAL/mmap tuning profile; in-memory URLs keep SQLAlchemy's defaults.
+    """
+    url = url or cfg.database_url
+    is_sqlite = url.startswith("sqlite")
+    is_memory = is_sqlite and (url in ("sqlite://", "sqlite:///:memory:") or "mode=memory" in url)
+    use_tuning = cfg.sqlite_tuning if tuned is None else tuned
+
+    kwargs: dict[str, Any] = {"echo": cfg.database_echo}
+    if is_sqlite:
+        kwargs["connect_args"] = {
+            "check_same_thread": False,
+            "timeout": max(0.0, cfg.sqlite_busy_timeout_ms / 1000.0),
+        }
+    if not is_memory:
+        kwargs.update(
+            pool_size=cfg.db_pool_size,
+            max_overflow=cfg.db_max_overflow,
+            pool_timeout=cfg.db_pool_timeout,
+            pool_recycle=cfg.db_pool_recycle,
+            pool_pre_ping=True,
+        )
+
+    new_engine = create_engine(url, **kwargs)
+    if is_sqlite and not is_memory and use_tuning:
+        install_sqlite_tuning(new_engine, cfg)
+    return new_engine
+
+
+engine = build_engine(DATABASE_URL)
 
 
 def create_db_and_tables() -> None:
@@ -20,4 +90,3 @@ def create_db_and_tables() -> None:
 def get_session() -> Iterator[Session]:
     with Session(engine) as session:
         yield session
-
@@ -1,15 +1,18 @@
 from __future__ import annotations
 
-import json
-from collections import defaultdict
-from dataclasses import dataclass
-from typing import Dict, List, Optional, Set, Tuple
+import threading
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 from fastapi import HTTPException
 from sqlmodel import Session, select
 
+from ...core.metrics import record_cache_lookup
 from ...models import BasisPlan
-from ...schemas import SlotMeta
+from .basis_store import load_basis_document
+from ...schemas import BASIS_PLAN_MAX_SLOTS, SlotMeta
 from ...utils import TAGE
 
 
@@ -27,125 +30,94 @@ class BasisPlanContext:
     slots_meta: List[SlotMeta]
 
 
-class BasisPlanParser:
-    DAY_KEY_TO_TAG = {
-        "mon": "Mo",
-        "tue": "Di",
-        "wed": "Mi",
-        "thu": "Do",
-        "fri": "Fr",
-    }
+@dataclass
+class NormalizedBasisPlan:
+    """Requirement-independent part of a parsed basis plan.
 
-    def __init__(self, session: Session) -> None:
-        self.session = session
+    Fixed and flexible entries keep class/subject ids; names and fids are bound
+    per generation by ``BasisPlanParser.bind``. Instances are shared through the
+    cache and must not be mutated.
+    """
+    room_plan: Dict[int, Dict[str, List[bool]]] = field(default_factory=dict)
+    class_windows: Dict[int, Dict[str, List[bool]]] = field(default_factory=dict)
+    # (class_id, subject_id, day, slot)
+    fixed_entries: List[Tuple[int, int, str, int]] = field(default_factory=list)
+    # (class_id, subject_id, options, highest registered slot index or -1)
+    flexible_entries: List[Tuple[int, int, List[Tuple[str, int]], int]] = field(default_factory=list)
+    # slots per day before flexible groups are taken into account
+    base_slots_per_day: int = 8
+    pause_slots: frozenset = frozenset()
+    slots_meta: List[dict] = field(default_factory=list)
 
-    def parse(
-        self,
-        account_id: int,
-        period_id: int,
-        df,
-        FACH_ID,
-        class_id_to_name: Dict[int, str],
-        subject_id_to_name: Dict[int, str],
-    ) -> BasisPlanContext:
-        basis_payload = self._load_payload(account_id, period_id)
-        return self.parse_from_payload(
-            basis_payload,
-            df,
-            FACH_ID,
-            class_id_to_name,
-            subject_id_to_name,
-        )
 
-    def parse_from_payload(
-        self,
-        payload: Dict[str, object],
-        df,
-        FACH_ID,
-        class_id_to_name: Dict[int, str],
-        subject_id_to_name: Dict[int, str],
-    ) -> BasisPlanContext:
-        """Parse already-loaded JSON payload (useful for previews/tests)."""
-        basis_payload = payload or {}
+BASIS_CACHE_SIZE = 64
+_BasisCacheKey = Tuple[int, int, int, Optional[datetime]]  # account, period, row id, updated_at
+_basis_cache: "OrderedDict[_BasisCacheKey, NormalizedBasisPlan]" = OrderedDict()
+_basis_cache_lock = threading.Lock()
 
-        self._reset_state()
-        self.class_id_to_name = class_id_to_name
-        self.subject_id_to_name = subject_id_to_name
 
-        self._parse_room_plan(basis_payload)
-        self._parse_meta(basis_payload)
-        self._parse_class_windows(basis_payload)
+def _cache_get(key: _BasisCacheKey) -> Optional[NormalizedBasisPlan]:
+    with _basis_cache_lock:
+        entry = _basis_cache.get(key)
+        if entry is not None:
+            _basis_cache.move_to_end(key)
+    record_cache_lookup("basis_plan", entry is not None)
+    return entry
 
-        pick_fid = self._build_fid_picker(df, FACH_ID)
-        self._parse_fixed_slots(basis_payload, pick_fid)
-        self._parse_flexible_groups(basis_payload, pick_fid)
-
-        if self.basis_errors:
-            raise HTTPException(status_code=400, detail=" ".join(sorted(self.basis_errors)))
-
-        slots_meta = [SlotMeta(**item) for item in self.slots_meta_payload] if self.slots_meta_payload else []
-        if self.fixed_slot_map:
-            self.fixed_slot_map = {
-                fid: sorted(
-                    set(slots),
-                    key=lambda item: (TAGE.index(item[0]) if item[0] in TAGE else 0, item[1]),
-                )
-                for fid, slots in self.fixed_slot_map.items()
-            }
 
-        return BasisPlanContext(
-            room_plan=self.room_plan,
-            class_windows_by_name=self.class_windows_by_name,
-            class_fixed_lookup=self.class_fixed_lookup,
-            flexible_slot_lookup=self.flexible_slot_lookup,
-            flexible_slot_limits=self.flexible_slot_limits,
-            flexible_groups=self.flexible_groups,
-            fixed_slot_map=self.fixed_slot_map,
-            slots_per_day=self.slots_per_day,
-            pause_slots=self.pause_slots,
-            slots_meta=slots_meta,
-        )
+def _cache_put(key: _BasisCacheKey, value: NormalizedBasisPlan) -> None:
+    with _basis_cache_lock:
+        # Only the latest revision of a basis plan is worth keeping
+        for stale in [k for k in _basis_cache if k[:2] == key[:2] and k != key]:
+            del _basis_cache[stale]
+        _basis_cache[key] = value
+        _basis_cache.move_to_end(key)
+        while len(_basis_cache) > BASIS_CACHE_SIZE:
+            _basis_cache.popitem(last=False)
 
-    def _reset_state(self) -> None:
-        self.room_plan: Dict[int, Dict[str, List[bool]]] = {}
-        self.class_windows_by_name: Dict[str, Dict[str, List[bool]]] = {}
-        self.class_fixed_lookup: Dict[str, Dict[str, set[int]]] = {}
-        self.flexible_slot_lookup: Dict[Tuple[str, str, int], set[int]] = {}
-        self.flexible_slot_limits: Dict[Tuple[str, str, int], set[int]] = {}
-        self.flexible_groups: List[dict] = []
-        self.fixed_slot_map: Dict[int, List[Tuple[str, int]]] = {}
+
+def invalidate_basis_plan_cache(account_id: Optional[int] = None, period_id: Optional[int] = None) -> None:
+    """Drop cached basis plans (all, per account, or per account and period)."""
+    with _basis_cache_lock:
+        for key in list(_basis_cache):
+            if account_id is not None and key[0] != account_id:
+                continue
+            if period_id is not None and key[1] != period_id:
+                continue
+            del _basis_cache[key]
+
+
+def _option_sort_key(item: Tuple[str, int]):
+    return (TAGE.index(item[0]) if item[0] in TAGE else 0, item[1])
+
+
+class _BasisPlanNormalizer:
+    """Walks the basis plan JSON once; mirrors the historic parsing order so that
+    ``slots_per_day`` grows exactly as before."""
+
+    DAY_KEY_TO_TAG = {
+        "mon": "Mo",
+        "tue": "Di",
+        "wed": "Mi",
+        "thu": "Do",
+        "fri": "Fr",
+    }
+
+    def __init__(self) -> None:
+        self.result = NormalizedBasisPlan()
         self.slots_per_day = 8
-        self.pause_slots: set[int] = set()
-        self.slots_meta_payload: List[dict] = []
-        self.basis_errors: Set[str] = set()
+        self.pause_slots: Set[int] = set()
 
-    def _load_payload(self, account_id: int, period_id: int) -> Dict[str, object]:
-        basis_row = self.session.exec(
-            select(BasisPlan).where(
-                BasisPlan.account_id == account_id,
-                BasisPlan.planning_period_id == period_id,
-            )
-        ).first()
-        if not basis_row:
-            legacy_basis = self.session.exec(
-                select(BasisPlan).where(
-                    BasisPlan.account_id == account_id,
-                    BasisPlan.planning_period_id == None,  # noqa: E711
-                )
-            ).first()
-            if legacy_basis:
-                legacy_basis.planning_period_id = period_id
-                self.session.add(legacy_basis)
-                self.session.commit()
-                self.session.refresh(legacy_basis)
-                basis_row = legacy_basis
-        if basis_row and basis_row.data:
-            try:
-                payload = json.loads(basis_row.data)
-            except json.JSONDecodeError:
-                payload = {}
-            return payload if isinstance(payload, dict) else {}
-        return {}
+    def normalize(self, payload: Dict[str, object]) -> NormalizedBasisPlan:
+        payload = payload or {}
+        self._parse_room_plan(payload)
+        self._parse_meta(payload)
+        self._parse_class_windows(payload)
+        self._parse_fixed_slots(payload)
+        self.result.base_slots_per_day = self.slots_per_day
+        self._parse_flexible_groups(payload)
+        self.result.pause_slots = frozenset(self.pause_slots)
+        return self.result
 
     def _parse_room_plan(self, payload: Dict[str, object]) -> None:
         rooms_cfg = payload.get("rooms") or {}
@@ -174,7 +146,7 @@ class BasisPlanParser:
                         bool(slots[i]) if i < len(slots) else True
                         for i in range(self.slots_per_day if self.slots_per_day > 0 else 8)
                     ]
-            self.room_plan[rid_int] = normalized
+            self.result.room_plan[rid_int] = normalized
 
     def _parse_meta(self, payload: Dict[str, object]) -> None:
         meta_cfg = payload.get("meta") if isinstance(payload, dict) else {}
@@ -186,7 +158,7 @@ class BasisPlanParser:
                     if isinstance(slot_entry, dict) and slot_entry.get("isPause"):
                         self.pause_slots.add(idx)
                     label = slot_entry.get("label") if isinstance(slot_entry, dict) else None
-                    self.slots_meta_payload.append(
+                    self.result.slots_meta.append(
                         {
                             "index": idx,
                             "label": label or f"{idx + 1}. Stunde",
@@ -217,13 +189,9 @@ class BasisPlanParser:
                             self._register_slot_index(i)
                         if not normalized[tag]:
                             normalized[tag] = [True] * self.slots_per_day
-                class_name = self.class_id_to_name.get(class_id_int)
-                if class_name:
-                    self.class_windows_by_name[class_name] = normalized
-                else:
-                    self.class_windows_by_name[str(class_id_int)] = normalized
+                self.result.class_windows[class_id_int] = normalized
 
-    def _parse_fixed_slots(self, payload: Dict[str, object], pick_fid) -> None:
+    def _parse_fixed_slots(self, payload: Dict[str, object]) -> None:
         fixed_cfg = payload.get("fixed") or {}
         if isinstance(fixed_cfg, dict):
             for class_key, entries in fixed_cfg.items():
@@ -231,7 +199,6 @@ class BasisPlanParser:
                     class_id_int = int(class_key)
                 except (TypeError, ValueError):
                     continue
-                class_name = self.class_id_to_name.get(class_id_int) or str(class_id_int)
                 if not isinstance(entries, list):
                     continue
                 for entry in entries:
@@ -243,24 +210,20 @@ class BasisPlanParser:
                     if subject_id is None or day_key not in self.DAY_KEY_TO_TAG or slot_index is None:
                         continue
                     self._register_slot_index(slot_index)
-                    subject_name = self.subject_id_to_name.get(int(subject_id))
-                    if not subject_name:
-                        continue
-                    solver_day = self.DAY_KEY_TO_TAG[day_key]
+                    subject_id_int = int(subject_id)
                     try:
                         slot_int = int(slot_index)
                     except (TypeError, ValueError):
                         continue
                     if slot_int < 0 or slot_int >= self.slots_per_day:
                         continue
-                    fid = pick_fid((class_name, subject_name))
-                    if fid is None:
-                        self.basis_errors.add(f"Zu viele feste Slots für {class_name} / {subject_name}.")
-                        continue
-                    self.fixed_slot_map.setdefault(fid, []).append((solver_day, slot_int))
-                    self.class_fixed_lookup.setdefault(class_name, {}).setdefault(solver_day, set()).add(slot_int)
+                    self.result.fixed_entries.append(
+                        (class_id_int, subject_id_int, self.DAY_KEY_TO_TAG[day_key], slot_int)
+                    )
 
-    def _parse_flexible_groups(self, payload: Dict[str, object], pick_fid) -> None:
+    def _parse_flexible_groups(self, payload: Dict[str, object]) -> None:
+        # Slot indexes of a group only count once its subject is known (see bind),
+        # so they are recorded per group instead of being registered here.
         flex_cfg = payload.get("flexible") or {}
         if isinstance(flex_cfg, dict):
             for class_key, groups in flex_cfg.items():
@@ -268,7 +231,6 @@ class BasisPlanParser:
                     class_id_int = int(class_key)
                 except (TypeError, ValueError):
                     continue
-                class_name = self.class_id_to_name.get(class_id_int) or str(class_id_int)
                 if not isinstance(groups, list):
                     continue
                 for group in groups:
@@ -277,10 +239,9 @@ class BasisPlanParser:
                     subject_id = group.get("subjectId") or group.get("subject_id")
                     if subject_id is None:
                         continue
-                    subject_name = self.subject_id_to_name.get(int(subject_id))
-                    if not subject_name:
-                        continue
+                    subject_id_int = int(subject_id)
                     option_set = set()
+                    highest = -1
                     for slot in group.get("slots") or []:
                         if not isinstance(slot, dict):
                             continue
@@ -292,36 +253,176 @@ class BasisPlanParser:
                             slot_int = int(slot.get("slot"))
                         except (TypeError, ValueError):
                             continue
-                        self._register_slot_index(slot_int)
-                        if slot_int < 0 or slot_int >= self.slots_per_day:
+                        if not 0 <= slot_int < BASIS_PLAN_MAX_SLOTS:
                             continue
+                        highest = max(highest, slot_int)
                         option_set.add((solver_day, slot_int))
-                    if not option_set:
-                        continue
-                    fid = pick_fid((class_name, subject_name))
-                    if fid is None:
-                        self.basis_errors.add(f"Zu viele Optionen für {class_name} / {subject_name}.")
-                        continue
-                    option_payload = {
-                        "fid": fid,
-                        "slots": sorted(
-                            option_set,
-                            key=lambda item: (TAGE.index(item[0]) if item[0] in TAGE else 0, item[1]),
-                        ),
-                    }
-                    self.flexible_groups.append(option_payload)
-                    for solver_day, slot_int in option_set:
-                        self.flexible_slot_lookup.setdefault((class_name, solver_day, slot_int), set()).add(fid)
-                        self.flexible_slot_limits.setdefault((class_name, solver_day, slot_int), set()).add(fid)
+                    self.result.flexible_entries.append(
+                        (class_id_int, subject_id_int, sorted(option_set, key=_option_sort_key), highest)
+                    )
 
     def _register_slot_index(self, value: object) -> None:
         try:
             slot_idx = int(value)
         except (TypeError, ValueError):
             return
-        if slot_idx >= 0 and slot_idx + 1 > self.slots_per_day:
+        # Out-of-range indexes (e.g. stored before the cap) must not blow up the day
+        if 0 <= slot_idx < BASIS_PLAN_MAX_SLOTS and slot_idx + 1 > self.slots_per_day:
             self.slots_per_day = slot_idx + 1
 
+
+def normalize_basis_payload(payload: Dict[str, object]) -> NormalizedBasisPlan:
+    """Parse the requirement-independent parts of a basis plan JSON payload."""
+    return _BasisPlanNormalizer().normalize(payload)
+
+
+class BasisPlanParser:
+    DAY_KEY_TO_TAG = _BasisPlanNormalizer.DAY_KEY_TO_TAG
+
+    def __init__(self, session: Session) -> None:
+        self.session = session
+
+    def parse(
+        self,
+        account_id: int,
+        period_id: int,
+        df,
+        FACH_ID,
+        class_id_to_name: Dict[int, str],
+        subject_id_to_name: Dict[int, str],
+    ) -> BasisPlanContext:
+        normalized = self.load_normalized(account_id, period_id)
+        return self.bind(normalized, df, FACH_ID, class_id_to_name, subject_id_to_name)
+
+    def parse_from_payload(
+        self,
+        payload: Dict[str, object],
+        df,
+        FACH_ID,
+        class_id_to_name: Dict[int, str],
+        subject_id_to_name: Dict[int, str],
+    ) -> BasisPlanContext:
+        """Parse already-loaded JSON payload (useful for previews/tests)."""
+        return self.bind(normalize_basis_payload(payload), df, FACH_ID, class_id_to_name, subject_id_to_name)
+
+    def load_normalized(self, account_id: int, period_id: int, claim_legacy: bool = True) -> NormalizedBasisPlan:
+        """Normalized basis plan of a period, cached per (account, period, updated_at).
+
+        A cache hit only reads the id/updated_at columns, never the JSON document.
+        """
+        basis_row = self._find_row(account_id, period_id, claim_legacy)
+        if basis_row is None:
+            return NormalizedBasisPlan()
+        row_id, updated_at = basis_row
+        key = (account_id, period_id, row_id, updated_at)
+        cached = _cache_get(key)
+        if cached is not None:
+            return cached
+        row = self.session.exec(
+            select(BasisPlan.id, BasisPlan.data, BasisPlan.storage_version).where(BasisPlan.id == row_id)
+        ).first()
+        normalized = normalize_basis_payload(load_basis_document(self.session, row) if row is not None else {})
+        _cache_put(key, normalized)
+        return normalized
+
+    def bind(
+        self,
+        normalized: NormalizedBasisPlan,
+        df,
+        FACH_ID,
+        class_id_to_name: Dict[int, str],
+        subject_id_to_name: Dict[int, str],
+    ) -> BasisPlanContext:
+        """Attach class/subject names and pick fids for the current requirement set."""
+        pick_fid = self._build_fid_picker(df, FACH_ID)
+        basis_errors: Set[str] = set()
+
+        def class_name_of(class_id: int) -> str:
+            return class_id_to_name.get(class_id) or str(class_id)
+
+        class_windows_by_name = {
+            class_name_of(class_id): {tag: list(slots) for tag, slots in windows.items()}
+            for class_id, windows in normalized.class_windows.items()
+        }
+
+        fixed_slot_map: Dict[int, List[Tuple[str, int]]] = {}
+        class_fixed_lookup: Dict[str, Dict[str, set[int]]] = {}
+        for class_id, subject_id, solver_day, slot_int in normalized.fixed_entries:
+            subject_name = subject_id_to_name.get(subject_id)
+            if not subject_name:
+                continue
+            class_name = class_name_of(class_id)
+            fid = pick_fid((class_name, subject_name))
+            if fid is None:
+                basis_errors.add(f"Zu viele feste Slots für {class_name} / {subject_name}.")
+                continue
+            fixed_slot_map.setdefault(fid, []).append((solver_day, slot_int))
+            class_fixed_lookup.setdefault(class_name, {}).setdefault(solver_day, set()).add(slot_int)
+
+        slots_per_day = normalized.base_slots_per_day
+        flexible_groups: List[dict] = []
+        flexible_slot_lookup: Dict[Tuple[str, str, int], set[int]] = {}
+        flexible_slot_limits: Dict[Tuple[str, str, int], set[int]] = {}
+        for class_id, subject_id, options, highest in normalized.flexible_entries:
+            subject_name = subject_id_to_name.get(subject_id)
+            if not subject_name:
+                continue
+            slots_per_day = max(slots_per_day, highest + 1)
+            if not options:
+                continue
+            class_name = class_name_of(class_id)
+            fid = pick_fid((class_name, subject_name))
+            if fid is None:
+                basis_errors.add(f"Zu viele Optionen für {class_name} / {subject_name}.")
+                continue
+            flexible_groups.append({"fid": fid, "slots": list(options)})
+            for solver_day, slot_int in options:
+                flexible_slot_lookup.setdefault((class_name, solver_day, slot_int), set()).add(fid)
+                flexible_slot_limits.setdefault((class_name, solver_day, slot_int), set()).add(fid)
+
+        if basis_errors:
+            raise HTTPException(status_code=400, detail=" ".join(sorted(basis_errors)))
+
+        if fixed_slot_map:
+            fixed_slot_map = {
+                fid: sorted(set(slots), key=_option_sort_key) for fid, slots in fixed_slot_map.items()
+            }
+
+        return BasisPlanContext(
+            room_plan={rid: {tag: list(slots) for tag, slots in plan.items()} for rid, plan in normalized.room_plan.items()},
+            class_windows_by_name=class_windows_by_name,
+            class_fixed_lookup=class_fixed_lookup,
+            flexible_slot_lookup=flexible_slot_lookup,
+            flexible_slot_limits=flexible_slot_limits,
+            flexible_groups=flexible_groups,
+            fixed_slot_map=fixed_slot_map,
+            slots_per_day=slots_per_day,
+            pause_slots=set(normalized.pause_slots),
+            slots_meta=[SlotMeta(**item) for item in normalized.slots_meta],
+        )
+
+    def _find_row(self, account_id: int, period_id: int, claim_legacy: bool) -> Optional[Tuple[int, Any]]:
+        row = self.session.exec(
+            select(BasisPlan.id, BasisPlan.updated_at).where(
+                BasisPlan.account_id == account_id,
+                BasisPlan.planning_period_id == period_id,
+            )
+        ).first()
+        if row is None and claim_legacy:
+            legacy_basis = self.session.exec(
+                select(BasisPlan).where(
+                    BasisPlan.account_id == account_id,
+                    BasisPlan.planning_period_id == None,  # noqa: E711
+                )
+            ).first()
+            if legacy_basis:
+                legacy_basis.planning_period_id = period_id
+                self.session.add(legacy_basis)
+                self.session.commit()
+                self.session.refresh(legacy_basis)
+                return legacy_basis.id, legacy_basis.updated_at
+        return tuple(row) if row is not None else None
+
     def _build_fid_picker(self, df, FACH_ID):
         fid_hours = {fid: int(df.loc[fid, "Wochenstunden"]) for fid in FACH_ID}
         fid_usage = defaultdict(int)
@@ -0,0 +1,441 @@
+from __future__ import annotations
+
+import json
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlmodel import Session
+
+from ...models import BasisPlan, BasisPlanAvailability, BasisPlanFixedSlot, BasisPlanFlexibleGroup, BasisPlanFlexibleSlot
+from ...schemas import BASIS_PLAN_MAX_SLOTS
+
+STORAGE_DOCUMENT = 1
+STORAGE_NORMALIZED = 2
+
+AVAILABILITY_SECTIONS = ("rooms", "classes", "windows")
+
+# JSON key -> (column, expected type); values of another type stay in ``extra``
+_FIXED_KEYS = {"day": ("day", str), "slot": ("slot", int), "subjectId": ("subject_id", int)}
+_GROUP_KEYS = {"id": ("group_key", str), "subjectId": ("subject_id", int)}
+_GROUP_SLOT_KEYS = {"day": ("day", str), "slot": ("slot", int)}
+
+
+def _check_slot(slot: int) -> None:
+    if not 0 <= slot < BASIS_PLAN_MAX_SLOTS:
+        raise ValueError(f"Ungültige Stunde {slot}: erlaubt sind 0 bis {BASIS_PLAN_MAX_SLOTS - 1}")
+
+
+@dataclass
+class BasisPlanRows:
+    availability: List[Dict[str, Any]] = field(default_factory=list)
+    fixed: List[Dict[str, Any]] = field(default_factory=list)
+    groups: List[Tuple[Dict[str, Any], List[Dict[str, Any]]]] = field(default_factory=list)
+
+
+def decode_basis_data(raw: Optional[str]) -> Dict[str, Any]:
+    if not raw:
+        return {}
+    try:
+        payload = json.loads(raw)
+    except json.JSONDecodeError:
+        return {}
+    return payload if isinstance(payload, dict) else {}
+
+
+def _matches(value: Any, expected: type) -> bool:
+    if expected is int:
+        return type(value) is int
+    return isinstance(value, expected)
+
+
+def _split_entry(entry: Any, keys: Dict[str, Tuple[str, type]]) -> Dict[str, Any]:
+    columns: Dict[str, Any] = {column: None for column, _ in keys.values()}
+    if not isinstance(entry, dict):
+        columns["extra"] = json.dumps(entry)
+        return columns
+    rest = {}
+    for key, value in entry.items():
+        column = keys.get(key)
+        if column is not None and _matches(value, column[1]):
+            columns[column[0]] = value
+        else:
+            rest[key] = value
+    columns["extra"] = json.dumps(rest) if rest else None
+    return columns
+
+
+def _join_entry(columns: Dict[str, Any], keys: Dict[str, Tuple[str, type]], **inserted: Any) -> Any:
+    extra = json.loads(columns["extra"]) if columns.get("extra") is not None else {}
+    if not isinstance(extra, dict):
+        return extra
+    entry = {key: columns[column] for key, (column, _) in keys.items() if columns[column] is not None}
+    entry.update(inserted)
+    entry.update(extra)
+    return entry
+
+
+def split_basis_document(document: Dict[str, Any]) -> Tuple[Dict[str, Any], BasisPlanRows]:
+    """Split a basis plan document into table rows and the residual JSON.
+
+    Only values with the expected shape move into rows (boolean slot lists,
+    entries with typed keys); everything else stays in the residual so that
+    ``assemble_basis_document`` returns the same document. Owners whose
+    contents moved out keep an empty placeholder to preserve key order.
+    """
+    residual = dict(document or {})
+    rows = BasisPlanRows()
+
+    for section in AVAILABILITY_SECTIONS:
+        owners = residual.get(section)
+        if not isinstance(owners, dict):
+            continue
+        kept_owners = {}
+        for owner_key, cfg in owners.items():
+            allowed = cfg.get("allowed") if isinstance(cfg, dict) else None
+            if not isinstance(allowed, dict):
+                kept_owners[owner_key] = cfg
+                continue
+            kept_allowed = {}
+            for day, values in allowed.items():
+                if isinstance(values, list) and all(isinstance(value, bool) for value in values):
+                    rows.availability.append(
+                        {
+                            "section": section,
+                            "owner_key": str(owner_key),
+                            "day": str(day),
+                            "slots": "".join("1" if value else "0" for value in values),
+                        }
+                    )
+                else:
+                    kept_allowed[day] = values
+            kept_owners[owner_key] = {**cfg, "allowed": kept_allowed}
+        residual[section] = kept_owners
+
+    fixed = residual.get("fixed")
+    if isinstance(fixed, dict):
+        kept = {}
+        for class_key, entries in fixed.items():
+            if not isinstance(entries, list):
+                kept[class_key] = entries
+                continue
+            for position, entry in enumerate(entries):
+                rows.fixed.append({"class_key": str(class_key), "position": position, **_split_entry(entry, _FIXED_KEYS)})
+            kept[class_key] = []
+        residual["fixed"] = kept
+
+    flexible = residual.get("flexible")
+    if isinstance(flexible, dict):
+        kept = {}
+        for class_key, groups in flexible.items():
+            if not isinstance(groups, list):
+                kept[class_key] = groups
+                continue
+            for position, group in enumerate(groups):
+                slots = group.get("slots") if isinstance(group, dict) else None
+                has_slots = isinstance(slots, list)
+                if has_slots:
+                    group = {key: value for key, value in group.items() if key != "slots"}
+                group_row = {
+                    "class_key": str(class_key),
+                    "position": position,
+                    "has_slots": has_slots,
+                    **_split_entry(group, _GROUP_KEYS),
+                }
+                slot_rows = [
+                    {"position": idx, **_split_entry(slot, _GROUP_SLOT_KEYS)} for idx, slot in enumerate(slots or [])
+                ]
+                rows.groups.append((group_row, slot_rows))
+            kept[class_key] = []
+        residual["flexible"] = kept
+
+    return residual, rows
+
+
+def assemble_basis_document(residual: Dict[str, Any], rows: BasisPlanRows) -> Dict[str, Any]:
+    """Inverse of ``split_basis_document``; rows win over residual values."""
+    document = dict(residual or {})
+
+    by_owner: Dict[Tuple[str, str], Dict[str, List[bool]]] = defaultdict(dict)
+    for row in rows.availability:
+        by_owner[(row["section"], row["owner_key"])][row["day"]] = [char == "1" for char in row["slots"]]
+    for (section, owner_key), days in by_owner.items():
+        owners = document.get(section)
+        owners = dict(owners) if isinstance(owners, dict) else {}
+        cfg = owners.get(owner_key)
+        cfg = dict(cfg) if isinstance(cfg, dict) else {}
+        allowed = cfg.get("allowed")
+        cfg["allowed"] = {**(allowed if isinstance(allowed, dict) else {}), **days}
+        owners[owner_key] = cfg
+        document[section] = owners
+
+    fixed_by_class: Dict[str, List[Any]] = defaultdict(list)
+    for row in rows.fixed:
+        fixed_by_class[row["class_key"]].append(_join_entry(row, _FIXED_KEYS))
+    if fixed_by_class:
+        fixed = document.get("fixed")
+        document["fixed"] = {**(fixed if isinstance(fixed, dict) else {}), **fixed_by_class}
+
+    groups_by_class: Dict[str, List[Any]] = defaultdict(list)
+    for group_row, slot_rows in rows.groups:
+        inserted = {}
+        if group_row["has_slots"]:
+            inserted["slots"] = [_join_entry(slot, _GROUP_SLOT_KEYS) for slot in slot_rows]
+        groups_by_class[group_row["class_key"]].append(_join_entry(group_row, _GROUP_KEYS, **inserted))
+    if groups_by_class:
+        flexible = document.get("flexible")
+        document["flexible"] = {**(flexible if isinstance(flexible, dict) else {}), **groups_by_class}
+
+    return document
+
+
+def _mappings(session: Session, stmt) -> List[Dict[str, Any]]:
+    return [dict(row) for row in session.execute(stmt).mappings()]
+
+
+def load_basis_rows(session: Session, basis_plan_id: int) -> BasisPlanRows:
+    availability = BasisPlanAvailability.__table__
+    fixed = BasisPlanFixedSlot.__table__
+    groups = BasisPlanFlexibleGroup.__table__
+    slots = BasisPlanFlexibleSlot.__table__
+    rows = BasisPlanRows(
+        availability=_mappings(
+            session, select(availability).where(availability.c.basis_plan_id == basis_plan_id).order_by(availability.c.id)
+        ),
+        fixed=_mappings(
+            session,
+            select(fixed).where(fixed.c.basis_plan_id == basis_plan_id).order_by(fixed.c.position, fixed.c.id),
+        ),
+    )
+    group_rows = _mappings(
+        session,
+        select(groups).where(groups.c.basis_plan_id == basis_plan_id).order_by(groups.c.position, groups.c.id),
+    )
+    slots_by_group: Dict[int, List[Dict[str, Any]]] = defaultdict(list)
+    if group_rows:
+        slot_stmt = (
+            select(slots)
+            .join(groups, groups.c.id == slots.c.group_id)
+            .where(groups.c.basis_plan_id == basis_plan_id)
+            .order_by(slots.c.group_id, slots.c.position, slots.c.id)
+        )
+        for slot in _mappings(session, slot_stmt):
+            slots_by_group[slot["group_id"]].append(slot)
+    rows.groups = [(group, slots_by_group.get(group["id"], [])) for group in group_rows]
+    return rows
+
+
+def load_basis_document(session: Session, row: Any) -> Dict[str, Any]:
+    """The JSON document of a basis plan row, assembled from the tables if normalized.
+
+    ``row`` only needs ``id``, ``data`` and ``storage_version``.
+    """
+    residual = decode_basis_data(row.data)
+    if (row.storage_version or STORAGE_DOCUMENT) < STORAGE_NORMALIZED or row.id is None:
+        return residual
+    return assemble_basis_document(residual, load_basis_rows(session, row.id))
+
+
+def delete_basis_rows(session: Session, basis_plan_id: int) -> None:
+    groups = BasisPlanFlexibleGroup.__table__
+    session.execute(
+        delete(BasisPlanFlexibleSlot.__table__).where(
+            BasisPlanFlexibleSlot.__table__.c.group_id.in_(
+                select(groups.c.id).where(groups.c.basis_plan_id == basis_plan_id)
+            )
+        )
+    )
+    session.execute(delete(groups).where(groups.c.basis_plan_id == basis_plan_id))
+    session.execute(delete(BasisPlanFixedSlot.__table__).where(BasisPlanFixedSlot.__table__.c.basis_plan_id == basis_plan_id))
+    session.execute(
+        delete(BasisPlanAvailability.__table__).where(BasisPlanAvailability.__table__.c.basis_plan_id == basis_plan_id)
+    )
+
+
+def _insert_group(session: Session, basis_plan_id: int, group_row: Dict[str, Any], slot_rows: List[Dict[str, Any]]) -> int:
+    result = session.execute(insert(BasisPlanFlexibleGroup.__table__).values(basis_plan_id=basis_plan_id, **group_row))
+    group_id = result.inserted_primary_key[0]
+    if slot_rows:
+        session.execute(
+            insert(BasisPlanFlexibleSlot.__table__), [{"group_id": group_id, **slot} for slot in slot_rows]
+        )
+    return group_id
+
+
+def save_basis_document(session: Session, row: BasisPlan, document: Dict[str, Any]) -> None:
+    """Replace the stored document of ``row`` (normalized layout); the caller commits."""
+    if row.id is None:
+        session.add(row)
+        session.flush()
+    residual, rows = split_basis_document(document)
+    delete_basis_rows(session, row.id)
+    if rows.availability:
+        session.execute(
+            insert(BasisPlanAvailability.__table__), [{"basis_plan_id": row.id, **item} for item in rows.availability]
+        )
+    if rows.fixed:
+        session.execute(insert(BasisPlanFixedSlot.__table__), [{"basis_plan_id": row.id, **item} for item in rows.fixed])
+    for group_row, slot_rows in rows.groups:
+        _insert_group(session, row.id, group_row, slot_rows)
+    row.data = json.dumps(residual)
+    row.storage_version = STORAGE_NORMALIZED
+    session.add(row)
+
+
+def ensure_normalized(session: Session, row: BasisPlan) -> None:
+    """Move a legacy whole-document row into the tables before a partial update."""
+    if (row.storage_version or STORAGE_DOCUMENT) < STORAGE_NORMALIZED:
+        save_basis_document(session, row, decode_basis_data(row.data))
+
+
+def copy_basis_document(session: Session, source: BasisPlan, target: BasisPlan) -> None:
+    """Copy the table rows of ``source`` to ``target`` (e.g. when cloning a period)."""
+    if (source.storage_version or STORAGE_DOCUMENT) < STORAGE_NORMALIZED:
+        return
+    save_basis_document(session, target, load_basis_document(session, source))
+
+
+def apply_availability_changes(session: Session, basis_plan_id: int, changes: Iterable[Any]) -> int:
+    """Set single slots of room/class/window availability rows.
+
+    A missing day row is created; slots beyond its current length are padded
+    with ``True`` (the parser's default for missing slots). Slots outside
+    ``BASIS_PLAN_MAX_SLOTS`` raise ``ValueError``.
+    """
+    table = BasisPlanAvailability.__table__
+    changed = 0
+    for change in changes:
+        _check_slot(change.slot)
+        scope = (
+            table.c.basis_plan_id == basis_plan_id,
+            table.c.section == change.section,
+            table.c.owner_key == change.key,
+            table.c.day == change.day,
+        )
+        existing = session.execute(select(table.c.id, table.c.slots).where(*scope)).first()
+        slots = list(existing.slots if existing else "")
+        if len(slots) <= change.slot:
+            slots.extend("1" * (change.slot + 1 - len(slots)))
+        value = "1" if change.allowed else "0"
+        if existing is not None and slots[change.slot] == value and len(slots) == len(existing.slots):
+            continue
+        slots[change.slot] = value
+        if existing is None:
+            session.execute(
+                insert(table).values(
+                    basis_plan_id=basis_plan_id,
+                    section=change.section,
+                    owner_key=change.key,
+                    day=change.day,
+                    slots="".join(slots),
+                )
+            )
+        else:
+            session.execute(update(table).where(table.c.id == existing.id).values(slots="".join(slots)))
+        changed += 1
+    return changed
+
+
+def _next_position(session: Session, table, basis_plan_id: int, class_key: str) -> int:
+    current = session.execute(
+        select(func.max(table.c.position)).where(table.c.basis_plan_id == basis_plan_id, table.c.class_key == class_key)
+    ).scalar()
+    return 0 if current is None else current + 1
+
+
+def apply_fixed_patch(session: Session, basis_plan_id: int, upsert: Iterable[Any], remove: Iterable[Any]) -> int:
+    """Remove and upsert fixed entries by cell (class, day, slot); one entry per cell."""
+    table = BasisPlanFixedSlot.__table__
+    upsert = list(upsert)
+    for entry in upsert:
+        _check_slot(entry.slot)
+
+    def _clear(cell) -> int:
+        result = session.execute(
+            delete(table).where(
+                table.c.basis_plan_id == basis_plan_id,
+                table.c.class_key == str(cell.class_id),
+                table.c.day == cell.day,
+                table.c.slot == cell.slot,
+            )
+        )
+        return max(result.rowcount or 0, 0)
+
+    changed = sum(_clear(cell) for cell in remove)
+    for entry in upsert:
+        _clear(entry)
+        class_key = str(entry.class_id)
+        session.execute(
+            insert(table).values(
+                basis_plan_id=basis_plan_id,
+                class_key=class_key,
+                position=_next_position(session, table, basis_plan_id, class_key),
+                day=entry.day,
+                slot=entry.slot,
+                subject_id=entry.subject_id,
+            )
+        )
+        changed += 1
+    return changed
+
+
+def apply_flexible_patch(session: Session, basis_plan_id: int, upsert: Iterable[Any], remove: Iterable[Any]) -> int:
+    """Remove and upsert flexible groups by (class, group id).
+
+    An upserted group keeps its position and extra keys; only its subject and
+    its slot rows are replaced. Further groups with the same key (possible in
+    legacy documents) are deleted, so that the key names one group again.
+    """
+    groups = BasisPlanFlexibleGroup.__table__
+    slots = BasisPlanFlexibleSlot.__table__
+
+    def _group_ids(key) -> List[int]:
+        return list(
+            session.execute(
+                select(groups.c.id).where(
+                    groups.c.basis_plan_id == basis_plan_id,
+                    groups.c.class_key == str(key.class_id),
+                    groups.c.group_key == key.id,
+                )
+                .order_by(groups.c.position, groups.c.id)
+            ).scalars()
+        )
+
+    changed = 0
+    for key in remove:
+        group_ids = _group_ids(key)
+        if group_ids:
+            session.execute(delete(slots).where(slots.c.group_id.in_(group_ids)))
+            session.execute(delete(groups).where(groups.c.id.in_(group_ids)))
+            changed += len(group_ids)
+    for group in upsert:
+        for slot in group.slots:
+            _check_slot(slot.slot)
+        slot_rows = [{"position": idx, "day": slot.day, "slot": slot.slot} for idx, slot in enumerate(group.slots)]
+        group_ids = _group_ids(group)
+        if not group_ids:
+            class_key = str(group.class_id)
+            _insert_group(
+                session,
+                basis_plan_id,
+                {
+                    "class_key": class_key,
+                    "position": _next_position(session, groups, basis_plan_id, class_key),
+                    "group_key": group.id,
+                    "subject_id": group.subject_id,
+                    "has_slots": True,
+                },
+                slot_rows,
+            )
+        else:
+            session.execute(
+                update(groups).where(groups.c.id == group_ids[0]).values(subject_id=group.subject_id, has_slots=True)
+            )
+            session.execute(delete(slots).where(slots.c.group_id.in_(group_ids)))
+            if len(group_ids) > 1:
+                session.execute(delete(groups).where(groups.c.id.in_(group_ids[1:])))
+            if slot_rows:
+                session.execute(insert(slots), [{"group_id": group_ids[0], **slot} for slot in slot_rows])
+        changed += 1
+    return changed
@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ...config import settings
+from ...core.metrics import record_cache_lookup
+from ...schemas import GenerateResponse
+
+# Per-account data revision, e.g. the EntityRevision numbers of all tracked tables
+Revision = Tuple[Hashable, ...]
+
+
+def _canonical(value: Any) -> Any:
+    if isinstance(value, pd.DataFrame):
+        frame = value.sort_index(axis=1)
+        return {
+            "columns": [str(col) for col in frame.columns],
+            "index": [_canonical(idx) for idx in frame.index.tolist()],
+            "data": [[_canonical(cell) for cell in row] for row in frame.itertuples(index=False, name=None)],
+        }
+    if isinstance(value, dict):
+        return {str(key): _canonical(val) for key, val in sorted(value.items(), key=lambda item: str(item[0]))}
+    if isinstance(value, (set, frozenset)):
+        return sorted((_canonical(item) for item in value), key=lambda item: json.dumps(item, sort_keys=True))
+    if isinstance(value, (list, tuple)):
+        return [_canonical(item) for item in value]
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, float) and value != value:  # NaN
+        return None
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if hasattr(value, "model_dump"):
+        return _canonical(value.model_dump())
+    return str(value)
+
+
+def canonical_hash(payload: Any) -> str:
+    """SHA-256 over a canonical JSON form of ``payload`` (sets sorted, dict keys ordered)."""
+    data = json.dumps(_canonical(payload), sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+class GenerationResultCache:
+    """LRU + TTL cache of ``GenerateResponse`` objects per account.
+
+    Entries are stored with the account's data revision; a lookup with a newer
+    revision drops all entries of that account. Responses are stored without
+    ``plan_id`` and returned as copies.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 64,
+        ttl_seconds: float = 900.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_entries = max(0, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple[int, str], Tuple[float, GenerateResponse]]" = OrderedDict()
+        self._revisions: Dict[int, Revision] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def _sync_revision(self, account_id: int, revision: Revision) -> None:
+        if self._revisions.get(account_id) != revision:
+            for key in [key for key in self._entries if key[0] == account_id]:
+                del self._entries[key]
+            self._revisions[account_id] = revision
+
+    def get(self, account_id: int, revision: Revision, key: str) -> Optional[GenerateResponse]:
+        if not self.enabled:
+            return None
+        with self._lock:
+            self._sync_revision(account_id, revision)
+            entry = self._entries.get((account_id, key))
+            if entry is not None and self.ttl_seconds > 0 and self.clock() - entry[0] > self.ttl_seconds:
+                del self._entries[(account_id, key)]
+                entry = None
+            record_cache_lookup("generation", entry is not None)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end((account_id, key))
+            self.hits += 1
+            return entry[1].model_copy(deep=True)
+
+    def put(self, account_id: int, revision: Revision, key: str, response: GenerateResponse) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._sync_revision(account_id, revision)
+            stored = response.model_copy(deep=True, update={"plan_id": None, "cached": False, "bundle": None, "timings": None})
+            self._entries[(account_id, key)] = (self.clock(), stored)
+            self._entries.move_to_end((account_id, key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, account_id: Optional[int] = None) -> None:
+        with self._lock:
+            for key in [key for key in self._entries if account_id is None or key[0] == account_id]:
+                del self._entries[key]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+_generation_cache: Optional[GenerationResultCache] = None
+_generation_cache_lock = threading.Lock()
+
+
+def get_generation_cache() -> GenerationResultCache:
+    """Process-wide cache configured from ``STUNDENPLAN_GENERATION_CACHE_*`` settings."""
+    global _generation_cache
+    with _generation_cache_lock:
+        if _generation_cache is None:
+            _generation_cache = GenerationResultCache(
+                max_entries=settings.generation_cache_size,
+                ttl_seconds=settings.generation_cache_ttl_seconds,
+            )
+        return _generation_cache
@@ -2,42 +2,97 @@ from __future__ import annotations
 
 import json
 import logging
+import time
 from collections import defaultdict
-from typing import Dict, List, Optional, Set, Tuple
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 from fastapi import HTTPException
 from ortools.sat.python import cp_model
 from sqlmodel import Session, select
 
+from ...config import settings
+from ...core.metrics import record_generation
+from ...core.tracing import record_span, span, start_trace
 from ...models import (
     Class,
     DistributionVersion,
     Plan,
-    PlanSlot,
     Room,
     RuleProfile,
     Subject,
     Teacher,
 )
-from ...schemas import GenerateRequest, GenerateResponse, PlanSlotOut
+from ...schemas import GenerateParams, GenerateRequest, GenerateResponse, PlanSlotOut, TimingSpanOut
 from ..accounts.service import resolve_account, resolve_planning_period
 from .data_access import fetch_requirements_dataframe
 from .rules import rules_to_dict
 from .rules_config import get_rule_definitions
-from .solver_protocol import PlannerSolver, SolverInputs
+from .result_cache import GenerationResultCache, canonical_hash, get_generation_cache
+from .solver_presets import available_solver_presets, resolve_generate_params, solver_param_inputs
+from .solver_protocol import PlannerSolver, SolverInputs, SolverResult
+from ...infrastructure.solver.bundles import BundlingSolver, new_bundle_path, record_bundle_result
+from ...infrastructure.solver.executor import SolverBusyError, SolverExecutor
+from ...infrastructure.solver.scheduler import SolverQuotaError, SolverScheduler, get_solver_scheduler
+from ...infrastructure.solver.telemetry import encode_progress
 from ...infrastructure.solver.ortools_solver import OrToolsPlannerSolver
 from ...utils import TAGE
 from .basis_parser import BasisPlanContext, BasisPlanParser
+from ..plans.persistence import persist_plan_with_slots
+from ...services.revisions import account_revision
 from ..plans.schema import ensure_plan_schema
 
 
 logger = logging.getLogger("stundenplan.planner")
 
 
+@dataclass
+class PreparedGeneration:
+    """Everything ``generate_plan`` derives from the database before solving."""
+
+    df: Any
+    FACH_ID: List[int]
+    effective_rules: dict
+    active_rule_keys: List[str]
+    params: GenerateParams
+    basis_context: BasisPlanContext
+    subject_id_to_name: Dict[int, str]
+    subjects_by_name: Dict[str, int]
+    class_id_to_name: Dict[int, str]
+    classes_by_name: Dict[str, int]
+    teacher_id_to_name: Dict[int, str]
+    teachers_by_name: Dict[str, int]
+    room_id_to_name: Dict[int, str]
+    subject_required_map: Dict[int, Optional[int]]
+    solver_inputs: SolverInputs
+
+
 class PlannerService:
-    def __init__(self, session: Session, solver: Optional[PlannerSolver] = None) -> None:
+    def __init__(
+        self,
+        session: Session,
+        solver: Optional[PlannerSolver] = None,
+        executor: Optional[SolverExecutor] = None,
+        scheduler: Optional[SolverScheduler] = None,
+        result_cache: Optional[GenerationResultCache] = None,
+        bundle_dir: Optional[Path] = None,
+    ) -> None:
         self.session = session
         self.solver = solver or OrToolsPlannerSolver()
+        if scheduler is None:
+            if solver is None and executor is None:
+                # The default solver goes through the shared, fair-scheduled process pool
+                scheduler = get_solver_scheduler()
+            else:
+                # Injected solvers (tests, tooling) run in-process unless an executor is given
+                scheduler = SolverScheduler(executor or SolverExecutor(max_workers=1, use_processes=False))
+        self.scheduler = scheduler
+        if result_cache is None:
+            # Injected solvers get a private cache so that results never leak between them
+            result_cache = get_generation_cache() if solver is None else GenerationResultCache()
+        self.result_cache = result_cache
+        self.bundle_dir = Path(bundle_dir or settings.solver_bundle_dir)
         self.basis_parser = BasisPlanParser(session)
         ensure_plan_schema(self.session)
 
@@ -47,31 +102,217 @@ class PlannerService:
         account_id: Optional[int],
         planning_period_id: Optional[int],
     ) -> GenerateResponse:
-        account = resolve_account(self.session, account_id)
-        period = resolve_planning_period(self.session, account, planning_period_id)
-        self._resolve_version(req.version_id, account, period)
+        with start_trace("generate") as trace:
+            response = self._generate_plan(req, account_id, planning_period_id)
+        if req.include_timings:
+            response.timings = [TimingSpanOut(**timing) for timing in trace.timings()]
+        return response
 
-        df, FACH_ID, KLASSEN, LEHRER, teacher_workdays, pool_teacher_names = fetch_requirements_dataframe(
-            self.session,
-            account_id=account.id,
+    def _generate_plan(
+        self,
+        req: GenerateRequest,
+        account_id: Optional[int],
+        planning_period_id: Optional[int],
+    ) -> GenerateResponse:
+        with span("resolve_account"):
+            account = resolve_account(self.session, account_id)
+            period = resolve_planning_period(self.session, account, planning_period_id)
+        with span("prepare"):
+            prepared = self.prepare_generation(req, account, period)
+        solver = self.solver
+        bundle_path = None
+        if req.save_bundle:
+            # Written by the solve itself, i.e. in the worker process and on the account's quota
+            bundle_path = new_bundle_path(self.bundle_dir / str(account.id))
+            solver = self._bundling_solver(req, account, period, prepared, bundle_path)
+
+        cache_key = None
+        if self.result_cache.enabled:
+            # Identical inputs (same data revision) are answered from the cache
+            with span("cache_lookup"):
+                revision = account_revision(self.session, account.id)
+                cache_key = self._generation_cache_key(req, period, prepared)
+                # A bundle needs an actual solve; its result still goes into the cache
+                cached = None if req.save_bundle else self.result_cache.get(account.id, revision, cache_key)
+            if cached is not None:
+                cached.cached = True
+                if not req.dry_run:
+                    with span("persist"):
+                        cached.plan_id = self._persist_response(req, account, cached)
+                return cached
+
+        started = time.perf_counter()
+        try:
+            with span("solve"):
+                solver_output = self.scheduler.run(account.id, solver, prepared.solver_inputs)
+                stats = solver_output.get("stats") or {}
+                # Stages of the solver process
+                record_span("build_model", stats.get("build_seconds"))
+                record_span("presolve", stats.get("presolve_seconds"))
+                record_span("search", stats.get("wall_seconds"))
+        except SolverQuotaError as exc:
+            raise HTTPException(
+                status_code=429,
+                detail="Das Rechenzeit-Kontingent dieses Accounts ist aufgebraucht – bitte später erneut versuchen.",
+                headers={"Retry-After": str(exc.retry_after)},
+            )
+        except SolverBusyError as exc:
+            raise HTTPException(
+                status_code=429,
+                detail="Der Solver ist ausgelastet – bitte später erneut versuchen.",
+                headers={"Retry-After": str(exc.retry_after)},
+            )
+        status = solver_output["status"]
+        record_generation(
+            _status_label(status),
+            solver_output["objective_value"],
+            solver_output.get("stats"),
+            solver_output.get("cpu_seconds"),
+        )
+        bundle = None
+        if bundle_path is not None:
+            bundle = self._record_bundle(
+                bundle_path,
+                _status_label(status),
+                solver_output["objective_value"],
+                cpu_seconds=solver_output.get("cpu_seconds"),
+                wall_seconds=time.perf_counter() - started,
+            )
+        if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            status_label = _status_label(status)
+            logger.warning(
+                "Solver failed | status=%s score=%s", status_label, solver_output.get("score")
+            )
+            raise HTTPException(status_code=422, detail="Keine Lösung gefunden.")
+
+        with span("extract_slots"):
+            slots_out = self._build_slot_outputs(
+                solver_output,
+                prepared.df,
+                prepared.FACH_ID,
+                prepared.subject_id_to_name,
+                prepared.class_id_to_name,
+                prepared.teacher_id_to_name,
+                prepared.room_id_to_name,
+                prepared.basis_context,
+                prepared.subjects_by_name,
+                prepared.teachers_by_name,
+                prepared.classes_by_name,
+                prepared.subject_required_map,
+            )
+
+        response = GenerateResponse(
+            plan_id=None,
+            status=_status_label(status),
+            score=solver_output["score"],
+            objective_value=solver_output["objective_value"],
+            slots=slots_out,
+            slots_meta=prepared.basis_context.slots_meta,
+            rules_snapshot=dict(prepared.effective_rules),
+            rule_keys_active=prepared.active_rule_keys,
+            params_used=prepared.params,
             planning_period_id=period.id,
+        )
+        if cache_key is not None:
+            self.result_cache.put(account.id, revision, cache_key, response)
+        response.bundle = bundle
+        if not req.dry_run:
+            with span("persist"):
+                response.plan_id = self._persist_response(req, account, response, solver_output.get("progress"))
+        return response
+
+    def _generation_cache_key(self, req: GenerateRequest, period, prepared: PreparedGeneration) -> str:
+        return canonical_hash(
+            {
+                "planning_period_id": period.id,
+                "version_id": req.version_id,
+                "inputs": prepared.solver_inputs,
+                "params": prepared.params,
+            }
+        )
+
+    def _bundling_solver(
+        self, req: GenerateRequest, account, period, prepared: PreparedGeneration, path: Path
+    ) -> BundlingSolver:
+        return BundlingSolver(
+            self.solver,
+            path,
+            prepared.params,
+            prepared.basis_context,
+            prepared.active_rule_keys,
+            meta={
+                "account_id": account.id,
+                "planning_period_id": period.id,
+                "version_id": req.version_id,
+                "rule_profile_id": req.rule_profile_id,
+                "name": req.name,
+            },
+        )
+
+    def _record_bundle(self, path: Path, status: str, objective_value, **result) -> str:
+        record_bundle_result(path, {"status": status, "objective_value": objective_value, **result})
+        logger.info("Model bundle saved | path=%s", path)
+        return path.relative_to(self.bundle_dir).as_posix()
+
+    def _persist_response(
+        self,
+        req: GenerateRequest,
+        account,
+        response: GenerateResponse,
+        progress: Optional[list] = None,
+    ) -> int:
+        plan = Plan(
+            account_id=account.id,
+            name=req.name,
+            rule_profile_id=req.rule_profile_id,
+            seed=response.params_used.base_seed,
+            status=response.status,
+            score=response.score,
+            objective_value=response.objective_value,
+            comment=req.comment,
             version_id=req.version_id,
+            rules_snapshot=json.dumps(response.rules_snapshot),
+            rule_keys_active=json.dumps(response.rule_keys_active),
+            params_used=json.dumps(response.params_used.model_dump()),
+            planning_period_id=response.planning_period_id,
+            solver_progress=encode_progress(progress or []),
         )
+        return persist_plan_with_slots(self.session, plan, response.slots)
+
+    def prepare_generation(self, req: GenerateRequest, account, period) -> PreparedGeneration:
+        """Load requirements, rules and basis plan and build the solver inputs of ``req``."""
+        self._resolve_version(req.version_id, account, period)
+
+        with span("load_requirements"):
+            df, FACH_ID, KLASSEN, LEHRER, teacher_workdays, pool_teacher_names = fetch_requirements_dataframe(
+                self.session,
+                account_id=account.id,
+                planning_period_id=period.id,
+                version_id=req.version_id,
+            )
         if df.empty:
             msg = "Keine Requirements in der DB – bitte zuerst Bedarf anlegen."
             if req.version_id is not None:
                 msg = f"Keine Requirements für Version #{req.version_id} gefunden – bitte zuerst Bedarf anlegen."
             raise HTTPException(status_code=400, detail=msg)
 
-        rules_definition = get_rule_definitions()
-        effective_rules, active_rule_keys = self._build_ruleset(req, account, rules_definition)
-        effective_rules = self._ensure_rule_mapping(effective_rules)
+        with span("build_rules"):
+            rules_definition = get_rule_definitions()
+            effective_rules, active_rule_keys = self._build_ruleset(req, account, rules_definition)
+            effective_rules = self._ensure_rule_mapping(effective_rules)
+            profile = self.session.get(RuleProfile, req.rule_profile_id) if req.rule_profile_id is not None else None
+            params = resolve_generate_params(
+                req.params,
+                profile.solver_preset if profile else None,
+                available_solver_presets(self.session, account.id),
+            )
         logger.debug("Effective rules prepared | type=%s keys=%s", type(effective_rules), list(effective_rules.keys()))
 
-        subject_rows = self.session.exec(select(Subject).where(Subject.account_id == account.id)).all()
-        class_rows = self.session.exec(select(Class).where(Class.account_id == account.id)).all()
-        teacher_rows = self.session.exec(select(Teacher).where(Teacher.account_id == account.id)).all()
-        room_rows = self.session.exec(select(Room).where(Room.account_id == account.id)).all()
+        with span("load_masterdata"):
+            subject_rows = self.session.exec(select(Subject).where(Subject.account_id == account.id)).all()
+            class_rows = self.session.exec(select(Class).where(Class.account_id == account.id)).all()
+            teacher_rows = self.session.exec(select(Teacher).where(Teacher.account_id == account.id)).all()
+            room_rows = self.session.exec(select(Room).where(Room.account_id == account.id)).all()
 
         subject_id_to_name = {s.id: s.name for s in subject_rows}
         subjects_by_name = {s.name: s.id for s in subject_rows}
@@ -82,14 +323,15 @@ class PlannerService:
         room_id_to_name = {r.id: r.name for r in room_rows}
         subject_required_map = {s.id: s.required_room_id for s in subject_rows}
 
-        basis_context = self.basis_parser.parse(
-            account.id,
-            period.id,
-            df,
-            FACH_ID,
-            class_id_to_name,
-            subject_id_to_name,
-        )
+        with span("parse_basis"):
+            basis_context = self.basis_parser.parse(
+                account.id,
+                period.id,
+                df,
+                FACH_ID,
+                class_id_to_name,
+                subject_id_to_name,
+            )
 
         solver_inputs: SolverInputs = {
             "df": df,
@@ -106,103 +348,24 @@ class PlannerService:
             "class_windows": basis_context.class_windows_by_name,
             "pause_slots": basis_context.pause_slots,
             "slots_per_day": basis_context.slots_per_day,
-            "multi_start": req.params.multi_start,
-            "max_attempts": req.params.max_attempts,
-            "patience": req.params.patience,
-            "time_per_attempt": req.params.time_per_attempt,
-            "randomize_search": req.params.randomize_search,
-            "base_seed": req.params.base_seed,
-            "seed_step": req.params.seed_step,
-            "use_value_hints": req.params.use_value_hints,
+            **solver_param_inputs(params),
         }
-
-        solver_output = self.solver.solve(solver_inputs)
-        status = solver_output["status"]
-        if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
-            status_label = _status_label(status)
-            logger.warning(
-                "Solver failed | status=%s score=%s", status_label, solver_output.get("score")
-            )
-            raise HTTPException(status_code=422, detail="Keine Lösung gefunden.")
-
-        slots_out = self._build_slot_outputs(
-            solver_output,
-            df,
-            FACH_ID,
-            subject_id_to_name,
-            class_id_to_name,
-            teacher_id_to_name,
-            room_id_to_name,
-            basis_context,
-            subjects_by_name,
-            teachers_by_name,
-            classes_by_name,
-            subject_required_map,
-        )
-
-        if req.dry_run:
-            return GenerateResponse(
-                plan_id=None,
-                status=_status_label(status),
-                score=solver_output["score"],
-                objective_value=solver_output["solver"].ObjectiveValue()
-                if hasattr(solver_output["solver"], "ObjectiveValue")
-                else None,
-                slots=slots_out,
-                slots_meta=basis_context.slots_meta,
-                rules_snapshot=dict(effective_rules),
-                rule_keys_active=active_rule_keys,
-                params_used=req.params,
-                planning_period_id=period.id,
-            )
-
-        plan = Plan(
-            account_id=account.id,
-            name=req.name,
-            rule_profile_id=req.rule_profile_id,
-            seed=req.params.base_seed,
-            status=_status_label(status),
-            score=solver_output["score"],
-            objective_value=solver_output["solver"].ObjectiveValue()
-            if hasattr(solver_output["solver"], "ObjectiveValue")
-            else None,
-            comment=req.comment,
-            version_id=req.version_id,
-            rules_snapshot=json.dumps(dict(effective_rules)),
-            rule_keys_active=json.dumps(active_rule_keys),
-            params_used=json.dumps(req.params.model_dump()),
-            planning_period_id=period.id,
-        )
-        self.session.add(plan)
-        self.session.commit()
-        self.session.refresh(plan)
-
-        for entry in slots_out:
-            slot = PlanSlot(
-                account_id=account.id,
-                plan_id=plan.id,
-                planning_period_id=plan.planning_period_id,
-                class_id=entry.class_id,
-                tag=entry.tag,
-                stunde=entry.stunde,
-                subject_id=entry.subject_id,
-                teacher_id=entry.teacher_id,
-                room_id=entry.room_id,
-            )
-            self.session.add(slot)
-        self.session.commit()
-
-        return GenerateResponse(
-            plan_id=plan.id,
-            status=plan.status,
-            score=plan.score,
-            objective_value=plan.objective_value,
-            slots=slots_out,
-            slots_meta=basis_context.slots_meta,
-            rules_snapshot=dict(effective_rules),
-            rule_keys_active=active_rule_keys,
-            params_used=req.params,
-            planning_period_id=plan.planning_period_id,
+        return PreparedGeneration(
+            df=df,
+            FACH_ID=FACH_ID,
+            effective_rules=effective_rules,
+            active_rule_keys=active_rule_keys,
+            params=params,
+            basis_context=basis_context,
+            subject_id_to_name=subject_id_to_name,
+            subjects_by_name=subjects_by_name,
+            class_id_to_name=class_id_to_name,
+            classes_by_name=classes_by_name,
+            teacher_id_to_name=teacher_id_to_name,
+            teachers_by_name=teachers_by_name,
+            room_id_to_name=room_id_to_name,
+            subject_required_map=subject_required_map,
+            solver_inputs=solver_inputs,
         )
 
     def analyze_requirements(
@@ -387,15 +550,12 @@ class PlannerService:
         classes_by_name,
         subject_required_map,
     ):
-        solver = solver_output["solver"]
-        plan_matrix = solver_output["plan"]
         slots_per_day = basis_context.slots_per_day
 
         solver_slots = self._collect_solver_assignments(
             df,
             FACH_ID,
-            plan_matrix,
-            solver,
+            solver_output,
             slots_per_day,
             subjects_by_name,
             teachers_by_name,
@@ -413,8 +573,7 @@ class PlannerService:
         self,
         df,
         FACH_ID,
-        plan_matrix,
-        solver,
+        solver_output: SolverResult,
         slots_per_day: int,
         subjects_by_name,
         teachers_by_name,
@@ -422,6 +581,7 @@ class PlannerService:
         subject_required_map,
     ) -> List[dict]:
         solver_slots: List[dict] = []
+        assigned = set(solver_output["assignments"])
         for fid in FACH_ID:
             fach = str(df.loc[fid, "Fach"])
             klasse = str(df.loc[fid, "Klasse"])
@@ -433,8 +593,7 @@ class PlannerService:
                 continue
             for tag in TAGE:
                 for std in range(slots_per_day):
-                    var = plan_matrix.get((fid, tag, std))
-                    if var is not None and solver.Value(var) == 1:
+                    if (fid, tag, std) in assigned:
                         solver_slots.append(
                             {
                                 "class_id": class_id,
@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import json
+from datetime import datetime, timezone
+from typing import Any, Dict, Mapping, Optional
+
+from fastapi import HTTPException
+from sqlmodel import Session, select
+
+from ...config import settings
+from ...models import SolverPreset
+from ...schemas import GenerateParams, SolverParams
+
+DEFAULT_SOLVER_PRESET = "balanced"
+
+# Priority of the soft-goal groups in lexicographic mode when none is given
+DEFAULT_OBJECTIVE_ORDER = ["class_gaps", "teacher_gaps", "doppelstunden", "band_optional", "even_distribution"]
+
+# Named starting points for GenerateParams; explicit request values win.
+SOLVER_PRESETS: Dict[str, Dict[str, Any]] = {
+    "fast_draft": {
+        "time_per_attempt": 2.0,
+        "max_attempts": 3,
+        "solver": {
+            "num_workers": 4,
+            "linearization_level": 0,
+            "cp_model_presolve": True,
+            "symmetry_level": 0,
+            "search_branching": "automatic",
+            "interleave_search": False,
+        },
+    },
+    "balanced": {
+        "time_per_attempt": 5.0,
+        "max_attempts": 10,
+        "solver": {
+            "num_workers": 8,
+            "linearization_level": 1,
+            "cp_model_presolve": True,
+            "symmetry_level": 2,
+            "search_branching": "automatic",
+            "interleave_search": False,
+        },
+    },
+    "thorough": {
+        "time_per_attempt": 20.0,
+        "max_attempts": 10,
+        "solver": {
+            "num_workers": 16,
+            "linearization_level": 2,
+            "cp_model_presolve": True,
+            "symmetry_level": 4,
+            "search_branching": "portfolio",
+            "interleave_search": False,
+        },
+    },
+}
+
+
+def available_solver_presets(session: Session, account_id: int) -> Dict[str, Dict[str, Any]]:
+    """Built-in presets plus the account's stored ``SolverPreset`` rows."""
+    presets = dict(SOLVER_PRESETS)
+    rows = session.exec(select(SolverPreset.name, SolverPreset.params).where(SolverPreset.account_id == account_id)).all()
+    for name, params in rows:
+        presets.setdefault(name, json.loads(params))
+    return presets
+
+
+def validate_solver_preset(name: Optional[str], presets: Optional[Mapping[str, Any]] = None) -> Optional[str]:
+    if name is None or name == "":
+        return None
+    if name not in (SOLVER_PRESETS if presets is None else presets):
+        raise HTTPException(status_code=400, detail=f"Unbekanntes Solver-Preset: {name}")
+    return name
+
+
+def resolve_generate_params(
+    params: GenerateParams,
+    profile_preset: Optional[str] = None,
+    presets: Optional[Mapping[str, Dict[str, Any]]] = None,
+) -> GenerateParams:
+    """Effective parameters of a run: preset defaults, request overrides, server caps.
+
+    The preset comes from the request, else from the rule profile, else
+    ``balanced`` (the former hard-coded behaviour). Only fields the client set
+    explicitly override the preset.
+    """
+    presets = SOLVER_PRESETS if presets is None else presets
+    preset_name = (
+        validate_solver_preset(params.preset, presets)
+        or validate_solver_preset(profile_preset, presets)
+        or DEFAULT_SOLVER_PRESET
+    )
+    preset = presets[preset_name]
+
+    values = params.model_dump(exclude={"solver"})
+    for key, value in preset.items():
+        if key not in ("solver", "preset") and key not in params.model_fields_set:
+            values[key] = value
+    solver_values = {"log_search_progress": False, **SOLVER_PRESETS[DEFAULT_SOLVER_PRESET]["solver"]}
+    solver_values.update(preset.get("solver") or {})
+    solver_values.update(params.solver.model_dump(exclude_none=True))
+
+    solver_values["num_workers"] = min(solver_values["num_workers"], max(1, settings.solver_max_search_workers))
+    if params.deterministic:
+        solver_values.update(num_workers=1, interleave_search=False)
+    if not settings.solver_allow_search_log:
+        solver_values["log_search_progress"] = False
+    values["time_per_attempt"] = min(max(0.1, float(values["time_per_attempt"])), settings.solver_max_time_per_attempt)
+    values["max_attempts"] = min(max(1, int(values["max_attempts"])), settings.solver_max_attempts)
+    order = list(values.get("objective_order") or [])
+    duplicates = sorted({group for group in order if order.count(group) > 1})
+    if duplicates:
+        raise HTTPException(status_code=400, detail=f"Zielgruppe mehrfach angegeben: {', '.join(duplicates)}")
+    if values.get("objective_mode") == "lexicographic" and not order:
+        values["objective_order"] = list(DEFAULT_OBJECTIVE_ORDER)
+    values["preset"] = preset_name
+    values["solver"] = SolverParams(**solver_values)
+    return GenerateParams(**values)
+
+
+def solver_param_inputs(params: GenerateParams) -> Dict[str, Any]:
+    """The search part of ``SolverInputs`` for resolved ``params``."""
+    return {
+        "multi_start": params.multi_start,
+        "max_attempts": params.max_attempts,
+        "patience": params.patience,
+        "time_per_attempt": params.time_per_attempt,
+        "randomize_search": params.randomize_search,
+        "base_seed": params.base_seed,
+        "seed_step": params.seed_step,
+        "use_value_hints": params.use_value_hints,
+        "deterministic": params.deterministic,
+        "search_params": params.solver.model_dump(),
+        "objective_mode": params.objective_mode,
+        "objective_order": list(params.objective_order),
+    }
+
+
+def save_solver_preset(
+    session: Session,
+    account_id: int,
+    name: str,
+    params: GenerateParams,
+    metrics: Optional[Dict[str, Any]] = None,
+) -> SolverPreset:
+    """Store ``params`` as the account preset ``name`` (replacing an older one)."""
+    if not name or name in SOLVER_PRESETS:
+        raise ValueError(f"Preset-Name nicht erlaubt: {name!r}")
+    row = session.exec(
+        select(SolverPreset).where(SolverPreset.account_id == account_id, SolverPreset.name == name)
+    ).first()
+    if row is None:
+        row = SolverPreset(account_id=account_id, name=name, params="{}")
+    row.params = json.dumps(params.model_dump(exclude={"preset"}))
+    row.metrics = json.dumps(metrics) if metrics is not None else None
+    row.updated_at = datetime.now(timezone.utc)
+    session.add(row)
+    session.commit()
+    session.refresh(row)
+    return row
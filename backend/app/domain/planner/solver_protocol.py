@@ -29,9 +29,22 @@ class SolverInputs(TypedDict, total=False):
     base_seed: int
     seed_step: int
     use_value_hints: bool
+    deterministic: bool
+    search_params: dict[str, object]  # resolved SolverParams (see solver_presets)
+    objective_mode: str  # "weighted" | "lexicographic"
+    objective_order: list[str]  # soft-goal groups by priority (lexicographic mode)
+    export_model: str  # write the built CpModelProto to this path before solving (model bundles)
 
 
-class SolverOutputs(TypedDict):
+class _SolverOutputStats(TypedDict, total=False):
+    # first_solution_seconds, objective, best_bound, attempts, wall_seconds, build_seconds,
+    # presolve_seconds (summed over all attempts), variables, constraints (of the built model);
+    # progress: sampled [t, objective, bound, gap] events (see telemetry.SearchProgressRecorder);
+    # lexicographic mode adds "stages": [{group, status, objective, seconds}, ...]
+    stats: dict[str, object]
+
+
+class SolverOutputs(_SolverOutputStats):
     status: int
     solver: cp_model.CpSolver
     model: cp_model.CpModel
@@ -39,6 +52,18 @@ class SolverOutputs(TypedDict):
     score: float
 
 
+class SolverResult(TypedDict):
+    """Picklable summary of ``SolverOutputs``: the cells set to 1, no CP-SAT objects."""
+    status: int
+    score: float
+    objective_value: float | None
+    assignments: list[tuple[int, str, int]]  # (fid, tag, slot index)
+    cpu_seconds: float  # CPU time of the solving process
+    progress: list[list[float | None]]  # sampled [t, objective, bound, gap] events
+    stats: dict[str, object]  # SolverOutputs stats without "progress"
+
+
 class PlannerSolver(Protocol):
     def solve(self, inputs: SolverInputs) -> SolverOutputs:
         ...
+
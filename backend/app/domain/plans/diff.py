@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+from collections import Counter, defaultdict, deque
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .matrix import PLAN_MATRIX_DTYPE, PackedPlan
+
+DIFF_CHANGES = ("added", "removed", "changed", "room")
+
+Cell = Tuple[int, int, int]  # (class index, day index, slot index)
+
+
+def align_cells(packed: PackedPlan, class_ids: List[int], days: List[str], slots_per_day: int) -> np.ndarray:
+    """Place ``packed`` on a larger (classes, days, slots) grid; missing cells stay empty."""
+    cells = np.zeros((len(class_ids), len(days), slots_per_day), dtype=PLAN_MATRIX_DTYPE)
+    if packed.cells.size:
+        class_pos = {cid: idx for idx, cid in enumerate(class_ids)}
+        day_pos = {day: idx for idx, day in enumerate(days)}
+        cells[
+            np.ix_(
+                [class_pos[cid] for cid in packed.class_ids],
+                [day_pos[day] for day in packed.days],
+                np.arange(packed.slots_per_day),
+            )
+        ] = packed.cells
+    return cells
+
+
+def _lesson(value) -> Dict[str, Any]:
+    return {
+        "subject_id": int(value["subject_id"]),
+        "teacher_id": int(value["teacher_id"]),
+        "room_id": int(value["room_id"]) or None,
+    }
+
+
+def _counts() -> Dict[str, int]:
+    return {"unchanged": 0, "moved": 0, **{change: 0 for change in DIFF_CHANGES}}
+
+
+def diff_packed_plans(before: PackedPlan, after: PackedPlan) -> Dict[str, Any]:
+    """Cell-level differences between two plans.
+
+    Both matrices are aligned on a common grid and compared with boolean masks;
+    only the changed cells are visited in Python. A lesson (class, subject,
+    teacher) that disappears from one cell and appears in another cell of the
+    same class counts as a move. Remaining differences are ``added``,
+    ``removed``, ``changed`` (another lesson in the same cell) or ``room``
+    (same lesson, other room).
+    """
+    class_ids = sorted(set(before.class_ids) | set(after.class_ids))
+    days = list(before.days) + [day for day in after.days if day not in before.days]
+    slots_per_day = max(before.slots_per_day, after.slots_per_day)
+    a = align_cells(before, class_ids, days, slots_per_day)
+    b = align_cells(after, class_ids, days, slots_per_day)
+
+    a_occupied = a["subject_id"] != 0
+    b_occupied = b["subject_id"] != 0
+    same_lesson = (
+        a_occupied & b_occupied & (a["subject_id"] == b["subject_id"]) & (a["teacher_id"] == b["teacher_id"])
+    )
+    unchanged = same_lesson & (a["room_id"] == b["room_id"])
+    room_changed = same_lesson & ~unchanged
+    removed_mask = a_occupied & ~same_lesson
+    added_mask = b_occupied & ~same_lesson
+
+    summary = _counts()
+    per_class: Dict[int, Dict[str, int]] = {}
+    for idx, count in enumerate(unchanged.sum(axis=(1, 2)).tolist()):
+        per_class.setdefault(class_ids[idx], _counts())["unchanged"] = count
+    summary["unchanged"] = int(unchanged.sum())
+    per_teacher: Counter = Counter()
+
+    def _position(cell: Cell) -> Dict[str, Any]:
+        return {"class_id": class_ids[cell[0]], "tag": days[cell[1]], "stunde": cell[2] + 1}
+
+    def _count(class_id: int, change: str, *teachers: Optional[int]) -> None:
+        summary[change] += 1
+        per_class[class_id][change] += 1
+        for teacher_id in set(teachers):
+            if teacher_id:
+                per_teacher[teacher_id] += 1
+
+    # Pair removed and added occurrences of the same lesson within a class
+    removed_by_lesson: Dict[Tuple[int, int, int], deque] = defaultdict(deque)
+    removed_cells = [tuple(int(v) for v in cell) for cell in zip(*np.nonzero(removed_mask))]
+    for cell in removed_cells:
+        value = a[cell]
+        removed_by_lesson[(cell[0], int(value["subject_id"]), int(value["teacher_id"]))].append(cell)
+    moves: List[Dict[str, Any]] = []
+    moved_from = set()
+    added_left: List[Cell] = []
+    for cell in (tuple(int(v) for v in cell) for cell in zip(*np.nonzero(added_mask))):
+        value = b[cell]
+        candidates = removed_by_lesson.get((cell[0], int(value["subject_id"]), int(value["teacher_id"])))
+        if not candidates:
+            added_left.append(cell)
+            continue
+        source = candidates.popleft()
+        moved_from.add(source)
+        origin = _position(source)
+        target = _position(cell)
+        moves.append(
+            {
+                "class_id": origin["class_id"],
+                "subject_id": int(value["subject_id"]),
+                "teacher_id": int(value["teacher_id"]),
+                "from_tag": origin["tag"],
+                "from_stunde": origin["stunde"],
+                "to_tag": target["tag"],
+                "to_stunde": target["stunde"],
+                "room_id_before": int(a[source]["room_id"]) or None,
+                "room_id_after": int(value["room_id"]) or None,
+            }
+        )
+        _count(origin["class_id"], "moved", int(value["teacher_id"]))
+
+    cells: Dict[Cell, Dict[str, Any]] = {}
+    for cell in removed_cells:
+        if cell not in moved_from:
+            cells[cell] = {**_position(cell), "change": "removed", "before": _lesson(a[cell]), "after": None}
+    for cell in added_left:
+        entry = cells.get(cell)
+        if entry is not None:
+            entry.update(change="changed", after=_lesson(b[cell]))
+        else:
+            cells[cell] = {**_position(cell), "change": "added", "before": None, "after": _lesson(b[cell])}
+    for cell in (tuple(int(v) for v in cell) for cell in zip(*np.nonzero(room_changed))):
+        cells[cell] = {**_position(cell), "change": "room", "before": _lesson(a[cell]), "after": _lesson(b[cell])}
+
+    ordered = [cells[cell] for cell in sorted(cells)]
+    for entry in ordered:
+        teachers = [lesson["teacher_id"] for lesson in (entry["before"], entry["after"]) if lesson]
+        _count(entry["class_id"], entry["change"], *teachers)
+
+    return {
+        "summary": summary,
+        "per_class": per_class,
+        "per_teacher": dict(sorted(per_teacher.items())),
+        "moves": moves,
+        "cells": ordered,
+    }
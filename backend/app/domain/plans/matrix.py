@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import json
+import zlib
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+import numpy as np
+from sqlmodel import Session, select
+
+from ...models import PlanMatrix
+from ...utils import TAGE
+
+
+MATRIX_FORMAT_VERSION = 1
+
+# 0 marks an empty cell / missing room; database ids start at 1.
+PLAN_MATRIX_DTYPE = np.dtype(
+    [
+        ("subject_id", "<i4"),
+        ("teacher_id", "<i4"),
+        ("room_id", "<i4"),
+    ]
+)
+
+
+@dataclass
+class PackedPlan:
+    class_ids: List[int]
+    days: List[str]
+    slots_per_day: int
+    cells: np.ndarray  # shape (classes, days, slots), dtype PLAN_MATRIX_DTYPE
+
+    @property
+    def occupied(self) -> np.ndarray:
+        return self.cells["subject_id"] != 0
+
+
+def _value(entry: Any, key: str):
+    if isinstance(entry, Mapping):
+        return entry.get(key)
+    return getattr(entry, key, None)
+
+
+def pack_plan_slots(slots: Iterable[Any]) -> Optional[PackedPlan]:
+    """Pack slot rows/objects into a dense matrix.
+
+    Returns None if the slots cannot be represented (several lessons in one
+    cell, non-positive ``stunde``); callers then keep reading PlanSlot rows.
+    """
+    entries = list(slots)
+    class_ids = sorted({int(_value(entry, "class_id")) for entry in entries})
+    extra_days = sorted({str(_value(entry, "tag")) for entry in entries} - set(TAGE))
+    days = list(TAGE) + extra_days
+    stunden = [int(_value(entry, "stunde")) for entry in entries]
+    if any(stunde < 1 for stunde in stunden):
+        return None
+    slots_per_day = max(stunden, default=0)
+
+    cells = np.zeros((len(class_ids), len(days), slots_per_day), dtype=PLAN_MATRIX_DTYPE)
+    class_index = {cid: idx for idx, cid in enumerate(class_ids)}
+    day_index = {day: idx for idx, day in enumerate(days)}
+    for entry, stunde in zip(entries, stunden):
+        pos = (class_index[int(_value(entry, "class_id"))], day_index[str(_value(entry, "tag"))], stunde - 1)
+        if cells["subject_id"][pos] != 0:
+            return None
+        cells[pos] = (
+            int(_value(entry, "subject_id")),
+            int(_value(entry, "teacher_id")),
+            int(_value(entry, "room_id") or 0),
+        )
+    return PackedPlan(class_ids=class_ids, days=days, slots_per_day=slots_per_day, cells=cells)
+
+
+def unpack_slot_rows(packed: PackedPlan) -> List[Dict[str, Any]]:
+    """Return slot dicts ordered by day, stunde and class."""
+    cls_idx, day_idx, slot_idx = np.nonzero(packed.occupied)
+    order = np.lexsort((cls_idx, slot_idx, day_idx))
+    values = packed.cells[cls_idx[order], day_idx[order], slot_idx[order]]
+    class_ids = np.asarray(packed.class_ids, dtype=np.int64)
+    rows: List[Dict[str, Any]] = []
+    for c, d, s, value in zip(cls_idx[order], day_idx[order], slot_idx[order], values):
+        room_id = int(value["room_id"])
+        rows.append(
+            {
+                "class_id": int(class_ids[c]),
+                "tag": packed.days[d],
+                "stunde": int(s) + 1,
+                "subject_id": int(value["subject_id"]),
+                "teacher_id": int(value["teacher_id"]),
+                "room_id": room_id or None,
+            }
+        )
+    return rows
+
+
+def index_cells(values: np.ndarray) -> Tuple[List[int], np.ndarray]:
+    """Lookup table of the ids in ``values`` and per-cell indices into it (-1 = empty)."""
+    filled = values != 0
+    ids, inverse = np.unique(values[filled], return_inverse=True)
+    indices = np.full(values.shape, -1, dtype=np.int32)
+    indices[filled] = inverse
+    return [int(value) for value in ids], indices
+
+
+def encode_cells(cells: np.ndarray) -> bytes:
+    return zlib.compress(np.ascontiguousarray(cells, dtype=PLAN_MATRIX_DTYPE).tobytes(), level=1)
+
+
+def decode_matrix(row: PlanMatrix) -> PackedPlan:
+    class_ids = [int(cid) for cid in json.loads(row.class_ids)]
+    days = [str(day) for day in json.loads(row.days)]
+    cells = np.frombuffer(zlib.decompress(row.data), dtype=PLAN_MATRIX_DTYPE).reshape(
+        (len(class_ids), len(days), int(row.slots_per_day))
+    )
+    return PackedPlan(class_ids=class_ids, days=days, slots_per_day=int(row.slots_per_day), cells=cells)
+
+
+def write_plan_matrix(
+    session: Session,
+    plan_id: int,
+    account_id: int,
+    planning_period_id: Optional[int],
+    slots: Iterable[Any],
+) -> Optional[PlanMatrix]:
+    """Store (or replace) the packed matrix of a plan; the caller commits.
+
+    Drops an existing matrix when the slots cannot be packed so that reads fall
+    back to the PlanSlot rows.
+    """
+    packed = pack_plan_slots(slots)
+    row = session.get(PlanMatrix, plan_id)
+    if packed is None:
+        if row is not None:
+            session.delete(row)
+        return None
+    if row is None:
+        row = PlanMatrix(plan_id=plan_id, account_id=account_id, slots_per_day=0, class_ids="[]", days="[]", data=b"")
+    row.account_id = account_id
+    row.planning_period_id = planning_period_id
+    row.format_version = MATRIX_FORMAT_VERSION
+    row.class_ids = json.dumps(packed.class_ids)
+    row.days = json.dumps(packed.days)
+    row.slots_per_day = packed.slots_per_day
+    row.data = encode_cells(packed.cells)
+    session.add(row)
+    return row
+
+
+def load_plan_matrices(session: Session, plan_ids: Iterable[int]) -> Dict[int, PackedPlan]:
+    """Fetch and decode the matrices for ``plan_ids`` with a single query."""
+    ids = list(plan_ids)
+    if not ids:
+        return {}
+    rows = session.exec(
+        select(PlanMatrix).where(
+            PlanMatrix.plan_id.in_(ids),
+            PlanMatrix.format_version == MATRIX_FORMAT_VERSION,
+        )
+    ).all()
+    return {row.plan_id: decode_matrix(row) for row in rows}
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+from typing import Any, Iterable, List, Mapping, Optional
+
+from sqlalchemy import insert
+from sqlmodel import Session
+
+from ...models import Plan, PlanSlot
+from .matrix import write_plan_matrix
+
+
+PLAN_SLOT_FIELDS = ("class_id", "tag", "stunde", "subject_id", "teacher_id", "room_id")
+
+
+def _slot_value(entry: Any, key: str):
+    if isinstance(entry, Mapping):
+        return entry.get(key)
+    return getattr(entry, key, None)
+
+
+def plan_slot_rows(
+    slots: Iterable[Any],
+    *,
+    account_id: int,
+    plan_id: int,
+    planning_period_id: Optional[int],
+) -> List[dict]:
+    """Convert slot-like objects (PlanSlotOut, dicts) into PlanSlot column rows."""
+    rows: List[dict] = []
+    for entry in slots:
+        row = {key: _slot_value(entry, key) for key in PLAN_SLOT_FIELDS}
+        row["account_id"] = account_id
+        row["plan_id"] = plan_id
+        row["planning_period_id"] = planning_period_id
+        rows.append(row)
+    return rows
+
+
+def bulk_insert_plan_slots(session: Session, rows: List[dict]) -> int:
+    """Insert prepared PlanSlot rows with a single executemany statement.
+
+    Runs inside the session's current transaction; the caller commits.
+    """
+    if not rows:
+        return 0
+    session.execute(insert(PlanSlot.__table__), rows)
+    return len(rows)
+
+
+def persist_plan_with_slots(
+    session: Session,
+    plan: Plan,
+    slots: Iterable[Any],
+    commit: bool = True,
+) -> int:
+    """Write a plan and its slots in one transaction and return the new plan id.
+
+    The plan row is flushed to obtain its id, the slots go through
+    ``bulk_insert_plan_slots``; no per-row ORM objects or refreshes are involved.
+    The packed PlanMatrix is written in the same transaction.
+    """
+    session.add(plan)
+    session.flush()
+    plan_id = plan.id
+    rows = plan_slot_rows(
+        slots,
+        account_id=plan.account_id,
+        plan_id=plan_id,
+        planning_period_id=plan.planning_period_id,
+    )
+    bulk_insert_plan_slots(session, rows)
+    write_plan_matrix(session, plan_id, plan.account_id, plan.planning_period_id, rows)
+    if commit:
+        session.commit()
+    return plan_id
@@ -42,6 +42,8 @@ def ensure_plan_metadata_columns(session: Session) -> None:
         statements.append("ALTER TABLE plan ADD COLUMN rule_keys_active TEXT")
     if "params_used" not in columns:
         statements.append("ALTER TABLE plan ADD COLUMN params_used TEXT")
+    if "solver_progress" not in columns:
+        statements.append("ALTER TABLE plan ADD COLUMN solver_progress TEXT")
     for stmt in statements:
         session.exec(text(stmt))
     if statements:
@@ -56,6 +58,14 @@ def ensure_subject_columns(session: Session) -> None:
         session.commit()
 
 
+def ensure_rule_profile_columns(session: Session) -> None:
+    info = session.exec(text("PRAGMA table_info(ruleprofile)")).all()
+    columns = {row[1] for row in info}
+    if "solver_preset" not in columns:
+        session.exec(text("ALTER TABLE ruleprofile ADD COLUMN solver_preset TEXT"))
+        session.commit()
+
+
 def ensure_requirement_columns(session: Session) -> None:
     ensure_requirement_columns_db(session)
 
@@ -65,4 +75,5 @@ def ensure_plan_schema(session: Session) -> None:
     ensure_plan_room_column(session)
     ensure_plan_metadata_columns(session)
     ensure_subject_columns(session)
+    ensure_rule_profile_columns(session)
     ensure_requirement_columns(session)
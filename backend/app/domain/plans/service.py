@@ -1,25 +1,55 @@
 from __future__ import annotations
 
 import json
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
 
 from fastapi import HTTPException
-from sqlalchemy import delete
+from sqlalchemy import bindparam, delete, update
 from sqlmodel import Session, select
 
-from ...models import BasisPlan, Class, Plan, PlanSlot, Room, Subject, Teacher
+from ...core.pagination import KeysetPage, keyset_page
+from ...models import Class, Plan, PlanMatrix, PlanSlot, Room, Subject, Teacher
 from ...schemas import (
     GenerateParams,
+    PlanClassMatrix,
     PlanDetail,
+    PlanDiff,
+    PlanMatrixDetail,
+    PlanMatrixOut,
     PlanSlotOut,
+    PlanSlotsPatchRequest,
     PlanSlotsUpdateRequest,
     PlanUpdateRequest,
     PlanSummary,
+    SolverProgressOut,
 )
+from ...utils import claim_unassigned_rows
 from ..accounts.service import resolve_account, resolve_planning_period
+from ..planner.basis_parser import BasisPlanParser
+from .diff import diff_packed_plans
+from .matrix import PackedPlan, index_cells, load_plan_matrices, pack_plan_slots, unpack_slot_rows, write_plan_matrix
+from .persistence import PLAN_SLOT_FIELDS, bulk_insert_plan_slots, plan_slot_rows
 from .schema import ensure_plan_schema
 
 
+SlotKey = Tuple[int, str, int]
+
+PLAN_DETAIL_FORMATS = ("slots", "matrix")
+
+PLAN_SUMMARY_COLUMNS = (
+    Plan.id,
+    Plan.name,
+    Plan.status,
+    Plan.score,
+    Plan.objective_value,
+    Plan.created_at,
+    Plan.version_id,
+    Plan.comment,
+    Plan.rule_profile_id,
+    Plan.rule_keys_active,
+)
+
+
 def _safe_json_load(raw: Optional[str], fallback):
     if not raw:
         return fallback
@@ -39,9 +69,11 @@ class PlanQueryService:
         account_id: Optional[int],
         planning_period_id: Optional[int],
         limit: Optional[int] = None,
-    ) -> List[PlanSummary]:
+        cursor: Optional[str] = None,
+        version_id: Optional[int] = None,
+    ) -> KeysetPage:
         account, period = self._resolve_context(account_id, planning_period_id)
-        return self.list_plans(account, period, limit)
+        return self.list_plans_page(account, period, limit, cursor=cursor, version_id=version_id)
 
     def list_plans(
         self,
@@ -49,105 +81,94 @@ class PlanQueryService:
         period,
         limit: Optional[int] = None,
     ) -> List[PlanSummary]:
-        stmt = (
-            select(Plan)
-            .where(Plan.account_id == account.id)
-            .where(
-                (Plan.planning_period_id == period.id)
-                | (Plan.planning_period_id == None)  # noqa: E711
-            )
-            .order_by(Plan.created_at.desc())
+        return self.list_plans_page(account, period, limit).rows
+
+    def list_plans_page(
+        self,
+        account,
+        period,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        version_id: Optional[int] = None,
+    ) -> KeysetPage:
+        """Newest plans first, paged by (created_at, id).
+
+        Only the summary columns are selected; snapshots and params stay in the table.
+        """
+        claim_unassigned_rows(self.session, Plan, account.id, period.id)
+        stmt = select(*PLAN_SUMMARY_COLUMNS).where(
+            Plan.account_id == account.id,
+            Plan.planning_period_id == period.id,
         )
-        if limit:
-            stmt = stmt.limit(int(limit))
-        rows = self.session.exec(stmt).all()
-        dirty = False
-        filtered: List[Plan] = []
-        for row in rows:
-            if row.planning_period_id is None:
-                row.planning_period_id = period.id
-                self.session.add(row)
-                dirty = True
-            if row.planning_period_id == period.id:
-                filtered.append(row)
-        if dirty:
-            self.session.commit()
-        summaries: List[PlanSummary] = []
-        for row in filtered:
-            rule_keys = _safe_json_load(row.rule_keys_active, [])
-            summaries.append(
-                PlanSummary(
-                    id=row.id,
-                    name=row.name,
-                    status=row.status,
-                    score=row.score,
-                    objective_value=row.objective_value,
-                    created_at=row.created_at,
-                    version_id=row.version_id,
-                    comment=row.comment,
-                    rule_profile_id=row.rule_profile_id,
-                    rule_keys_active=rule_keys,
-                    planning_period_id=row.planning_period_id,
-                )
+        if version_id is not None:
+            stmt = stmt.where(Plan.version_id == version_id)
+        page = keyset_page(
+            self.session,
+            stmt,
+            [Plan.created_at, Plan.id],
+            limit=limit,
+            cursor=cursor,
+            descending=True,
+        )
+        page.rows = [
+            PlanSummary(
+                id=row.id,
+                name=row.name,
+                status=row.status,
+                score=row.score,
+                objective_value=row.objective_value,
+                created_at=row.created_at,
+                version_id=row.version_id,
+                comment=row.comment,
+                rule_profile_id=row.rule_profile_id,
+                rule_keys_active=_safe_json_load(row.rule_keys_active, []),
             )
-        return summaries
+            for row in page.rows
+        ]
+        return page
 
     def get_plan_detail_for_request(
         self,
         plan_id: int,
         account_id: Optional[int],
         planning_period_id: Optional[int],
-    ) -> PlanDetail:
+        format: str = "slots",
+    ) -> Union[PlanDetail, PlanMatrixDetail]:
         account, period = self._resolve_context(account_id, planning_period_id)
-        return self.get_plan_detail(plan_id, account, period)
+        return self.get_plan_detail(plan_id, account, period, format=format)
 
     def get_plan_detail(
         self,
         plan_id: int,
         account,
         period,
-    ) -> PlanDetail:
+        format: str = "slots",
+    ) -> Union[PlanDetail, PlanMatrixDetail]:
+        """Plan with its cells, either as ``PlanSlotOut`` list or (``format="matrix"``)
+        as dense per-class index arrays plus lookup tables."""
+        if format not in PLAN_DETAIL_FORMATS:
+            raise HTTPException(status_code=400, detail=f"Unbekanntes Format: {format}")
         plan = self._get_plan_for_account(plan_id, account, period)
+        if format == "matrix":
+            return PlanMatrixDetail(**self._plan_detail_fields(plan, account), matrix=self._load_plan_matrix(plan, account))
 
-        slots_meta_payload = self._load_basisplan_slots_meta(account.id, plan.planning_period_id)
-
-        slot_rows = self.session.exec(
-            select(PlanSlot).where(
-                PlanSlot.plan_id == plan_id,
-                PlanSlot.account_id == account.id,
-                (PlanSlot.planning_period_id == plan.planning_period_id)
-                | (PlanSlot.planning_period_id == None),  # noqa: E711
-            ).order_by(PlanSlot.tag, PlanSlot.stunde)
-        ).all()
         room_lookup = {
             room.id: room.name
             for room in self.session.exec(select(Room).where(Room.account_id == account.id)).all()
         }
-        dirty_slots = False
-        slots_normalized: List[PlanSlot] = []
-        for row in slot_rows:
-            if row.planning_period_id is None:
-                row.planning_period_id = plan.planning_period_id
-                self.session.add(row)
-                dirty_slots = True
-            if row.planning_period_id == plan.planning_period_id:
-                slots_normalized.append(row)
-        if dirty_slots:
-            self.session.commit()
         slots_out = [
             PlanSlotOut(
-                class_id=row.class_id,
-                tag=row.tag,
-                stunde=row.stunde,
-                subject_id=row.subject_id,
-                teacher_id=row.teacher_id,
-                room_id=row.room_id,
-                room_name=room_lookup.get(row.room_id) if row.room_id else None,
+                **row,
+                room_name=room_lookup.get(row["room_id"]) if row["room_id"] else None,
                 is_fixed=None,
                 is_flexible=None,
             )
-            for row in slots_normalized
+            for row in self._load_plan_cells(plan, account)
         ]
+        return PlanDetail(**self._plan_detail_fields(plan, account), slots=slots_out)
+
+    def _plan_detail_fields(self, plan: Plan, account) -> Dict[str, Any]:
+        slots_meta_payload = self._load_basisplan_slots_meta(account.id, plan.planning_period_id)
 
         if plan.rules_snapshot:
             try:
@@ -171,7 +192,7 @@ class PlanQueryService:
             except Exception:
                 params_used = None
 
-        return PlanDetail(
+        return dict(
             id=plan.id,
             name=plan.name,
             status=plan.status,
@@ -181,7 +202,6 @@ class PlanQueryService:
             version_id=plan.version_id,
             comment=plan.comment,
             rule_profile_id=plan.rule_profile_id,
-            slots=slots_out,
             slots_meta=slots_meta_payload,
             rules_snapshot=rules_snapshot,
             rule_keys_active=rule_keys_active,
@@ -189,6 +209,127 @@ class PlanQueryService:
             planning_period_id=plan.planning_period_id,
         )
 
+    def _load_plan_matrix(self, plan: Plan, account) -> PlanMatrixOut:
+        """Dense matrix view of the plan, read from the packed PlanMatrix row.
+
+        Each id column is turned into a lookup list and an index array with
+        ``np.unique``; the per-class arrays are plain slices of the result.
+        """
+        packed = self._load_packed_plan(plan, account)
+        subject_ids, subjects = index_cells(packed.cells["subject_id"])
+        teacher_ids, teachers = index_cells(packed.cells["teacher_id"])
+        room_ids, rooms = index_cells(packed.cells["room_id"])
+        room_lookup = {}
+        if room_ids:
+            room_lookup = dict(
+                self.session.exec(
+                    select(Room.id, Room.name).where(Room.account_id == account.id, Room.id.in_(room_ids))
+                ).all()
+            )
+        subjects, teachers, rooms = subjects.tolist(), teachers.tolist(), rooms.tolist()
+        return PlanMatrixOut(
+            days=packed.days,
+            slots_per_day=packed.slots_per_day,
+            subject_ids=subject_ids,
+            teacher_ids=teacher_ids,
+            room_ids=room_ids,
+            room_names=[room_lookup.get(room_id) for room_id in room_ids],
+            classes=[
+                PlanClassMatrix(class_id=class_id, subject=subjects[idx], teacher=teachers[idx], room=rooms[idx])
+                for idx, class_id in enumerate(packed.class_ids)
+            ],
+        )
+
+    def _load_plan_cells(self, plan: Plan, account) -> List[dict]:
+        """Return the plan's cells, preferring the packed PlanMatrix row.
+
+        Plans written before the matrix existed are read from PlanSlot once and
+        backfilled (together with missing planning_period_id values). Plans that
+        cannot be packed are read from PlanSlot every time, without writes.
+        """
+        packed = load_plan_matrices(self.session, [plan.id]).get(plan.id)
+        if packed is not None:
+            return unpack_slot_rows(packed)
+
+        slot_rows = self.session.exec(
+            select(PlanSlot).where(
+                PlanSlot.plan_id == plan.id,
+                PlanSlot.account_id == account.id,
+                (PlanSlot.planning_period_id == plan.planning_period_id)
+                | (PlanSlot.planning_period_id == None),  # noqa: E711
+            ).order_by(PlanSlot.tag, PlanSlot.stunde)
+        ).all()
+        slots_normalized: List[PlanSlot] = []
+        backfilled = False
+        for row in slot_rows:
+            if row.planning_period_id is None:
+                row.planning_period_id = plan.planning_period_id
+                self.session.add(row)
+                backfilled = True
+            if row.planning_period_id == plan.planning_period_id:
+                slots_normalized.append(row)
+        cells = [{key: getattr(row, key) for key in PLAN_SLOT_FIELDS} for row in slots_normalized]
+        # Plans that cannot be packed (several lessons in one cell) stay on PlanSlot;
+        # their reads must not write anything
+        packable = pack_plan_slots(cells) is not None
+        if packable:
+            write_plan_matrix(self.session, plan.id, account.id, plan.planning_period_id, cells)
+        if packable or backfilled:
+            self.session.commit()
+        return cells
+
+    def _load_packed_plan(self, plan: Plan, account, packed: Optional[PackedPlan] = None) -> PackedPlan:
+        if packed is None:
+            packed = load_plan_matrices(self.session, [plan.id]).get(plan.id)
+        if packed is None:
+            packed = pack_plan_slots(self._load_plan_cells(plan, account))
+        if packed is None:
+            raise HTTPException(
+                status_code=409,
+                detail=f"Plan {plan.id} enthält mehrere Stunden in einer Zelle und kann nicht als Matrix verarbeitet werden.",
+            )
+        return packed
+
+    def diff_plans_for_request(
+        self,
+        plan_id: int,
+        other_plan_id: int,
+        account_id: Optional[int],
+        planning_period_id: Optional[int],
+    ) -> PlanDiff:
+        account, period = self._resolve_context(account_id, planning_period_id)
+        return self.diff_plans(plan_id, other_plan_id, account, period)
+
+    def diff_plans(self, plan_id: int, other_plan_id: int, account, period) -> PlanDiff:
+        """Differences from plan ``plan_id`` to ``other_plan_id`` (see ``diff_packed_plans``)."""
+        plan = self._get_plan_for_account(plan_id, account, period)
+        other = self._get_plan_for_account(other_plan_id, account, period)
+        matrices = load_plan_matrices(self.session, [plan.id, other.id])
+        before = self._load_packed_plan(plan, account, matrices.get(plan.id))
+        after = self._load_packed_plan(other, account, matrices.get(other.id))
+
+        def _delta(a: Optional[float], b: Optional[float]) -> Optional[float]:
+            return None if a is None or b is None else b - a
+
+        return PlanDiff(
+            plan_id=plan.id,
+            other_plan_id=other.id,
+            score_delta=_delta(plan.score, other.score),
+            objective_delta=_delta(plan.objective_value, other.objective_value),
+            **diff_packed_plans(before, after),
+        )
+
+    def get_solver_progress_for_request(
+        self,
+        plan_id: int,
+        account_id: Optional[int],
+        planning_period_id: Optional[int],
+    ) -> SolverProgressOut:
+        account, period = self._resolve_context(account_id, planning_period_id)
+        plan = self._get_plan_for_account(plan_id, account, period)
+        payload = _safe_json_load(plan.solver_progress, {})
+        return SolverProgressOut(plan_id=plan.id, **payload)
+
     def replace_plan_slots_for_request(
         self,
         plan_id: int,
@@ -207,48 +348,31 @@ class PlanQueryService:
         period,
     ) -> PlanDetail:
         plan = self._get_plan_for_account(plan_id, account, period)
+        incoming = self._validated_slot_rows(payload.slots, account)
+        self._apply_slot_changes(plan, account, incoming, removed=set(), full_replace=True)
+        return self.get_plan_detail(plan_id, account, period)
 
-        self.session.exec(
-            delete(PlanSlot).where(
-                PlanSlot.plan_id == plan_id,
-                PlanSlot.account_id == account.id,
-                (PlanSlot.planning_period_id == plan.planning_period_id)
-                | (PlanSlot.planning_period_id == None),  # noqa: E711
-            )
-        )
-        self.session.commit()
-
-        for slot in payload.slots:
-            cls = self.session.get(Class, slot.class_id)
-            if not cls or cls.account_id != account.id:
-                raise HTTPException(status_code=400, detail=f"Klasse {slot.class_id} gehört zu einem anderen Account")
-            subj = self.session.get(Subject, slot.subject_id)
-            if not subj or subj.account_id != account.id:
-                raise HTTPException(status_code=400, detail=f"Fach {slot.subject_id} gehört zu einem anderen Account")
-            teacher = self.session.get(Teacher, slot.teacher_id)
-            if not teacher or teacher.account_id != account.id:
-                raise HTTPException(status_code=400, detail=f"Lehrkraft {slot.teacher_id} gehört zu einem anderen Account")
-            room_id = None
-            if getattr(slot, "room_id", None) is not None:
-                room = self.session.get(Room, slot.room_id)
-                if not room or room.account_id != account.id:
-                    raise HTTPException(status_code=400, detail=f"Raum {slot.room_id} gehört zu einem anderen Account")
-                room_id = room.id
-            self.session.add(
-                PlanSlot(
-                    account_id=account.id,
-                    plan_id=plan_id,
-                    class_id=slot.class_id,
-                    tag=slot.tag,
-                    stunde=slot.stunde,
-                    subject_id=slot.subject_id,
-                    teacher_id=slot.teacher_id,
-                    room_id=room_id,
-                    planning_period_id=plan.planning_period_id,
-                )
-            )
+    def patch_plan_slots_for_request(
+        self,
+        plan_id: int,
+        payload: PlanSlotsPatchRequest,
+        account_id: Optional[int],
+        planning_period_id: Optional[int],
+    ) -> PlanDetail:
+        account, period = self._resolve_context(account_id, planning_period_id)
+        return self.patch_plan_slots(plan_id, payload, account, period)
 
-        self.session.commit()
+    def patch_plan_slots(
+        self,
+        plan_id: int,
+        payload: PlanSlotsPatchRequest,
+        account,
+        period,
+    ) -> PlanDetail:
+        plan = self._get_plan_for_account(plan_id, account, period)
+        incoming = self._validated_slot_rows(payload.slots, account)
+        removed = {(cell.class_id, cell.tag, cell.stunde) for cell in payload.remove}
+        self._apply_slot_changes(plan, account, incoming, removed=removed, full_replace=False)
         return self.get_plan_detail(plan_id, account, period)
 
     def update_plan_metadata_for_request(
@@ -307,6 +431,7 @@ class PlanQueryService:
         period,
     ) -> None:
         plan = self._get_plan_for_account(plan_id, account, period)
+        self.session.exec(delete(PlanMatrix).where(PlanMatrix.plan_id == plan_id))
         self.session.exec(
             delete(PlanSlot).where(
                 PlanSlot.plan_id == plan_id,
@@ -318,46 +443,177 @@ class PlanQueryService:
         self.session.delete(plan)
         self.session.commit()
 
+    def _validated_slot_rows(self, slots, account) -> Dict[SlotKey, List[dict]]:
+        """Validate all referenced ids with one IN query per entity type.
+
+        Returns the incoming lessons grouped by cell (class_id, tag, stunde); a
+        cell may hold several lessons (parallel or band lessons).
+        """
+        checks = (
+            (Class, "class_id", "Klasse"),
+            (Subject, "subject_id", "Fach"),
+            (Teacher, "teacher_id", "Lehrkraft"),
+            (Room, "room_id", "Raum"),
+        )
+        for model, attr, label in checks:
+            requested = {getattr(slot, attr, None) for slot in slots} - {None}
+            if not requested:
+                continue
+            found = set(
+                self.session.exec(
+                    select(model.id).where(model.id.in_(requested), model.account_id == account.id)
+                ).all()
+            )
+            missing = sorted(requested - found)
+            if missing:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"{label} {missing[0]} gehört zu einem anderen Account",
+                )
+
+        rows: Dict[SlotKey, List[dict]] = {}
+        for slot in slots:
+            rows.setdefault((slot.class_id, slot.tag, slot.stunde), []).append(
+                {
+                    "class_id": slot.class_id,
+                    "tag": slot.tag,
+                    "stunde": slot.stunde,
+                    "subject_id": slot.subject_id,
+                    "teacher_id": slot.teacher_id,
+                    "room_id": getattr(slot, "room_id", None),
+                }
+            )
+        return rows
+
+    def _apply_slot_changes(
+        self,
+        plan: Plan,
+        account,
+        incoming: Dict[SlotKey, List[dict]],
+        removed: Set[SlotKey],
+        full_replace: bool,
+    ) -> Dict[str, int]:
+        """Diff the plan's stored cells against ``incoming`` and write only the changes.
+
+        Every cell in ``incoming`` gets exactly the listed lessons. Stored rows are
+        matched to them by (subject_id, teacher_id) first, left-over rows are
+        reused for left-over lessons, the rest is deleted or inserted. With
+        ``full_replace`` every stored cell missing from ``incoming`` is deleted,
+        otherwise only the cells listed in ``removed``. Inserts, updates and
+        deletes run in a single transaction.
+        """
+        existing_rows = self.session.exec(
+            select(PlanSlot).where(
+                PlanSlot.plan_id == plan.id,
+                PlanSlot.account_id == account.id,
+                (PlanSlot.planning_period_id == plan.planning_period_id)
+                | (PlanSlot.planning_period_id == None),  # noqa: E711
+            ).order_by(PlanSlot.id)
+        ).all()
+
+        existing: Dict[SlotKey, List[PlanSlot]] = {}
+        for row in existing_rows:
+            existing.setdefault((row.class_id, row.tag, row.stunde), []).append(row)
+
+        delete_ids: List[int] = []
+        updates: List[dict] = []
+        inserts: List[dict] = []
+        final_cells: List[dict] = []
+        for key, rows in existing.items():
+            if key in incoming:
+                continue
+            if full_replace or key in removed:
+                delete_ids.extend(row.id for row in rows)
+                continue
+            for row in rows:
+                final_cells.append({field: getattr(row, field) for field in PLAN_SLOT_FIELDS})
+                if row.planning_period_id is None:
+                    updates.append(self._slot_update_params(row, None, plan.planning_period_id))
+
+        for key, targets in incoming.items():
+            final_cells.extend(targets)
+            unmatched_rows = list(existing.get(key, []))
+            unmatched_targets: List[dict] = []
+            pairs: List[Tuple[PlanSlot, dict]] = []
+            for target in targets:
+                match = next(
+                    (
+                        row
+                        for row in unmatched_rows
+                        if (row.subject_id, row.teacher_id) == (target["subject_id"], target["teacher_id"])
+                    ),
+                    None,
+                )
+                if match is None:
+                    unmatched_targets.append(target)
+                else:
+                    unmatched_rows.remove(match)
+                    pairs.append((match, target))
+            pairs.extend(zip(unmatched_rows, unmatched_targets))
+            delete_ids.extend(row.id for row in unmatched_rows[len(unmatched_targets):])
+            inserts.extend(unmatched_targets[len(unmatched_rows):])
+            for row, target in pairs:
+                if (
+                    row.subject_id != target["subject_id"]
+                    or row.teacher_id != target["teacher_id"]
+                    or row.room_id != target["room_id"]
+                    or row.planning_period_id != plan.planning_period_id
+                ):
+                    updates.append(self._slot_update_params(row, target, plan.planning_period_id))
+
+        if delete_ids:
+            self.session.exec(delete(PlanSlot).where(PlanSlot.id.in_(delete_ids)))
+        if updates:
+            table = PlanSlot.__table__
+            self.session.execute(
+                update(table)
+                .where(table.c.id == bindparam("_slot_id"))
+                .values(
+                    subject_id=bindparam("_subject_id"),
+                    teacher_id=bindparam("_teacher_id"),
+                    room_id=bindparam("_room_id"),
+                    planning_period_id=bindparam("_planning_period_id"),
+                ),
+                updates,
+            )
+        bulk_insert_plan_slots(
+            self.session,
+            plan_slot_rows(
+                inserts,
+                account_id=account.id,
+                plan_id=plan.id,
+                planning_period_id=plan.planning_period_id,
+            ),
+        )
+        write_plan_matrix(self.session, plan.id, account.id, plan.planning_period_id, final_cells)
+        self.session.commit()
+        # Core statements bypass the identity map; drop stale PlanSlot instances.
+        self.session.expire_all()
+        return {"inserted": len(inserts), "updated": len(updates), "deleted": len(delete_ids)}
+
+    @staticmethod
+    def _slot_update_params(row: PlanSlot, target: Optional[dict], planning_period_id) -> dict:
+        source = target or {
+            "subject_id": row.subject_id,
+            "teacher_id": row.teacher_id,
+            "room_id": row.room_id,
+        }
+        return {
+            "_slot_id": row.id,
+            "_subject_id": source["subject_id"],
+            "_teacher_id": source["teacher_id"],
+            "_room_id": source["room_id"],
+            "_planning_period_id": planning_period_id,
+        }
+
     def _resolve_context(self, account_id, planning_period_id):
         account = resolve_account(self.session, account_id)
         period = resolve_planning_period(self.session, account, planning_period_id)
         return account, period
 
     def _load_basisplan_slots_meta(self, account_id: int, planning_period_id: int) -> List[dict]:
-        slots_meta_payload: List[dict] = []
-        basis_row = self.session.exec(
-            select(BasisPlan).where(
-                BasisPlan.account_id == account_id,
-                BasisPlan.planning_period_id == planning_period_id,
-            )
-        ).first()
-        if basis_row and basis_row.data:
-            try:
-                basis_payload = json.loads(basis_row.data)
-            except json.JSONDecodeError:
-                basis_payload = {}
-            meta_cfg = basis_payload.get("meta") if isinstance(basis_payload, dict) else {}
-            if isinstance(meta_cfg, dict):
-                meta_slots = meta_cfg.get("slots")
-                if isinstance(meta_slots, list):
-                    for idx, slot_entry in enumerate(meta_slots):
-                        if isinstance(slot_entry, dict):
-                            slots_meta_payload.append({
-                                "index": idx,
-                                "label": slot_entry.get("label") or f"{idx + 1}. Stunde",
-                                "start": slot_entry.get("start"),
-                                "end": slot_entry.get("end"),
-                                "is_pause": bool(slot_entry.get("isPause")),
-                            })
-                        else:
-                            slots_meta_payload.append({
-                                "index": idx,
-                                "label": f"{idx + 1}. Stunde",
-                                "start": None,
-                                "end": None,
-                                "is_pause": False,
-                            })
-        return slots_meta_payload
+        normalized = BasisPlanParser(self.session).load_normalized(account_id, planning_period_id, claim_legacy=False)
+        return [dict(item) for item in normalized.slots_meta]
 
     def _get_plan_for_account(self, plan_id: int, account, period) -> Plan:
         plan = self.session.get(Plan, plan_id)
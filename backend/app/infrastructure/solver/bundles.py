@@ -0,0 +1,254 @@
+from __future__ import annotations
+
+import json
+import pickle
+import statistics
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+from ortools.sat.python import cp_model
+
+from ...domain.planner.basis_parser import BasisPlanContext
+from ...domain.planner.solver_presets import solver_param_inputs
+from ...domain.planner.solver_protocol import PlannerSolver, SolverInputs, SolverOutputs
+from ...schemas import GenerateParams
+from .ortools_solver import OrToolsPlannerSolver
+from .parameters import apply_search_parameters
+from .tuning import STATUS_NAMES
+
+BUNDLE_FORMAT = 1
+
+# Files of a bundle directory
+MANIFEST_FILE = "manifest.json"
+REQUIREMENTS_FILE = "requirements.parquet"
+BASIS_CONTEXT_FILE = "basis_context.pkl"
+INPUTS_FILE = "inputs.json"
+RULES_FILE = "rules.json"
+PARAMS_FILE = "params.json"
+MODEL_FILE = "model.pb"
+
+
+@dataclass
+class ModelBundle:
+    """A generation's solver inputs as written by ``BundlingSolver``."""
+
+    path: Path
+    manifest: Dict[str, Any]
+    df: pd.DataFrame
+    basis_context: BasisPlanContext
+    inputs: Dict[str, Any]  # FACH_ID, KLASSEN, LEHRER, teacher_workdays, pool_teacher_names
+    rules: Dict[str, int | bool]
+    active_rule_keys: List[str]
+    params: GenerateParams
+
+    @property
+    def model_path(self) -> Optional[Path]:
+        path = self.path / MODEL_FILE
+        return path if path.exists() else None
+
+    def solver_inputs(self, params: Optional[GenerateParams] = None) -> SolverInputs:
+        """SolverInputs of the bundle, optionally with other (resolved) ``params``."""
+        context = self.basis_context
+        return {
+            "df": self.df,
+            "FACH_ID": list(self.inputs["FACH_ID"]),
+            "KLASSEN": list(self.inputs["KLASSEN"]),
+            "LEHRER": list(self.inputs["LEHRER"]),
+            "regeln": dict(self.rules),
+            "teacher_workdays": {int(key): value for key, value in self.inputs["teacher_workdays"].items()},
+            "pool_teacher_names": set(self.inputs["pool_teacher_names"]),
+            "room_plan": context.room_plan,
+            "fixed_slots": context.fixed_slot_map,
+            "flexible_groups": context.flexible_groups,
+            "flexible_slot_limits": context.flexible_slot_limits,
+            "class_windows": context.class_windows_by_name,
+            "pause_slots": context.pause_slots,
+            "slots_per_day": context.slots_per_day,
+            **solver_param_inputs(params or self.params),
+        }
+
+
+def _write_json(path: Path, data: Any) -> None:
+    path.write_text(json.dumps(data, indent=2, ensure_ascii=False, default=str), encoding="utf-8")
+
+
+def _read_json(path: Path) -> Any:
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def new_bundle_path(root: Path) -> Path:
+    """A fresh, not yet created bundle directory below ``root``."""
+    created = datetime.now(timezone.utc)
+    return Path(root) / f"{created:%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:8]}"
+
+
+def _write_bundle_inputs(
+    path: Path,
+    inputs: SolverInputs,
+    params: GenerateParams,
+    basis_context: BasisPlanContext,
+    active_rule_keys: List[str],
+) -> None:
+    inputs["df"].to_parquet(path / REQUIREMENTS_FILE)
+    with (path / BASIS_CONTEXT_FILE).open("wb") as fh:
+        pickle.dump(basis_context, fh, protocol=pickle.HIGHEST_PROTOCOL)
+    _write_json(
+        path / INPUTS_FILE,
+        {
+            "FACH_ID": [int(fid) for fid in inputs["FACH_ID"]],
+            "KLASSEN": list(inputs["KLASSEN"]),
+            "LEHRER": list(inputs["LEHRER"]),
+            "teacher_workdays": inputs.get("teacher_workdays") or {},
+            "pool_teacher_names": sorted(inputs.get("pool_teacher_names") or []),
+        },
+    )
+    _write_json(path / RULES_FILE, {"rules": inputs["regeln"], "active_rule_keys": list(active_rule_keys)})
+    _write_json(path / PARAMS_FILE, params.model_dump())
+
+
+class BundlingSolver(PlannerSolver):
+    """Solves with ``solver`` and writes a self-contained bundle of the run to ``path``.
+
+    The bundle holds the requirements as Parquet, the pickled basis context,
+    the effective rules, the resolved params and the ``CpModelProto`` the
+    wrapped solver exported from its build (``SolverInputs.export_model``).
+    Being a ``PlannerSolver`` itself, it runs in the scheduler's worker
+    process: the file writes count towards the account's solve and the model
+    is built only once.
+    """
+
+    def __init__(
+        self,
+        solver: PlannerSolver,
+        path: Path,
+        params: GenerateParams,
+        basis_context: BasisPlanContext,
+        active_rule_keys: List[str],
+        meta: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        self.solver = solver
+        self.path = Path(path)
+        self.params = params
+        self.basis_context = basis_context
+        self.active_rule_keys = list(active_rule_keys)
+        self.meta = dict(meta or {})
+
+    def solve(self, inputs: SolverInputs) -> SolverOutputs:
+        created = datetime.now(timezone.utc)
+        self.path.mkdir(parents=True)
+        _write_bundle_inputs(self.path, inputs, self.params, self.basis_context, self.active_rule_keys)
+        output = self.solver.solve({**inputs, "export_model": str(self.path / MODEL_FILE)})
+        stats = output.get("stats") or {}
+        _write_json(
+            self.path / MANIFEST_FILE,
+            {
+                "format": BUNDLE_FORMAT,
+                "created_at": created.isoformat(),
+                **self.meta,
+                "model": {
+                    "variables": stats.get("variables"),
+                    "constraints": stats.get("constraints"),
+                    "plan_variables": len(output.get("plan") or {}),
+                    "build_seconds": stats.get("build_seconds"),
+                },
+            },
+        )
+        return output
+
+
+def record_bundle_result(path: Path, result: Dict[str, Any]) -> None:
+    """Add the outcome of the original run (status, objective, times) to the manifest."""
+    manifest = _read_json(Path(path) / MANIFEST_FILE)
+    manifest["result"] = result
+    _write_json(Path(path) / MANIFEST_FILE, manifest)
+
+
+def load_model_bundle(path: Path) -> ModelBundle:
+    path = Path(path)
+    manifest = _read_json(path / MANIFEST_FILE)
+    if manifest.get("format") != BUNDLE_FORMAT:
+        raise ValueError(f"Unbekanntes Bundle-Format: {manifest.get('format')!r}")
+    with (path / BASIS_CONTEXT_FILE).open("rb") as fh:
+        basis_context = pickle.load(fh)
+    rules = _read_json(path / RULES_FILE)
+    return ModelBundle(
+        path=path,
+        manifest=manifest,
+        df=pd.read_parquet(path / REQUIREMENTS_FILE),
+        basis_context=basis_context,
+        inputs=_read_json(path / INPUTS_FILE),
+        rules=rules["rules"],
+        active_rule_keys=rules["active_rule_keys"],
+        params=GenerateParams.model_validate(_read_json(path / PARAMS_FILE)),
+    )
+
+
+def replay_model_bundle(
+    bundle: ModelBundle,
+    params: Optional[GenerateParams] = None,
+    solver: Optional[PlannerSolver] = None,
+) -> Dict[str, Any]:
+    """Build and solve the bundle's inputs once; timings of the run."""
+    started = time.perf_counter()
+    cpu_started = time.process_time()
+    output = (solver or OrToolsPlannerSolver()).solve(bundle.solver_inputs(params))
+    stats = output.get("stats") or {}
+    status = output["status"]
+    return {
+        "status": STATUS_NAMES.get(status, str(status)),
+        "objective": stats.get("objective"),
+        "best_bound": stats.get("best_bound"),
+        "attempts": stats.get("attempts"),
+        "build_seconds": stats.get("build_seconds"),
+        "first_solution_seconds": stats.get("first_solution_seconds"),
+        "solve_seconds": stats.get("wall_seconds"),
+        "wall_seconds": time.perf_counter() - started,
+        "cpu_seconds": time.process_time() - cpu_started,
+    }
+
+
+def replay_model_proto(
+    bundle: ModelBundle,
+    params: Optional[GenerateParams] = None,
+    time_limit: Optional[float] = None,
+) -> Dict[str, Any]:
+    """Solve the exported ``CpModelProto`` as is (no model building); one attempt."""
+    params = params or bundle.params
+    model_path = bundle.model_path
+    if model_path is None:
+        raise ValueError(f"Bundle ohne {MODEL_FILE}: {bundle.path}")
+    model = cp_model.CpModel()
+    model.Proto().ParseFromString(model_path.read_bytes())
+
+    solver = cp_model.CpSolver()
+    apply_search_parameters(solver, params.solver.model_dump(), params.randomize_search)
+    solver.parameters.max_time_in_seconds = time_limit or params.time_per_attempt
+    solver.parameters.random_seed = params.base_seed
+    status = solver.Solve(model)
+    response = solver.ResponseProto()
+    feasible = status in (cp_model.OPTIMAL, cp_model.FEASIBLE)
+    return {
+        "status": STATUS_NAMES.get(status, str(status)),
+        "objective": solver.ObjectiveValue() if feasible else None,
+        "best_bound": solver.BestObjectiveBound() if feasible else None,
+        "wall_seconds": response.wall_time,
+        "cpu_seconds": response.user_time,
+        "deterministic_time": response.deterministic_time,
+        "conflicts": response.num_conflicts,
+        "branches": response.num_branches,
+    }
+
+
+def summarize_runs(runs: List[Dict[str, Any]], keys: List[str]) -> Dict[str, Dict[str, float]]:
+    """min/median/max of the numeric ``keys`` over ``runs``."""
+    summary: Dict[str, Dict[str, float]] = {}
+    for key in keys:
+        values = [run[key] for run in runs if isinstance(run.get(key), (int, float))]
+        if values:
+            summary[key] = {"min": min(values), "median": statistics.median(values), "max": max(values)}
+    return summary
@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import logging
+import math
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, Optional
+
+from ortools.sat.python import cp_model
+
+from ...config import settings
+from ...domain.planner.solver_protocol import PlannerSolver, SolverInputs, SolverOutputs, SolverResult
+from .telemetry import configure_solver_logging
+
+logger = logging.getLogger("stundenplan.solver")
+
+
+class SolverBusyError(Exception):
+    """All solver slots and queue places are taken; retry after ``retry_after`` seconds."""
+
+    def __init__(self, retry_after: int) -> None:
+        super().__init__(f"solver capacity exhausted, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+def collect_solver_result(output: SolverOutputs) -> SolverResult:
+    status = output["status"]
+    solver = output["solver"]
+    stats = dict(output.get("stats") or {})
+    progress = stats.pop("progress", None) or []
+    assignments = []
+    objective_value = None
+    if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        assignments = [key for key, var in output["plan"].items() if solver.Value(var) == 1]
+        if hasattr(solver, "ObjectiveValue"):
+            objective_value = solver.ObjectiveValue()
+    return SolverResult(
+        status=status,
+        score=output["score"],
+        objective_value=objective_value,
+        assignments=assignments,
+        cpu_seconds=0.0,
+        progress=progress,
+        stats=stats,
+    )
+
+
+def run_solver(
+    solver: PlannerSolver, inputs: SolverInputs, cpu_clock: Callable[[], float] = time.process_time
+) -> SolverResult:
+    """Entry point of the worker processes (module level so that it pickles).
+
+    In a worker process ``process_time`` covers all CP-SAT search threads of
+    the solve. In-process solves pass ``thread_time`` instead: the server
+    process also runs other requests and solves, so only the calling thread
+    can be charged to this solve.
+    """
+    started = cpu_clock()
+    result = collect_solver_result(solver.solve(inputs))
+    result["cpu_seconds"] = cpu_clock() - started
+    return result
+
+
+def default_worker_count(cpu_count: Optional[int] = None) -> int:
+    """Concurrent solves that fit the machine without oversubscribing its cores.
+
+    One solve uses at most ``solver_max_search_workers`` CP-SAT threads.
+    """
+    cpus = cpu_count or os.cpu_count() or 1
+    return max(1, cpus // max(1, settings.solver_max_search_workers))
+
+
+class SolverExecutor:
+    """Bounded executor for CP-SAT solves.
+
+    At most ``max_workers`` solves run at once (in worker processes unless
+    ``use_processes`` is off); ``queue_size`` further requests may wait for a
+    worker. Anything beyond that waits up to ``queue_timeout`` seconds for a
+    place and is then rejected with ``SolverBusyError``, so request threads
+    never pile up behind long solves.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        queue_size: int = 0,
+        queue_timeout: float = 0.0,
+        use_processes: bool = True,
+    ) -> None:
+        self.max_workers = max_workers or default_worker_count()
+        self.queue_size = max(0, queue_size)
+        self.queue_timeout = max(0.0, queue_timeout)
+        self.use_processes = use_processes
+        self._places = threading.BoundedSemaphore(self.capacity)
+        self._workers = threading.BoundedSemaphore(self.max_workers)
+        self._lock = threading.Lock()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._admitted = 0
+        self._running = 0
+        self._rejected = 0
+        self._avg_seconds = 5.0
+
+    @property
+    def capacity(self) -> int:
+        return self.max_workers + self.queue_size
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                # spawn: forking a threaded server process is not safe
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=configure_solver_logging,
+                )
+            return self._pool
+
+    def retry_after(self) -> int:
+        """Rough wait until a place frees up, from the average solve duration."""
+        with self._lock:
+            waves = max(1, math.ceil(self._admitted / self.max_workers))
+            estimate = self._avg_seconds * waves
+        return int(min(300, max(1, math.ceil(estimate))))
+
+    def run(self, solver: PlannerSolver, inputs: SolverInputs) -> SolverResult:
+        if self.queue_timeout > 0:
+            admitted = self._places.acquire(timeout=self.queue_timeout)
+        else:
+            admitted = self._places.acquire(blocking=False)
+        if not admitted:
+            with self._lock:
+                self._rejected += 1
+            retry_after = self.retry_after()
+            logger.warning("Solver busy | capacity=%s retry_after=%ss", self.capacity, retry_after)
+            raise SolverBusyError(retry_after)
+        with self._lock:
+            self._admitted += 1
+        try:
+            with self._workers:
+                with self._lock:
+                    self._running += 1
+                started = time.monotonic()
+                try:
+                    if self.use_processes:
+                        future: Future = self._get_pool().submit(run_solver, solver, inputs)
+                        try:
+                            result = future.result()
+                        except BrokenProcessPool:
+                            # A crashed worker breaks the whole pool; start a fresh one next time
+                            self.shutdown()
+                            raise
+                    else:
+                        result = run_solver(solver, inputs, time.thread_time)
+                finally:
+                    elapsed = time.monotonic() - started
+                    with self._lock:
+                        self._running -= 1
+                        self._avg_seconds = 0.8 * self._avg_seconds + 0.2 * elapsed
+            return result
+        finally:
+            with self._lock:
+                self._admitted -= 1
+            self._places.release()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "capacity": self.capacity,
+                "running": self._running,
+                "queued": self._admitted - self._running,
+                "rejected": self._rejected,
+            }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+_executor: Optional[SolverExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_solver_executor() -> SolverExecutor:
+    """Process-wide executor configured from ``STUNDENPLAN_SOLVER_*`` settings."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = SolverExecutor(
+                max_workers=settings.solver_max_workers or None,
+                queue_size=settings.solver_queue_size,
+                queue_timeout=settings.solver_queue_timeout,
+                use_processes=settings.solver_use_processes,
+            )
+        return _executor
+
+
+def shutdown_solver_executor() -> None:
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown()
@@ -7,20 +7,16 @@ import pandas as pd
 from ortools.sat.python import cp_model
 
 from ...utils import TAGE
+from .parameters import apply_search_parameters
+from .telemetry import attach_progress_recorder
 
 try:
     from stundenplan_regeln import add_constraints
 except ImportError as exc:  # pragma: no cover
     raise RuntimeError("Regel-Engine 'stundenplan_regeln' fehlt im PYTHONPATH") from exc
 
+# Level from STUNDENPLAN_SOLVER_LOG_LEVEL (see telemetry.configure_solver_logging)
 solver_logger = logging.getLogger("stundenplan.solver")
-if not solver_logger.handlers:
-    handler = logging.StreamHandler()
-    formatter = logging.Formatter("%(levelname)s %(name)s: %(message)s")
-    handler.setFormatter(formatter)
-    solver_logger.addHandler(handler)
-solver_logger.setLevel(logging.DEBUG)
-solver_logger.propagate = True
 
 
 def solve_best_plan(
@@ -46,6 +42,7 @@ def solve_best_plan(
     base_seed: int = 42,
     seed_step: int = 17,
     use_value_hints: bool = True,
+    search_params: Optional[Dict[str, object]] = None,
 ) -> Tuple[int, cp_model.CpSolver, cp_model.CpModel, Dict[Tuple[int, str, int], cp_model.IntVar], float]:
     slots_per_day = max(1, int(slots_per_day))
 
@@ -116,9 +113,9 @@ def solve_best_plan(
 
     solver = cp_model.CpSolver()
     solver.parameters.max_time_in_seconds = max(0.1, float(time_per_attempt))
-    solver.parameters.num_search_workers = 8
+    apply_search_parameters(solver, search_params, randomize_search)
+    attach_progress_recorder(solver, bool((search_params or {}).get("log_search_progress")))
     solver.parameters.random_seed = base_seed
-    solver.parameters.log_search_progress = True
 
     def try_solve(seed: int) -> Tuple[int, float]:
         solver.parameters.random_seed = seed
@@ -2,30 +2,30 @@ from __future__ import annotations
 
 from typing import Dict, List, Optional, Tuple, Set
 import logging
+import time
 
 import pandas as pd
 from ortools.sat.python import cp_model
 
 from ...utils import TAGE
 from ...domain.planner.solver_protocol import PlannerSolver, SolverInputs, SolverOutputs
+from .parameters import apply_search_parameters
+from .telemetry import attach_progress_recorder
 
 try:
     from stundenplan_regeln import add_constraints
 except ImportError as exc:  # pragma: no cover
     raise RuntimeError("Regel-Engine 'stundenplan_regeln' fehlt im PYTHONPATH") from exc
 
+# Level from STUNDENPLAN_SOLVER_LOG_LEVEL (see telemetry.configure_solver_logging)
 solver_logger = logging.getLogger("stundenplan.solver")
-if not solver_logger.handlers:
-    handler = logging.StreamHandler()
-    formatter = logging.Formatter("%(levelname)s %(name)s: %(message)s")
-    handler.setFormatter(formatter)
-    solver_logger.addHandler(handler)
-solver_logger.setLevel(logging.DEBUG)
-solver_logger.propagate = True
 
 
 class OrToolsPlannerSolver(PlannerSolver):
-    def solve(self, inputs: SolverInputs) -> SolverOutputs:
+    def build_model(
+        self, inputs: SolverInputs
+    ) -> Tuple[cp_model.CpModel, Dict[Tuple[int, str, int], cp_model.IntVar], Dict[str, list]]:
+        """CP model of ``inputs`` with the plan variables and soft terms per objective group."""
         df: pd.DataFrame = inputs['df']
         FACH_ID = inputs['FACH_ID']
         KLASSEN = inputs['KLASSEN']
@@ -85,6 +85,7 @@ class OrToolsPlannerSolver(PlannerSolver):
                         <= 1
                     )
 
+        objective_groups: Dict[str, list] = {}
         add_constraints(
             model,
             plan,
@@ -103,6 +104,7 @@ class OrToolsPlannerSolver(PlannerSolver):
             pool_teacher_names=inputs.get('pool_teacher_names'),
             slots_per_day=slots_per_day,
             pause_slots=inputs.get('pause_slots'),
+            objective_groups=objective_groups,
         )
 
         if inputs.get('use_value_hints', True):
@@ -112,11 +114,29 @@ class OrToolsPlannerSolver(PlannerSolver):
                 slots_per_day=slots_per_day,
                 seed=inputs.get('base_seed', 42),
             )
+        return model, plan, objective_groups
+
+    def solve(self, inputs: SolverInputs) -> SolverOutputs:
+        build_started = time.perf_counter()
+        model, plan, objective_groups = self.build_model(inputs)
+        build_seconds = time.perf_counter() - build_started
+        proto = model.Proto()
+        model_stats = {
+            "build_seconds": build_seconds,
+            "variables": len(proto.variables),
+            "constraints": len(proto.constraints),
+        }
+        if inputs.get('export_model'):
+            # Before solving: the lexicographic mode adds its stage constraints to the model
+            model.ExportToFile(str(inputs['export_model']))
 
         solver = cp_model.CpSolver()
-        solver.parameters.max_time_in_seconds = max(0.1, float(inputs.get('time_per_attempt', 5.0)))
-        solver.parameters.num_search_workers = 8
-        solver.parameters.log_search_progress = True
+        time_per_attempt = max(0.1, float(inputs.get('time_per_attempt', 5.0)))
+        deterministic = bool(inputs.get('deterministic'))
+        search_params = inputs.get('search_params') or {}
+        apply_search_parameters(solver, search_params, inputs.get('randomize_search', True))
+        progress = attach_progress_recorder(solver, bool(search_params.get('log_search_progress')))
+        _set_time_limit(solver, time_per_attempt, deterministic)
 
         multi_start = inputs.get('multi_start', True)
         attempts = max(1, inputs.get('max_attempts', 10) if multi_start else 1)
@@ -124,14 +144,40 @@ class OrToolsPlannerSolver(PlannerSolver):
         base_seed = inputs.get('base_seed', 42)
         seed_step = inputs.get('seed_step', 17)
 
+        if inputs.get('objective_mode') == 'lexicographic' and objective_groups:
+            # One staged run instead of restarts; it gets the restarts' worst-case time
+            solver.parameters.random_seed = base_seed
+            output = _solve_lexicographic(
+                model,
+                plan,
+                solver,
+                objective_groups,
+                inputs.get('objective_order') or [],
+                budget=time_per_attempt * attempts,
+                deterministic=deterministic,
+            )
+            output["stats"].update(model_stats)
+            output["stats"]["presolve_seconds"] = progress.presolve_seconds if progress else None
+            output["stats"]["progress"] = progress.events() if progress else []
+            return output
+
         best_status = cp_model.UNKNOWN
         best_score = 0.0
         patience_counter = patience
+        timer = _FirstSolutionTimer()
+        stats = {
+            "first_solution_seconds": None,
+            "objective": None,
+            "best_bound": None,
+            "attempts": 0,
+            **model_stats,
+        }
 
         for attempt in range(attempts):
             seed = base_seed + attempt * seed_step if multi_start else base_seed
             solver.parameters.random_seed = seed
-            status = solver.Solve(model)
+            status = solver.Solve(model, timer)
+            stats["attempts"] = attempt + 1
             score = _compute_score(model, solver)
             solver_logger.debug(
                 "solve_best_plan attempt seed=%s status=%s objective=%s score=%.2f",
@@ -143,6 +189,8 @@ class OrToolsPlannerSolver(PlannerSolver):
             if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
                 best_status = status
                 best_score = score
+                stats["objective"] = solver.ObjectiveValue()
+                stats["best_bound"] = solver.BestObjectiveBound()
                 if status == cp_model.OPTIMAL:
                     break
                 patience_counter -= 1
@@ -156,7 +204,137 @@ class OrToolsPlannerSolver(PlannerSolver):
         if best_status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
             solver_logger.warning("solve_best_plan exhausted attempts without feasible solution")
 
-        return SolverOutputs(status=best_status, solver=solver, model=model, plan=plan, score=best_score)
+        stats["first_solution_seconds"] = timer.first_solution_seconds
+        stats["wall_seconds"] = timer.elapsed()
+        stats["presolve_seconds"] = progress.presolve_seconds if progress else None
+        stats["progress"] = progress.events() if progress else []
+        return SolverOutputs(status=best_status, solver=solver, model=model, plan=plan, score=best_score, stats=stats)
+
+
+def _set_time_limit(solver: cp_model.CpSolver, seconds: float, deterministic: bool) -> None:
+    solver.parameters.max_time_in_seconds = seconds
+    if deterministic:
+        # Deterministic time instead of wall time, so equal inputs give equal plans
+        solver.parameters.max_deterministic_time = seconds
+        solver.parameters.max_time_in_seconds = seconds * 10
+
+
+def _solve_lexicographic(
+    model: cp_model.CpModel,
+    plan: Dict[Tuple[int, str, int], cp_model.IntVar],
+    solver: cp_model.CpSolver,
+    objective_groups: Dict[str, list],
+    order: List[str],
+    budget: float,
+    deterministic: bool,
+) -> SolverOutputs:
+    """Minimise the soft-goal groups one after another in ``order``.
+
+    Each stage fixes the optimum (or best value found) of its group as an upper
+    bound and hints the next stage with its solution. Groups missing from
+    ``order`` form a final weighted stage. The budget is split evenly over the
+    remaining stages, so time a stage does not use goes to the later ones.
+    """
+    stages = [(group, sum(objective_groups[group])) for group in order if objective_groups.get(group)]
+    rest = [term for group, terms in objective_groups.items() if group not in order for term in terms]
+    if rest:
+        stages.append(("rest", sum(rest)))
+    total = sum(term for terms in objective_groups.values() for term in terms)
+
+    timer = _FirstSolutionTimer()
+    status = cp_model.UNKNOWN
+    snapshot: Optional[_SolutionSnapshot] = None
+    stage_stats: List[Dict[str, object]] = []
+    remaining = budget
+    for idx, (group, expr) in enumerate(stages):
+        _set_time_limit(solver, max(0.1, remaining / (len(stages) - idx)), deterministic)
+        model.Minimize(expr)
+        started = time.perf_counter()
+        stage_status = solver.Solve(model, timer)
+        seconds = time.perf_counter() - started
+        remaining -= solver.ResponseProto().deterministic_time if deterministic else seconds
+        feasible = stage_status in (cp_model.OPTIMAL, cp_model.FEASIBLE)
+        stage_stats.append({
+            "group": group,
+            "status": int(stage_status),
+            "objective": solver.ObjectiveValue() if feasible else None,
+            "seconds": seconds,
+        })
+        solver_logger.debug(
+            "solve_lexicographic stage=%s status=%s objective=%s seconds=%.2f",
+            group,
+            stage_status,
+            stage_stats[-1]["objective"],
+            seconds,
+        )
+        if not feasible:
+            # earlier stages' solution stays valid, but is no longer proven optimal
+            status = stage_status if snapshot is None else cp_model.FEASIBLE
+            break
+        if stage_status == cp_model.FEASIBLE or status == cp_model.FEASIBLE:
+            status = cp_model.FEASIBLE
+        else:
+            status = cp_model.OPTIMAL
+        snapshot = _SolutionSnapshot(solver, float(solver.Value(total)))
+        if isinstance(expr, (int, float)):
+            continue
+        model.Add(expr <= int(round(solver.ObjectiveValue())))
+        model.ClearHints()
+        for var_index, value in enumerate(snapshot.values):
+            model.AddHint(model.GetIntVarFromProtoIndex(var_index), value)
+
+    if snapshot is None:
+        solver_logger.warning("solve_lexicographic found no feasible solution")
+    stats = {
+        "first_solution_seconds": timer.first_solution_seconds,
+        "objective": snapshot.ObjectiveValue() if snapshot else None,
+        "best_bound": None,  # each stage has its own bound, see "stages"
+        "attempts": len(stage_stats),
+        "wall_seconds": timer.elapsed(),
+        "stages": stage_stats,
+    }
+    return SolverOutputs(
+        status=status,
+        solver=snapshot if snapshot is not None else solver,
+        model=model,
+        plan=plan,
+        score=_compute_score(model, snapshot) if snapshot is not None else 0.0,
+        stats=stats,
+    )
+
+
+class _SolutionSnapshot:
+    """Variable values of one solution, read like a solved ``CpSolver``.
+
+    Later stages overwrite the solver's response, and a stage that times out
+    leaves none, so the lexicographic mode returns the last stage's solution.
+    """
+
+    def __init__(self, solver: cp_model.CpSolver, objective: float) -> None:
+        self.values = list(solver.ResponseProto().solution)
+        self.objective = objective
+
+    def Value(self, var: cp_model.IntVar) -> int:
+        return self.values[var.Index()]
+
+    def ObjectiveValue(self) -> float:
+        return self.objective
+
+
+class _FirstSolutionTimer(cp_model.CpSolverSolutionCallback):
+    """Records the time to the first feasible solution across all attempts."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.started = time.perf_counter()
+        self.first_solution_seconds: Optional[float] = None
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def on_solution_callback(self) -> None:
+        if self.first_solution_seconds is None:
+            self.first_solution_seconds = self.elapsed()
 
 
 def _compute_score(model: cp_model.CpModel, solver: cp_model.CpSolver) -> float:
@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+from typing import Any, Mapping, Optional
+
+from ortools.sat import sat_parameters_pb2
+from ortools.sat.python import cp_model
+
+# Workers when no parameters are given (same as the "balanced" preset)
+DEFAULT_NUM_WORKERS = 8
+
+
+def apply_search_parameters(
+    solver: cp_model.CpSolver,
+    params: Optional[Mapping[str, Any]],
+    randomize_search: bool = False,
+) -> None:
+    """Copy a resolved ``SolverParams`` dump onto ``solver.parameters``.
+
+    Missing keys keep the CP-SAT defaults; the search log stays off unless
+    requested.
+    """
+    params = params or {}
+    parameters = solver.parameters
+    parameters.num_workers = int(params.get("num_workers") or DEFAULT_NUM_WORKERS)
+    parameters.log_search_progress = bool(params.get("log_search_progress", False))
+    parameters.randomize_search = bool(randomize_search)
+    if params.get("linearization_level") is not None:
+        parameters.linearization_level = int(params["linearization_level"])
+    if params.get("cp_model_presolve") is not None:
+        parameters.cp_model_presolve = bool(params["cp_model_presolve"])
+    if params.get("symmetry_level") is not None:
+        parameters.symmetry_level = int(params["symmetry_level"])
+    if params.get("interleave_search") is not None:
+        parameters.interleave_search = bool(params["interleave_search"])
+    if params.get("search_branching"):
+        name = f"{str(params['search_branching']).upper()}_SEARCH"
+        parameters.search_branching = sat_parameters_pb2.SatParameters.SearchBranching.Value(name)
@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import itertools
+import logging
+import math
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+from ...config import settings
+from ...core.metrics import record_solver_queue, record_solver_rejection
+from ...domain.planner.solver_protocol import PlannerSolver, SolverInputs, SolverResult
+from .executor import SolverBusyError, SolverExecutor, get_solver_executor
+
+logger = logging.getLogger("stundenplan.solver")
+
+QUOTA_WINDOW_SECONDS = 3600.0
+
+
+class SolverQuotaError(SolverBusyError):
+    """The account used up its CPU-seconds quota of the current window."""
+
+
+@dataclass
+class _Ticket:
+    account_id: int
+    seq: int
+
+
+@dataclass
+class AccountSolverUsage:
+    running: int = 0
+    completed: int = 0
+    failed: int = 0
+    rejected: int = 0
+    quota_rejected: int = 0
+    cpu_seconds_total: float = 0.0
+    wall_seconds_total: float = 0.0
+    waiting: Deque[_Ticket] = field(default_factory=deque)
+    # (finished at, cpu seconds) of the solves inside the quota window
+    window: Deque[Tuple[float, float]] = field(default_factory=deque)
+
+
+class SolverScheduler:
+    """Fair admission of solves from several accounts to a ``SolverExecutor``.
+
+    Each account may run ``account_limit`` solves at a time. When a worker is
+    free, the waiting request of the account with the lowest weighted CPU usage
+    in the quota window goes next (weighted fair queuing; FIFO within an
+    account). Accounts over ``quota_seconds`` CPU seconds per window are
+    rejected with ``SolverQuotaError`` until enough usage has aged out.
+    """
+
+    def __init__(
+        self,
+        executor: SolverExecutor,
+        account_limit: int = 1,
+        quota_seconds: float = 0.0,
+        weights: Optional[Dict[int, float]] = None,
+        window_seconds: float = QUOTA_WINDOW_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.executor = executor
+        self.account_limit = max(1, account_limit)
+        self.quota_seconds = max(0.0, quota_seconds)
+        self.weights = dict(weights or {})
+        self.window_seconds = window_seconds
+        self.clock = clock
+        self._cond = threading.Condition()
+        self._seq = itertools.count()
+        self._accounts: Dict[int, AccountSolverUsage] = {}
+        self._running = 0
+
+    def _usage(self, account_id: int) -> AccountSolverUsage:
+        usage = self._accounts.get(account_id)
+        if usage is None:
+            usage = self._accounts[account_id] = AccountSolverUsage()
+        return usage
+
+    def _window_cpu(self, usage: AccountSolverUsage, now: float) -> float:
+        while usage.window and usage.window[0][0] <= now - self.window_seconds:
+            usage.window.popleft()
+        return sum(cpu for _, cpu in usage.window)
+
+    def _quota_retry_after(self, usage: AccountSolverUsage, now: float) -> Optional[int]:
+        if not self.quota_seconds:
+            return None
+        excess = self._window_cpu(usage, now) - self.quota_seconds
+        if excess < 0:
+            return None
+        for finished_at, cpu in usage.window:
+            excess -= cpu
+            if excess < 0:
+                return max(1, math.ceil(finished_at + self.window_seconds - now))
+        return 1
+
+    def _waiting_total(self) -> int:
+        return sum(len(usage.waiting) for usage in self._accounts.values())
+
+    def _publish_queue(self) -> None:
+        record_solver_queue(self._running, self._waiting_total())
+
+    def _next_ticket(self, now: float) -> Optional[_Ticket]:
+        if self._running >= self.executor.max_workers:
+            return None
+        best: Optional[Tuple[float, int, _Ticket]] = None
+        for account_id, usage in self._accounts.items():
+            if not usage.waiting or usage.running >= self.account_limit:
+                continue
+            weight = self.weights.get(account_id, 1.0) or 1.0
+            ticket = usage.waiting[0]
+            key = (self._window_cpu(usage, now) / weight, ticket.seq, ticket)
+            if best is None or key[:2] < best[:2]:
+                best = key
+        return best[2] if best else None
+
+    def run(self, account_id: int, solver: PlannerSolver, inputs: SolverInputs) -> SolverResult:
+        with self._cond:
+            now = self.clock()
+            usage = self._usage(account_id)
+            retry_after = self._quota_retry_after(usage, now)
+            if retry_after is not None:
+                usage.quota_rejected += 1
+                record_solver_rejection("quota")
+                logger.warning("Solver quota exceeded | account=%s retry_after=%ss", account_id, retry_after)
+                raise SolverQuotaError(retry_after)
+            if self._running + self._waiting_total() >= self.executor.capacity:
+                usage.rejected += 1
+                record_solver_rejection("busy")
+                raise SolverBusyError(self.executor.retry_after())
+            ticket = _Ticket(account_id=account_id, seq=next(self._seq))
+            usage.waiting.append(ticket)
+            self._publish_queue()
+            while self._next_ticket(self.clock()) is not ticket:
+                self._cond.wait()
+            usage.waiting.popleft()
+            usage.running += 1
+            self._running += 1
+            self._publish_queue()
+
+        started = time.monotonic()
+        result: Optional[SolverResult] = None
+        try:
+            result = self.executor.run(solver, inputs)
+            return result
+        finally:
+            wall_seconds = time.monotonic() - started
+            # Failed solves are charged their wall time; their CPU time is unknown
+            cpu_seconds = float(result.get("cpu_seconds") or 0.0) if result else wall_seconds
+            with self._cond:
+                usage.running -= 1
+                self._running -= 1
+                if result is None:
+                    usage.failed += 1
+                else:
+                    usage.completed += 1
+                usage.cpu_seconds_total += cpu_seconds
+                usage.wall_seconds_total += wall_seconds
+                usage.window.append((self.clock(), cpu_seconds))
+                self._publish_queue()
+                self._cond.notify_all()
+
+    def usage(self) -> List[Dict[str, object]]:
+        with self._cond:
+            now = self.clock()
+            return [
+                {
+                    "account_id": account_id,
+                    "running": usage.running,
+                    "queued": len(usage.waiting),
+                    "completed": usage.completed,
+                    "failed": usage.failed,
+                    "rejected": usage.rejected,
+                    "quota_rejected": usage.quota_rejected,
+                    "cpu_seconds_window": round(self._window_cpu(usage, now), 3),
+                    "cpu_seconds_total": round(usage.cpu_seconds_total, 3),
+                    "wall_seconds_total": round(usage.wall_seconds_total, 3),
+                    "weight": self.weights.get(account_id, 1.0),
+                }
+                for account_id, usage in sorted(self._accounts.items())
+            ]
+
+
+_scheduler: Optional[SolverScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_solver_scheduler() -> SolverScheduler:
+    """Process-wide scheduler in front of ``get_solver_executor()``."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = SolverScheduler(
+                get_solver_executor(),
+                account_limit=settings.solver_account_max_concurrent,
+                quota_seconds=settings.solver_cpu_quota_seconds_per_hour,
+                weights=settings.solver_account_weights,
+            )
+        return _scheduler
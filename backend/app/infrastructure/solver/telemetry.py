@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import json
+import logging
+import re
+import time
+from typing import Callable, List, Optional
+
+from ortools.sat.python import cp_model
+
+from ...config import settings
+
+solver_logger = logging.getLogger("stundenplan.solver")
+
+# Column order of the stored progress events
+PROGRESS_FIELDS = ("t", "objective", "bound", "gap")
+
+# e.g. "#3       0.15s best:28    next:[16,27]    max_lp_sym" or "#Bound   0.07s best:41    next:[16,40] ..."
+_PROGRESS_LINE = re.compile(r"^#(?:\d+|Bound)\s+[\d.]+s\s+best:(?P<best>\S+)\s+next:\[(?P<next>[^\]]*)\]")
+# end of presolve, e.g. "Starting search at 0.03s with 8 workers."
+_SEARCH_START_LINE = re.compile(r"^Starting search at (?P<seconds>[\d.]+)s")
+
+ProgressEvent = List[Optional[float]]  # [t, objective, bound, gap]
+
+
+def configure_solver_logging() -> None:
+    """Set the level of the ``stundenplan.solver`` logger from ``STUNDENPLAN_SOLVER_LOG_LEVEL``.
+
+    Runs at app startup and in every solver worker process; handlers come from
+    the server's logging configuration.
+    """
+    solver_logger.setLevel(settings.solver_log_level.upper())
+
+
+def _number(raw: str) -> Optional[float]:
+    try:
+        value = float(raw)
+    except ValueError:
+        return None
+    return value if value not in (float("inf"), float("-inf")) else None
+
+
+def gap(objective: Optional[float], bound: Optional[float]) -> Optional[float]:
+    """Relative gap between objective and bound; also used by the tuning reports."""
+    if objective is None or bound is None:
+        return None
+    return abs(objective - bound) / max(1.0, abs(objective))
+
+
+class SearchProgressRecorder:
+    """CP-SAT log callback that turns progress lines into sampled events.
+
+    Only ``#<n>`` (new solution) and ``#Bound`` lines are parsed. An event is
+    kept at most every ``interval`` seconds, the latest one is always kept; when
+    more than ``max_events`` collect, every second event is dropped and the
+    interval doubles. With ``forward`` all log lines also go to the solver
+    logger at DEBUG level. ``presolve_seconds`` sums the presolve time of all
+    ``Solve`` calls the recorder was attached to.
+    """
+
+    def __init__(
+        self,
+        interval: float = 0.5,
+        max_events: int = 200,
+        forward: bool = False,
+        clock: Callable[[], float] = time.perf_counter,
+    ) -> None:
+        self.interval = max(0.0, interval)
+        self.max_events = max_events  # 0: only forward the log
+        self.forward = forward and solver_logger.isEnabledFor(logging.DEBUG)
+        self.clock = clock
+        self.started = clock()
+        self._events: List[ProgressEvent] = []
+        self._pending: Optional[ProgressEvent] = None
+        self.presolve_seconds: Optional[float] = None
+
+    def __call__(self, line: str) -> None:
+        if self.forward:
+            solver_logger.debug("cp-sat: %s", line)
+        if line.startswith("Starting search"):
+            search_start = _SEARCH_START_LINE.match(line)
+            if search_start is not None:
+                self.presolve_seconds = (self.presolve_seconds or 0.0) + float(search_start.group("seconds"))
+            return
+        if self.max_events <= 0 or not line.startswith("#"):
+            return
+        match = _PROGRESS_LINE.match(line)
+        if match is None:
+            return
+        objective = _number(match.group("best"))
+        lower, _, _ = match.group("next").partition(",")
+        # "next:[]": nothing better left, the incumbent is optimal
+        bound = _number(lower) if lower else objective
+        self._add([round(self.clock() - self.started, 3), objective, bound, gap(objective, bound)])
+
+    def _add(self, event: ProgressEvent) -> None:
+        if event[3] is not None:
+            event[3] = round(event[3], 4)
+        if self._events and event[0] - self._events[-1][0] < self.interval:
+            self._pending = event
+            return
+        self._events.append(event)
+        self._pending = None
+        if len(self._events) > max(2, self.max_events):
+            self._events = self._events[::2]
+            self.interval = max(self.interval * 2, 0.001)
+
+    def events(self) -> List[ProgressEvent]:
+        """Sampled events including the latest progress line."""
+        if self._pending is not None:
+            return [*self._events, self._pending]
+        return list(self._events)
+
+
+def encode_progress(events: List[ProgressEvent]) -> Optional[str]:
+    """Compact JSON of ``events`` as stored in ``Plan.solver_progress``."""
+    if not events:
+        return None
+    return json.dumps({"fields": PROGRESS_FIELDS, "events": events}, separators=(",", ":"))
+
+
+def attach_progress_recorder(solver: cp_model.CpSolver, search_log: bool = False) -> Optional[SearchProgressRecorder]:
+    """Route the CP-SAT log of ``solver`` through a ``SearchProgressRecorder``.
+
+    CP-SAT never writes to stdout. Without progress sampling
+    (``STUNDENPLAN_SOLVER_PROGRESS_MAX_EVENTS=0``) and without a requested
+    search log the log stays off entirely.
+    """
+    solver.parameters.log_to_stdout = False
+    if settings.solver_progress_max_events <= 0 and not search_log:
+        solver.parameters.log_search_progress = False
+        return None
+    recorder = SearchProgressRecorder(
+        interval=settings.solver_progress_interval,
+        max_events=settings.solver_progress_max_events,
+        forward=search_log,
+    )
+    solver.parameters.log_search_progress = True
+    solver.log_callback = recorder
+    return recorder
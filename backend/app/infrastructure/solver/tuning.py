@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import itertools
+import math
+import multiprocessing
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence
+
+from ortools.sat.python import cp_model
+
+from ...domain.planner.solver_presets import resolve_generate_params, solver_param_inputs
+from ...domain.planner.solver_protocol import PlannerSolver, SolverInputs
+from ...schemas import GenerateParams
+from .ortools_solver import OrToolsPlannerSolver
+from .telemetry import gap
+
+TUNING_STRATEGIES = ("grid", "halving")
+
+STATUS_NAMES = {
+    cp_model.OPTIMAL: "OPTIMAL",
+    cp_model.FEASIBLE: "FEASIBLE",
+    cp_model.INFEASIBLE: "INFEASIBLE",
+    cp_model.MODEL_INVALID: "MODEL_INVALID",
+    cp_model.UNKNOWN: "UNKNOWN",
+}
+
+# SolverInputs keys that depend on GenerateParams and are replaced per candidate
+_PARAM_INPUT_KEYS = set(solver_param_inputs(GenerateParams()))
+
+
+def save_tuning_inputs(inputs: SolverInputs, path: Path) -> None:
+    """Store the data part of ``inputs`` (requirements, basis context, rules) for tuning runs."""
+    data = {key: value for key, value in inputs.items() if key not in _PARAM_INPUT_KEYS}
+    with Path(path).open("wb") as fh:
+        pickle.dump(data, fh, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def load_tuning_inputs(path: Path) -> SolverInputs:
+    with Path(path).open("rb") as fh:
+        return pickle.load(fh)
+
+
+def expand_grid(grid: Mapping[str, Sequence[Any]]) -> List[Dict[str, Any]]:
+    """Cartesian product of ``grid`` as GenerateParams overrides.
+
+    Keys are GenerateParams fields; ``solver.<name>`` addresses the CP-SAT
+    block, e.g. ``{"time_per_attempt": [2, 5], "solver.num_workers": [4, 8]}``.
+    """
+    keys = list(grid)
+    candidates: List[Dict[str, Any]] = []
+    for values in itertools.product(*(grid[key] for key in keys)):
+        overrides: Dict[str, Any] = {}
+        for key, value in zip(keys, values):
+            if key.startswith("solver."):
+                overrides.setdefault("solver", {})[key.split(".", 1)[1]] = value
+            else:
+                overrides[key] = value
+        candidates.append(overrides)
+    return candidates or [{}]
+
+
+def evaluate_candidate(
+    inputs: SolverInputs,
+    params: Dict[str, Any],
+    solver: Optional[PlannerSolver] = None,
+) -> Dict[str, Any]:
+    """Solve ``inputs`` with resolved ``params`` and report the search metrics.
+
+    Module level so that it runs in the worker processes of ``SolverTuner``.
+    """
+    generate_params = GenerateParams.model_validate(params)
+    output = (solver or OrToolsPlannerSolver()).solve({**inputs, **solver_param_inputs(generate_params)})
+    stats = output.get("stats") or {}
+    status = output["status"]
+    feasible = status in (cp_model.OPTIMAL, cp_model.FEASIBLE)
+    objective = stats.get("objective") if feasible else None
+    return {
+        "status": STATUS_NAMES.get(status, str(status)),
+        "feasible": feasible,
+        "first_feasible_seconds": stats.get("first_solution_seconds"),
+        "objective": objective,
+        "best_bound": stats.get("best_bound") if feasible else None,
+        "gap": gap(objective, stats.get("best_bound")),
+        "wall_seconds": stats.get("wall_seconds"),
+        "attempts": stats.get("attempts"),
+    }
+
+
+def _rank_key(result: Dict[str, Any]):
+    metrics = result["metrics"]
+    return (
+        not metrics["feasible"],
+        metrics["objective"] if metrics["objective"] is not None else math.inf,
+        metrics["first_feasible_seconds"] if metrics["first_feasible_seconds"] is not None else math.inf,
+        metrics["wall_seconds"] or 0.0,
+    )
+
+
+class SolverTuner:
+    """Grid or successive-halving search over GenerateParams for fixed inputs.
+
+    ``grid`` evaluates every candidate with its full time budget. ``halving``
+    starts all candidates with ``1 / eta**(rounds - 1)`` of the budget, keeps
+    the best ``1 / eta`` of each round and multiplies the budget by ``eta``
+    until one round runs at full budget. Candidates of a round are solved in
+    parallel worker processes (``processes``; 0 runs them inline).
+    """
+
+    def __init__(
+        self,
+        inputs: SolverInputs,
+        base_params: Optional[GenerateParams] = None,
+        presets: Optional[Mapping[str, Dict[str, Any]]] = None,
+        processes: int = 1,
+        solver: Optional[PlannerSolver] = None,
+    ) -> None:
+        self.inputs = inputs
+        self.base_params = base_params or GenerateParams()
+        self.presets = presets
+        self.processes = max(0, processes)
+        self.solver = solver
+        self.history: List[Dict[str, Any]] = []  # every evaluation of the last run
+
+    def resolve(self, overrides: Dict[str, Any], budget: float = 1.0) -> GenerateParams:
+        values = self.base_params.model_dump(exclude_unset=True)
+        solver_values = {**values.pop("solver", {}), **overrides.get("solver", {})}
+        values.update({key: value for key, value in overrides.items() if key != "solver"})
+        params = resolve_generate_params(GenerateParams(**values, solver=solver_values), presets=self.presets)
+        if budget < 1.0:
+            params = params.model_copy(update={"time_per_attempt": max(0.1, params.time_per_attempt * budget)})
+        return params
+
+    def _evaluate(self, jobs: List[GenerateParams]) -> List[Dict[str, Any]]:
+        payloads = [params.model_dump() for params in jobs]
+        if self.processes == 0:
+            return [evaluate_candidate(self.inputs, payload, self.solver) for payload in payloads]
+        with ProcessPoolExecutor(
+            max_workers=min(self.processes, len(jobs)),
+            mp_context=multiprocessing.get_context("spawn"),
+        ) as pool:
+            futures = [pool.submit(evaluate_candidate, self.inputs, payload, self.solver) for payload in payloads]
+            return [future.result() for future in futures]
+
+    def run(
+        self,
+        candidates: Iterable[Dict[str, Any]],
+        strategy: str = "grid",
+        eta: int = 3,
+        rounds: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """Evaluate ``candidates`` (GenerateParams overrides); best result first."""
+        if strategy not in TUNING_STRATEGIES:
+            raise ValueError(f"Unbekannte Strategie: {strategy}")
+        entries = [{"name": f"c{idx:02d}", "overrides": dict(overrides)} for idx, overrides in enumerate(candidates)]
+        eta = max(2, int(eta))
+        if strategy == "grid":
+            rounds = 1
+        elif rounds is None:
+            rounds = max(1, math.ceil(math.log(max(1, len(entries)), eta)) + 1)
+
+        survivors = entries
+        results: List[Dict[str, Any]] = []
+        self.history = []
+        for round_idx in range(rounds):
+            budget = float(eta) ** (round_idx - rounds + 1)
+            jobs = [self.resolve(entry["overrides"], budget) for entry in survivors]
+            metrics = self._evaluate(jobs)
+            results = sorted(
+                (
+                    {
+                        **entry,
+                        "round": round_idx,
+                        "budget": budget,
+                        # full-budget params, i.e. what a saved preset would run with
+                        "params": self.resolve(entry["overrides"]).model_dump(),
+                        "metrics": result,
+                    }
+                    for entry, result in zip(survivors, metrics)
+                ),
+                key=_rank_key,
+            )
+            self.history.extend(results)
+            if len(results) == 1:
+                break
+            survivors = results[: max(1, math.ceil(len(results) / eta))]
+        return results
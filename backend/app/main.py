@@ -4,7 +4,12 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 
+from .config import settings
+from .core.metrics import MetricsMiddleware, install_query_counter, mark_worker_dead
+from .core.tracing import TraceFileSink, TracingMiddleware, install_trace_query_counter
 from .database import create_db_and_tables
+from .infrastructure.solver.executor import shutdown_solver_executor
+from .infrastructure.solver.telemetry import configure_solver_logging
 from .routers import (
     plans,
     masterdata,
@@ -16,6 +21,7 @@ from .routers import (
     versions,
     auth,
     admin,
+    metrics,
 )
 from .routers import rooms, basisplan, planning_periods, school
 
@@ -25,11 +31,13 @@ app = FastAPI(title="Stundenplan API", version="0.1.0")
 
 @app.on_event("startup")
 def on_startup() -> None:
+    configure_solver_logging()
     create_db_and_tables()
     # Seed default RuleProfile if none exists
     from sqlmodel import Session, select
     from .database import engine
     from .models import RuleProfile
+    from .domain.plans.schema import ensure_rule_profile_columns
     from .domain.accounts.service import (
         ensure_default_account,
         ensure_default_admin,
@@ -37,6 +45,7 @@ def on_startup() -> None:
     )
 
     with Session(engine) as session:
+        ensure_rule_profile_columns(session)
         account = ensure_default_account(session)
         ensure_default_admin(session, account)
         ensure_default_planning_period(session, account)
@@ -47,6 +56,12 @@ def on_startup() -> None:
             session.commit()
 
 
+@app.on_event("shutdown")
+def on_shutdown() -> None:
+    shutdown_solver_executor()
+    mark_worker_dead()
+
+
 @app.get("/")
 def root():
     return {"ok": True, "service": "stundenplan", "routes": ["/plans/generate"]}
@@ -67,6 +82,18 @@ app.include_router(school.router)
 app.include_router(auth.router)
 app.include_router(admin.router)
 app.include_router(admin.account_admin_router)
+if settings.metrics_enabled:
+    install_query_counter()
+    app.include_router(metrics.router)
+    app.add_middleware(MetricsMiddleware)
+if settings.tracing_enabled:
+    install_trace_query_counter()
+    app.add_middleware(
+        TracingMiddleware,
+        sink=TraceFileSink(settings.tracing_dir) if settings.tracing_dir else None,
+        slow_ms=settings.tracing_slow_request_ms,
+        max_spans=settings.tracing_server_timing_max_spans,
+    )
 
 # Dev CORS: erlaubt alles für lokale Tests / statische Seite
 app.add_middleware(
@@ -75,6 +102,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Retry-After", "Server-Timing"],
 )
 
 # Statische Frontend-Dateien bereitstellen
@@ -62,6 +62,14 @@ class AccountUser(SQLModel, table=True):
     created_at: datetime = Field(default_factory=_utc_now)
 
 
+class EntityRevision(SQLModel, table=True):
+    """Per-account change counter of a master data table; source of the list ETags."""
+    account_id: int = Field(foreign_key="account.id", primary_key=True)
+    entity: str = Field(primary_key=True)  # table name, e.g. "teacher"
+    revision: int = Field(default=0)
+    updated_at: datetime = Field(default_factory=_utc_now)
+
+
 class PlanningPeriod(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     account_id: int = Field(foreign_key="account.id", index=True, default=1)
@@ -122,6 +130,14 @@ class RequirementParticipationEnum(str, Enum):
 
 
 class Requirement(SQLModel, table=True):
+    __table_args__ = (
+        sa.Index("ix_requirement_scope", "account_id", "planning_period_id"),
+        sa.Index("ix_requirement_scope_class", "account_id", "planning_period_id", "class_id"),
+        sa.Index("ix_requirement_scope_teacher", "account_id", "planning_period_id", "teacher_id"),
+        sa.Index("ix_requirement_scope_subject", "account_id", "planning_period_id", "subject_id"),
+        sa.Index("ix_requirement_scope_version", "account_id", "planning_period_id", "version_id"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     account_id: int = Field(foreign_key="account.id", index=True, default=1)
     class_id: int = Field(foreign_key="class.id")
@@ -143,6 +159,11 @@ class ClassSubject(SQLModel, table=True):
     """Stundentafel: Zuordnung Klasse ←→ Fach mit Wochenstunden.
     Lehrkraft ist hier nicht enthalten (nur Bedarf/Struktur).
     """
+    __table_args__ = (
+        sa.Index("ix_classsubject_scope_class", "account_id", "planning_period_id", "class_id"),
+        sa.Index("ix_classsubject_scope_subject", "account_id", "planning_period_id", "subject_id"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     account_id: int = Field(foreign_key="account.id", index=True, default=1)
     planning_period_id: Optional[int] = Field(default=None, foreign_key="planningperiod.id", index=True)
@@ -178,8 +199,27 @@ class RuleProfile(SQLModel, table=True):
     W_EVEN_DIST: int = 1
     W_EINZEL_KANN: int = 5
 
+    # Solver-Preset (fast_draft, balanced, thorough oder ein SolverPreset); None = balanced
+    solver_preset: Optional[str] = None
+
+
+class SolverPreset(SQLModel, table=True):
+    """Named GenerateParams of an account, e.g. the winner of a tuning run."""
+
+    __table_args__ = (sa.UniqueConstraint("account_id", "name"),)
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    account_id: int = Field(foreign_key="account.id", index=True)
+    name: str
+    params: str = Field(sa_column=sa.Column(sa.Text, nullable=False))  # JSON, GenerateParams without preset
+    metrics: Optional[str] = Field(default=None, sa_column=sa.Column(sa.Text))  # JSON, tuning results
+    created_at: datetime = Field(default_factory=_utc_now)
+    updated_at: datetime = Field(default_factory=_utc_now)
+
 
 class Plan(SQLModel, table=True):
+    __table_args__ = (sa.Index("ix_plan_scope_created", "account_id", "planning_period_id", "created_at"),)
+
     id: Optional[int] = Field(default=None, primary_key=True)
     account_id: int = Field(foreign_key="account.id", index=True, default=1)
     planning_period_id: Optional[int] = Field(default=None, foreign_key="planningperiod.id", index=True)
@@ -196,6 +236,8 @@ class Plan(SQLModel, table=True):
     rules_snapshot: Optional[str] = Field(default=None, sa_column=sa.Column(sa.Text))
     rule_keys_active: Optional[str] = Field(default=None, sa_column=sa.Column(sa.Text))
     params_used: Optional[str] = Field(default=None, sa_column=sa.Column(sa.Text))
+    # JSON {"fields": [...], "events": [[t, objective, bound, gap], ...]} of the solve
+    solver_progress: Optional[str] = Field(default=None, sa_column=sa.Column(sa.Text))
 
 
 class PlanSlot(SQLModel, table=True):
@@ -211,7 +253,27 @@ class PlanSlot(SQLModel, table=True):
     room_id: Optional[int] = Field(default=None, foreign_key="room.id")
 
 
+class PlanMatrix(SQLModel, table=True):
+    """Packed per-plan timetable (class × day × slot → subject/teacher/room ids).
+
+    Written alongside the PlanSlot rows, which stay the materialized view for SQL consumers.
+    """
+    plan_id: int = Field(foreign_key="plan.id", primary_key=True)
+    account_id: int = Field(foreign_key="account.id", index=True, default=1)
+    planning_period_id: Optional[int] = Field(default=None, foreign_key="planningperiod.id", index=True)
+    format_version: int = Field(default=1)
+    class_ids: str = Field(sa_column=sa.Column(sa.Text, nullable=False))  # JSON list, axis 0
+    days: str = Field(sa_column=sa.Column(sa.Text, nullable=False))  # JSON list, axis 1
+    slots_per_day: int
+    data: bytes = Field(sa_column=sa.Column(sa.LargeBinary, nullable=False))
+    updated_at: datetime = Field(default_factory=_utc_now)
+
+
 class DistributionVersion(SQLModel, table=True):
+    __table_args__ = (
+        sa.Index("ix_distributionversion_scope_created", "account_id", "planning_period_id", "created_at"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     account_id: int = Field(foreign_key="account.id", index=True, default=1)
     planning_period_id: Optional[int] = Field(default=None, foreign_key="planningperiod.id", index=True)
@@ -228,9 +290,60 @@ class BasisPlan(SQLModel, table=True):
     name: str = Field(default="Basisplan")
     # JSON payload as text (per-class rules, allowed slots, windows, fixed entries)
     data: Optional[str] = Field(default=None)
+    # 1: ``data`` holds the whole document; 2: availability, fixed slots and
+    # flexible groups live in the basisplan* tables and ``data`` keeps the rest
+    storage_version: int = Field(default=1)
     updated_at: datetime = Field(default_factory=_utc_now)
 
 
+class BasisPlanAvailability(SQLModel, table=True):
+    """Allowed slots of one room, class or window on one day ("1"/"0" per slot)."""
+    __table_args__ = (sa.UniqueConstraint("basis_plan_id", "section", "owner_key", "day"),)
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    basis_plan_id: int = Field(foreign_key="basisplan.id", index=True)
+    section: str  # rooms | classes | windows
+    owner_key: str
+    day: str
+    slots: str = Field(default="")
+
+
+class BasisPlanFixedSlot(SQLModel, table=True):
+    __table_args__ = (sa.Index("ix_basisplanfixedslot_cell", "basis_plan_id", "class_key", "day", "slot"),)
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    basis_plan_id: int = Field(foreign_key="basisplan.id", index=True)
+    class_key: str
+    position: int = Field(default=0)
+    day: Optional[str] = Field(default=None)
+    slot: Optional[int] = Field(default=None)
+    subject_id: Optional[int] = Field(default=None)
+    # Remaining keys of the JSON entry (or the whole entry if it is not an object)
+    extra: Optional[str] = Field(default=None)
+
+
+class BasisPlanFlexibleGroup(SQLModel, table=True):
+    __table_args__ = (sa.Index("ix_basisplanflexiblegroup_key", "basis_plan_id", "class_key", "group_key"),)
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    basis_plan_id: int = Field(foreign_key="basisplan.id", index=True)
+    class_key: str
+    position: int = Field(default=0)
+    group_key: Optional[str] = Field(default=None)  # "id" of the JSON group, e.g. "flex-3"
+    subject_id: Optional[int] = Field(default=None)
+    has_slots: bool = Field(default=True)
+    extra: Optional[str] = Field(default=None)
+
+
+class BasisPlanFlexibleSlot(SQLModel, table=True):
+    id: Optional[int] = Field(default=None, primary_key=True)
+    group_id: int = Field(foreign_key="basisplanflexiblegroup.id", index=True)
+    position: int = Field(default=0)
+    day: Optional[str] = Field(default=None)
+    slot: Optional[int] = Field(default=None)
+    extra: Optional[str] = Field(default=None)
+
+
 class Room(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     account_id: int = Field(foreign_key="account.id", index=True, default=1)
@@ -14,7 +14,9 @@ from ..schemas import (
     AccountUserCreate,
     AdminUserCreate,
     AdminUserOut,
+    SolverUsageOut,
 )
+from ..infrastructure.solver.scheduler import SolverScheduler, get_solver_scheduler
 from ..domain.accounts.service import (
     ensure_account_role,
     ensure_pool_teacher,
@@ -160,6 +162,24 @@ def create_account(
     )
 
 
+@router.get('/solver/usage', response_model=SolverUsageOut)
+def solver_usage(
+    session: Session = Depends(get_session),
+    scheduler: SolverScheduler = Depends(get_solver_scheduler),
+) -> SolverUsageOut:
+    usage = scheduler.usage()
+    names = {}
+    if usage:
+        account_ids = [entry['account_id'] for entry in usage]
+        names = dict(session.exec(select(Account.id, Account.name).where(Account.id.in_(account_ids))).all())
+    return SolverUsageOut(
+        **scheduler.executor.stats(),
+        account_max_concurrent=scheduler.account_limit,
+        cpu_quota_seconds_per_hour=scheduler.quota_seconds,
+        accounts=[{**entry, 'account_name': names.get(entry['account_id'])} for entry in usage],
+    )
+
+
 def get_account_for_owner(
     account_id: Optional[int] = Query(None),
     session: Session = Depends(get_session),
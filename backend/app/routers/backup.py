@@ -2,10 +2,14 @@ from __future__ import annotations
 
 import json
 from datetime import datetime, timezone
-from typing import Dict, List, Optional
-
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import delete
+from itertools import groupby
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import delete, insert, update
 from sqlmodel import Session, select
 
 from ..core.security import require_active_user
@@ -25,6 +29,7 @@ from ..models import (
     RequirementConfigSourceEnum,
     BasisPlan,
     Plan,
+    PlanMatrix,
     PlanSlot,
 )
 from ..schemas import (
@@ -45,36 +50,82 @@ from ..schemas import (
     PlanSlotExport,
     BasisPlanData,
 )
-from ..domain.accounts.service import resolve_account
-from ..utils import ensure_teacher_color_column, next_teacher_color, normalize_hex_color
+from ..domain.accounts.service import resolve_account, resolve_planning_period
+from ..domain.planner.basis_parser import invalidate_basis_plan_cache
+from ..domain.planner.basis_store import load_basis_document, save_basis_document
+from ..domain.plans.matrix import MATRIX_FORMAT_VERSION, decode_matrix, unpack_slot_rows
+from ..domain.plans.persistence import persist_plan_with_slots
+from ..services.revisions import bump_all_revisions
+from ..utils import ensure_teacher_color_column, normalize_hex_color, pick_teacher_color
 
 
 router = APIRouter(prefix="/backup", tags=["backup"], dependencies=[Depends(require_active_user)])
 
 
-@router.get("/export", response_model=BackupPayload)
-def export_data(
-    account_id: Optional[int] = Query(None),
-    session: Session = Depends(get_session),
-) -> BackupPayload:
-    ensure_teacher_color_column(session)
-    account = resolve_account(session, account_id)
-    teachers = session.exec(select(Teacher).where(Teacher.account_id == account.id)).all()
-    classes = session.exec(select(Class).where(Class.account_id == account.id)).all()
-    subjects = session.exec(select(Subject).where(Subject.account_id == account.id)).all()
-    rooms = session.exec(select(Room).where(Room.account_id == account.id)).all()
-    curriculum = session.exec(select(ClassSubject).where(ClassSubject.account_id == account.id)).all()
-    requirements = session.exec(select(Requirement).where(Requirement.account_id == account.id)).all()
-    rule_profiles = session.exec(select(RuleProfile).where(RuleProfile.account_id == account.id)).all()
-
-    # Lookups
-    teacher_by_id = {t.id: t for t in teachers}
-    class_by_id = {c.id: c for c in classes}
-    subject_by_id = {s.id: s for s in subjects}
-    room_by_id = {r.id: r for r in rooms}
-
-    out_teachers: List[BackupTeacher] = [
-        BackupTeacher(
+STREAM_BATCH_SIZE = 500
+# Plan records carry all of their slots, so they are applied in smaller batches.
+STREAM_PLAN_BATCH_SIZE = 20
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+BACKUP_RECORD_FIELDS = {
+    "teacher": "teachers",
+    "room": "rooms",
+    "class": "classes",
+    "subject": "subjects",
+    "curriculum": "curriculum",
+    "requirement": "requirements",
+    "rule_profile": "rule_profiles",
+}
+
+
+def _stream(session: Session, statement):
+    """Execute ``statement`` with a server-side cursor fetching STREAM_BATCH_SIZE rows at a time."""
+    return session.exec(statement.execution_options(yield_per=STREAM_BATCH_SIZE))
+
+
+def _ndjson_line(record_type: str, item: object) -> bytes:
+    data = item.model_dump(mode="json") if isinstance(item, BaseModel) else item
+    return (json.dumps({"type": record_type, "data": data}, ensure_ascii=False, default=str) + "\n").encode("utf-8")
+
+
+def _ndjson_response(
+    session: Session,
+    records: Callable[[Session], Iterator[Tuple[str, object]]],
+    filename: str,
+) -> StreamingResponse:
+    """Stream ``records`` as newline-delimited JSON (``{"type": ..., "data": ...}`` per line).
+
+    The generator runs on its own session because the request session is
+    released before the body is sent. Errors raised after the first line can
+    no longer change the status code and are emitted as an ``error`` record.
+    """
+    bind = session.get_bind()
+
+    def body() -> Iterator[bytes]:
+        with Session(bind) as stream_session:
+            try:
+                for record_type, item in records(stream_session):
+                    yield _ndjson_line(record_type, item)
+            except HTTPException as exc:
+                yield _ndjson_line("error", {"status_code": exc.status_code, "detail": exc.detail})
+
+    return StreamingResponse(
+        body(),
+        media_type=NDJSON_MEDIA_TYPE,
+        headers={"Content-Disposition": f'attachment; filename="{filename}.ndjson"'},
+    )
+
+
+def _iter_backup_records(session: Session, account_id: int) -> Iterator[Tuple[str, object]]:
+    """Yield ``(record type, item)`` pairs of an account backup, one query per entity type.
+
+    Records come in import dependency order; the name maps needed for references
+    are filled while the referenced entity type is streamed.
+    """
+    teacher_labels: Dict[int, str] = {}
+    for t in _stream(session, select(Teacher).where(Teacher.account_id == account_id).order_by(Teacher.id)):
+        teacher_labels[t.id] = t.kuerzel or t.name
+        yield "teacher", BackupTeacher(
             name=t.name,
             kuerzel=t.kuerzel,
             color=t.color,
@@ -88,87 +139,98 @@ def export_data(
             work_do=t.work_do,
             work_fr=t.work_fr,
         )
-        for t in teachers
-    ]
-
-    out_classes: List[BackupClass] = [
-        BackupClass(
-            name=c.name,
-            homeroom_teacher=(teacher_by_id[c.homeroom_teacher_id].kuerzel if (c.homeroom_teacher_id and teacher_by_id.get(c.homeroom_teacher_id) and teacher_by_id[c.homeroom_teacher_id].kuerzel)
-                              else (teacher_by_id[c.homeroom_teacher_id].name if c.homeroom_teacher_id and teacher_by_id.get(c.homeroom_teacher_id) else None))
-        )
-        for c in classes
-    ]
 
-    out_rooms: List[BackupRoom] = [
-        BackupRoom(
+    room_names: Dict[int, str] = {}
+    for r in _stream(session, select(Room).where(Room.account_id == account_id).order_by(Room.id)):
+        room_names[r.id] = r.name
+        yield "room", BackupRoom(
             name=r.name,
             type=r.type,
             capacity=r.capacity,
             is_classroom=r.is_classroom,
         )
-        for r in rooms
-    ]
 
-    out_subjects: List[BackupSubject] = [
-        BackupSubject(
+    class_names: Dict[int, str] = {}
+    for c in _stream(session, select(Class).where(Class.account_id == account_id).order_by(Class.id)):
+        class_names[c.id] = c.name
+        yield "class", BackupClass(
+            name=c.name,
+            homeroom_teacher=teacher_labels.get(c.homeroom_teacher_id) if c.homeroom_teacher_id else None,
+        )
+
+    # Aliases may point at any subject, so the (small) subject list is read up front.
+    subjects = session.exec(select(Subject).where(Subject.account_id == account_id).order_by(Subject.id)).all()
+    subject_names: Dict[int, str] = {s.id: s.name for s in subjects}
+    for s in subjects:
+        yield "subject", BackupSubject(
             name=s.name,
             kuerzel=s.kuerzel,
             color=s.color,
             default_doppelstunde=(s.default_doppelstunde.value if s.default_doppelstunde else None),
             default_nachmittag=(s.default_nachmittag.value if s.default_nachmittag else None),
-            required_room=room_by_id[s.required_room_id].name if (s.required_room_id and room_by_id.get(s.required_room_id)) else None,
+            required_room=room_names.get(s.required_room_id) if s.required_room_id else None,
             is_bandfach=s.is_bandfach,
             is_ag_foerder=s.is_ag_foerder,
-            alias_subject=subject_by_id[s.alias_subject_id].name if (s.alias_subject_id and subject_by_id.get(s.alias_subject_id)) else None,
+            alias_subject=subject_names.get(s.alias_subject_id) if s.alias_subject_id else None,
         )
-        for s in subjects
-    ]
 
-    out_curriculum: List[BackupCurriculumItem] = [
-        BackupCurriculumItem(
-            class_name=class_by_id[cs.class_id].name if class_by_id.get(cs.class_id) else str(cs.class_id),
-            subject_name=subject_by_id[cs.subject_id].name if subject_by_id.get(cs.subject_id) else str(cs.subject_id),
+    for cs in _stream(session, select(ClassSubject).where(ClassSubject.account_id == account_id).order_by(ClassSubject.id)):
+        yield "curriculum", BackupCurriculumItem(
+            class_name=class_names.get(cs.class_id, str(cs.class_id)),
+            subject_name=subject_names.get(cs.subject_id, str(cs.subject_id)),
             wochenstunden=cs.wochenstunden,
             participation=cs.participation.value if getattr(cs, "participation", None) else None,
             doppelstunde=cs.doppelstunde.value if getattr(cs, "doppelstunde", None) else None,
             nachmittag=cs.nachmittag.value if getattr(cs, "nachmittag", None) else None,
         )
-        for cs in curriculum
-    ]
-
-    out_requirements: List[BackupRequirementItem] = [
-        BackupRequirementItem(
-            class_name=class_by_id[r.class_id].name if class_by_id.get(r.class_id) else str(r.class_id),
-            subject_name=subject_by_id[r.subject_id].name if subject_by_id.get(r.subject_id) else str(r.subject_id),
-            teacher_name=teacher_by_id[r.teacher_id].kuerzel or teacher_by_id[r.teacher_id].name if teacher_by_id.get(r.teacher_id) else str(r.teacher_id),
+
+    for r in _stream(session, select(Requirement).where(Requirement.account_id == account_id).order_by(Requirement.id)):
+        yield "requirement", BackupRequirementItem(
+            class_name=class_names.get(r.class_id, str(r.class_id)),
+            subject_name=subject_names.get(r.subject_id, str(r.subject_id)),
+            teacher_name=teacher_labels.get(r.teacher_id) or str(r.teacher_id),
             wochenstunden=r.wochenstunden,
             doppelstunde=r.doppelstunde.value,
             nachmittag=r.nachmittag.value,
             participation=r.participation.value if r.participation else None,
-            config_source=(
-                r.config_source.value
-                if isinstance(r.config_source, RequirementConfigSourceEnum)
-                else (r.config_source if isinstance(r.config_source, str) else None)
-            ),
+            config_source=_config_source_value(r.config_source),
         )
-        for r in requirements
-    ]
 
     # Rule profiles (dump raw dicts)
-    rp_dicts = [rp.dict() for rp in rule_profiles]
-    for rp in rp_dicts:
-        rp.pop("id", None)
-
-    return BackupPayload(
-        teachers=out_teachers,
-        classes=out_classes,
-        subjects=out_subjects,
-        rooms=out_rooms,
-        curriculum=out_curriculum,
-        requirements=out_requirements,
-        rule_profiles=rp_dicts,
-    )
+    for rp in _stream(session, select(RuleProfile).where(RuleProfile.account_id == account_id).order_by(RuleProfile.id)):
+        data = rp.model_dump()
+        data.pop("id", None)
+        yield "rule_profile", data
+
+
+def _config_source_value(value) -> Optional[str]:
+    if isinstance(value, RequirementConfigSourceEnum):
+        return value.value
+    return value if isinstance(value, str) else None
+
+
+@router.get("/export", response_model=BackupPayload)
+def export_data(
+    account_id: Optional[int] = Query(None),
+    session: Session = Depends(get_session),
+) -> BackupPayload:
+    ensure_teacher_color_column(session)
+    account = resolve_account(session, account_id)
+    collected: Dict[str, list] = {field: [] for field in BACKUP_RECORD_FIELDS.values()}
+    for record_type, item in _iter_backup_records(session, account.id):
+        collected[BACKUP_RECORD_FIELDS[record_type]].append(item)
+    return BackupPayload(**collected)
+
+
+@router.get("/export/stream")
+def export_data_stream(
+    account_id: Optional[int] = Query(None),
+    session: Session = Depends(get_session),
+) -> StreamingResponse:
+    """Account backup as NDJSON; the counterpart of ``POST /backup/import/stream``."""
+    ensure_teacher_color_column(session)
+    target_account_id = resolve_account(session, account_id).id
+    return _ndjson_response(session, lambda s: _iter_backup_records(s, target_account_id), "backup")
 
 
 @router.get("/export/setup", response_model=SetupExport)
@@ -214,292 +276,485 @@ def import_data(
 ):
     ensure_teacher_color_column(session)
     account = resolve_account(session, account_id)
-    # Optionally clear tables (in dependency order)
-    if replace:
-        session.exec(delete(Requirement).where(Requirement.account_id == account.id))
-        session.exec(delete(ClassSubject).where(ClassSubject.account_id == account.id))
-        session.exec(delete(Subject).where(Subject.account_id == account.id))
-        session.exec(delete(Room).where(Room.account_id == account.id))
-        session.exec(delete(Class).where(Class.account_id == account.id))
-        session.exec(delete(Teacher).where(Teacher.account_id == account.id))
-        session.exec(delete(RuleProfile).where(RuleProfile.account_id == account.id))
+    # All entities are prefetched once, changes are written with bulk statements
+    # and committed together; any validation error rolls the whole import back.
+    try:
+        if replace:
+            _clear_masterdata(session, account.id)
+
+        _import_teachers(session, account.id, payload.teachers or [])
+        teacher_ids = _teacher_id_lookup(session, account.id)
+        _import_rooms(session, account.id, payload.rooms or [])
+        class_ids = _import_classes(session, account.id, payload.classes or [], teacher_ids).ids("name")
+        subject_ids = _import_subjects(session, account.id, payload.subjects or []).ids("name")
+        _apply_subject_aliases(session, account.id, {bs.name: bs.alias_subject for bs in payload.subjects or []})
+        _import_curriculum(session, account.id, payload.curriculum or [], class_ids, subject_ids)
+        _import_requirements(
+            session, account.id, payload.requirements or [], class_ids, subject_ids, teacher_ids
+        )
+        _import_rule_profiles(session, account.id, payload.rule_profiles or [])
+        bump_all_revisions(session, account.id)
         session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    # Bulk statements bypass the identity map
+    session.expire_all()
+    return {"ok": True}
 
-    # Helper: get-or-create by unique keys
-    def upsert_teacher(bt: BackupTeacher) -> Teacher:
-        t = None
-        if bt.kuerzel:
-            t = session.exec(
-                select(Teacher).where(Teacher.account_id == account.id, Teacher.kuerzel == bt.kuerzel)
-            ).first()
-        if not t and bt.name:
-            t = session.exec(
-                select(Teacher).where(Teacher.account_id == account.id, Teacher.name == bt.name)
-            ).first()
-        if not t:
-            color = normalize_hex_color(bt.color) or next_teacher_color(session, account.id)
-            t = Teacher(
-                account_id=account.id,
-                name=bt.name or (bt.kuerzel or "").strip() or None,
-                kuerzel=bt.kuerzel,
-                color=color,
-                deputat_soll=bt.deputat_soll,
-                first_name=bt.first_name,
-                last_name=bt.last_name,
-                deputat=bt.deputat,
-                work_mo=bt.work_mo if bt.work_mo is not None else True,
-                work_di=bt.work_di if bt.work_di is not None else True,
-                work_mi=bt.work_mi if bt.work_mi is not None else True,
-                work_do=bt.work_do if bt.work_do is not None else True,
-                work_fr=bt.work_fr if bt.work_fr is not None else True,
-            )
-            session.add(t)
-            session.commit(); session.refresh(t)
+
+def _clear_masterdata(session: Session, account_id: int) -> None:
+    # Clear tables in dependency order
+    session.exec(delete(Requirement).where(Requirement.account_id == account_id))
+    session.exec(delete(ClassSubject).where(ClassSubject.account_id == account_id))
+    session.exec(delete(Subject).where(Subject.account_id == account_id))
+    session.exec(delete(Room).where(Room.account_id == account_id))
+    session.exec(delete(Class).where(Class.account_id == account_id))
+    session.exec(delete(Teacher).where(Teacher.account_id == account_id))
+    session.exec(delete(RuleProfile).where(RuleProfile.account_id == account_id))
+
+
+TEACHER_IMPORT_FIELDS = (
+    "name", "kuerzel", "color", "deputat_soll", "first_name", "last_name", "deputat",
+    "work_mo", "work_di", "work_mi", "work_do", "work_fr",
+)
+WORK_DAY_FIELDS = ("work_mo", "work_di", "work_mi", "work_do", "work_fr")
+
+
+def _write_rows(session: Session, model, rows: List[dict], originals: Dict[int, dict]) -> None:
+    """Insert rows without id and update changed rows with one bulk statement each.
+
+    Inserted rows get their new id; ``originals`` is brought up to date so that
+    the same rows can be written again by a later batch.
+    """
+    inserts = [row for row in rows if row.get("id") is None]
+    updates = [row for row in rows if row.get("id") is not None and row != originals.get(row["id"])]
+    if inserts:
+        new_ids = session.execute(
+            insert(model).returning(model.id, sort_by_parameter_order=True),
+            [{k: v for k, v in row.items() if k != "id"} for row in inserts],
+        ).scalars().all()
+        for row, row_id in zip(inserts, new_ids):
+            row["id"] = row_id
+    if updates:
+        session.execute(update(model), updates)
+    for row in inserts + updates:
+        originals[row["id"]] = dict(row)
+
+
+def _prefetch_rows(session: Session, model, account_id: int, fields) -> List[dict]:
+    records = session.exec(
+        select(model).where(model.account_id == account_id).order_by(model.id)
+    ).all()
+    return [{"id": record.id, **{field: getattr(record, field) for field in fields}} for record in records]
+
+
+class _TableState:
+    """Prefetched rows of one table with lookup indexes (first row per key wins).
+
+    The import helpers load it themselves; the NDJSON importer keeps one per
+    table so that later batches reuse the maps instead of prefetching again.
+    """
+
+    def __init__(self, rows: List[dict], keys: Dict[str, Callable[[dict], object]]) -> None:
+        self.keys = keys
+        self.originals: Dict[int, dict] = {row["id"]: dict(row) for row in rows}
+        self.indexes: Dict[str, Dict[object, dict]] = {name: {} for name in keys}
+        self.extra: Dict[str, object] = {}
+        for row in rows:
+            self.register(row)
+
+    def register(self, row: dict) -> None:
+        for name, key in self.keys.items():
+            value = key(row)
+            if value:
+                self.indexes[name].setdefault(value, row)
+
+    def ids(self, *names: str) -> "_IdLookup":
+        return _IdLookup([self.indexes[name] for name in names or tuple(self.keys)])
+
+
+class _IdLookup:
+    """``dict.get``-style id lookup over state indexes; the first index that knows a key wins."""
+
+    def __init__(self, indexes: List[Dict[object, dict]]) -> None:
+        self.indexes = indexes
+
+    def get(self, key, default: Optional[int] = None) -> Optional[int]:
+        for index in self.indexes:
+            row = index.get(key)
+            if row is not None:
+                return row["id"]
+        return default
+
+
+def _field(name: str) -> Callable[[dict], object]:
+    return lambda row: row.get(name)
+
+
+def _name_id_map(session: Session, model, account_id: int) -> Dict[str, int]:
+    ids: Dict[str, int] = {}
+    for row_id, name in session.exec(
+        select(model.id, model.name).where(model.account_id == account_id).order_by(model.id)
+    ).all():
+        ids.setdefault(name, row_id)
+    return ids
+
+
+def _teacher_id_lookup(session: Session, account_id: int) -> Dict[str, int]:
+    """Map kuerzel and names to teacher ids; kuerzel matches take precedence."""
+    rows = session.exec(
+        select(Teacher.id, Teacher.kuerzel, Teacher.name)
+        .where(Teacher.account_id == account_id)
+        .order_by(Teacher.id)
+    ).all()
+    by_name: Dict[str, int] = {}
+    by_kuerzel: Dict[str, int] = {}
+    for teacher_id, kuerzel, name in rows:
+        if name:
+            by_name.setdefault(name, teacher_id)
+        if kuerzel:
+            by_kuerzel.setdefault(kuerzel, teacher_id)
+    return {**by_name, **by_kuerzel}
+
+
+def _teacher_state(session: Session, account_id: int) -> _TableState:
+    rows = _prefetch_rows(session, Teacher, account_id, TEACHER_IMPORT_FIELDS)
+    state = _TableState(rows, {"kuerzel": _field("kuerzel"), "name": _field("name")})
+    state.extra["used_colors"] = {normalize_hex_color(row["color"]) for row in rows} - {None}
+    return state
+
+
+def _room_state(session: Session, account_id: int) -> _TableState:
+    rows = _prefetch_rows(session, Room, account_id, ("name", "type", "capacity", "is_classroom"))
+    return _TableState(rows, {"name": _field("name")})
+
+
+def _class_state(session: Session, account_id: int) -> _TableState:
+    return _TableState(_prefetch_rows(session, Class, account_id, ("name", "homeroom_teacher_id")), {"name": _field("name")})
+
+
+SUBJECT_IMPORT_FIELDS = (
+    "name", "kuerzel", "color", "default_doppelstunde", "default_nachmittag",
+    "required_room_id", "is_bandfach", "is_ag_foerder", "alias_subject_id",
+)
+
+
+def _subject_state(session: Session, account_id: int) -> _TableState:
+    return _TableState(_prefetch_rows(session, Subject, account_id, SUBJECT_IMPORT_FIELDS), {"name": _field("name")})
+
+
+def _pair_key(row: dict) -> object:
+    return (row["class_id"], row["subject_id"])
+
+
+def _curriculum_state(session: Session, account_id: int) -> _TableState:
+    fields = ("class_id", "subject_id", "wochenstunden", "participation", "doppelstunde", "nachmittag")
+    return _TableState(_prefetch_rows(session, ClassSubject, account_id, fields), {"pair": _pair_key})
+
+
+def _requirement_state(session: Session, account_id: int) -> _TableState:
+    fields = (
+        "class_id", "subject_id", "teacher_id", "wochenstunden", "doppelstunde",
+        "nachmittag", "participation", "config_source",
+    )
+    return _TableState(_prefetch_rows(session, Requirement, account_id, fields), {"pair": _pair_key})
+
+
+def _rule_profile_columns() -> List[str]:
+    return [name for name in RuleProfile.__table__.columns.keys() if name not in ("id", "account_id")]
+
+
+def _rule_profile_state(session: Session, account_id: int) -> _TableState:
+    return _TableState(_prefetch_rows(session, RuleProfile, account_id, _rule_profile_columns()), {"name": _field("name")})
+
+
+def _import_teachers(
+    session: Session,
+    account_id: int,
+    items: List[BackupTeacher],
+    state: Optional[_TableState] = None,
+) -> _TableState:
+    state = state or _teacher_state(session, account_id)
+    by_kuerzel, by_name = state.indexes["kuerzel"], state.indexes["name"]
+    used_colors = state.extra["used_colors"]
+    touched: Dict[int, dict] = {}
+
+    def next_color() -> str:
+        color = pick_teacher_color(used_colors)
+        used_colors.add(color)
+        return color
+
+    for bt in items:
+        row = by_kuerzel.get(bt.kuerzel) if bt.kuerzel else None
+        if row is None and bt.name:
+            row = by_name.get(bt.name)
+        if row is None:
+            color = normalize_hex_color(bt.color)
+            if color:
+                used_colors.add(color)
+            row = {
+                "id": None,
+                "account_id": account_id,
+                "name": bt.name or (bt.kuerzel or "").strip() or None,
+                "kuerzel": bt.kuerzel,
+                "color": color or next_color(),
+                "deputat_soll": bt.deputat_soll,
+                "first_name": bt.first_name,
+                "last_name": bt.last_name,
+                "deputat": bt.deputat,
+            }
+            for field in WORK_DAY_FIELDS:
+                value = getattr(bt, field)
+                row[field] = value if value is not None else True
         else:
-            # update basic fields
-            t.name = bt.name or t.name
-            t.kuerzel = bt.kuerzel or t.kuerzel
-            t.deputat_soll = bt.deputat_soll if bt.deputat_soll is not None else t.deputat_soll
-            t.first_name = bt.first_name if bt.first_name is not None else t.first_name
-            t.last_name = bt.last_name if bt.last_name is not None else t.last_name
-            t.deputat = bt.deputat if bt.deputat is not None else t.deputat
+            row["name"] = bt.name or row["name"]
+            row["kuerzel"] = bt.kuerzel or row["kuerzel"]
+            for field in ("deputat_soll", "first_name", "last_name", "deputat", *WORK_DAY_FIELDS):
+                value = getattr(bt, field)
+                if value is not None:
+                    row[field] = value
             normalized_color = normalize_hex_color(bt.color)
             if normalized_color:
-                t.color = normalized_color
-            elif t.color is None:
-                t.color = next_teacher_color(session, account.id)
-            if bt.work_mo is not None: t.work_mo = bt.work_mo
-            if bt.work_di is not None: t.work_di = bt.work_di
-            if bt.work_mi is not None: t.work_mi = bt.work_mi
-            if bt.work_do is not None: t.work_do = bt.work_do
-            if bt.work_fr is not None: t.work_fr = bt.work_fr
-            session.add(t); session.commit(); session.refresh(t)
-        return t
-
-    def upsert_room(br: BackupRoom) -> Room:
-        r = session.exec(
-            select(Room).where(Room.account_id == account.id, Room.name == br.name)
-        ).first()
-        if not r:
-            r = Room(
-                account_id=account.id,
-                name=br.name,
-                type=br.type,
-                capacity=br.capacity,
-                is_classroom=bool(br.is_classroom) if br.is_classroom is not None else False,
-            )
-            session.add(r); session.commit(); session.refresh(r)
+                row["color"] = normalized_color
+                used_colors.add(normalized_color)
+            elif row["color"] is None:
+                row["color"] = next_color()
+        state.register(row)
+        touched[id(row)] = row
+
+    _write_rows(session, Teacher, list(touched.values()), state.originals)
+    return state
+
+
+def _import_rooms(
+    session: Session,
+    account_id: int,
+    items: List[BackupRoom],
+    state: Optional[_TableState] = None,
+) -> _TableState:
+    state = state or _room_state(session, account_id)
+    by_name = state.indexes["name"]
+    touched: Dict[int, dict] = {}
+
+    for br in items:
+        row = by_name.get(br.name)
+        if row is None:
+            row = {
+                "id": None,
+                "account_id": account_id,
+                "name": br.name,
+                "type": br.type,
+                "capacity": br.capacity,
+                "is_classroom": bool(getattr(br, "is_classroom", None)),
+            }
+            by_name[br.name] = row
         else:
-            if br.type is not None:
-                r.type = br.type
-            if br.capacity is not None:
-                r.capacity = br.capacity
-            if br.is_classroom is not None:
-                r.is_classroom = br.is_classroom
-            session.add(r); session.commit(); session.refresh(r)
-        return r
-
-    def upsert_class(bc: BackupClass) -> Class:
-        c = session.exec(select(Class).where(Class.account_id == account.id, Class.name == bc.name)).first()
-        if not c:
-            c = Class(name=bc.name, account_id=account.id)
-            session.add(c); session.commit(); session.refresh(c)
+            for field in ("type", "capacity", "is_classroom"):
+                value = getattr(br, field, None)
+                if value is not None:
+                    row[field] = value
+        touched[id(row)] = row
+
+    _write_rows(session, Room, list(touched.values()), state.originals)
+    return state
+
+
+def _import_classes(
+    session: Session,
+    account_id: int,
+    items: List[BackupClass],
+    teacher_ids,
+    state: Optional[_TableState] = None,
+) -> _TableState:
+    state = state or _class_state(session, account_id)
+    by_name = state.indexes["name"]
+    touched: Dict[int, dict] = {}
+
+    for bc in items:
+        row = by_name.get(bc.name)
+        if row is None:
+            row = {"id": None, "account_id": account_id, "name": bc.name, "homeroom_teacher_id": None}
+            by_name[bc.name] = row
         # homeroom teacher by kuerzel or name
         if bc.homeroom_teacher:
-            t = session.exec(
-                select(Teacher).where(
-                    Teacher.account_id == account.id,
-                    Teacher.kuerzel == bc.homeroom_teacher,
-                )
-            ).first()
-            if not t:
-                t = session.exec(
-                    select(Teacher).where(
-                        Teacher.account_id == account.id,
-                        Teacher.name == bc.homeroom_teacher,
-                    )
-                ).first()
-            c.homeroom_teacher_id = t.id if t else None
-        session.add(c); session.commit(); session.refresh(c)
-        return c
-
-    def upsert_subject(bs: BackupSubject) -> Subject:
-        s = session.exec(select(Subject).where(Subject.account_id == account.id, Subject.name == bs.name)).first()
-        if not s:
-            s = Subject(
-                account_id=account.id,
-                name=bs.name,
-                kuerzel=bs.kuerzel,
-                color=bs.color,
-                default_doppelstunde=(DoppelstundeEnum(bs.default_doppelstunde) if bs.default_doppelstunde else None),
-                default_nachmittag=(NachmittagEnum(bs.default_nachmittag) if bs.default_nachmittag else None),
-            )
-            session.add(s); session.commit(); session.refresh(s)
+            row["homeroom_teacher_id"] = teacher_ids.get(bc.homeroom_teacher)
+        touched[id(row)] = row
+
+    _write_rows(session, Class, list(touched.values()), state.originals)
+    return state
+
+
+def _import_subjects(
+    session: Session,
+    account_id: int,
+    items: List[BackupSubject],
+    room_ids=None,
+    state: Optional[_TableState] = None,
+) -> _TableState:
+    state = state or _subject_state(session, account_id)
+    if room_ids is None:
+        room_ids = _name_id_map(session, Room, account_id)
+    by_name = state.indexes["name"]
+    touched: Dict[int, dict] = {}
+
+    for bs in items:
+        row = by_name.get(bs.name)
+        if row is None:
+            row = {
+                "id": None,
+                "account_id": account_id,
+                "name": bs.name,
+                "kuerzel": bs.kuerzel,
+                "color": bs.color,
+                "default_doppelstunde": DoppelstundeEnum(bs.default_doppelstunde) if bs.default_doppelstunde else None,
+                "default_nachmittag": NachmittagEnum(bs.default_nachmittag) if bs.default_nachmittag else None,
+                "required_room_id": None,
+                "is_bandfach": False,
+                "is_ag_foerder": False,
+                "alias_subject_id": None,
+            }
+            by_name[bs.name] = row
         else:
             if bs.kuerzel is not None:
-                s.kuerzel = bs.kuerzel
+                row["kuerzel"] = bs.kuerzel
             if bs.color is not None:
-                s.color = bs.color
+                row["color"] = bs.color
             if bs.default_doppelstunde is not None:
-                s.default_doppelstunde = DoppelstundeEnum(bs.default_doppelstunde)
+                row["default_doppelstunde"] = DoppelstundeEnum(bs.default_doppelstunde)
             if bs.default_nachmittag is not None:
-                s.default_nachmittag = NachmittagEnum(bs.default_nachmittag)
+                row["default_nachmittag"] = NachmittagEnum(bs.default_nachmittag)
         if bs.required_room is not None:
-            room = session.exec(
-                select(Room).where(Room.account_id == account.id, Room.name == bs.required_room)
-            ).first()
-            s.required_room_id = room.id if room else None
+            row["required_room_id"] = room_ids.get(bs.required_room)
         if bs.is_bandfach is not None:
-            s.is_bandfach = bool(bs.is_bandfach)
+            row["is_bandfach"] = bool(bs.is_bandfach)
         if bs.is_ag_foerder is not None:
-            s.is_ag_foerder = bool(bs.is_ag_foerder)
-        if bs.alias_subject:
-            alias = session.exec(
-                select(Subject).where(Subject.account_id == account.id, Subject.name == bs.alias_subject)
-            ).first()
-            s.alias_subject_id = alias.id if alias else None
-        else:
-            s.alias_subject_id = None
-        session.add(s); session.commit(); session.refresh(s)
-        return s
-
-    # Upsert master data
-    t_map: Dict[str, Teacher] = {}
-    for bt in payload.teachers or []:
-        t = upsert_teacher(bt)
-        key = (bt.kuerzel or bt.name or str(t.id)).strip()
-        t_map[key] = t
-
-    for br in payload.rooms or []:
-        upsert_room(br)
-
-    c_map: Dict[str, Class] = {}
-    for bc in payload.classes or []:
-        c = upsert_class(bc)
-        c_map[bc.name] = c
-
-    s_map: Dict[str, Subject] = {}
-    for bs in payload.subjects or []:
-        s = upsert_subject(bs)
-        s_map[bs.name] = s
-
-    # Curriculum (upsert by class+subject)
-    for item in payload.curriculum or []:
-        cls = c_map.get(item.class_name) or session.exec(
-            select(Class).where(Class.account_id == account.id, Class.name == item.class_name)
-        ).first()
-        sub = s_map.get(item.subject_name) or session.exec(
-            select(Subject).where(Subject.account_id == account.id, Subject.name == item.subject_name)
-        ).first()
-        if not cls or not sub:
+            row["is_ag_foerder"] = bool(bs.is_ag_foerder)
+        touched[id(row)] = row
+
+    _write_rows(session, Subject, list(touched.values()), state.originals)
+    return state
+
+
+def _apply_subject_aliases(session: Session, account_id: int, aliases: Dict[str, Optional[str]]) -> None:
+    """Point subjects at their alias subject once every imported subject has an id."""
+    ids: Dict[str, int] = {}
+    current: Dict[str, Optional[int]] = {}
+    for subject_id, name, alias_id in session.exec(
+        select(Subject.id, Subject.name, Subject.alias_subject_id)
+        .where(Subject.account_id == account_id)
+        .order_by(Subject.id)
+    ).all():
+        if name not in ids:
+            ids[name] = subject_id
+            current[name] = alias_id
+    updates = []
+    for name, alias in aliases.items():
+        if name not in ids:
+            continue
+        alias_id = ids.get(alias) if alias else None
+        if current[name] != alias_id:
+            updates.append({"id": ids[name], "alias_subject_id": alias_id})
+    if updates:
+        session.execute(update(Subject), updates)
+
+
+def _import_curriculum(
+    session: Session,
+    account_id: int,
+    items: List[BackupCurriculumItem],
+    class_ids,
+    subject_ids,
+    state: Optional[_TableState] = None,
+) -> _TableState:
+    state = state or _curriculum_state(session, account_id)
+    by_pair = state.indexes["pair"]
+    touched: Dict[int, dict] = {}
+
+    for item in items:
+        class_id = class_ids.get(item.class_name)
+        subject_id = subject_ids.get(item.subject_name)
+        if not class_id or not subject_id:
             raise HTTPException(status_code=400, detail=f"Unbekannte Klasse/Fach in curriculum: {item.class_name}/{item.subject_name}")
-        participation = RequirementParticipationEnum(item.participation) if item.participation else RequirementParticipationEnum.curriculum
-        doppel = DoppelstundeEnum(item.doppelstunde) if item.doppelstunde else None
-        nachmittag = NachmittagEnum(item.nachmittag) if item.nachmittag else None
-        existing = session.exec(
-            select(ClassSubject).where(
-                ClassSubject.account_id == account.id,
-                ClassSubject.class_id == cls.id,
-                ClassSubject.subject_id == sub.id,
-            )
-        ).first()
-        if existing:
-            existing.wochenstunden = item.wochenstunden
-            existing.participation = participation
-            existing.doppelstunde = doppel
-            existing.nachmittag = nachmittag
-            session.add(existing)
-        else:
-            session.add(
-                ClassSubject(
-                    account_id=account.id,
-                    class_id=cls.id,
-                    subject_id=sub.id,
-                    wochenstunden=item.wochenstunden,
-                    participation=participation,
-                    doppelstunde=doppel,
-                    nachmittag=nachmittag,
-                )
-            )
-        session.commit()
-
-    # Requirements (upsert by class+subject pair)
-    for item in payload.requirements or []:
-        cls = c_map.get(item.class_name) or session.exec(
-            select(Class).where(Class.account_id == account.id, Class.name == item.class_name)
-        ).first()
-        sub = s_map.get(item.subject_name) or session.exec(
-            select(Subject).where(Subject.account_id == account.id, Subject.name == item.subject_name)
-        ).first()
+        values = {
+            "wochenstunden": item.wochenstunden,
+            "participation": RequirementParticipationEnum(item.participation) if item.participation else RequirementParticipationEnum.curriculum,
+            "doppelstunde": DoppelstundeEnum(item.doppelstunde) if item.doppelstunde else None,
+            "nachmittag": NachmittagEnum(item.nachmittag) if item.nachmittag else None,
+        }
+        row = by_pair.get((class_id, subject_id))
+        if row is None:
+            row = {"id": None, "account_id": account_id, "class_id": class_id, "subject_id": subject_id}
+            by_pair[(class_id, subject_id)] = row
+        row.update(values)
+        touched[id(row)] = row
+
+    _write_rows(session, ClassSubject, list(touched.values()), state.originals)
+    return state
+
+
+def _import_requirements(
+    session: Session,
+    account_id: int,
+    items: List[BackupRequirementItem],
+    class_ids,
+    subject_ids,
+    teacher_ids,
+    state: Optional[_TableState] = None,
+) -> _TableState:
+    state = state or _requirement_state(session, account_id)
+    by_pair = state.indexes["pair"]
+    touched: Dict[int, dict] = {}
+
+    for item in items:
+        class_id = class_ids.get(item.class_name)
+        subject_id = subject_ids.get(item.subject_name)
         # teacher by kuerzel first, then name
-        t = None
-        if item.teacher_name:
-            t = session.exec(
-                select(Teacher).where(Teacher.account_id == account.id, Teacher.kuerzel == item.teacher_name)
-            ).first()
-            if not t:
-                t = session.exec(
-                    select(Teacher).where(Teacher.account_id == account.id, Teacher.name == item.teacher_name)
-                ).first()
-        if not (cls and sub and t):
+        teacher_id = teacher_ids.get(item.teacher_name) if item.teacher_name else None
+        if not (class_id and subject_id and teacher_id):
             raise HTTPException(status_code=400, detail=f"Unbekannte Zuordnung in requirements: {item.class_name}/{item.subject_name}/{item.teacher_name}")
-        existing = session.exec(
-            select(Requirement).where(
-                Requirement.account_id == account.id,
-                Requirement.class_id == cls.id,
-                Requirement.subject_id == sub.id,
-            )
-        ).first()
-        ds = item.doppelstunde or DoppelstundeEnum.kann.value
-        nm = item.nachmittag or NachmittagEnum.kann.value
-        participation = RequirementParticipationEnum(item.participation) if item.participation else RequirementParticipationEnum.curriculum
-        config_source = RequirementConfigSourceEnum(item.config_source) if item.config_source else RequirementConfigSourceEnum.subject
-        if existing:
-            existing.teacher_id = t.id
-            existing.wochenstunden = item.wochenstunden
-            existing.doppelstunde = DoppelstundeEnum(ds)
-            existing.nachmittag = NachmittagEnum(nm)
-            existing.participation = participation
-            existing.config_source = config_source
-            session.add(existing)
-        else:
-            session.add(
-                Requirement(
-                    account_id=account.id,
-                    class_id=cls.id,
-                    subject_id=sub.id,
-                    teacher_id=t.id,
-                    wochenstunden=item.wochenstunden,
-                    doppelstunde=DoppelstundeEnum(ds),
-                    nachmittag=NachmittagEnum(nm),
-                    participation=participation,
-                    config_source=config_source,
-                )
-            )
-        session.commit()
-
-    # Rule profiles
-    for rp in (payload.rule_profiles or []):
-        # upsert by name
-        existing = session.exec(
-            select(RuleProfile).where(
-                RuleProfile.account_id == account.id,
-                RuleProfile.name == rp.get("name"),
-            )
-        ).first()
-        if existing:
-            for k, v in rp.items():
-                if k == "id":
-                    continue
-                setattr(existing, k, v)
-            session.add(existing); session.commit()
-        else:
-            data = {k: v for k, v in rp.items() if k != "id"}
-            data["account_id"] = account.id
-            session.add(RuleProfile(**data))
-            session.commit()
-
-    return {"ok": True}
+        values = {
+            "teacher_id": teacher_id,
+            "wochenstunden": item.wochenstunden,
+            "doppelstunde": DoppelstundeEnum(item.doppelstunde or DoppelstundeEnum.kann.value),
+            "nachmittag": NachmittagEnum(item.nachmittag or NachmittagEnum.kann.value),
+            "participation": RequirementParticipationEnum(item.participation) if item.participation else RequirementParticipationEnum.curriculum,
+            "config_source": RequirementConfigSourceEnum(item.config_source) if item.config_source else RequirementConfigSourceEnum.subject,
+        }
+        row = by_pair.get((class_id, subject_id))
+        if row is None:
+            row = {"id": None, "account_id": account_id, "class_id": class_id, "subject_id": subject_id}
+            by_pair[(class_id, subject_id)] = row
+        row.update(values)
+        touched[id(row)] = row
+
+    _write_rows(session, Requirement, list(touched.values()), state.originals)
+    return state
+
+
+def _import_rule_profiles(
+    session: Session,
+    account_id: int,
+    items: List[dict],
+    state: Optional[_TableState] = None,
+) -> _TableState:
+    columns = _rule_profile_columns()
+    state = state or _rule_profile_state(session, account_id)
+    by_name = state.indexes["name"]
+    touched: Dict[int, dict] = {}
+
+    # upsert by name
+    for rp in items:
+        values = {k: v for k, v in rp.items() if k in columns}
+        row = by_name.get(rp.get("name"))
+        if row is None:
+            row = {"id": None, "account_id": account_id}
+            by_name[rp.get("name")] = row
+        row.update(values)
+        touched[id(row)] = row
+
+    _write_rows(session, RuleProfile, list(touched.values()), state.originals)
+    return state
 
 
 def _lookup_maps(session: Session, account_id: int) -> Dict[str, Dict[int, object]]:
@@ -515,30 +770,41 @@ def _lookup_maps(session: Session, account_id: int) -> Dict[str, Dict[int, objec
     }
 
 
-@router.get("/export/distribution", response_model=DistributionExport)
-def export_distribution(
-    version_id: int = Query(..., description="ID der zu exportierenden Stundenverteilungs-Version"),
-    account_id: Optional[int] = Query(None),
-    session: Session = Depends(get_session),
-) -> DistributionExport:
-    account = resolve_account(session, account_id)
+def _get_export_version(session: Session, account_id: int, version_id: int) -> DistributionVersion:
     version = session.get(DistributionVersion, version_id)
-    if not version or version.account_id != account.id:
+    if not version or version.account_id != account_id:
         raise HTTPException(status_code=404, detail="Version nicht gefunden")
+    return version
+
+
+def _iter_distribution_records(
+    session: Session,
+    account_id: int,
+    version_id: int,
+) -> Iterator[Tuple[str, object]]:
+    """Yield the version header followed by its requirements (one streamed query)."""
+    version = _get_export_version(session, account_id, version_id)
+    yield "version", DistributionVersionExport(
+        name=version.name,
+        comment=version.comment,
+        created_at=version.created_at,
+        updated_at=version.updated_at,
+    )
 
-    data_maps = _lookup_maps(session, account.id)
+    data_maps = _lookup_maps(session, account_id)
     teacher_by_id = data_maps["teachers"]
     class_by_id = data_maps["classes"]
     subject_by_id = data_maps["subjects"]
-    room_by_id = data_maps["rooms"]
 
-    requirements = session.exec(
-        select(Requirement).where(
-            Requirement.account_id == account.id,
+    requirements = _stream(
+        session,
+        select(Requirement)
+        .where(
+            Requirement.account_id == account_id,
             Requirement.version_id == version_id,
         )
-    ).all()
-    items: List[BackupRequirementItem] = []
+        .order_by(Requirement.id),
+    )
     for req in requirements:
         teacher = teacher_by_id.get(req.teacher_id)
         cls = class_by_id.get(req.class_id)
@@ -549,131 +815,156 @@ def export_distribution(
                 detail=f"Ungültiger Requirement-Eintrag (ID {req.id}) – Stammdaten nicht gefunden.",
             )
         teacher_name = teacher.kuerzel or teacher.name or str(teacher.id)
-        items.append(
-            BackupRequirementItem(
-                class_name=cls.name,
-                subject_name=subject.name,
-                teacher_name=teacher_name,
-                wochenstunden=req.wochenstunden,
-                doppelstunde=req.doppelstunde.value,
-                nachmittag=req.nachmittag.value,
-                participation=req.participation.value if req.participation else None,
-                version_name=version.name,
-                config_source=(
-                    req.config_source.value
-                    if isinstance(req.config_source, RequirementConfigSourceEnum)
-                    else (req.config_source if isinstance(req.config_source, str) else None)
-                ),
-            )
+        yield "version_requirement", BackupRequirementItem(
+            class_name=cls.name,
+            subject_name=subject.name,
+            teacher_name=teacher_name,
+            wochenstunden=req.wochenstunden,
+            doppelstunde=req.doppelstunde.value,
+            nachmittag=req.nachmittag.value,
+            participation=req.participation.value if req.participation else None,
+            version_name=version.name,
+            config_source=_config_source_value(req.config_source),
         )
 
-    version_export = DistributionVersionExport(
-        name=version.name,
-        comment=version.comment,
-        created_at=version.created_at,
-        updated_at=version.updated_at,
-    )
+
+@router.get("/export/distribution", response_model=DistributionExport)
+def export_distribution(
+    version_id: int = Query(..., description="ID der zu exportierenden Stundenverteilungs-Version"),
+    account_id: Optional[int] = Query(None),
+    session: Session = Depends(get_session),
+) -> DistributionExport:
+    account = resolve_account(session, account_id)
+    version_export: Optional[DistributionVersionExport] = None
+    items: List[BackupRequirementItem] = []
+    for record_type, item in _iter_distribution_records(session, account.id, version_id):
+        if record_type == "version":
+            version_export = item
+        else:
+            items.append(item)
     return DistributionExport(version=version_export, requirements=items)
 
 
-@router.post("/import/distribution")
-def import_distribution(
-    payload: DistributionExport,
+@router.get("/export/distribution/stream")
+def export_distribution_stream(
+    version_id: int = Query(..., description="ID der zu exportierenden Stundenverteilungs-Version"),
     account_id: Optional[int] = Query(None),
     session: Session = Depends(get_session),
-    replace: bool = Query(False, description="Vorhandene Requirements der Version überschreiben, falls sie existiert"),
-) -> Dict[str, int]:
-    account = resolve_account(session, account_id)
-    if not payload.version:
-        raise HTTPException(status_code=400, detail="Versionsinformationen fehlen.")
+) -> StreamingResponse:
+    target_account_id = resolve_account(session, account_id).id
+    _get_export_version(session, target_account_id, version_id)
+    return _ndjson_response(
+        session,
+        lambda s: _iter_distribution_records(s, target_account_id, version_id),
+        f"stundenverteilung-{version_id}",
+    )
+
 
+def _upsert_distribution_version(
+    session: Session,
+    account_id: int,
+    payload: DistributionVersionExport,
+    replace: bool,
+) -> DistributionVersion:
+    """Create the version or, with ``replace``, clear the requirements of the existing one."""
     version = session.exec(
         select(DistributionVersion).where(
-            DistributionVersion.account_id == account.id,
-            DistributionVersion.name == payload.version.name,
+            DistributionVersion.account_id == account_id,
+            DistributionVersion.name == payload.name,
         )
     ).first()
     if version:
-        if replace:
-            session.exec(
-                delete(Requirement).where(
-                    Requirement.account_id == account.id,
-                    Requirement.version_id == version.id,
-                )
-            )
-            session.commit()
-        else:
+        if not replace:
             raise HTTPException(status_code=409, detail="Version existiert bereits. Mit replace=true überschreiben.")
-        version.comment = payload.version.comment
-        version.updated_at = payload.version.updated_at or datetime.now(timezone.utc)
-        session.add(version)
-        session.commit()
-        session.refresh(version)
+        session.exec(
+            delete(Requirement).where(
+                Requirement.account_id == account_id,
+                Requirement.version_id == version.id,
+            )
+        )
+        version.comment = payload.comment
+        version.updated_at = payload.updated_at or datetime.now(timezone.utc)
     else:
         version = DistributionVersion(
-            account_id=account.id,
-            name=payload.version.name,
-            comment=payload.version.comment,
-            created_at=payload.version.created_at or datetime.now(timezone.utc),
-            updated_at=payload.version.updated_at or datetime.now(timezone.utc),
+            account_id=account_id,
+            name=payload.name,
+            comment=payload.comment,
+            created_at=payload.created_at or datetime.now(timezone.utc),
+            updated_at=payload.updated_at or datetime.now(timezone.utc),
         )
-        session.add(version)
-        session.commit()
-        session.refresh(version)
-
-    teachers = session.exec(select(Teacher).where(Teacher.account_id == account.id)).all()
-    teachers_map = {t.name: t for t in teachers}
-    for t in teachers:
-        if t.kuerzel:
-            teachers_map[t.kuerzel] = t
-    classes_map = {c.name: c for c in session.exec(select(Class).where(Class.account_id == account.id)).all()}
-    subjects_map = {s.name: s for s in session.exec(select(Subject).where(Subject.account_id == account.id)).all()}
-
-    new_requirements: List[Requirement] = []
-    for item in payload.requirements or []:
-        cls = classes_map.get(item.class_name)
-        subject = subjects_map.get(item.subject_name)
-        teacher = teachers_map.get(item.teacher_name) if item.teacher_name else None
-        if not cls or not subject or not teacher:
+    session.add(version)
+    session.flush()
+    return version
+
+
+def _insert_version_requirements(
+    session: Session,
+    account_id: int,
+    version_id: int,
+    items: List[BackupRequirementItem],
+    lookups: Optional[Tuple[object, object, object]] = None,
+) -> int:
+    """Insert version requirements; ``lookups`` are prebuilt (teacher, class, subject) id lookups."""
+    if lookups is None:
+        lookups = (
+            _teacher_id_lookup(session, account_id),
+            _name_id_map(session, Class, account_id),
+            _name_id_map(session, Subject, account_id),
+        )
+    teacher_ids, class_ids, subject_ids = lookups
+
+    rows: List[dict] = []
+    for item in items:
+        class_id = class_ids.get(item.class_name)
+        subject_id = subject_ids.get(item.subject_name)
+        teacher_id = teacher_ids.get(item.teacher_name) if item.teacher_name else None
+        if not class_id or not subject_id or not teacher_id:
             raise HTTPException(
                 status_code=400,
                 detail=f"Klasse/Fach/Lehrkraft nicht gefunden: {item.class_name}/{item.subject_name}/{item.teacher_name}",
             )
-        ds = DoppelstundeEnum(item.doppelstunde) if item.doppelstunde else DoppelstundeEnum.kann
-        nm = NachmittagEnum(item.nachmittag) if item.nachmittag else NachmittagEnum.kann
-        participation = RequirementParticipationEnum(item.participation) if item.participation else RequirementParticipationEnum.curriculum
-        config_source = RequirementConfigSourceEnum(item.config_source) if item.config_source else RequirementConfigSourceEnum.subject
-        new_requirements.append(
-            Requirement(
-                account_id=account.id,
-                class_id=cls.id,
-                subject_id=subject.id,
-                teacher_id=teacher.id,
-                version_id=version.id,
-                wochenstunden=item.wochenstunden,
-                doppelstunde=ds,
-                nachmittag=nm,
-                participation=participation,
-                config_source=config_source,
-            )
+        rows.append(
+            {
+                "account_id": account_id,
+                "class_id": class_id,
+                "subject_id": subject_id,
+                "teacher_id": teacher_id,
+                "version_id": version_id,
+                "wochenstunden": item.wochenstunden,
+                "doppelstunde": DoppelstundeEnum(item.doppelstunde) if item.doppelstunde else DoppelstundeEnum.kann,
+                "nachmittag": NachmittagEnum(item.nachmittag) if item.nachmittag else NachmittagEnum.kann,
+                "participation": RequirementParticipationEnum(item.participation) if item.participation else RequirementParticipationEnum.curriculum,
+                "config_source": RequirementConfigSourceEnum(item.config_source) if item.config_source else RequirementConfigSourceEnum.subject,
+            }
         )
+    if rows:
+        session.execute(insert(Requirement), rows)
+    return len(rows)
 
-    if new_requirements:
-        session.bulk_save_objects(new_requirements)
-        session.commit()
 
-    return {"version_id": version.id}
+@router.post("/import/distribution")
+def import_distribution(
+    payload: DistributionExport,
+    account_id: Optional[int] = Query(None),
+    session: Session = Depends(get_session),
+    replace: bool = Query(False, description="Vorhandene Requirements der Version überschreiben, falls sie existiert"),
+) -> Dict[str, int]:
+    account = resolve_account(session, account_id)
+    if not payload.version:
+        raise HTTPException(status_code=400, detail="Versionsinformationen fehlen.")
+    try:
+        version = _upsert_distribution_version(session, account.id, payload.version, replace)
+        version_id = version.id
+        _insert_version_requirements(session, account.id, version_id, payload.requirements or [])
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    return {"version_id": version_id}
 
 
-def _load_basisplan_data(row: BasisPlan) -> BasisPlanData:
-    raw: Dict[str, object] = {}
-    if row.data:
-        try:
-            raw = json.loads(row.data)
-        except json.JSONDecodeError:
-            raw = {}
-    if not isinstance(raw, dict):
-        raw = {}
+def _load_basisplan_data(session: Session, row: BasisPlan) -> BasisPlanData:
+    raw = load_basis_document(session, row)
     raw.setdefault("meta", {"version": 1})
     raw.setdefault("classes", {})
     raw.setdefault("rooms", {})
@@ -699,7 +990,7 @@ def export_basisplan_snapshot(
     ).first()
     if not row:
         raise HTTPException(status_code=404, detail="Kein Basisplan gespeichert.")
-    data = _load_basisplan_data(row)
+    data = _load_basisplan_data(session, row)
     return BasisPlanExport(name=row.name, updated_at=row.updated_at, data=data)
 
 
@@ -723,60 +1014,57 @@ def import_basisplan_snapshot(
     if payload.name:
         row.name = payload.name
     if payload.data is not None:
-        row.data = json.dumps(payload.data.dict())
+        save_basis_document(session, row, payload.data.model_dump())
     row.updated_at = payload.updated_at or datetime.now(timezone.utc)
     session.add(row)
     session.commit()
     session.refresh(row)
+    # The snapshot may carry the previous updated_at, so the cache key alone is not enough
+    invalidate_basis_plan_cache(account.id, period.id)
     return {"basisplan_id": row.id}
 
 
-@router.get("/export/plans", response_model=PlansExport)
-def export_plans(
-    plan_ids: List[int] = Query(..., description="Kommaseparierte Liste von Plan-IDs", alias="plan_ids"),
-    account_id: Optional[int] = Query(None),
-    session: Session = Depends(get_session),
-) -> PlansExport:
-    account = resolve_account(session, account_id)
-    if not plan_ids:
-        raise HTTPException(status_code=400, detail="Mindestens eine Plan-ID angeben.")
+def _json_field(raw: Optional[str], fallback):
+    if not raw:
+        return fallback
+    try:
+        return json.loads(raw)
+    except json.JSONDecodeError:
+        return fallback
+
+
+def _iter_plan_records(
+    session: Session,
+    account_id: int,
+    plan_ids: List[int],
+) -> Iterator[Tuple[str, object]]:
+    """Yield one ``plan`` record (metadata + slots) per plan.
+
+    Slots come from the packed PlanMatrix rows (one streamed query); plans
+    without a matrix are served from a single PlanSlot query afterwards.
+    """
     plans = session.exec(
-        select(Plan).where(Plan.account_id == account.id, Plan.id.in_(plan_ids))
+        select(Plan).where(Plan.account_id == account_id, Plan.id.in_(plan_ids)).order_by(Plan.id)
     ).all()
     if not plans:
         raise HTTPException(status_code=404, detail="Keine passenden Pläne gefunden.")
 
-    data_maps = _lookup_maps(session, account.id)
+    data_maps = _lookup_maps(session, account_id)
     teacher_by_id = data_maps["teachers"]
     class_by_id = data_maps["classes"]
     subject_by_id = data_maps["subjects"]
+    room_by_id = data_maps["rooms"]
+    rule_profiles = {
+        rp.id: rp for rp in session.exec(select(RuleProfile).where(RuleProfile.account_id == account_id)).all()
+    }
+    versions = {
+        v.id: v
+        for v in session.exec(select(DistributionVersion).where(DistributionVersion.account_id == account_id)).all()
+    }
 
-    rule_profiles = {rp.id: rp for rp in session.exec(select(RuleProfile)).all()}
-    versions = {v.id: v for v in session.exec(select(DistributionVersion)).all()}
-
-    items: List[PlanExportItem] = []
-    for plan in plans:
+    def export_item(plan: Plan, slots: Iterable[dict]) -> PlanExportItem:
         version = versions.get(plan.version_id) if plan.version_id else None
         rule_profile = rule_profiles.get(plan.rule_profile_id) if plan.rule_profile_id else None
-        rule_keys = []
-        if plan.rule_keys_active:
-            try:
-                rule_keys = json.loads(plan.rule_keys_active)
-            except json.JSONDecodeError:
-                rule_keys = []
-        params_used = None
-        if plan.params_used:
-            try:
-                params_used = json.loads(plan.params_used)
-            except json.JSONDecodeError:
-                params_used = None
-        rules_snapshot = None
-        if plan.rules_snapshot:
-            try:
-                rules_snapshot = json.loads(plan.rules_snapshot)
-            except json.JSONDecodeError:
-                rules_snapshot = None
-
         metadata = PlanExportMetadata(
             name=plan.name,
             status=plan.status,
@@ -786,72 +1074,141 @@ def export_plans(
             comment=plan.comment,
             version_name=version.name if version else None,
             rule_profile_name=rule_profile.name if rule_profile else None,
-            rule_keys_active=rule_keys,
-            rules_snapshot=rules_snapshot,
-            params_used=params_used,
+            rule_keys_active=_json_field(plan.rule_keys_active, []),
+            rules_snapshot=_json_field(plan.rules_snapshot, None),
+            params_used=_json_field(plan.params_used, None),
         )
-
-        slots = session.exec(select(PlanSlot).where(PlanSlot.plan_id == plan.id)).all()
         slot_items: List[PlanSlotExport] = []
         for slot in slots:
-            cls = class_by_id.get(slot.class_id)
-            subject = subject_by_id.get(slot.subject_id)
-            teacher = teacher_by_id.get(slot.teacher_id)
+            cls = class_by_id.get(slot["class_id"])
+            subject = subject_by_id.get(slot["subject_id"])
+            teacher = teacher_by_id.get(slot["teacher_id"])
             if not (cls and subject and teacher):
                 raise HTTPException(status_code=400, detail=f"PlanSlot verweist auf fehlende Stammdaten (Plan {plan.id}).")
-            room = room_by_id.get(slot.room_id) if slot.room_id else None
+            room = room_by_id.get(slot["room_id"]) if slot["room_id"] else None
             slot_items.append(
                 PlanSlotExport(
                     class_name=cls.name,
                     subject_name=subject.name,
                     teacher_name=teacher.kuerzel or teacher.name or str(teacher.id),
                     room_name=room.name if room else None,
-                    tag=slot.tag,
-                    stunde=slot.stunde,
+                    tag=slot["tag"],
+                    stunde=slot["stunde"],
                 )
             )
+        return PlanExportItem(plan=metadata, slots=slot_items)
+
+    plan_by_id = {plan.id: plan for plan in plans}
+    remaining = dict(plan_by_id)
+    matrices = _stream(
+        session,
+        select(PlanMatrix).where(
+            PlanMatrix.plan_id.in_(list(plan_by_id)),
+            PlanMatrix.format_version == MATRIX_FORMAT_VERSION,
+        ),
+    )
+    for row in matrices:
+        plan = remaining.pop(row.plan_id)
+        yield "plan", export_item(plan, unpack_slot_rows(decode_matrix(row)))
+
+    if remaining:
+        slot_rows = _stream(
+            session,
+            select(PlanSlot).where(PlanSlot.plan_id.in_(list(remaining))).order_by(PlanSlot.plan_id, PlanSlot.id),
+        )
+        for plan_id, group in groupby(slot_rows, key=lambda s: s.plan_id):
+            slots = [
+                {"class_id": s.class_id, "subject_id": s.subject_id, "teacher_id": s.teacher_id,
+                 "room_id": s.room_id, "tag": s.tag, "stunde": s.stunde}
+                for s in group
+            ]
+            yield "plan", export_item(remaining.pop(plan_id), slots)
+    for plan in remaining.values():
+        yield "plan", export_item(plan, [])
 
-        items.append(PlanExportItem(plan=metadata, slots=slot_items))
 
+@router.get("/export/plans", response_model=PlansExport)
+def export_plans(
+    plan_ids: List[int] = Query(..., description="Kommaseparierte Liste von Plan-IDs", alias="plan_ids"),
+    account_id: Optional[int] = Query(None),
+    session: Session = Depends(get_session),
+) -> PlansExport:
+    account = resolve_account(session, account_id)
+    if not plan_ids:
+        raise HTTPException(status_code=400, detail="Mindestens eine Plan-ID angeben.")
+    items = [item for _, item in _iter_plan_records(session, account.id, plan_ids)]
     return PlansExport(plans=items)
 
 
-@router.post("/import/plans")
-def import_plans(
-    payload: PlansExport,
+@router.get("/export/plans/stream")
+def export_plans_stream(
+    plan_ids: List[int] = Query(..., description="Kommaseparierte Liste von Plan-IDs", alias="plan_ids"),
     account_id: Optional[int] = Query(None),
     session: Session = Depends(get_session),
-    replace: bool = Query(False, description="Vorhandene Pläne mit gleichem Namen vor dem Import löschen"),
-) -> Dict[str, int]:
-    account = resolve_account(session, account_id)
-    if not payload.plans:
-        raise HTTPException(status_code=400, detail="Keine Pläne im Payload.")
-    teachers = session.exec(select(Teacher).where(Teacher.account_id == account.id)).all()
+) -> StreamingResponse:
+    target_account_id = resolve_account(session, account_id).id
+    if not plan_ids:
+        raise HTTPException(status_code=400, detail="Mindestens eine Plan-ID angeben.")
+    exists = session.exec(
+        select(Plan.id).where(Plan.account_id == target_account_id, Plan.id.in_(plan_ids)).limit(1)
+    ).first()
+    if exists is None:
+        raise HTTPException(status_code=404, detail="Keine passenden Pläne gefunden.")
+    return _ndjson_response(session, lambda s: _iter_plan_records(s, target_account_id, plan_ids), "plaene")
+
+
+def _plan_import_maps(session: Session, account_id: int) -> Dict[str, Dict[str, object]]:
+    """Name lookups of the master data, rule profiles and versions referenced by plan exports."""
+    teachers = session.exec(select(Teacher).where(Teacher.account_id == account_id)).all()
     teacher_map = {t.name: t for t in teachers}
     for t in teachers:
         if t.kuerzel:
             teacher_map[t.kuerzel] = t
-    class_map = {c.name: c for c in session.exec(select(Class).where(Class.account_id == account.id)).all()}
-    subject_map = {s.name: s for s in session.exec(select(Subject).where(Subject.account_id == account.id)).all()}
-    room_map = {r.name: r for r in session.exec(select(Room).where(Room.account_id == account.id)).all()}
-    rule_profile_map = {rp.name: rp for rp in session.exec(select(RuleProfile).where(RuleProfile.account_id == account.id)).all()}
-    version_map = {v.name: v for v in session.exec(select(DistributionVersion).where(DistributionVersion.account_id == account.id)).all()}
-
-    created_plan_ids: List[int] = []
-    for item in payload.plans:
+    return {
+        "teachers": teacher_map,
+        "classes": {c.name: c for c in session.exec(select(Class).where(Class.account_id == account_id)).all()},
+        "subjects": {s.name: s for s in session.exec(select(Subject).where(Subject.account_id == account_id)).all()},
+        "rooms": {r.name: r for r in session.exec(select(Room).where(Room.account_id == account_id)).all()},
+        "rule_profiles": {
+            rp.name: rp for rp in session.exec(select(RuleProfile).where(RuleProfile.account_id == account_id)).all()
+        },
+        "versions": {
+            v.name: v
+            for v in session.exec(select(DistributionVersion).where(DistributionVersion.account_id == account_id)).all()
+        },
+    }
+
+
+def _import_plan_items(
+    session: Session,
+    account_id: int,
+    items: List[PlanExportItem],
+    replace: bool,
+    maps: Optional[Dict[str, Dict[str, object]]] = None,
+) -> int:
+    """Create plans (and their slots) from export items; the caller commits."""
+    maps = maps or _plan_import_maps(session, account_id)
+    teacher_map = maps["teachers"]
+    class_map = maps["classes"]
+    subject_map = maps["subjects"]
+    room_map = maps["rooms"]
+    rule_profile_map = maps["rule_profiles"]
+    version_map = maps["versions"]
+
+    created = 0
+    for item in items:
         meta = item.plan
         if replace:
             existing_plans = session.exec(
                 select(Plan).where(
-                    Plan.account_id == account.id,
+                    Plan.account_id == account_id,
                     Plan.name == meta.name,
                 )
             ).all()
             for existing_plan in existing_plans:
+                session.exec(delete(PlanMatrix).where(PlanMatrix.plan_id == existing_plan.id))
                 session.exec(delete(PlanSlot).where(PlanSlot.plan_id == existing_plan.id))
                 session.exec(delete(Plan).where(Plan.id == existing_plan.id))
-            if existing_plans:
-                session.commit()
 
         version_id = None
         if meta.version_name:
@@ -868,7 +1225,7 @@ def import_plans(
             rule_profile_id = rp.id
 
         plan = Plan(
-            account_id=account.id,
+            account_id=account_id,
             name=meta.name,
             status=meta.status,
             score=meta.score,
@@ -882,10 +1239,7 @@ def import_plans(
         plan.rules_snapshot = json.dumps(meta.rules_snapshot) if meta.rules_snapshot is not None else None
         plan.params_used = json.dumps(meta.params_used) if meta.params_used is not None else None
 
-        session.add(plan)
-        session.commit()
-        session.refresh(plan)
-
+        slot_rows: List[dict] = []
         for slot_data in item.slots:
             cls = class_map.get(slot_data.class_name)
             subject = subject_map.get(slot_data.subject_name)
@@ -901,18 +1255,252 @@ def import_plans(
                 if not room:
                     raise HTTPException(status_code=400, detail=f"Raum '{slot_data.room_name}' nicht gefunden. Bitte zuerst Räume importieren.")
                 room_id = room.id
-            slot = PlanSlot(
-                account_id=account.id,
-                plan_id=plan.id,
-                class_id=cls.id,
-                subject_id=subject.id,
-                teacher_id=teacher.id,
-                room_id=room_id,
-                tag=slot_data.tag,
-                stunde=slot_data.stunde,
+            slot_rows.append(
+                {
+                    "class_id": cls.id,
+                    "subject_id": subject.id,
+                    "teacher_id": teacher.id,
+                    "room_id": room_id,
+                    "tag": slot_data.tag,
+                    "stunde": slot_data.stunde,
+                }
             )
-            session.add(slot)
+        persist_plan_with_slots(session, plan, slot_rows, commit=False)
+        created += 1
+    return created
+
+
+@router.post("/import/plans")
+def import_plans(
+    payload: PlansExport,
+    account_id: Optional[int] = Query(None),
+    session: Session = Depends(get_session),
+    replace: bool = Query(False, description="Vorhandene Pläne mit gleichem Namen vor dem Import löschen"),
+) -> Dict[str, int]:
+    account = resolve_account(session, account_id)
+    if not payload.plans:
+        raise HTTPException(status_code=400, detail="Keine Pläne im Payload.")
+    try:
+        created = _import_plan_items(session, account.id, payload.plans, replace)
         session.commit()
-        created_plan_ids.append(plan.id)
+    except Exception:
+        session.rollback()
+        raise
+    return {"count": created}
+
+
+STREAM_RECORD_MODELS: Dict[str, Optional[type]] = {
+    "teacher": BackupTeacher,
+    "room": BackupRoom,
+    "class": BackupClass,
+    "subject": BackupSubject,
+    "curriculum": BackupCurriculumItem,
+    "requirement": BackupRequirementItem,
+    "rule_profile": None,  # raw dict, like BackupPayload.rule_profiles
+    "version": DistributionVersionExport,
+    "version_requirement": BackupRequirementItem,
+    "plan": PlanExportItem,
+}
+
+
+class _NdjsonImporter:
+    """Apply NDJSON export records in bounded batches within the session's transaction.
+
+    Consecutive records of one type are buffered and handed to the same
+    helpers as the JSON imports once the batch is full or the type changes;
+    the caller commits after ``finish`` or rolls back on error.
+    """
+
+    def __init__(self, session: Session, account_id: int, replace: bool, batch_size: int) -> None:
+        self.session = session
+        self.account_id = account_id
+        self.replace = replace
+        self.batch_size = batch_size
+        self.line_no = 0
+        self.batch_type: Optional[str] = None
+        self.batch: List[object] = []
+        self.counts: Dict[str, int] = {}
+        self.subject_aliases: Dict[str, Optional[str]] = {}
+        # Set by the first master-data batch (with or without replace); bumps all revisions at the end
+        self.masterdata_written = False
+        self.version: Optional[DistributionVersion] = None
+        # Prefetched rows and lookups per table, loaded on first use and kept
+        # up to date by the import helpers, so batches never prefetch again
+        self.states: Dict[str, _TableState] = {}
+        self.plan_maps: Optional[Dict[str, Dict[str, object]]] = None
+
+    def feed(self, lines: Iterable[bytes]) -> None:
+        for raw in lines:
+            self.line_no += 1
+            raw = raw.strip()
+            if not raw:
+                continue
+            try:
+                record = json.loads(raw)
+                record_type = record["type"]
+                data = record["data"]
+            except (ValueError, KeyError, TypeError):
+                raise HTTPException(status_code=400, detail=f"Ungültige NDJSON-Zeile {self.line_no}.")
+            if record_type == "error":
+                raise HTTPException(status_code=400, detail=f"Export unvollständig: {data.get('detail')}")
+            if record_type not in STREAM_RECORD_MODELS:
+                raise HTTPException(status_code=400, detail=f"Unbekannter Datensatztyp '{record_type}' in Zeile {self.line_no}.")
+            model = STREAM_RECORD_MODELS[record_type]
+            try:
+                item = model.model_validate(data) if model else dict(data)
+            except (ValidationError, TypeError, ValueError):
+                raise HTTPException(status_code=400, detail=f"Ungültiger Datensatz in Zeile {self.line_no}.")
+
+            if record_type != self.batch_type:
+                self.flush()
+                self.batch_type = record_type
+            self.batch.append(item)
+            limit = STREAM_PLAN_BATCH_SIZE if record_type == "plan" else self.batch_size
+            if len(self.batch) >= min(limit, self.batch_size):
+                self.flush()
+
+    def flush(self) -> None:
+        if not self.batch:
+            return
+        record_type, items = self.batch_type, self.batch
+        self.batch = []
+        if record_type != "plan":
+            # Plans only read these tables; anything else may add rows to them
+            self.plan_maps = None
+        getattr(self, f"_apply_{record_type}")(items)
+        self.counts[record_type] = self.counts.get(record_type, 0) + len(items)
+
+    def finish(self) -> Dict[str, int]:
+        self.flush()
+        if self.subject_aliases:
+            _apply_subject_aliases(self.session, self.account_id, self.subject_aliases)
+        if self.masterdata_written:
+            bump_all_revisions(self.session, self.account_id)
+        return self.counts
+
+    def _state(self, table: str, loader: Callable[[Session, int], _TableState]) -> _TableState:
+        state = self.states.get(table)
+        if state is None:
+            state = self.states[table] = loader(self.session, self.account_id)
+        return state
+
+    def _teacher_ids(self) -> _IdLookup:
+        # kuerzel matches take precedence, like _teacher_id_lookup
+        return self._state("teacher", _teacher_state).ids("kuerzel", "name")
+
+    def _class_ids(self) -> _IdLookup:
+        return self._state("class", _class_state).ids("name")
+
+    def _subject_ids(self) -> _IdLookup:
+        return self._state("subject", _subject_state).ids("name")
+
+    def _prepare_masterdata(self) -> None:
+        # With replace the old master data goes before the first master-data batch is written
+        if self.replace and not self.masterdata_written:
+            _clear_masterdata(self.session, self.account_id)
+            self.states.clear()
+        self.masterdata_written = True
+
+    def _apply_teacher(self, items: List[BackupTeacher]) -> None:
+        self._prepare_masterdata()
+        _import_teachers(self.session, self.account_id, items, self._state("teacher", _teacher_state))
+
+    def _apply_room(self, items: List[BackupRoom]) -> None:
+        self._prepare_masterdata()
+        _import_rooms(self.session, self.account_id, items, self._state("room", _room_state))
+
+    def _apply_class(self, items: List[BackupClass]) -> None:
+        self._prepare_masterdata()
+        _import_classes(self.session, self.account_id, items, self._teacher_ids(), self._state("class", _class_state))
+
+    def _apply_subject(self, items: List[BackupSubject]) -> None:
+        self._prepare_masterdata()
+        _import_subjects(
+            self.session,
+            self.account_id,
+            items,
+            self._state("room", _room_state).ids("name"),
+            self._state("subject", _subject_state),
+        )
+        self.subject_aliases.update({bs.name: bs.alias_subject for bs in items})
+
+    def _apply_curriculum(self, items: List[BackupCurriculumItem]) -> None:
+        self._prepare_masterdata()
+        _import_curriculum(
+            self.session,
+            self.account_id,
+            items,
+            self._class_ids(),
+            self._subject_ids(),
+            self._state("curriculum", _curriculum_state),
+        )
+
+    def _apply_requirement(self, items: List[BackupRequirementItem]) -> None:
+        self._prepare_masterdata()
+        _import_requirements(
+            self.session,
+            self.account_id,
+            items,
+            self._class_ids(),
+            self._subject_ids(),
+            self._teacher_ids(),
+            self._state("requirement", _requirement_state),
+        )
+
+    def _apply_rule_profile(self, items: List[dict]) -> None:
+        self._prepare_masterdata()
+        _import_rule_profiles(self.session, self.account_id, items, self._state("rule_profile", _rule_profile_state))
+
+    def _apply_version(self, items: List[DistributionVersionExport]) -> None:
+        for item in items:
+            self.version = _upsert_distribution_version(self.session, self.account_id, item, self.replace)
+
+    def _apply_version_requirement(self, items: List[BackupRequirementItem]) -> None:
+        if self.version is None:
+            raise HTTPException(status_code=400, detail="Versionsinformationen fehlen.")
+        _insert_version_requirements(
+            self.session,
+            self.account_id,
+            self.version.id,
+            items,
+            (self._teacher_ids(), self._class_ids(), self._subject_ids()),
+        )
+
+    def _apply_plan(self, items: List[PlanExportItem]) -> None:
+        if self.plan_maps is None:
+            self.plan_maps = _plan_import_maps(self.session, self.account_id)
+        _import_plan_items(self.session, self.account_id, items, self.replace, self.plan_maps)
 
-    return {"count": len(created_plan_ids)}
+
+@router.post("/import/stream")
+async def import_stream(
+    request: Request,
+    account_id: Optional[int] = Query(None),
+    session: Session = Depends(get_session),
+    replace: bool = Query(False, description="Bestehende Daten ersetzen (wie bei den JSON-Importen)"),
+    batch_size: int = Query(STREAM_BATCH_SIZE, ge=1, le=5000, description="Datensätze pro Schreib-Batch"),
+) -> Dict[str, int]:
+    """Import NDJSON produced by the ``/export/.../stream`` endpoints.
+
+    The body is read incrementally; records are applied in batches and the
+    whole import is committed (or rolled back) as one transaction.
+    """
+    await run_in_threadpool(ensure_teacher_color_column, session)
+    account = await run_in_threadpool(resolve_account, session, account_id)
+    importer = _NdjsonImporter(session, account.id, replace=replace, batch_size=batch_size)
+    buffer = b""
+    try:
+        async for chunk in request.stream():
+            buffer += chunk
+            lines = buffer.split(b"\n")
+            buffer = lines.pop()
+            if lines:
+                await run_in_threadpool(importer.feed, lines)
+        await run_in_threadpool(importer.feed, [buffer])
+        counts = await run_in_threadpool(importer.finish)
+        await run_in_threadpool(session.commit)
+    except Exception:
+        await run_in_threadpool(session.rollback)
+        raise
+    await run_in_threadpool(session.expire_all)
+    return counts
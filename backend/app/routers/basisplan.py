@@ -1,20 +1,37 @@
 from __future__ import annotations
 
-import json
 from datetime import datetime, timezone
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, Optional
 
 import pandas as pd
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlmodel import Session, select
 
 from ..core.security import require_active_user, require_admin_user
 from ..database import get_session
 from ..models import BasisPlan
-from ..schemas import BasisPlanData, BasisPlanOut, BasisPlanUpdate, BasisPlanPreviewRequest
+from ..schemas import (
+    BasisPlanAvailabilityPatch,
+    BasisPlanData,
+    BasisPlanFixedPatch,
+    BasisPlanFlexiblePatch,
+    BasisPlanOut,
+    BasisPlanPatchResult,
+    BasisPlanPreviewRequest,
+    BasisPlanUpdate,
+)
 from ..domain.accounts.service import resolve_account, resolve_planning_period
-from ..domain.planner.basis_parser import BasisPlanParser
+from ..domain.planner.basis_parser import BasisPlanParser, invalidate_basis_plan_cache
+from ..domain.planner.basis_store import (
+    apply_availability_changes,
+    apply_fixed_patch,
+    apply_flexible_patch,
+    ensure_normalized,
+    load_basis_document,
+    save_basis_document,
+)
 from ..domain.planner.data_access import fetch_requirements_dataframe
+from ..services.revisions import not_modified, set_revision_headers
 from ..models import Class as ClassModel, Subject as SubjectModel
 from sqlalchemy import text
 
@@ -30,17 +47,13 @@ def _ensure_basisplan_columns(session: Session) -> None:
     if "planning_period_id" not in columns:
         session.exec(text("ALTER TABLE basisplan ADD COLUMN planning_period_id INTEGER"))
         session.commit()
+    if "storage_version" not in columns:
+        session.exec(text("ALTER TABLE basisplan ADD COLUMN storage_version INTEGER NOT NULL DEFAULT 1"))
+        session.commit()
 
 
-def _load_data(row: BasisPlan) -> BasisPlanData:
-    raw: Dict[str, Any] = {}
-    if row.data:
-        try:
-            raw = json.loads(row.data)
-        except json.JSONDecodeError:
-            raw = {}
-    if not isinstance(raw, dict):
-        raw = {}
+def _load_data(session: Session, row: BasisPlan) -> BasisPlanData:
+    raw = load_basis_document(session, row)
     raw.setdefault("meta", DEFAULT_META.copy())
     raw.setdefault("classes", {})
     raw.setdefault("rooms", {})
@@ -78,15 +91,22 @@ def _ensure_row(session: Session, account_id: int, planning_period_id: int) -> B
 
 @router.get("", response_model=BasisPlanOut)
 def get_basisplan(
+    request: Request,
+    response: Response,
     account_id: Optional[int] = Query(None),
     planning_period_id: Optional[int] = Query(None),
     session: Session = Depends(get_session),
-) -> BasisPlanOut:
+):
     _ensure_basisplan_columns(session)
     account = resolve_account(session, account_id)
     period = resolve_planning_period(session, account, planning_period_id)
+    scope = f"period:{period.id}"
+    cached = not_modified(request, session, account.id, BasisPlan.__tablename__, scope=scope)
+    if cached:
+        return cached
     row = _ensure_row(session, account.id, period.id)
-    data = _load_data(row)
+    set_revision_headers(response, request, session, account.id, BasisPlan.__tablename__, scope=scope)
+    data = _load_data(session, row)
     return BasisPlanOut(
         id=row.id,
         name=row.name,
@@ -111,15 +131,16 @@ def update_basisplan(
     if "name" in payload_data and payload_data["name"]:
         row.name = payload_data["name"]
     if "data" in payload_data and payload_data["data"] is not None:
-        row.data = json.dumps(payload_data["data"])
+        save_basis_document(session, row, payload_data["data"])
     elif row.data is None:
-        row.data = json.dumps(BasisPlanData().model_dump())
+        save_basis_document(session, row, BasisPlanData().model_dump())
     row.updated_at = datetime.now(timezone.utc)
     row.planning_period_id = period.id
     session.add(row)
     session.commit()
     session.refresh(row)
-    data = _load_data(row)
+    invalidate_basis_plan_cache(account.id, period.id)
+    data = _load_data(session, row)
     return BasisPlanOut(
         id=row.id,
         name=row.name,
@@ -129,6 +150,86 @@ def update_basisplan(
     )
 
 
+def _patch_basisplan(
+    session: Session,
+    account_id: Optional[int],
+    planning_period_id: Optional[int],
+    apply: Callable[[int], int],
+) -> BasisPlanPatchResult:
+    """Apply a partial update to the basis plan tables; the document is never rewritten."""
+    _ensure_basisplan_columns(session)
+    account = resolve_account(session, account_id)
+    period = resolve_planning_period(session, account, planning_period_id)
+    row = _ensure_row(session, account.id, period.id)
+    try:
+        ensure_normalized(session, row)
+        changed = apply(row.id)
+        if changed:
+            row.updated_at = datetime.now(timezone.utc)
+            session.add(row)
+        session.commit()
+    except ValueError as exc:
+        session.rollback()
+        raise HTTPException(status_code=400, detail=str(exc))
+    except Exception:
+        session.rollback()
+        raise
+    session.refresh(row)
+    if changed:
+        invalidate_basis_plan_cache(account.id, period.id)
+    return BasisPlanPatchResult(
+        id=row.id,
+        updated_at=row.updated_at,
+        planning_period_id=row.planning_period_id,
+        changed=changed,
+    )
+
+
+@router.patch("/availability", response_model=BasisPlanPatchResult)
+def patch_basisplan_availability(
+    payload: BasisPlanAvailabilityPatch,
+    account_id: Optional[int] = Query(None),
+    planning_period_id: Optional[int] = Query(None),
+    session: Session = Depends(get_session),
+) -> BasisPlanPatchResult:
+    return _patch_basisplan(
+        session,
+        account_id,
+        planning_period_id,
+        lambda basis_plan_id: apply_availability_changes(session, basis_plan_id, payload.changes),
+    )
+
+
+@router.patch("/fixed", response_model=BasisPlanPatchResult)
+def patch_basisplan_fixed(
+    payload: BasisPlanFixedPatch,
+    account_id: Optional[int] = Query(None),
+    planning_period_id: Optional[int] = Query(None),
+    session: Session = Depends(get_session),
+) -> BasisPlanPatchResult:
+    return _patch_basisplan(
+        session,
+        account_id,
+        planning_period_id,
+        lambda basis_plan_id: apply_fixed_patch(session, basis_plan_id, payload.upsert, payload.remove),
+    )
+
+
+@router.patch("/flexible", response_model=BasisPlanPatchResult)
+def patch_basisplan_flexible(
+    payload: BasisPlanFlexiblePatch,
+    account_id: Optional[int] = Query(None),
+    planning_period_id: Optional[int] = Query(None),
+    session: Session = Depends(get_session),
+) -> BasisPlanPatchResult:
+    return _patch_basisplan(
+        session,
+        account_id,
+        planning_period_id,
+        lambda basis_plan_id: apply_flexible_patch(session, basis_plan_id, payload.upsert, payload.remove),
+    )
+
+
 @router.post("/debug/parse")
 def preview_basisplan(
     body: BasisPlanPreviewRequest | None = None,
@@ -141,7 +242,7 @@ def preview_basisplan(
     _ensure_basisplan_columns(session)
     account = resolve_account(session, account_id)
     period = resolve_planning_period(session, account, planning_period_id)
-    row = _ensure_row(session, account.id, period.id)
+    _ensure_row(session, account.id, period.id)
     df, FACH_ID, _, _, _, _ = fetch_requirements_dataframe(
         session,
         account_id=account.id,
@@ -156,8 +257,12 @@ def preview_basisplan(
     subject_id_to_name = {row.id: row.name for row in subject_rows}
     class_id_to_name = {row.id: row.name for row in class_rows}
     parser = BasisPlanParser(session)
-    payload_dict = body.payload.model_dump() if body and body.payload else _load_data(row).model_dump()
-    context = parser.parse_from_payload(payload_dict, df, FACH_ID, class_id_to_name, subject_id_to_name)
+    if body and body.payload:
+        context = parser.parse_from_payload(body.payload.model_dump(), df, FACH_ID, class_id_to_name, subject_id_to_name)
+    else:
+        # Same cached, normalized document the generator uses
+        normalized = parser.load_normalized(account.id, period.id)
+        context = parser.bind(normalized, df, FACH_ID, class_id_to_name, subject_id_to_name)
     return _serialize_context(context)
 
 
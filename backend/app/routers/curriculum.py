@@ -2,15 +2,17 @@ from __future__ import annotations
 
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy import text
-from sqlmodel import Session, select
+from sqlmodel import Session
 
+from ..core.pagination import MAX_PAGE_SIZE, list_model_page
 from ..core.security import require_active_user
 from ..database import get_session
 from ..models import Class, ClassSubject, Subject, RequirementParticipationEnum, DoppelstundeEnum, NachmittagEnum
 from ..domain.accounts.service import resolve_account, resolve_planning_period
 from ..services.subject_config import sync_requirements_for_class_subject
+from ..utils import claim_unassigned_rows
 
 
 router = APIRouter(prefix="/curriculum", tags=["curriculum"], dependencies=[Depends(require_active_user)])
@@ -38,30 +40,26 @@ def _ensure_curriculum_columns(session: Session) -> None:
 
 @router.get("", response_model=List[ClassSubject])
 def list_curriculum(
+    response: Response,
+    class_id: Optional[int] = Query(None),
+    subject_id: Optional[int] = Query(None),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None),
+    fields: Optional[str] = Query(None),
     account_id: Optional[int] = Query(None),
     planning_period_id: Optional[int] = Query(None),
     session: Session = Depends(get_session),
-) -> List[ClassSubject]:
+):
     _ensure_curriculum_columns(session)
     account = resolve_account(session, account_id)
     period = resolve_planning_period(session, account, planning_period_id)
-    stmt = select(ClassSubject).where(
-        ClassSubject.account_id == account.id,
-        (ClassSubject.planning_period_id == period.id) | (ClassSubject.planning_period_id == None),  # noqa: E711
-    )
-    rows = session.exec(stmt).all()
-    dirty = False
-    filtered: List[ClassSubject] = []
-    for row in rows:
-        if row.planning_period_id is None:
-            row.planning_period_id = period.id
-            session.add(row)
-            dirty = True
-        if row.planning_period_id == period.id:
-            filtered.append(row)
-    if dirty:
-        session.commit()
-    return filtered
+    claim_unassigned_rows(session, ClassSubject, account.id, period.id)
+    filters = [ClassSubject.account_id == account.id, ClassSubject.planning_period_id == period.id]
+    if class_id is not None:
+        filters.append(ClassSubject.class_id == class_id)
+    if subject_id is not None:
+        filters.append(ClassSubject.subject_id == subject_id)
+    return list_model_page(session, ClassSubject, filters, response, limit=limit, cursor=cursor, fields=fields)
 
 
 @router.post("", response_model=ClassSubject)
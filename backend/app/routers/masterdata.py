@@ -2,14 +2,16 @@ from __future__ import annotations
 
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlmodel import Session, select
 from sqlalchemy import text
 
+from ..core.pagination import MAX_PAGE_SIZE, list_model_page
 from ..core.security import require_active_user
 from ..database import get_session
 from ..models import Class, Subject, Teacher, Room, Requirement, PlanSlot, ClassSubject
 from ..domain.accounts.service import resolve_account
+from ..services.revisions import not_modified, set_revision_headers
 from ..services.subject_config import sync_requirements_for_subject
 from ..utils import ensure_teacher_color_column, next_teacher_color, normalize_hex_color
 
@@ -27,12 +29,23 @@ def _ensure_subject_alias_column(session: Session) -> None:
 
 @router.get("/teachers", response_model=List[Teacher])
 def list_teachers(
+    request: Request,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None),
+    fields: Optional[str] = Query(None),
     account_id: Optional[int] = Query(None),
     session: Session = Depends(get_session),
-) -> List[Teacher]:
+):
     account = resolve_account(session, account_id)
     ensure_teacher_color_column(session)
-    return session.exec(select(Teacher).where(Teacher.account_id == account.id)).all()
+    cached = not_modified(request, session, account.id, Teacher.__tablename__)
+    if cached:
+        return cached
+    set_revision_headers(response, request, session, account.id, Teacher.__tablename__)
+    return list_model_page(
+        session, Teacher, [Teacher.account_id == account.id], response, limit=limit, cursor=cursor, fields=fields
+    )
 
 
 @router.post("/teachers", response_model=Teacher)
@@ -179,11 +192,24 @@ def delete_teacher(
 
 @router.get("/classes", response_model=List[Class])
 def list_classes(
+    request: Request,
+    response: Response,
+    homeroom_teacher_id: Optional[int] = Query(None),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None),
+    fields: Optional[str] = Query(None),
     account_id: Optional[int] = Query(None),
     session: Session = Depends(get_session),
-) -> List[Class]:
+):
     account = resolve_account(session, account_id)
-    return session.exec(select(Class).where(Class.account_id == account.id)).all()
+    cached = not_modified(request, session, account.id, Class.__tablename__)
+    if cached:
+        return cached
+    set_revision_headers(response, request, session, account.id, Class.__tablename__)
+    filters = [Class.account_id == account.id]
+    if homeroom_teacher_id is not None:
+        filters.append(Class.homeroom_teacher_id == homeroom_teacher_id)
+    return list_model_page(session, Class, filters, response, limit=limit, cursor=cursor, fields=fields)
 
 
 @router.post("/classes", response_model=Class)
@@ -278,12 +304,23 @@ def delete_class(
 
 @router.get("/subjects", response_model=List[Subject])
 def list_subjects(
+    request: Request,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None),
+    fields: Optional[str] = Query(None),
     account_id: Optional[int] = Query(None),
     session: Session = Depends(get_session),
-) -> List[Subject]:
+):
     _ensure_subject_alias_column(session)
     account = resolve_account(session, account_id)
-    return session.exec(select(Subject).where(Subject.account_id == account.id)).all()
+    cached = not_modified(request, session, account.id, Subject.__tablename__)
+    if cached:
+        return cached
+    set_revision_headers(response, request, session, account.id, Subject.__tablename__)
+    return list_model_page(
+        session, Subject, [Subject.account_id == account.id], response, limit=limit, cursor=cursor, fields=fields
+    )
 
 
 @router.post("/subjects", response_model=Subject)
@@ -0,0 +1,14 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, Response
+
+from ..core.metrics import render_metrics
+
+router = APIRouter(tags=['metrics'])
+
+
+@router.get('/metrics', include_in_schema=False)
+def get_metrics() -> Response:
+    """Prometheus exposition format (all uvicorn workers with STUNDENPLAN_METRICS_MULTIPROC_DIR)."""
+    payload, content_type = render_metrics()
+    return Response(content=payload, media_type=content_type)
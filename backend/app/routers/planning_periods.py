@@ -1,9 +1,11 @@
 from __future__ import annotations
 
+import time
 from datetime import datetime, timezone
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 
 from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, case, cast, func, insert, literal
 from sqlmodel import Session, select
 
 from ..core.security import require_active_user
@@ -12,19 +14,33 @@ from ..models import (
     PlanningPeriod,
     Requirement,
     Plan,
+    PlanMatrix,
     PlanSlot,
     DistributionVersion,
     BasisPlan,
     ClassSubject,
 )
-from ..schemas import PlanningPeriodCreate, PlanningPeriodUpdate, PlanningPeriodOut, PlanningPeriodCloneRequest
+from ..schemas import (
+    PlanningPeriodCloneOut,
+    PlanningPeriodCloneRequest,
+    PlanningPeriodCreate,
+    PlanningPeriodOut,
+    PlanningPeriodUpdate,
+)
 from ..domain.accounts.service import resolve_account
+from ..domain.planner.basis_store import copy_basis_document
+from ..services.revisions import bump_revision
 
 
 router = APIRouter(prefix="/planning-periods", tags=["planning-periods"], dependencies=[Depends(require_active_user)])
 
 
-def _deactivate_other_periods(session: Session, account_id: int, active_period_id: int) -> None:
+def _deactivate_other_periods(
+    session: Session,
+    account_id: int,
+    active_period_id: int,
+    commit: bool = True,
+) -> None:
     others = session.exec(
         select(PlanningPeriod).where(
             PlanningPeriod.account_id == account_id,
@@ -36,7 +52,7 @@ def _deactivate_other_periods(session: Session, account_id: int, active_period_i
         other.is_active = False
         other.updated_at = datetime.now(timezone.utc)
         session.add(other)
-    if others:
+    if others and commit:
         session.commit()
 
 
@@ -213,13 +229,191 @@ def delete_planning_period(
     return {"ok": True}
 
 
-@router.post("/{period_id}/clone", response_model=PlanningPeriodOut)
+def _temp_id_map(session: Session, name: str) -> Table:
+    """Create (or empty) a connection-local old_id → new_id mapping table."""
+    table = Table(
+        name,
+        MetaData(),
+        Column("old_id", Integer, primary_key=True),
+        Column("new_id", Integer, nullable=False),
+        prefixes=["TEMPORARY"],
+    )
+    table.create(session.connection(), checkfirst=True)
+    session.execute(table.delete())
+    return table
+
+
+def _copy_period_rows(
+    session: Session,
+    table: Table,
+    account_id: int,
+    source_period_id: int,
+    overrides: Dict[str, object],
+    join: Optional[Tuple[Table, object]] = None,
+    limit: Optional[int] = None,
+) -> int:
+    """``INSERT INTO table SELECT …`` of all rows of the source period.
+
+    ``overrides`` replaces individual column expressions (e.g. the target
+    period id); rows are inserted in source id order so that new ids can be
+    paired with old ones by rank.
+    """
+    src = table.alias("src")
+    columns = [name for name in table.c.keys() if name != "id"]
+    exprs = []
+    for name in columns:
+        override = overrides.get(name, src.c[name])
+        exprs.append(override(src) if callable(override) else override)
+    if join is not None:
+        join_table, on_clause = join
+        stmt = select(*exprs).select_from(src.join(join_table, on_clause(src)))
+    else:
+        stmt = select(*exprs).select_from(src).where(src.c.planning_period_id == source_period_id)
+    stmt = stmt.where(src.c.account_id == account_id).order_by(*src.primary_key)
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    result = session.execute(insert(table).from_select(columns, stmt))
+    return max(result.rowcount or 0, 0)
+
+
+def _fill_id_map(
+    session: Session,
+    id_map: Table,
+    table: Table,
+    account_id: int,
+    source_period_id: int,
+    target_period_id: int,
+) -> None:
+    """Pair source and cloned row ids by their rank within each period."""
+
+    def ranked(period_id: int):
+        return (
+            select(table.c.id, func.row_number().over(order_by=table.c.id).label("rn"))
+            .where(table.c.account_id == account_id, table.c.planning_period_id == period_id)
+            .subquery()
+        )
+
+    old, new = ranked(source_period_id), ranked(target_period_id)
+    session.execute(
+        insert(id_map).from_select(
+            ["old_id", "new_id"],
+            select(old.c.id, new.c.id).select_from(old.join(new, old.c.rn == new.c.rn)),
+        )
+    )
+
+
+def _period_basisplan(session: Session, account_id: int, period_id: int) -> BasisPlan:
+    return session.exec(
+        select(BasisPlan)
+        .where(BasisPlan.account_id == account_id, BasisPlan.planning_period_id == period_id)
+        .order_by(BasisPlan.id)
+    ).first()
+
+
+def _clone_period_data(
+    session: Session,
+    account_id: int,
+    source: PlanningPeriod,
+    target: PlanningPeriod,
+    payload: PlanningPeriodCloneRequest,
+) -> Dict[str, int]:
+    """Copy the selected data of ``source`` into ``target`` with set-based statements.
+
+    Runs inside the caller's transaction; version and plan ids are remapped via
+    temporary tables that are dropped again before returning.
+    """
+    now = literal(datetime.now(timezone.utc), DateTime)
+    target_id = literal(target.id, Integer)
+    copied: Dict[str, int] = {}
+
+    if payload.copy_curriculum:
+        copied["curriculum"] = _copy_period_rows(
+            session, ClassSubject.__table__, account_id, source.id, {"planning_period_id": target_id}
+        )
+
+    version_map = _temp_id_map(session, "clone_version_map")
+    if payload.copy_versions:
+        versions = DistributionVersion.__table__
+
+        def clone_name(src):
+            # Same naming as _next_available_version_name: "<name> (<period>)", then " (2)", " (3)", …
+            rank = func.row_number().over(partition_by=src.c.name, order_by=src.c.id)
+            suffix = case((rank > 1, " (" + cast(rank, String) + ")"), else_="")
+            return src.c.name + f" ({target.name})" + suffix
+
+        copied["versions"] = _copy_period_rows(
+            session,
+            versions,
+            account_id,
+            source.id,
+            {"planning_period_id": target_id, "name": clone_name, "created_at": now, "updated_at": now},
+        )
+        _fill_id_map(session, version_map, versions, account_id, source.id, target.id)
+
+    def cloned_version(src):
+        # Without copied versions the clones are unversioned (as before).
+        return select(version_map.c.new_id).where(version_map.c.old_id == src.c.version_id).scalar_subquery()
+
+    if payload.copy_requirements:
+        copied["requirements"] = _copy_period_rows(
+            session,
+            Requirement.__table__,
+            account_id,
+            source.id,
+            {"planning_period_id": target_id, "version_id": cloned_version},
+        )
+
+    if payload.copy_basisplan:
+        copied["basisplan"] = _copy_period_rows(
+            session,
+            BasisPlan.__table__,
+            account_id,
+            source.id,
+            {"planning_period_id": target_id, "updated_at": now},
+            limit=1,
+        )
+        if copied["basisplan"]:
+            # Normalized plans keep slots and groups in child tables
+            copy_basis_document(
+                session,
+                _period_basisplan(session, account_id, source.id),
+                _period_basisplan(session, account_id, target.id),
+            )
+        bump_revision(session, account_id, BasisPlan.__tablename__)
+
+    if payload.copy_plans:
+        plans = Plan.__table__
+        plan_map = _temp_id_map(session, "clone_plan_map")
+        copied["plans"] = _copy_period_rows(
+            session,
+            plans,
+            account_id,
+            source.id,
+            {"planning_period_id": target_id, "version_id": cloned_version},
+        )
+        _fill_id_map(session, plan_map, plans, account_id, source.id, target.id)
+        remap_plan = {"plan_id": plan_map.c.new_id, "planning_period_id": target_id}
+        on_plan = (plan_map, lambda src: plan_map.c.old_id == src.c.plan_id)
+        copied["plan_slots"] = _copy_period_rows(
+            session, PlanSlot.__table__, account_id, source.id, remap_plan, join=on_plan
+        )
+        _copy_period_rows(
+            session, PlanMatrix.__table__, account_id, source.id, {**remap_plan, "updated_at": now}, join=on_plan
+        )
+        plan_map.drop(session.connection())
+
+    version_map.drop(session.connection())
+    return copied
+
+
+@router.post("/{period_id}/clone", response_model=PlanningPeriodCloneOut)
 def clone_planning_period(
     period_id: int,
     payload: PlanningPeriodCloneRequest,
     account_id: Optional[int] = Query(None),
     session: Session = Depends(get_session),
-) -> PlanningPeriodOut:
+) -> PlanningPeriodCloneOut:
+    started = time.perf_counter()
     account = resolve_account(session, account_id)
     source = session.get(PlanningPeriod, period_id)
     if not source or source.account_id != account.id:
@@ -236,105 +430,19 @@ def clone_planning_period(
         created_at=datetime.now(timezone.utc),
         updated_at=datetime.now(timezone.utc),
     )
-    session.add(new_period)
-    session.commit()
-    session.refresh(new_period)
-
-    if new_period.is_active:
-        _deactivate_other_periods(session, account.id, new_period.id)
-
-    if payload.copy_curriculum:
-        curriculum_rows = session.exec(
-            select(ClassSubject).where(
-                ClassSubject.account_id == account.id,
-                ClassSubject.planning_period_id == source.id,
-            )
-        ).all()
-        for row in curriculum_rows:
-            session.add(
-                ClassSubject(
-                    account_id=account.id,
-                    planning_period_id=new_period.id,
-                    class_id=row.class_id,
-                    subject_id=row.subject_id,
-                    wochenstunden=row.wochenstunden,
-                    participation=row.participation,
-                    doppelstunde=row.doppelstunde,
-                    nachmittag=row.nachmittag,
-                )
-            )
-        if curriculum_rows:
-            session.commit()
-
-    version_map: dict[int, int] = {}
-    if payload.copy_versions:
-        versions = session.exec(
-            select(DistributionVersion).where(
-                DistributionVersion.account_id == account.id,
-                DistributionVersion.planning_period_id == source.id,
-            )
-        ).all()
-        for version in versions:
-            base_name = f"{version.name} ({new_period.name})"
-            clone_name = _next_available_version_name(session, account.id, base_name, new_period.id)
-            clone = DistributionVersion(
-                account_id=account.id,
-                planning_period_id=new_period.id,
-                name=clone_name,
-                comment=version.comment,
-                created_at=datetime.now(timezone.utc),
-                updated_at=datetime.now(timezone.utc),
-            )
-            session.add(clone)
-            session.commit()
-            session.refresh(clone)
-            version_map[version.id] = clone.id
-
-    if payload.copy_requirements:
-        requirements = session.exec(
-            select(Requirement).where(
-                Requirement.account_id == account.id,
-                Requirement.planning_period_id == source.id,
-            )
-        ).all()
-        for req in requirements:
-            clone_version_id = version_map.get(req.version_id) if version_map else None
-            session.add(
-                Requirement(
-                    account_id=account.id,
-                    class_id=req.class_id,
-                    subject_id=req.subject_id,
-                    teacher_id=req.teacher_id,
-                    wochenstunden=req.wochenstunden,
-                    doppelstunde=req.doppelstunde,
-                    nachmittag=req.nachmittag,
-                    participation=req.participation,
-                    config_source=req.config_source,
-                    version_id=clone_version_id,
-                    planning_period_id=new_period.id,
-                )
-            )
-        if requirements:
-            session.commit()
-
-    if payload.copy_basisplan:
-        basis_plan = session.exec(
-            select(BasisPlan).where(
-                BasisPlan.account_id == account.id,
-                BasisPlan.planning_period_id == source.id,
-            )
-        ).first()
-        if basis_plan:
-            session.add(
-                BasisPlan(
-                    account_id=account.id,
-                    planning_period_id=new_period.id,
-                    name=basis_plan.name,
-                    data=basis_plan.data,
-                    updated_at=datetime.now(timezone.utc),
-                )
-            )
-            session.commit()
+    try:
+        session.add(new_period)
+        session.flush()
+        if new_period.is_active:
+            _deactivate_other_periods(session, account.id, new_period.id, commit=False)
+        copied = _clone_period_data(session, account.id, source, new_period, payload)
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
 
     session.refresh(new_period)
-    return PlanningPeriodOut.from_orm(new_period)
+    result = PlanningPeriodCloneOut.from_orm(new_period)
+    result.copied = copied
+    result.elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+    return result
@@ -1,10 +1,12 @@
 from __future__ import annotations
 
-from typing import List, Optional
+from typing import List, Optional, Union
 
 from fastapi import APIRouter, Depends, HTTPException, Response, Query
+from fastapi.responses import JSONResponse
 from sqlmodel import Session, select
 
+from ..core.pagination import MAX_PAGE_SIZE, NEXT_CURSOR_HEADER, parse_fields
 from ..core.security import require_active_user
 from ..database import get_session
 from ..models import Plan, DistributionVersion
@@ -13,9 +15,13 @@ from ..schemas import (
     GenerateRequest,
     GenerateResponse,
     PlanDetail,
+    PlanDiff,
+    PlanMatrixDetail,
+    PlanSlotsPatchRequest,
     PlanSlotsUpdateRequest,
     PlanSummary,
     PlanUpdateRequest,
+    SolverProgressOut,
 )
 from ..domain.planner.rules_config import get_rule_definitions
 from ..domain.planner.service import PlannerService
@@ -33,12 +39,25 @@ def get_plan_query_service(session: Session = Depends(get_session)) -> PlanQuery
 
 @router.get("", response_model=List[PlanSummary])
 def list_plans(
-    limit: Optional[int] = None,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None),
+    version_id: Optional[int] = Query(None),
+    fields: Optional[str] = Query(None),
     account_id: Optional[int] = Query(None),
     planning_period_id: Optional[int] = Query(None),
     plan_service: PlanQueryService = Depends(get_plan_query_service),
-) -> List[PlanSummary]:
-    return plan_service.list_plans_for_request(account_id, planning_period_id, limit)
+):
+    selected = parse_fields(fields, PlanSummary.model_fields)
+    page = plan_service.list_plans_for_request(
+        account_id, planning_period_id, limit, cursor=cursor, version_id=version_id
+    )
+    headers = {NEXT_CURSOR_HEADER: page.next_cursor} if page.next_cursor else {}
+    if selected is not None:
+        content = [summary.model_dump(mode="json", include=set(selected)) for summary in page.rows]
+        return JSONResponse(content, headers=headers)
+    response.headers.update(headers)
+    return page.rows
 
 
 @router.get("/rules")
@@ -70,14 +89,37 @@ def generate_plan(
 ) -> GenerateResponse:
     return planner.generate_plan(req, account_id, planning_period_id)
 
-@router.get("/{plan_id}", response_model=PlanDetail)
+@router.get("/{plan_id}", response_model=Union[PlanDetail, PlanMatrixDetail])
 def get_plan(
     plan_id: int,
+    format: str = Query("slots", description="slots (Liste je Stunde) oder matrix (kompakte Arrays je Klasse)"),
     account_id: Optional[int] = Query(None),
     planning_period_id: Optional[int] = Query(None),
     plan_service: PlanQueryService = Depends(get_plan_query_service),
-) -> PlanDetail:
-    return plan_service.get_plan_detail_for_request(plan_id, account_id, planning_period_id)
+) -> Union[PlanDetail, PlanMatrixDetail]:
+    return plan_service.get_plan_detail_for_request(plan_id, account_id, planning_period_id, format=format)
+
+
+@router.get("/{plan_id}/diff/{other_plan_id}", response_model=PlanDiff)
+def diff_plans(
+    plan_id: int,
+    other_plan_id: int,
+    account_id: Optional[int] = Query(None),
+    planning_period_id: Optional[int] = Query(None),
+    plan_service: PlanQueryService = Depends(get_plan_query_service),
+) -> PlanDiff:
+    return plan_service.diff_plans_for_request(plan_id, other_plan_id, account_id, planning_period_id)
+
+
+@router.get("/{plan_id}/solver-progress", response_model=SolverProgressOut)
+def get_solver_progress(
+    plan_id: int,
+    account_id: Optional[int] = Query(None),
+    planning_period_id: Optional[int] = Query(None),
+    plan_service: PlanQueryService = Depends(get_plan_query_service),
+) -> SolverProgressOut:
+    """Search progress of the plan's solve as ``[t, objective, bound, gap]`` events."""
+    return plan_service.get_solver_progress_for_request(plan_id, account_id, planning_period_id)
 
 
 @router.put("/{plan_id}", response_model=Plan)
@@ -102,6 +144,18 @@ def replace_plan_slots(
     return plan_service.replace_plan_slots_for_request(plan_id, payload, account_id, planning_period_id)
 
 
+@router.patch("/{plan_id}/slots", response_model=PlanDetail)
+def patch_plan_slots(
+    plan_id: int,
+    payload: PlanSlotsPatchRequest,
+    account_id: Optional[int] = Query(None),
+    planning_period_id: Optional[int] = Query(None),
+    plan_service: PlanQueryService = Depends(get_plan_query_service),
+) -> PlanDetail:
+    """Apply only the changed cells (upserts in ``slots``, clears in ``remove``)."""
+    return plan_service.patch_plan_slots_for_request(plan_id, payload, account_id, planning_period_id)
+
+
 @router.delete("/{plan_id}", status_code=204)
 def delete_plan(
     plan_id: int,
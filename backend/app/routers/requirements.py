@@ -2,9 +2,10 @@ from __future__ import annotations
 
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlmodel import Session, select
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlmodel import Session
 
+from ..core.pagination import MAX_PAGE_SIZE, list_model_page
 from ..core.security import require_active_user
 from ..database import get_session
 from ..models import (
@@ -17,7 +18,7 @@ from ..models import (
 )
 from ..domain.accounts.service import resolve_account, resolve_planning_period
 from ..services.subject_config import apply_subject_defaults
-from ..utils import ensure_requirement_columns
+from ..utils import claim_unassigned_rows, ensure_requirement_columns
 
 
 router = APIRouter(prefix="/requirements", tags=["requirements"], dependencies=[Depends(require_active_user)])
@@ -25,18 +26,22 @@ router = APIRouter(prefix="/requirements", tags=["requirements"], dependencies=[
 
 @router.get("", response_model=List[Requirement])
 def list_requirements(
+    response: Response,
     version_id: Optional[int] = None,
+    class_id: Optional[int] = Query(None),
+    teacher_id: Optional[int] = Query(None),
+    subject_id: Optional[int] = Query(None),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="Wert aus dem Header X-Next-Cursor der vorherigen Seite"),
+    fields: Optional[str] = Query(None, description="Kommagetrennte Spaltenliste, z. B. id,class_id,wochenstunden"),
     account_id: Optional[int] = Query(None),
     planning_period_id: Optional[int] = Query(None),
     session: Session = Depends(get_session),
-) -> List[Requirement]:
+):
     account = resolve_account(session, account_id)
     period = resolve_planning_period(session, account, planning_period_id)
     ensure_requirement_columns(session)
-    stmt = select(Requirement).where(Requirement.account_id == account.id)
-    stmt = stmt.where(
-        (Requirement.planning_period_id == period.id) | (Requirement.planning_period_id == None)  # noqa: E711
-    )
+    filters = [Requirement.account_id == account.id, Requirement.planning_period_id == period.id]
     if version_id is not None:
         version = session.get(DistributionVersion, version_id)
         if not version or version.account_id != account.id:
@@ -51,20 +56,15 @@ def list_requirements(
             session.add(version)
             session.commit()
             session.refresh(version)
-        stmt = stmt.where(Requirement.version_id == version_id)
-    rows = session.exec(stmt).all()
-    dirty = False
-    filtered: List[Requirement] = []
-    for row in rows:
-        if row.planning_period_id is None:
-            row.planning_period_id = period.id
-            session.add(row)
-            dirty = True
-        if row.planning_period_id == period.id:
-            filtered.append(row)
-    if dirty:
-        session.commit()
-    return filtered
+        filters.append(Requirement.version_id == version_id)
+    if class_id is not None:
+        filters.append(Requirement.class_id == class_id)
+    if teacher_id is not None:
+        filters.append(Requirement.teacher_id == teacher_id)
+    if subject_id is not None:
+        filters.append(Requirement.subject_id == subject_id)
+    claim_unassigned_rows(session, Requirement, account.id, period.id)
+    return list_model_page(session, Requirement, filters, response, limit=limit, cursor=cursor, fields=fields)
 
 
 @router.post("", response_model=Requirement)
@@ -2,13 +2,15 @@ from __future__ import annotations
 
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlmodel import Session, select
 
+from ..core.pagination import MAX_PAGE_SIZE, list_model_page
 from ..core.security import require_active_user
 from ..database import get_session
 from ..models import Room, Subject
 from ..domain.accounts.service import resolve_account
+from ..services.revisions import not_modified, set_revision_headers
 
 
 router = APIRouter(prefix="/rooms", tags=["rooms"], dependencies=[Depends(require_active_user)])
@@ -16,11 +18,22 @@ router = APIRouter(prefix="/rooms", tags=["rooms"], dependencies=[Depends(requir
 
 @router.get("", response_model=List[Room])
 def list_rooms(
+    request: Request,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None),
+    fields: Optional[str] = Query(None),
     account_id: Optional[int] = Query(None),
     session: Session = Depends(get_session),
-) -> List[Room]:
+):
     account = resolve_account(session, account_id)
-    return session.exec(select(Room).where(Room.account_id == account.id)).all()
+    cached = not_modified(request, session, account.id, Room.__tablename__)
+    if cached:
+        return cached
+    set_revision_headers(response, request, session, account.id, Room.__tablename__)
+    return list_model_page(
+        session, Room, [Room.account_id == account.id], response, limit=limit, cursor=cursor, fields=fields
+    )
 
 
 @router.post("", response_model=Room)
@@ -2,13 +2,15 @@ from __future__ import annotations
 
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlmodel import Session, select
 
 from ..core.security import require_active_user
 from ..database import get_session
 from ..models import RuleProfile
 from ..domain.accounts.service import resolve_account
+from ..domain.planner.solver_presets import available_solver_presets, validate_solver_preset
+from ..services.revisions import not_modified, set_revision_headers
 
 
 router = APIRouter(prefix="/rule-profiles", tags=["rule-profiles"], dependencies=[Depends(require_active_user)])
@@ -16,10 +18,16 @@ router = APIRouter(prefix="/rule-profiles", tags=["rule-profiles"], dependencies
 
 @router.get("", response_model=List[RuleProfile])
 def list_profiles(
+    request: Request,
+    response: Response,
     account_id: Optional[int] = Query(None),
     session: Session = Depends(get_session),
-) -> List[RuleProfile]:
+):
     account = resolve_account(session, account_id)
+    cached = not_modified(request, session, account.id, RuleProfile.__tablename__)
+    if cached:
+        return cached
+    set_revision_headers(response, request, session, account.id, RuleProfile.__tablename__)
     return session.exec(select(RuleProfile).where(RuleProfile.account_id == account.id)).all()
 
 
@@ -47,6 +55,9 @@ def create_profile(
     account = resolve_account(session, account_id)
     if not profile.name:
         raise HTTPException(status_code=400, detail="name required")
+    profile.solver_preset = validate_solver_preset(
+        profile.solver_preset, available_solver_presets(session, account.id)
+    )
     profile.account_id = account.id
     session.add(profile)
     session.commit()
@@ -68,6 +79,11 @@ def update_profile(
     if p.account_id != account.id:
         raise HTTPException(status_code=403, detail="rule profile belongs to different account")
     data = payload.dict(exclude_unset=True)
+    if "solver_preset" in data:
+        # "" or null clears the preset
+        p.solver_preset = validate_solver_preset(
+            data.pop("solver_preset"), available_solver_presets(session, account.id)
+        )
     for k, v in data.items():
         if k == "id" or v is None:
             continue
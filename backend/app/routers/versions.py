@@ -2,9 +2,10 @@ from __future__ import annotations
 
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlmodel import Session, select
 
+from ..core.pagination import MAX_PAGE_SIZE, list_model_page
 from ..core.security import require_active_user
 from ..database import get_session
 from ..models import DistributionVersion
@@ -25,24 +26,32 @@ def _ensure_version_columns(session: Session) -> None:
 
 @router.get("", response_model=List[DistributionVersion])
 def list_versions(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None),
+    fields: Optional[str] = Query(None),
     account_id: Optional[int] = Query(None),
     planning_period_id: Optional[int] = Query(None),
     session: Session = Depends(get_session),
-) -> List[DistributionVersion]:
+):
     _ensure_version_columns(session)
     account = resolve_account(session, account_id)
     period = resolve_planning_period(session, account, planning_period_id)
-    stmt = (
-        select(DistributionVersion)
-        .where(DistributionVersion.account_id == account.id)
-        .where(
-            (DistributionVersion.planning_period_id == period.id)
-            | (DistributionVersion.planning_period_id == None)  # noqa: E711
-        )
-        .order_by(DistributionVersion.created_at)
+    filters = [
+        DistributionVersion.account_id == account.id,
+        (DistributionVersion.planning_period_id == period.id)
+        | (DistributionVersion.planning_period_id == None),  # noqa: E711
+    ]
+    return list_model_page(
+        session,
+        DistributionVersion,
+        filters,
+        response,
+        limit=limit,
+        cursor=cursor,
+        fields=fields,
+        sort_columns=[DistributionVersion.created_at, DistributionVersion.id],
     )
-    rows = session.exec(stmt).all()
-    return rows
 
 
 @router.post("", response_model=DistributionVersion)
@@ -1,15 +1,45 @@
 from __future__ import annotations
 
 from datetime import datetime, date
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, List, Literal, Optional, Union
 
 from pydantic import BaseModel, Field, EmailStr
 
 from .models import AccountRole
 
 
+SolverPresetName = Literal["fast_draft", "balanced", "thorough"]
+SearchBranching = Literal[
+    "automatic",
+    "fixed",
+    "portfolio",
+    "lp",
+    "pseudo_cost",
+    "portfolio_with_quick_restart",
+    "hint",
+    "partial_fixed",
+    "randomized",
+]
+ObjectiveMode = Literal["weighted", "lexicographic"]
+ObjectiveGroup = Literal["class_gaps", "teacher_gaps", "doppelstunden", "even_distribution", "band_optional"]
+
+
+class SolverParams(BaseModel):
+    # CP-SAT-Parameter; None = Wert aus dem Preset, Obergrenzen setzt der Server
+    num_workers: Optional[int] = Field(default=None, ge=1, le=64)
+    linearization_level: Optional[int] = Field(default=None, ge=0, le=2)
+    cp_model_presolve: Optional[bool] = None
+    symmetry_level: Optional[int] = Field(default=None, ge=0, le=4)
+    search_branching: Optional[SearchBranching] = None
+    interleave_search: Optional[bool] = None
+    log_search_progress: Optional[bool] = None
+
+
 class GenerateParams(BaseModel):
     # Suche/Heuristik
+    # eingebautes Preset (SolverPresetName) oder gespeichertes SolverPreset des Accounts
+    preset: Optional[str] = Field(default=None, max_length=64)
+    solver: SolverParams = Field(default_factory=SolverParams)
     multi_start: bool = True
     max_attempts: int = 10
     patience: int = 3
@@ -18,6 +48,12 @@ class GenerateParams(BaseModel):
     base_seed: int = 42
     seed_step: int = 17
     use_value_hints: bool = True
+    # Ein Worker und deterministisches Zeitlimit: gleiche Eingabe -> gleicher Plan
+    deterministic: bool = False
+    # Zielfunktion: gewichtete Summe aller Soft-Ziele oder Zielgruppen nacheinander
+    # (lexikographisch, Reihenfolge = Priorität; nicht genannte Gruppen zuletzt gemeinsam)
+    objective_mode: ObjectiveMode = "weighted"
+    objective_order: List[ObjectiveGroup] = Field(default_factory=list)
 
 
 class GenerateRequest(BaseModel):
@@ -27,6 +63,10 @@ class GenerateRequest(BaseModel):
     version_id: Optional[int] = None
     comment: Optional[str] = None
     dry_run: bool = False
+    # Eingaben, Parameter und CP-Modell als Bundle ablegen (Nachstellen mit scripts/replay_bundle.py)
+    save_bundle: bool = False
+    # Stufenzeiten der Generierung in GenerateResponse.timings zurückgeben
+    include_timings: bool = False
     params: GenerateParams = Field(default_factory=GenerateParams)
 
 
@@ -68,7 +108,7 @@ class PlanSummary(BaseModel):
     rule_keys_active: List[str] = Field(default_factory=list)
 
 
-class PlanDetail(BaseModel):
+class PlanDetailBase(BaseModel):
     id: int
     name: str
     status: str
@@ -78,7 +118,6 @@ class PlanDetail(BaseModel):
     version_id: Optional[int] = None
     comment: Optional[str] = None
     rule_profile_id: Optional[int] = None
-    slots: List[PlanSlotOut] = Field(default_factory=list)
     slots_meta: List[SlotMeta] = Field(default_factory=list)
     rules_snapshot: Optional[Dict[str, Union[int, bool]]] = None
     rule_keys_active: List[str] = Field(default_factory=list)
@@ -86,6 +125,97 @@ class PlanDetail(BaseModel):
     planning_period_id: Optional[int] = None
 
 
+class PlanDetail(PlanDetailBase):
+    slots: List[PlanSlotOut] = Field(default_factory=list)
+
+
+class PlanClassMatrix(BaseModel):
+    """Cells of one class as ``[day][slot]`` indices into the lookup lists (-1 = frei)."""
+    class_id: int
+    subject: List[List[int]]
+    teacher: List[List[int]]
+    room: List[List[int]]
+
+
+class PlanMatrixOut(BaseModel):
+    days: List[str]
+    slots_per_day: int
+    subject_ids: List[int] = Field(default_factory=list)
+    teacher_ids: List[int] = Field(default_factory=list)
+    room_ids: List[int] = Field(default_factory=list)
+    room_names: List[Optional[str]] = Field(default_factory=list)
+    classes: List[PlanClassMatrix] = Field(default_factory=list)
+
+
+class PlanMatrixDetail(PlanDetailBase):
+    """``GET /plans/{id}?format=matrix``: the plan as dense per-class arrays."""
+    matrix: PlanMatrixOut
+
+
+class PlanDiffLesson(BaseModel):
+    subject_id: int
+    teacher_id: int
+    room_id: Optional[int] = None
+
+
+class PlanDiffCell(BaseModel):
+    class_id: int
+    tag: str
+    stunde: int
+    change: str  # added | removed | changed | room
+    before: Optional[PlanDiffLesson] = None
+    after: Optional[PlanDiffLesson] = None
+
+
+class PlanDiffMove(BaseModel):
+    class_id: int
+    subject_id: int
+    teacher_id: int
+    from_tag: str
+    from_stunde: int
+    to_tag: str
+    to_stunde: int
+    room_id_before: Optional[int] = None
+    room_id_after: Optional[int] = None
+
+
+class PlanDiffCounts(BaseModel):
+    unchanged: int = 0
+    moved: int = 0
+    added: int = 0
+    removed: int = 0
+    changed: int = 0
+    room: int = 0
+
+
+class PlanDiff(BaseModel):
+    plan_id: int
+    other_plan_id: int
+    summary: PlanDiffCounts
+    per_class: Dict[int, PlanDiffCounts] = Field(default_factory=dict)
+    per_teacher: Dict[int, int] = Field(default_factory=dict)
+    moves: List[PlanDiffMove] = Field(default_factory=list)
+    cells: List[PlanDiffCell] = Field(default_factory=list)
+    score_delta: Optional[float] = None
+    objective_delta: Optional[float] = None
+
+
+class SolverProgressOut(BaseModel):
+    """Sampled search progress of the solve that produced a plan."""
+    plan_id: int
+    fields: List[str] = Field(default_factory=lambda: ["t", "objective", "bound", "gap"])
+    events: List[List[Optional[float]]] = Field(default_factory=list)
+
+
+class TimingSpanOut(BaseModel):
+    """One timed stage of a request; ``depth`` 0 are the top-level stages."""
+    name: str
+    depth: int
+    start_ms: Optional[float] = None  # None: measured in the solver process
+    duration_ms: float
+    queries: int = 0
+
+
 class GenerateResponse(BaseModel):
     plan_id: Optional[int]
     status: str
@@ -97,12 +227,27 @@ class GenerateResponse(BaseModel):
     rule_keys_active: List[str] = Field(default_factory=list)
     params_used: GenerateParams
     planning_period_id: Optional[int] = None
+    cached: bool = False
+    bundle: Optional[str] = None  # Pfad des Bundles relativ zu STUNDENPLAN_SOLVER_BUNDLE_DIR
+    timings: Optional[List[TimingSpanOut]] = None  # nur mit include_timings
 
 
 class PlanSlotsUpdateRequest(BaseModel):
     slots: List[PlanSlotOut]
 
 
+class PlanSlotCell(BaseModel):
+    class_id: int
+    tag: str
+    stunde: int
+
+
+class PlanSlotsPatchRequest(BaseModel):
+    """Only the changed cells: each cell in ``slots`` gets exactly its listed lessons, ``remove`` cells are cleared."""
+    slots: List[PlanSlotOut] = Field(default_factory=list)
+    remove: List[PlanSlotCell] = Field(default_factory=list)
+
+
 class PlanningPeriodBase(BaseModel):
     name: str
     start_date: Optional[date] = None
@@ -130,6 +275,7 @@ class PlanningPeriodCloneRequest(BaseModel):
     copy_requirements: bool = True
     copy_basisplan: bool = True
     copy_versions: bool = True
+    copy_plans: bool = False
 
 
 class PlanningPeriodOut(PlanningPeriodBase):
@@ -142,6 +288,11 @@ class PlanningPeriodOut(PlanningPeriodBase):
         from_attributes = True
 
 
+class PlanningPeriodCloneOut(PlanningPeriodOut):
+    copied: Dict[str, int] = Field(default_factory=dict)
+    elapsed_ms: float = 0.0
+
+
 # Backup/export schemas
 class BackupTeacher(BaseModel):
     name: Optional[str] = None
@@ -250,6 +401,32 @@ class AdminUserOut(BaseModel):
         from_attributes = True
 
 
+class AccountSolverUsageOut(BaseModel):
+    account_id: int
+    account_name: Optional[str] = None
+    running: int
+    queued: int
+    completed: int
+    failed: int
+    rejected: int
+    quota_rejected: int
+    cpu_seconds_window: float
+    cpu_seconds_total: float
+    wall_seconds_total: float
+    weight: float
+
+
+class SolverUsageOut(BaseModel):
+    max_workers: int
+    capacity: int
+    running: int
+    queued: int
+    rejected: int
+    account_max_concurrent: int
+    cpu_quota_seconds_per_hour: float
+    accounts: List[AccountSolverUsageOut]
+
+
 class AccountCreateRequest(BaseModel):
     name: str
     description: Optional[str] = None
@@ -406,3 +583,65 @@ class BasisPlanOut(BaseModel):
 
 class BasisPlanPreviewRequest(BaseModel):
     payload: Optional[BasisPlanData] = None
+
+
+BasisPlanWeekday = Literal["Mo", "Di", "Mi", "Do", "Fr"]
+BasisPlanDayKey = Literal["mon", "tue", "wed", "thu", "fri"]
+# Upper bound for slot indexes of the basis plan (slots per day)
+BASIS_PLAN_MAX_SLOTS = 24
+
+
+class BasisPlanAvailabilityChange(BaseModel):
+    """One slot of a room, class or window (``key`` as in the JSON document)."""
+    section: Literal["rooms", "classes", "windows"]
+    key: str
+    day: BasisPlanWeekday
+    slot: int = Field(ge=0, lt=BASIS_PLAN_MAX_SLOTS)
+    allowed: bool
+
+
+class BasisPlanAvailabilityPatch(BaseModel):
+    changes: List[BasisPlanAvailabilityChange] = Field(default_factory=list)
+
+
+class BasisPlanFixedCell(BaseModel):
+    class_id: int
+    day: BasisPlanDayKey
+    slot: int = Field(ge=0, lt=BASIS_PLAN_MAX_SLOTS)
+
+
+class BasisPlanFixedEntry(BasisPlanFixedCell):
+    subject_id: int
+
+
+class BasisPlanFixedPatch(BaseModel):
+    """``upsert`` entries replace whatever is fixed in their cell, ``remove`` cells are cleared."""
+    upsert: List[BasisPlanFixedEntry] = Field(default_factory=list)
+    remove: List[BasisPlanFixedCell] = Field(default_factory=list)
+
+
+class BasisPlanFlexibleSlotIn(BaseModel):
+    day: BasisPlanDayKey
+    slot: int = Field(ge=0, lt=BASIS_PLAN_MAX_SLOTS)
+
+
+class BasisPlanFlexibleKey(BaseModel):
+    class_id: int
+    id: str
+
+
+class BasisPlanFlexibleGroupIn(BasisPlanFlexibleKey):
+    subject_id: int
+    slots: List[BasisPlanFlexibleSlotIn] = Field(default_factory=list)
+
+
+class BasisPlanFlexiblePatch(BaseModel):
+    upsert: List[BasisPlanFlexibleGroupIn] = Field(default_factory=list)
+    remove: List[BasisPlanFlexibleKey] = Field(default_factory=list)
+
+
+class BasisPlanPatchResult(BaseModel):
+    id: int
+    updated_at: datetime
+    planning_period_id: Optional[int] = None
+    changed: int
@@ -0,0 +1,296 @@
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from openpyxl import load_workbook
+from sqlalchemy import delete, insert
+from sqlmodel import Session, select
+
+from ..models import (
+    Class,
+    ClassSubject,
+    DoppelstundeEnum,
+    NachmittagEnum,
+    Requirement,
+    RequirementParticipationEnum,
+    Subject,
+    Teacher,
+)
+from ..utils import normalize_hex_color, pick_teacher_color
+from .revisions import bump_revision
+from .subject_config import sync_requirements_for_class_subjects
+
+logger = logging.getLogger("stundenplan.excel")
+
+EXCEL_REQUIRED_COLUMNS = ("Fach", "Klasse", "Lehrer", "Wochenstunden")
+EXCEL_OPTIONAL_COLUMNS = ("Doppelstunde", "Nachmittag")
+EXCEL_CHUNK_SIZE = 500
+
+ProgressCallback = Callable[["ExcelImportStats"], None]
+
+
+class ExcelImportError(ValueError):
+    """The workbook does not have the expected layout."""
+
+
+@dataclass
+class ExcelImportStats:
+    rows: int = 0
+    chunks: int = 0
+    created: Dict[str, int] = field(default_factory=dict)
+    inserted: int = 0
+
+    def count_created(self, label: str, amount: int) -> None:
+        if amount:
+            self.created[label] = self.created.get(label, 0) + amount
+
+    def as_dict(self) -> Dict[str, object]:
+        return {"rows": self.rows, "chunks": self.chunks, "created": dict(self.created), "inserted": self.inserted}
+
+
+def _cell_text(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+def _cell_int(value) -> int:
+    if value is None or value == "":
+        return 0
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return 0
+
+
+def iter_excel_rows(path: Path) -> Iterator[Dict[str, object]]:
+    """Yield normalized rows of the first sheet without loading the workbook into memory.
+
+    Rows without Fach/Klasse/Lehrer are skipped; Doppelstunde/Nachmittag default to "kann".
+    """
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = next(rows, None) or ()
+        columns = {_cell_text(name): idx for idx, name in enumerate(header) if name is not None}
+        missing = [name for name in EXCEL_REQUIRED_COLUMNS if name not in columns]
+        if missing:
+            raise ExcelImportError(f"Fehlende Spalten in Excel: {', '.join(missing)}")
+
+        def cell(values, name):
+            idx = columns.get(name)
+            return values[idx] if idx is not None and idx < len(values) else None
+
+        for values in rows:
+            fach = _cell_text(cell(values, "Fach"))
+            klasse = _cell_text(cell(values, "Klasse"))
+            lehrer = _cell_text(cell(values, "Lehrer"))
+            if not (fach or klasse or lehrer):
+                continue
+            yield {
+                "Fach": fach,
+                "Klasse": klasse,
+                "Lehrer": lehrer,
+                "Wochenstunden": _cell_int(cell(values, "Wochenstunden")),
+                "Doppelstunde": _cell_text(cell(values, "Doppelstunde")).lower() or "kann",
+                "Nachmittag": _cell_text(cell(values, "Nachmittag")).lower() or "kann",
+            }
+    finally:
+        workbook.close()
+
+
+def _chunks(rows: Iterable[dict], size: int) -> Iterator[List[dict]]:
+    chunk: List[dict] = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class _NameResolver:
+    """Name → id lookup for one master data table, preloaded once per import.
+
+    Unknown names of a chunk are inserted with a single executemany statement.
+    """
+
+    def __init__(self, session: Session, model, account_id: int, label: str) -> None:
+        self.session = session
+        self.model = model
+        self.account_id = account_id
+        self.label = label
+        self.ids: Dict[str, int] = {}
+        rows = session.exec(
+            select(model.id, model.name).where(model.account_id == account_id).order_by(model.id)
+        ).all()
+        for row_id, name in rows:
+            if name:
+                self.ids.setdefault(name, row_id)
+
+    def new_row(self, name: str) -> dict:
+        return {"account_id": self.account_id, "name": name}
+
+    def ensure(self, names: Set[str], stats: ExcelImportStats) -> None:
+        missing = sorted(name for name in names if name and name not in self.ids)
+        if not missing:
+            return
+        self.session.execute(insert(self.model), [self.new_row(name) for name in missing])
+        bump_revision(self.session, self.account_id, self.model.__tablename__)
+        created = self.session.exec(
+            select(self.model.id, self.model.name).where(
+                self.model.account_id == self.account_id,
+                self.model.name.in_(missing),
+            )
+        ).all()
+        for row_id, name in created:
+            self.ids.setdefault(name, row_id)
+        stats.count_created(self.label, len(missing))
+
+
+class _TeacherResolver(_NameResolver):
+    """Teachers are matched by name or kuerzel; new ones get the next free palette colour."""
+
+    def __init__(self, session: Session, account_id: int) -> None:
+        super().__init__(session, Teacher, account_id, "teachers")
+        self.used_colors: Set[str] = set()
+        for kuerzel, teacher_id, color in session.exec(
+            select(Teacher.kuerzel, Teacher.id, Teacher.color).where(Teacher.account_id == account_id)
+        ).all():
+            if kuerzel:
+                self.ids.setdefault(kuerzel, teacher_id)
+            normalized = normalize_hex_color(color)
+            if normalized:
+                self.used_colors.add(normalized)
+
+    def new_row(self, name: str) -> dict:
+        color = pick_teacher_color(self.used_colors)
+        self.used_colors.add(color)
+        return {"account_id": self.account_id, "name": name, "color": color}
+
+
+def _enum_value(enum_cls, value: str, default):
+    try:
+        return enum_cls(value)
+    except ValueError:
+        return default
+
+
+def _report(stats: ExcelImportStats, progress: Optional[ProgressCallback]) -> None:
+    logger.info("Excel-Import: %s Zeilen in %s Chunks verarbeitet", stats.rows, stats.chunks)
+    if progress:
+        progress(stats)
+
+
+def import_requirements_from_excel(
+    session: Session,
+    path: Path,
+    account_id: int,
+    planning_period_id: int,
+    chunk_size: int = EXCEL_CHUNK_SIZE,
+    progress: Optional[ProgressCallback] = None,
+) -> ExcelImportStats:
+    """Create requirements (and missing classes/subjects/teachers) from a Stundenverteilung sheet.
+
+    Rows are streamed in chunks of ``chunk_size``; each chunk adds its new
+    master data and requirements with one bulk statement per table. The caller
+    commits.
+    """
+    stats = ExcelImportStats()
+    subjects = _NameResolver(session, Subject, account_id, "subjects")
+    classes = _NameResolver(session, Class, account_id, "classes")
+    teachers = _TeacherResolver(session, account_id)
+
+    for chunk in _chunks(iter_excel_rows(path), chunk_size):
+        subjects.ensure({row["Fach"] for row in chunk}, stats)
+        classes.ensure({row["Klasse"] for row in chunk}, stats)
+        teachers.ensure({row["Lehrer"] for row in chunk}, stats)
+        requirement_rows = [
+            {
+                "account_id": account_id,
+                "planning_period_id": planning_period_id,
+                "class_id": classes.ids[row["Klasse"]],
+                "subject_id": subjects.ids[row["Fach"]],
+                "teacher_id": teachers.ids[row["Lehrer"]],
+                "wochenstunden": row["Wochenstunden"],
+                "doppelstunde": _enum_value(DoppelstundeEnum, row["Doppelstunde"], DoppelstundeEnum.kann),
+                "nachmittag": _enum_value(NachmittagEnum, row["Nachmittag"], NachmittagEnum.kann),
+            }
+            for row in chunk
+            if row["Fach"] and row["Klasse"] and row["Lehrer"]
+        ]
+        if requirement_rows:
+            session.execute(insert(Requirement), requirement_rows)
+        stats.rows += len(chunk)
+        stats.chunks += 1
+        stats.inserted += len(requirement_rows)
+        _report(stats, progress)
+    return stats
+
+
+def import_curriculum_from_excel(
+    session: Session,
+    path: Path,
+    account_id: int,
+    planning_period_id: int,
+    replace: bool = True,
+    chunk_size: int = EXCEL_CHUNK_SIZE,
+    progress: Optional[ProgressCallback] = None,
+) -> ExcelImportStats:
+    """Write the Stundentafel (ClassSubject) of a planning period from the sheet.
+
+    Wochenstunden are summed per Klasse+Fach while streaming the rows; only
+    the (small) per-pair totals are kept in memory. Existing requirements of
+    the imported pairs pick up the new curriculum settings. The caller commits.
+    """
+    stats = ExcelImportStats()
+    subjects = _NameResolver(session, Subject, account_id, "subjects")
+    classes = _NameResolver(session, Class, account_id, "classes")
+
+    totals: Dict[Tuple[str, str], int] = {}
+    for chunk in _chunks(iter_excel_rows(path), chunk_size):
+        subjects.ensure({row["Fach"] for row in chunk}, stats)
+        classes.ensure({row["Klasse"] for row in chunk}, stats)
+        for row in chunk:
+            if row["Klasse"] and row["Fach"]:
+                key = (row["Klasse"], row["Fach"])
+                totals[key] = totals.get(key, 0) + row["Wochenstunden"]
+        stats.rows += len(chunk)
+        stats.chunks += 1
+        _report(stats, progress)
+
+    if replace:
+        session.exec(
+            delete(ClassSubject).where(
+                ClassSubject.account_id == account_id,
+                ClassSubject.planning_period_id == planning_period_id,
+            )
+        )
+    curriculum_rows = [
+        {
+            "account_id": account_id,
+            "planning_period_id": planning_period_id,
+            "class_id": classes.ids[klasse],
+            "subject_id": subjects.ids[fach],
+            "wochenstunden": wochenstunden,
+            "participation": RequirementParticipationEnum.curriculum,
+        }
+        for (klasse, fach), wochenstunden in totals.items()
+    ]
+    for chunk in _chunks(curriculum_rows, chunk_size):
+        session.execute(insert(ClassSubject), chunk)
+    stats.inserted = len(curriculum_rows)
+    sync_requirements_for_class_subjects(
+        session,
+        account_id,
+        [(row["class_id"], row["subject_id"]) for row in curriculum_rows],
+        planning_period_id=planning_period_id,
+        commit=False,
+    )
+    return stats
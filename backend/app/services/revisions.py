@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from itertools import chain
+from typing import Dict, Iterable, Optional, Tuple
+
+from fastapi import Request, Response
+from sqlalchemy import event
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session as OrmSession
+from sqlmodel import Session, select
+
+from ..models import BasisPlan, Class, EntityRevision, Room, RuleProfile, Subject, Teacher
+
+# Tables whose list endpoints answer conditional GETs; the entity key is the table name.
+TRACKED_MODELS = (Teacher, Class, Subject, Room, RuleProfile, BasisPlan)
+TRACKED_ENTITIES = {model: model.__tablename__ for model in TRACKED_MODELS}
+
+RevisionState = Tuple[int, Optional[datetime]]
+
+
+def bump_revision(session: Session, account_id: int, *entities: str) -> None:
+    """Increment the revision of ``entities`` for an account inside the current transaction.
+
+    ORM writes of tracked models are counted automatically (see ``_track_revisions``);
+    bulk Core statements have to call this explicitly.
+    """
+    if account_id is None:
+        return
+    now = datetime.now(timezone.utc)
+    connection = session.connection()
+    for entity in dict.fromkeys(entities):
+        stmt = sqlite_insert(EntityRevision.__table__).values(
+            account_id=account_id, entity=entity, revision=1, updated_at=now
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["account_id", "entity"],
+            set_={"revision": EntityRevision.__table__.c.revision + 1, "updated_at": now},
+        )
+        connection.execute(stmt)
+
+
+def bump_all_revisions(session: Session, account_id: int) -> None:
+    bump_revision(session, account_id, *TRACKED_ENTITIES.values())
+
+
+@event.listens_for(OrmSession, "before_flush")
+def _track_revisions(session, flush_context, instances) -> None:
+    touched: Dict[int, set] = {}
+    for obj in chain(session.new, session.dirty, session.deleted):
+        entity = TRACKED_ENTITIES.get(type(obj))
+        if entity is None:
+            continue
+        if obj in session.dirty and not session.is_modified(obj):
+            continue
+        touched.setdefault(getattr(obj, "account_id", None), set()).add(entity)
+    for account_id, entities in touched.items():
+        bump_revision(session, account_id, *sorted(entities))
+
+
+def current_revisions(session: Session, account_id: int, entities: Iterable[str]) -> Dict[str, RevisionState]:
+    entities = list(entities)
+    rows = session.exec(
+        select(EntityRevision.entity, EntityRevision.revision, EntityRevision.updated_at).where(
+            EntityRevision.account_id == account_id,
+            EntityRevision.entity.in_(entities),
+        )
+    ).all()
+    state: Dict[str, RevisionState] = {entity: (0, None) for entity in entities}
+    for entity, revision, updated_at in rows:
+        state[entity] = (revision, updated_at)
+    return state
+
+
+def account_revision(session: Session, account_id: int) -> Tuple[int, ...]:
+    """Revision numbers of all tracked tables of an account; changes with every write."""
+    state = current_revisions(session, account_id, TRACKED_ENTITIES.values())
+    return tuple(revision for revision, _ in state.values())
+
+
+def _as_utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+def revision_headers(
+    request: Request,
+    session: Session,
+    account_id: int,
+    *entities: str,
+    scope: str = "",
+) -> Dict[str, str]:
+    """ETag/Last-Modified for the current revisions of ``entities``.
+
+    The query string is part of the tag, so filtered or projected views of the
+    same list get distinct ETags.
+    """
+    state = current_revisions(session, account_id, entities)
+    revisions = "-".join(f"{entity}.{state[entity][0]}" for entity in entities)
+    variant = hashlib.sha1(f"{request.url.path}?{request.url.query}|{scope}".encode("utf-8")).hexdigest()[:12]
+    headers = {"ETag": f'W/"{account_id}-{revisions}-{variant}"', "Cache-Control": "no-cache"}
+    stamps = [_as_utc(updated_at) for _, updated_at in state.values() if updated_at is not None]
+    if stamps:
+        headers["Last-Modified"] = format_datetime(max(stamps).replace(microsecond=0), usegmt=True)
+    return headers
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    candidates = [item.strip() for item in header.split(",")]
+    weak = etag[2:] if etag.startswith("W/") else etag
+    return "*" in candidates or any(
+        (candidate[2:] if candidate.startswith("W/") else candidate) == weak for candidate in candidates
+    )
+
+
+def _not_modified_since(header: str, last_modified: Optional[str]) -> bool:
+    if not last_modified:
+        return False
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return False
+    return parsedate_to_datetime(last_modified) <= _as_utc(since)
+
+
+def not_modified(
+    request: Request,
+    session: Session,
+    account_id: int,
+    *entities: str,
+    scope: str = "",
+) -> Optional[Response]:
+    """Return a 304 response if the client's copy is current, otherwise ``None``.
+
+    Only the revision table is read, never the entity tables themselves.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if_modified_since = request.headers.get("if-modified-since")
+    if not if_none_match and not if_modified_since:
+        return None
+    headers = revision_headers(request, session, account_id, *entities, scope=scope)
+    if if_none_match:
+        fresh = _etag_matches(if_none_match, headers["ETag"])
+    else:
+        fresh = _not_modified_since(if_modified_since, headers.get("Last-Modified"))
+    return Response(status_code=304, headers=headers) if fresh else None
+
+
+def set_revision_headers(
+    response: Response,
+    request: Request,
+    session: Session,
+    account_id: int,
+    *entities: str,
+    scope: str = "",
+) -> None:
+    response.headers.update(revision_headers(request, session, account_id, *entities, scope=scope))
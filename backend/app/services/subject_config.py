@@ -1,7 +1,8 @@
 from __future__ import annotations
 
-from typing import Optional
+from typing import Iterable, Optional, Tuple
 
+from sqlalchemy import String, cast, func, or_, tuple_, update
 from sqlmodel import Session, select
 
 from ..models import (
@@ -57,66 +58,133 @@ def resolve_participation(class_subject: Optional[ClassSubject]) -> RequirementP
     return RequirementParticipationEnum.curriculum
 
 
-def sync_requirements_for_class_subject(
+def _class_subject_value(column, period_match):
+    """Scalar subquery: the matching ClassSubject override for the requirement row being updated."""
+    req = Requirement.__table__
+    cs = ClassSubject.__table__
+    return (
+        select(func.nullif(cast(column, String), ""))
+        .where(
+            cs.c.account_id == req.c.account_id,
+            cs.c.class_id == req.c.class_id,
+            cs.c.subject_id == req.c.subject_id,
+            period_match,
+        )
+        .order_by(cs.c.id)
+        .limit(1)
+        .scalar_subquery()
+    )
+
+
+def _sync_requirement_defaults(session: Session, filters: list, planning_period_id: Optional[int] = None) -> int:
+    """Re-resolve doppelstunde/nachmittag/participation for all matching requirements in one UPDATE.
+
+    Mirrors ``apply_subject_defaults``: the class-subject override wins, then the
+    subject default, then "kann"/"curriculum". Manual requirements are left alone.
+    With ``planning_period_id`` the overrides of that period (or legacy rows
+    without period) are used and requirements without period are assigned to it.
+    """
+    req = Requirement.__table__
+    cs = ClassSubject.__table__
+    subject = Subject.__table__
+    if planning_period_id is not None:
+        period_match = or_(cs.c.planning_period_id == planning_period_id, cs.c.planning_period_id.is_(None))
+    else:
+        period_match = or_(
+            req.c.planning_period_id.is_(None),
+            cs.c.planning_period_id == req.c.planning_period_id,
+            cs.c.planning_period_id.is_(None),
+        )
+
+    def subject_default(column):
+        return select(cast(column, String)).where(subject.c.id == req.c.subject_id).scalar_subquery()
+
+    values = {
+        "doppelstunde": func.coalesce(
+            _class_subject_value(cs.c.doppelstunde, period_match),
+            subject_default(subject.c.default_doppelstunde),
+            DoppelstundeEnum.kann.name,
+        ),
+        "nachmittag": func.coalesce(
+            _class_subject_value(cs.c.nachmittag, period_match),
+            subject_default(subject.c.default_nachmittag),
+            NachmittagEnum.kann.name,
+        ),
+        "participation": func.coalesce(
+            _class_subject_value(cs.c.participation, period_match),
+            RequirementParticipationEnum.curriculum.name,
+        ),
+        "config_source": RequirementConfigSourceEnum.subject,
+    }
+    if planning_period_id is not None:
+        values["planning_period_id"] = func.coalesce(req.c.planning_period_id, planning_period_id)
+        filters = filters + [
+            or_(req.c.planning_period_id == planning_period_id, req.c.planning_period_id.is_(None))
+        ]
+
+    not_manual = or_(req.c.config_source.is_(None), req.c.config_source != RequirementConfigSourceEnum.manual)
+    result = session.execute(update(req).where(not_manual, *filters).values(**values))
+    return max(result.rowcount or 0, 0)
+
+
+def sync_requirements_for_class_subjects(
     session: Session,
     account_id: int,
-    class_id: int,
-    subject_id: int,
+    pairs: Iterable[Tuple[int, int]],
     planning_period_id: Optional[int] = None,
+    commit: bool = True,
 ) -> int:
-    """Apply the current class-subject configuration to all matching requirements.
+    """Batch variant of ``sync_requirements_for_class_subject`` for many (class_id, subject_id) pairs.
 
-    Returns the number of updated requirements.
+    Runs two statements regardless of the number of pairs and returns the
+    number of updated requirements.
     """
+    pairs = sorted(set(pairs))
+    if not pairs:
+        return 0
     ensure_requirement_columns(session)
-    stmt = select(ClassSubject).where(
-        ClassSubject.account_id == account_id,
-        ClassSubject.class_id == class_id,
-        ClassSubject.subject_id == subject_id,
-    )
+    req = Requirement.__table__
+    cs = ClassSubject.__table__
     if planning_period_id is not None:
-        stmt = stmt.where(
-            (ClassSubject.planning_period_id == planning_period_id)
-            | (ClassSubject.planning_period_id == None)  # noqa: E711
+        # Legacy curriculum rows without period belong to the edited period
+        session.execute(
+            update(cs)
+            .where(
+                cs.c.account_id == account_id,
+                tuple_(cs.c.class_id, cs.c.subject_id).in_(pairs),
+                cs.c.planning_period_id.is_(None),
+            )
+            .values(planning_period_id=planning_period_id)
         )
-    class_subject = session.exec(stmt).first()
-    if class_subject and planning_period_id is not None and class_subject.planning_period_id is None:
-        class_subject.planning_period_id = planning_period_id
-        session.add(class_subject)
-        session.commit()
-        session.refresh(class_subject)
-    doppel = resolve_doppelstunde(session, subject_id, class_subject)
-    nachmittag = resolve_nachmittag(session, subject_id, class_subject)
-    participation = resolve_participation(class_subject)
-
-    updated = 0
-    requirement_stmt = select(Requirement).where(
-        Requirement.account_id == account_id,
-        Requirement.class_id == class_id,
-        Requirement.subject_id == subject_id,
+    updated = _sync_requirement_defaults(
+        session,
+        [req.c.account_id == account_id, tuple_(req.c.class_id, req.c.subject_id).in_(pairs)],
+        planning_period_id=planning_period_id,
     )
-    if planning_period_id is not None:
-        requirement_stmt = requirement_stmt.where(
-            (Requirement.planning_period_id == planning_period_id)
-            | (Requirement.planning_period_id == None)  # noqa: E711
-        )
-    for req in session.exec(requirement_stmt):
-        if req.config_source == RequirementConfigSourceEnum.manual:
-            continue
-        if planning_period_id is not None and req.planning_period_id is None:
-            req.planning_period_id = planning_period_id
-        req.doppelstunde = doppel
-        req.nachmittag = nachmittag
-        req.config_source = RequirementConfigSourceEnum.subject
-        req.participation = participation
-        session.add(req)
-        updated += 1
-
-    if updated:
+    if commit:
         session.commit()
     return updated
 
 
+def sync_requirements_for_class_subject(
+    session: Session,
+    account_id: int,
+    class_id: int,
+    subject_id: int,
+    planning_period_id: Optional[int] = None,
+) -> int:
+    """Apply the current class-subject configuration to all matching requirements.
+
+    Returns the number of updated requirements.
+    """
+    return sync_requirements_for_class_subjects(
+        session,
+        account_id,
+        [(class_id, subject_id)],
+        planning_period_id=planning_period_id,
+    )
+
+
 def apply_subject_defaults(session: Session, requirement: Requirement) -> Requirement:
     """Apply subject/class defaults to a requirement and mark it as subject-config driven."""
     ensure_requirement_columns(session)
@@ -143,15 +211,26 @@ def apply_subject_defaults(session: Session, requirement: Requirement) -> Requir
 
 
 def sync_requirements_for_subject(session: Session, subject_id: int) -> int:
-    """Re-apply subject defaults for all requirements of a subject."""
+    """Re-apply subject defaults for all requirements of a subject (single UPDATE)."""
     ensure_requirement_columns(session)
-    updated = 0
-    for req in session.exec(select(Requirement).where(Requirement.subject_id == subject_id)):
-        if req.config_source == RequirementConfigSourceEnum.manual:
-            continue
-        apply_subject_defaults(session, req)
-        session.add(req)
-        updated += 1
-    if updated:
-        session.commit()
+    req = Requirement.__table__
+    cs = ClassSubject.__table__
+    # Legacy curriculum rows without period take the period of their requirements
+    period_of_requirements = (
+        select(func.min(req.c.planning_period_id))
+        .where(
+            req.c.account_id == cs.c.account_id,
+            req.c.class_id == cs.c.class_id,
+            req.c.subject_id == cs.c.subject_id,
+            req.c.planning_period_id.is_not(None),
+        )
+        .scalar_subquery()
+    )
+    session.execute(
+        update(cs)
+        .where(cs.c.subject_id == subject_id, cs.c.planning_period_id.is_(None))
+        .values(planning_period_id=period_of_requirements)
+    )
+    updated = _sync_requirement_defaults(session, [req.c.subject_id == subject_id])
+    session.commit()
     return updated
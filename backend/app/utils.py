@@ -1,6 +1,6 @@
-from typing import List, Optional
+from typing import List, Optional, Set
 
-from sqlalchemy import text
+from sqlalchemy import text, update
 from sqlmodel import Session, select
 
 TAGE: List[str] = ["Mo", "Di", "Mi", "Do", "Fr"]
@@ -53,6 +53,18 @@ def ensure_teacher_color_column(session: Session) -> None:
         session.commit()
 
 
+def claim_unassigned_rows(session: Session, model, account_id: int, planning_period_id: int) -> int:
+    """Assign legacy rows without planning period to ``planning_period_id`` (one UPDATE)."""
+    result = session.exec(
+        update(model)
+        .where(model.account_id == account_id, model.planning_period_id == None)  # noqa: E711
+        .values(planning_period_id=planning_period_id)
+    )
+    if result.rowcount:
+        session.commit()
+    return result.rowcount or 0
+
+
 def normalize_hex_color(value: Optional[str]) -> Optional[str]:
     if not value:
         return None
@@ -84,6 +96,11 @@ def next_teacher_color(session: Session, account_id: int) -> str:
         normalized = normalize_hex_color(value)
         if normalized:
             used.add(normalized)
+    return pick_teacher_color(used)
+
+
+def pick_teacher_color(used: Set[str]) -> str:
+    """Return the first palette colour not contained in ``used`` (normalized hex values)."""
     for color in TEACHER_COLOR_PALETTE:
         normalized = normalize_hex_color(color)
         if normalized not in used:
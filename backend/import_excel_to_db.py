@@ -1,81 +1,64 @@
 from __future__ import annotations
 
+import argparse
 import sys
 from pathlib import Path
 
-import pandas as pd
-from sqlmodel import Session, select
+from sqlmodel import Session
 
 from app.database import engine, create_db_and_tables
-from app.models import (
-    Class,
-    DoppelstundeEnum,
-    Requirement,
-    Subject,
-    Teacher,
-    NachmittagEnum,
+from app.domain.accounts.service import resolve_account, resolve_planning_period
+from app.services.excel_import import (
+    EXCEL_CHUNK_SIZE,
+    ExcelImportError,
+    ExcelImportStats,
+    import_requirements_from_excel,
 )
 
 
-def get_or_create_by_name(session: Session, model, name: str):
-    row = session.exec(select(model).where(model.name == name)).first()
-    if row:
-        return row
-    row = model(name=name)
-    session.add(row)
-    session.commit()
-    session.refresh(row)
-    return row
+def _print_progress(stats: ExcelImportStats) -> None:
+    created = ", ".join(f"{label}: {count}" for label, count in sorted(stats.created.items())) or "-"
+    print(f"  {stats.rows} Zeilen verarbeitet (Chunk {stats.chunks}, neu angelegt: {created})")
 
 
-def main(path: str = "stundenverteilung.xlsx") -> None:
+def main(
+    path: str = "stundenverteilung.xlsx",
+    account_id: int | None = None,
+    planning_period_id: int | None = None,
+    chunk_size: int = EXCEL_CHUNK_SIZE,
+) -> None:
     xls = Path(path)
     if not xls.exists():
         print(f"Excel nicht gefunden: {xls.resolve()}")
         sys.exit(1)
 
-    df = pd.read_excel(xls)
-    needed = {"Fach", "Klasse", "Lehrer", "Wochenstunden"}
-    if not needed.issubset(set(df.columns)):
-        print("Fehlende Spalten. Erwartet: 'Fach', 'Klasse', 'Lehrer', 'Wochenstunden'")
-        sys.exit(2)
-
-    # Normalisieren wie in Streamlit
-    if "Doppelstunde" not in df.columns:
-        df["Doppelstunde"] = "kann"
-    if "Nachmittag" not in df.columns:
-        df["Nachmittag"] = "kann"
-    df["Doppelstunde"] = df["Doppelstunde"].astype(str).str.strip().str.lower()
-    df["Nachmittag"] = df["Nachmittag"].astype(str).str.strip().str.lower()
-
     create_db_and_tables()
     with Session(engine) as session:
-        for _, row in df.iterrows():
-            fach = str(row["Fach"]).strip()
-            klasse = str(row["Klasse"]).strip()
-            lehrer = str(row["Lehrer"]).strip()
-            ws = int(row["Wochenstunden"]) if not pd.isna(row["Wochenstunden"]) else 0
-            ds = str(row.get("Doppelstunde", "kann")).strip().lower()
-            nm = str(row.get("Nachmittag", "kann")).strip().lower()
-
-            subj = get_or_create_by_name(session, Subject, fach)
-            cls = get_or_create_by_name(session, Class, klasse)
-            tch = get_or_create_by_name(session, Teacher, lehrer)
-
-            req = Requirement(
-                class_id=cls.id,
-                subject_id=subj.id,
-                teacher_id=tch.id,
-                wochenstunden=ws,
-                doppelstunde=DoppelstundeEnum(ds if ds in DoppelstundeEnum.__members__ else "kann"),
-                nachmittag=NachmittagEnum(nm if nm in NachmittagEnum.__members__ else "kann"),
+        account = resolve_account(session, account_id)
+        period = resolve_planning_period(session, account, planning_period_id)
+        print(f"Importiere {xls} in Account {account.id}, Planungsperiode {period.id} …")
+        try:
+            stats = import_requirements_from_excel(
+                session,
+                xls,
+                account.id,
+                period.id,
+                chunk_size=chunk_size,
+                progress=_print_progress,
             )
-            session.add(req)
+        except ExcelImportError as exc:
+            session.rollback()
+            print(f"{exc}. Erwartet: 'Fach', 'Klasse', 'Lehrer', 'Wochenstunden'")
+            sys.exit(2)
         session.commit()
-    print("Import fertig.")
+    print(f"Import fertig: {stats.inserted} Requirements aus {stats.rows} Zeilen.")
 
 
 if __name__ == "__main__":
-    path = sys.argv[1] if len(sys.argv) > 1 else "stundenverteilung.xlsx"
-    main(path)
-
+    parser = argparse.ArgumentParser(description="Stundenverteilung aus Excel in die Datenbank importieren")
+    parser.add_argument("path", nargs="?", default="stundenverteilung.xlsx")
+    parser.add_argument("--account-id", type=int, default=None)
+    parser.add_argument("--planning-period-id", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=EXCEL_CHUNK_SIZE)
+    args = parser.parse_args()
+    main(args.path, args.account_id, args.planning_period_id, args.chunk_size)
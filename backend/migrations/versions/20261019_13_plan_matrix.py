@@ -0,0 +1,39 @@
+"""add packed plan matrix table
+
+Revision ID: 20261019_13_plan_matrix
+Revises: 20251012_12_multiuser_accounts
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20261019_13_plan_matrix'
+down_revision = '20251012_12_multiuser_accounts'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'planmatrix',
+        sa.Column('plan_id', sa.Integer(), sa.ForeignKey('plan.id'), primary_key=True),
+        sa.Column('account_id', sa.Integer(), sa.ForeignKey('account.id'), nullable=False),
+        sa.Column('planning_period_id', sa.Integer(), sa.ForeignKey('planningperiod.id'), nullable=True),
+        sa.Column('format_version', sa.Integer(), nullable=False, server_default='1'),
+        sa.Column('class_ids', sa.Text(), nullable=False),
+        sa.Column('days', sa.Text(), nullable=False),
+        sa.Column('slots_per_day', sa.Integer(), nullable=False),
+        sa.Column('data', sa.LargeBinary(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+    )
+    op.create_index('ix_planmatrix_account_id', 'planmatrix', ['account_id'])
+    op.create_index('ix_planmatrix_planning_period_id', 'planmatrix', ['planning_period_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_planmatrix_planning_period_id', table_name='planmatrix')
+    op.drop_index('ix_planmatrix_account_id', table_name='planmatrix')
+    op.drop_table('planmatrix')
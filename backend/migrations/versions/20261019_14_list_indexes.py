@@ -0,0 +1,38 @@
+"""add composite indexes for paged list endpoints
+
+Revision ID: 20261019_14_list_indexes
+Revises: 20261019_13_plan_matrix
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '20261019_14_list_indexes'
+down_revision = '20261019_13_plan_matrix'
+branch_labels = None
+depends_on = None
+
+
+INDEXES = [
+    ('ix_requirement_scope', 'requirement', ['account_id', 'planning_period_id']),
+    ('ix_requirement_scope_class', 'requirement', ['account_id', 'planning_period_id', 'class_id']),
+    ('ix_requirement_scope_teacher', 'requirement', ['account_id', 'planning_period_id', 'teacher_id']),
+    ('ix_requirement_scope_subject', 'requirement', ['account_id', 'planning_period_id', 'subject_id']),
+    ('ix_requirement_scope_version', 'requirement', ['account_id', 'planning_period_id', 'version_id']),
+    ('ix_classsubject_scope_class', 'classsubject', ['account_id', 'planning_period_id', 'class_id']),
+    ('ix_classsubject_scope_subject', 'classsubject', ['account_id', 'planning_period_id', 'subject_id']),
+    ('ix_plan_scope_created', 'plan', ['account_id', 'planning_period_id', 'created_at']),
+    ('ix_distributionversion_scope_created', 'distributionversion', ['account_id', 'planning_period_id', 'created_at']),
+]
+
+
+def upgrade() -> None:
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns)
+
+
+def downgrade() -> None:
+    for name, table, _columns in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
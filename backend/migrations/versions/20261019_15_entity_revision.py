@@ -0,0 +1,30 @@
+"""add per-account entity revision counters
+
+Revision ID: 20261019_15_entity_revision
+Revises: 20261019_14_list_indexes
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20261019_15_entity_revision'
+down_revision = '20261019_14_list_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'entityrevision',
+        sa.Column('account_id', sa.Integer(), sa.ForeignKey('account.id'), primary_key=True),
+        sa.Column('entity', sa.String(), primary_key=True),
+        sa.Column('revision', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('entityrevision')
@@ -0,0 +1,89 @@
+"""normalize basis plan availability, fixed slots and flexible groups into tables
+
+Revision ID: 20261019_16_basisplan_tables
+Revises: 20261019_15_entity_revision
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20261019_16_basisplan_tables'
+down_revision = '20261019_15_entity_revision'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Existing rows keep their whole document (storage_version 1) and are
+    # moved into the tables on their next write.
+    with op.batch_alter_table('basisplan') as batch_op:
+        batch_op.add_column(sa.Column('storage_version', sa.Integer(), nullable=False, server_default='1'))
+
+    op.create_table(
+        'basisplanavailability',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('basis_plan_id', sa.Integer(), sa.ForeignKey('basisplan.id'), nullable=False),
+        sa.Column('section', sa.String(), nullable=False),
+        sa.Column('owner_key', sa.String(), nullable=False),
+        sa.Column('day', sa.String(), nullable=False),
+        sa.Column('slots', sa.String(), nullable=False, server_default=''),
+        sa.UniqueConstraint('basis_plan_id', 'section', 'owner_key', 'day'),
+    )
+    op.create_index('ix_basisplanavailability_basis_plan_id', 'basisplanavailability', ['basis_plan_id'])
+
+    op.create_table(
+        'basisplanfixedslot',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('basis_plan_id', sa.Integer(), sa.ForeignKey('basisplan.id'), nullable=False),
+        sa.Column('class_key', sa.String(), nullable=False),
+        sa.Column('position', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('day', sa.String(), nullable=True),
+        sa.Column('slot', sa.Integer(), nullable=True),
+        sa.Column('subject_id', sa.Integer(), nullable=True),
+        sa.Column('extra', sa.String(), nullable=True),
+    )
+    op.create_index('ix_basisplanfixedslot_basis_plan_id', 'basisplanfixedslot', ['basis_plan_id'])
+    op.create_index('ix_basisplanfixedslot_cell', 'basisplanfixedslot', ['basis_plan_id', 'class_key', 'day', 'slot'])
+
+    op.create_table(
+        'basisplanflexiblegroup',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('basis_plan_id', sa.Integer(), sa.ForeignKey('basisplan.id'), nullable=False),
+        sa.Column('class_key', sa.String(), nullable=False),
+        sa.Column('position', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('group_key', sa.String(), nullable=True),
+        sa.Column('subject_id', sa.Integer(), nullable=True),
+        sa.Column('has_slots', sa.Boolean(), nullable=False, server_default=sa.true()),
+        sa.Column('extra', sa.String(), nullable=True),
+    )
+    op.create_index('ix_basisplanflexiblegroup_basis_plan_id', 'basisplanflexiblegroup', ['basis_plan_id'])
+    op.create_index('ix_basisplanflexiblegroup_key', 'basisplanflexiblegroup', ['basis_plan_id', 'class_key', 'group_key'])
+
+    op.create_table(
+        'basisplanflexibleslot',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('group_id', sa.Integer(), sa.ForeignKey('basisplanflexiblegroup.id'), nullable=False),
+        sa.Column('position', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('day', sa.String(), nullable=True),
+        sa.Column('slot', sa.Integer(), nullable=True),
+        sa.Column('extra', sa.String(), nullable=True),
+    )
+    op.create_index('ix_basisplanflexibleslot_group_id', 'basisplanflexibleslot', ['group_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_basisplanflexibleslot_group_id', table_name='basisplanflexibleslot')
+    op.drop_table('basisplanflexibleslot')
+    op.drop_index('ix_basisplanflexiblegroup_key', table_name='basisplanflexiblegroup')
+    op.drop_index('ix_basisplanflexiblegroup_basis_plan_id', table_name='basisplanflexiblegroup')
+    op.drop_table('basisplanflexiblegroup')
+    op.drop_index('ix_basisplanfixedslot_cell', table_name='basisplanfixedslot')
+    op.drop_index('ix_basisplanfixedslot_basis_plan_id', table_name='basisplanfixedslot')
+    op.drop_table('basisplanfixedslot')
+    op.drop_index('ix_basisplanavailability_basis_plan_id', table_name='basisplanavailability')
+    op.drop_table('basisplanavailability')
+    with op.batch_alter_table('basisplan') as batch_op:
+        batch_op.drop_column('storage_version')
@@ -0,0 +1,26 @@
+"""add solver preset to rule profiles
+
+Revision ID: 20261019_17_rule_profile_solver_preset
+Revises: 20261019_16_basisplan_tables
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20261019_17_rule_profile_solver_preset'
+down_revision = '20261019_16_basisplan_tables'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('ruleprofile') as batch_op:
+        batch_op.add_column(sa.Column('solver_preset', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('ruleprofile') as batch_op:
+        batch_op.drop_column('solver_preset')
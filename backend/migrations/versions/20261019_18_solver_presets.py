@@ -0,0 +1,36 @@
+"""store tuned solver presets per account
+
+Revision ID: 20261019_18_solver_presets
+Revises: 20261019_17_rule_profile_solver_preset
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20261019_18_solver_presets'
+down_revision = '20261019_17_rule_profile_solver_preset'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'solverpreset',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('account_id', sa.Integer(), sa.ForeignKey('account.id'), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('params', sa.Text(), nullable=False),
+        sa.Column('metrics', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.UniqueConstraint('account_id', 'name'),
+    )
+    op.create_index('ix_solverpreset_account_id', 'solverpreset', ['account_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_solverpreset_account_id', table_name='solverpreset')
+    op.drop_table('solverpreset')
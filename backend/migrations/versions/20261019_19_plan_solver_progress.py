@@ -0,0 +1,26 @@
+"""add solver progress to plans
+
+Revision ID: 20261019_19_plan_solver_progress
+Revises: 20261019_18_solver_presets
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20261019_19_plan_solver_progress'
+down_revision = '20261019_18_solver_presets'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('plan') as batch_op:
+        batch_op.add_column(sa.Column('solver_progress', sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('plan') as batch_op:
+        batch_op.drop_column('solver_progress')
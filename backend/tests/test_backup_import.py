@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import unittest
+
+from fastapi import HTTPException
+from sqlalchemy import event
+from sqlmodel import SQLModel, Session, create_engine, select
+
+from backend.app.domain.plans.persistence import persist_plan_with_slots
+from backend.app.models import Account, Class, ClassSubject, Plan, PlanSlot, Requirement, Room, RuleProfile, Subject, Teacher
+from backend.app.routers.backup import (
+    _NdjsonImporter,
+    _iter_backup_records,
+    _iter_plan_records,
+    _ndjson_line,
+    export_data,
+    import_data,
+)
+from backend.app.schemas import (
+    BackupClass,
+    BackupCurriculumItem,
+    BackupPayload,
+    BackupRequirementItem,
+    BackupRoom,
+    BackupSubject,
+    BackupTeacher,
+)
+
+
+class BackupImportTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.engine = create_engine("sqlite://", connect_args={"check_same_thread": False})
+        SQLModel.metadata.create_all(self.engine)
+        self.session = Session(self.engine)
+        account = Account(name="Test Account")
+        self.session.add(account)
+        self.session.commit()
+        self.account_id = account.id
+
+    def tearDown(self) -> None:
+        self.session.close()
+        self.engine.dispose()
+
+    def _payload(self, **overrides) -> BackupPayload:
+        data = dict(
+            teachers=[
+                BackupTeacher(name="Anna Alt", kuerzel="ALT"),
+                BackupTeacher(name="Bernd Bau", kuerzel="BAU", deputat=20),
+            ],
+            rooms=[BackupRoom(name="Halle", type="Sporthalle")],
+            classes=[BackupClass(name="5a", homeroom_teacher="ALT"), BackupClass(name="5b", homeroom_teacher="Bernd Bau")],
+            subjects=[
+                BackupSubject(name="Sport", required_room="Halle", alias_subject="Sport2"),
+                BackupSubject(name="Sport2"),
+                BackupSubject(name="Mathe", default_doppelstunde="muss"),
+            ],
+            curriculum=[BackupCurriculumItem(class_name="5a", subject_name="Mathe", wochenstunden=4)],
+            requirements=[
+                BackupRequirementItem(class_name="5a", subject_name="Mathe", teacher_name="BAU", wochenstunden=4),
+            ],
+            rule_profiles=[{"name": "Standard", "W_GAPS_START": 7, "account_id": 999}],
+        )
+        data.update(overrides)
+        return BackupPayload(**data)
+
+    def _import(self, payload: BackupPayload, replace: bool = False):
+        return import_data(payload=payload, account_id=self.account_id, session=self.session, replace=replace)
+
+    def test_import_creates_entities_and_resolves_references(self) -> None:
+        self.assertEqual(self._import(self._payload()), {"ok": True})
+
+        teachers = {t.kuerzel: t for t in self.session.exec(select(Teacher)).all()}
+        self.assertTrue({"ALT", "BAU"} <= set(teachers))
+        self.assertNotEqual(teachers["ALT"].color, teachers["BAU"].color)
+        classes = {c.name: c for c in self.session.exec(select(Class)).all()}
+        self.assertEqual(classes["5a"].homeroom_teacher_id, teachers["ALT"].id)
+        self.assertEqual(classes["5b"].homeroom_teacher_id, teachers["BAU"].id)
+        subjects = {s.name: s for s in self.session.exec(select(Subject)).all()}
+        room = self.session.exec(select(Room)).one()
+        self.assertEqual(subjects["Sport"].required_room_id, room.id)
+        self.assertEqual(subjects["Sport"].alias_subject_id, subjects["Sport2"].id)
+        requirement = self.session.exec(select(Requirement)).one()
+        self.assertEqual(requirement.teacher_id, teachers["BAU"].id)
+        profile = self.session.exec(select(RuleProfile)).one()
+        self.assertEqual((profile.account_id, profile.W_GAPS_START), (self.account_id, 7))
+
+    def test_reimport_updates_in_place_and_roundtrips(self) -> None:
+        self._import(self._payload())
+        exported = export_data(account_id=self.account_id, session=self.session)
+
+        self._import(self._payload(teachers=[BackupTeacher(kuerzel="BAU", deputat=12)]))
+        self._import(exported)
+
+        self.assertEqual(len(self.session.exec(select(Teacher).where(Teacher.kuerzel.in_(["ALT", "BAU"]))).all()), 2)
+        self.assertEqual(len(self.session.exec(select(ClassSubject)).all()), 1)
+        self.assertEqual(len(self.session.exec(select(Requirement)).all()), 1)
+        bau = self.session.exec(select(Teacher).where(Teacher.kuerzel == "BAU")).one()
+        self.assertEqual(bau.deputat, 20)
+
+    def test_import_rolls_back_on_unknown_reference(self) -> None:
+        payload = self._payload(
+            requirements=[
+                BackupRequirementItem(class_name="5a", subject_name="Mathe", teacher_name="XYZ", wochenstunden=4),
+            ]
+        )
+        with self.assertRaises(HTTPException) as ctx:
+            self._import(payload)
+
+        self.assertEqual(ctx.exception.status_code, 400)
+        self.assertEqual(self.session.exec(select(Teacher).where(Teacher.kuerzel == "ALT")).all(), [])
+        self.assertEqual(self.session.exec(select(Class)).all(), [])
+
+
+    def _ndjson(self, records) -> list:
+        return b"".join(_ndjson_line(record_type, item) for record_type, item in records).split(b"\n")
+
+    def test_ndjson_stream_roundtrip_in_small_batches(self) -> None:
+        self._import(self._payload())
+        school_class = self.session.exec(select(Class).where(Class.name == "5a")).one()
+        subject = self.session.exec(select(Subject).where(Subject.name == "Mathe")).one()
+        teacher = self.session.exec(select(Teacher).where(Teacher.kuerzel == "BAU")).one()
+        plan_id = persist_plan_with_slots(
+            self.session,
+            Plan(account_id=self.account_id, name="Plan A", status="OPTIMAL"),
+            [
+                {"class_id": school_class.id, "tag": "Mo", "stunde": stunde, "subject_id": subject.id,
+                 "teacher_id": teacher.id, "room_id": None}
+                for stunde in (1, 2)
+            ],
+        )
+        lines = self._ndjson(_iter_backup_records(self.session, self.account_id))
+        lines += self._ndjson(_iter_plan_records(self.session, self.account_id, [plan_id]))
+
+        target = Account(name="Ziel")
+        self.session.add(target)
+        self.session.commit()
+        importer = _NdjsonImporter(self.session, target.id, replace=False, batch_size=1)
+        importer.feed(lines)
+        counts = importer.finish()
+        self.session.commit()
+
+        self.assertEqual(counts["subject"], 3)
+        self.assertEqual(counts["plan"], 1)
+        subjects = {s.name: s for s in self.session.exec(select(Subject).where(Subject.account_id == target.id)).all()}
+        # Alias points at a subject that arrived in a later batch
+        self.assertEqual(subjects["Sport"].alias_subject_id, subjects["Sport2"].id)
+        requirement = self.session.exec(select(Requirement).where(Requirement.account_id == target.id)).one()
+        self.assertEqual(requirement.subject_id, subjects["Mathe"].id)
+        plan = self.session.exec(select(Plan).where(Plan.account_id == target.id)).one()
+        slots = self.session.exec(select(PlanSlot).where(PlanSlot.plan_id == plan.id)).all()
+        self.assertEqual(len(slots), 2)
+
+    def test_ndjson_batches_reuse_the_prefetched_tables(self) -> None:
+        teachers = [BackupTeacher(name=f"Lehrkraft {idx}", kuerzel=f"L{idx:02d}") for idx in range(30)]
+        records = [("teacher", teacher) for teacher in teachers]
+        records += [("class", BackupClass(name=f"{idx}a", homeroom_teacher=f"L{idx:02d}")) for idx in range(10)]
+        # the same teacher again in a later batch is updated, not inserted twice
+        records += [("teacher", BackupTeacher(name="Lehrkraft 0", kuerzel="L00", deputat=12.0))]
+
+        teacher_selects = []
+
+        def _count(conn, cursor, statement, parameters, context, executemany) -> None:
+            if statement.lstrip().upper().startswith("SELECT") and "FROM teacher" in statement:
+                teacher_selects.append(statement)
+
+        event.listen(self.engine, "before_cursor_execute", _count)
+        try:
+            importer = _NdjsonImporter(self.session, self.account_id, replace=False, batch_size=4)
+            importer.feed(self._ndjson(records))
+            importer.finish()
+            self.session.commit()
+        finally:
+            event.remove(self.engine, "before_cursor_execute", _count)
+
+        self.assertEqual(len(teacher_selects), 1)
+        stored = self.session.exec(select(Teacher).where(Teacher.account_id == self.account_id)).all()
+        self.assertEqual(len(stored), 30)
+        first = next(teacher for teacher in stored if teacher.kuerzel == "L00")
+        self.assertEqual(first.deputat, 12.0)
+        homeroom = self.session.exec(select(Class).where(Class.name == "9a")).one()
+        self.assertEqual(homeroom.homeroom_teacher_id, next(t.id for t in stored if t.kuerzel == "L09"))
+
+    def test_ndjson_importer_rejects_error_records(self) -> None:
+        importer = _NdjsonImporter(self.session, self.account_id, replace=False, batch_size=10)
+        with self.assertRaises(HTTPException):
+            importer.feed([_ndjson_line("error", {"detail": "kaputt"})])
+        with self.assertRaises(HTTPException):
+            importer.feed([b"{kein json"])
+
+
+if __name__ == "__main__":
+    unittest.main()
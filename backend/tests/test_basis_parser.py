@@ -2,11 +2,17 @@ from __future__ import annotations
 
 import json
 import unittest
+from datetime import datetime, timedelta, timezone
 
 import pandas as pd
+from sqlalchemy import event, text
 from sqlmodel import SQLModel, Session, create_engine
 
-from backend.app.domain.planner.basis_parser import BasisPlanParser, BasisPlanContext
+from backend.app.domain.planner.basis_parser import (
+    BasisPlanContext,
+    BasisPlanParser,
+    invalidate_basis_plan_cache,
+)
 from backend.app.models import Account, BasisPlan, PlanningPeriod
 
 
@@ -65,3 +71,93 @@ class BasisPlanParserTests(unittest.TestCase):
         lookup_key = ("1A", "Di", 1)
         self.assertIn(lookup_key, context.flexible_slot_lookup)
         self.assertTrue(context.flexible_slot_limits[lookup_key])
+
+
+class BasisPlanCacheTests(unittest.TestCase):
+    PAYLOAD = {
+        "meta": {"slots": [{"label": "1"}, {"label": "Pause", "isPause": True}, "x"]},
+        "rooms": {"5": {"allowed": {"Mo": [False, True]}}},
+        "classes": {"1": {"allowed": {"Mo": [True, False, True, True]}}, "2": {"allowed": {}}},
+        "fixed": {"1": [{"subjectId": 1, "day": "mon", "slot": 0}, {"subjectId": 9, "day": "tue", "slot": 9}]},
+        "flexible": {
+            "1": [{"subjectId": 1, "slots": [{"day": "wed", "slot": 2}, {"day": "mon", "slot": 6}]}],
+            "2": [{"subjectId": 9, "slots": [{"day": "fri", "slot": 11}]}],
+        },
+    }
+
+    def setUp(self) -> None:
+        invalidate_basis_plan_cache()
+        self.engine = create_engine("sqlite://", connect_args={"check_same_thread": False})
+        SQLModel.metadata.create_all(self.engine)
+        self.session = Session(self.engine)
+        account = Account(name="Cache", description="Demo")
+        self.session.add(account)
+        self.session.commit()
+        period = PlanningPeriod(account_id=account.id, name="2025", is_active=True)
+        self.session.add(period)
+        self.session.commit()
+        self.basis = BasisPlan(account_id=account.id, planning_period_id=period.id, data=json.dumps(self.PAYLOAD))
+        self.session.add(self.basis)
+        self.session.commit()
+        self.account_id = account.id
+        self.period_id = period.id
+        self.df = pd.DataFrame([{"Klasse": "1A", "Fach": "Mathe", "Lehrer": "Frau", "Wochenstunden": 3}])
+        self.df.index = [0]
+
+    def tearDown(self) -> None:
+        invalidate_basis_plan_cache()
+        self.session.close()
+        self.engine.dispose()
+
+    def _parse(self, parser: BasisPlanParser) -> BasisPlanContext:
+        return parser.parse(self.account_id, self.period_id, self.df, [0], {1: "1A", 2: "2B"}, {1: "Mathe"})
+
+    def test_cached_parse_matches_payload_parse(self) -> None:
+        parser = BasisPlanParser(self.session)
+        cached = self._parse(parser)
+        direct = parser.parse_from_payload(self.PAYLOAD, self.df, [0], {1: "1A", 2: "2B"}, {1: "Mathe"})
+        self.assertEqual(cached, direct)
+        # unknown subject 9: fixed slot index still counts, the flexible one does not
+        self.assertEqual(cached.slots_per_day, 10)
+        self.assertEqual(cached.pause_slots, {1})
+        self.assertEqual(cached.room_plan[5]["Mo"][:2], [False, True])
+        self.assertEqual(cached.fixed_slot_map, {0: [("Mo", 0)]})
+        self.assertEqual(cached.flexible_groups, [{"fid": 0, "slots": [("Mo", 6), ("Mi", 2)]}])
+        self.assertEqual(set(cached.class_windows_by_name), {"1A", "2B"})
+
+    def test_cache_hit_skips_json_and_is_not_mutated(self) -> None:
+        parser = BasisPlanParser(self.session)
+        first = self._parse(parser)
+        first.room_plan[5]["Mo"][0] = True
+        first.pause_slots.add(3)
+
+        statements = []
+
+        def before_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(self.engine, "before_cursor_execute", before_execute)
+        try:
+            second = self._parse(parser)
+        finally:
+            event.remove(self.engine, "before_cursor_execute", before_execute)
+        self.assertFalse(any("basisplan.data" in statement for statement in statements))
+        self.assertEqual(second.room_plan[5]["Mo"][0], False)
+        self.assertEqual(second.pause_slots, {1})
+
+    def test_new_updated_at_or_invalidation_reparses(self) -> None:
+        parser = BasisPlanParser(self.session)
+        self.assertEqual(len(self._parse(parser).slots_meta), 3)
+
+        self.basis.data = json.dumps({"meta": {"slots": [{"label": "A"}]}})
+        self.basis.updated_at = datetime.now(timezone.utc) + timedelta(seconds=1)
+        self.session.add(self.basis)
+        self.session.commit()
+        self.assertEqual([slot.label for slot in self._parse(parser).slots_meta], ["A"])
+
+        # same updated_at (e.g. a restored snapshot) needs the explicit invalidation
+        self.session.exec(text("UPDATE basisplan SET data = :data").bindparams(data=json.dumps({})))
+        self.session.commit()
+        self.assertEqual(len(self._parse(parser).slots_meta), 1)
+        invalidate_basis_plan_cache(self.account_id, self.period_id)
+        self.assertEqual(self._parse(parser).slots_meta, [])
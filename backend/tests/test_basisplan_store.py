@@ -0,0 +1,246 @@
+from __future__ import annotations
+
+import copy
+import json
+import unittest
+
+from fastapi import HTTPException, Request, Response
+from pydantic import ValidationError
+from sqlalchemy import event
+from sqlmodel import SQLModel, Session, create_engine, select
+
+from backend.app.domain.planner.basis_parser import BasisPlanParser
+from backend.app.domain.planner.basis_store import (
+    STORAGE_NORMALIZED,
+    assemble_basis_document,
+    split_basis_document,
+)
+from backend.app.models import (
+    Account,
+    BasisPlan,
+    BasisPlanAvailability,
+    BasisPlanFixedSlot,
+    BasisPlanFlexibleGroup,
+    PlanningPeriod,
+)
+from backend.app.routers.basisplan import (
+    get_basisplan,
+    patch_basisplan_availability,
+    patch_basisplan_fixed,
+    patch_basisplan_flexible,
+    update_basisplan,
+)
+from backend.app.schemas import (
+    BASIS_PLAN_MAX_SLOTS,
+    BasisPlanAvailabilityChange,
+    BasisPlanAvailabilityPatch,
+    BasisPlanFixedPatch,
+    BasisPlanFlexiblePatch,
+    BasisPlanUpdate,
+)
+
+DOCUMENT = {
+    "meta": {"version": 1, "flexCounter": 2, "slots": [{"label": "1. Stunde"}, {"label": "Pause", "isPause": True}]},
+    "rooms": {"7": {"room_id": 7, "allowed": {"Mo": [True, False, True], "Di": [1, 0]}}},
+    "classes": {"3": {"allowed": {"Mo": [False, True]}, "note": "Inklusion"}, "extra": "kaputt"},
+    "windows": {"__default": {"allowed": {}}, "3": {"allowed": {"Fr": [True, True, False]}}},
+    "fixed": {
+        "3": [
+            {"day": "mon", "slot": 0, "subjectId": 11},
+            {"subjectId": 12, "day": "tue", "slot": 1, "locked": True},
+            {"day": "wed", "slot": "2", "subjectId": 13},
+            "unbekannt",
+        ],
+        "4": {"kaputt": True},
+    },
+    "flexible": {
+        "3": [
+            {"id": "flex-1", "subjectId": 11, "slots": [{"day": "mon", "slot": 2}, {"day": "tue", "slot": 3}]},
+            {"id": "flex-2", "subjectId": 12, "label": "AG"},
+        ]
+    },
+}
+
+
+def _request(path: str = "/basisplan") -> Request:
+    return Request({"type": "http", "method": "GET", "path": path, "query_string": b"", "headers": []})
+
+
+class BasisPlanStoreTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.engine = create_engine("sqlite://", connect_args={"check_same_thread": False})
+        SQLModel.metadata.create_all(self.engine)
+        self.session = Session(self.engine)
+        account = Account(name="Test Account")
+        self.session.add(account)
+        self.session.commit()
+        self.account_id = account.id
+        period = PlanningPeriod(account_id=account.id, name="Periode", is_active=True)
+        self.session.add(period)
+        self.session.commit()
+        self.period_id = period.id
+
+    def tearDown(self) -> None:
+        self.session.close()
+        self.engine.dispose()
+
+    def _scope(self) -> dict:
+        return {"account_id": self.account_id, "planning_period_id": self.period_id, "session": self.session}
+
+    def _document(self) -> dict:
+        return get_basisplan(_request(), Response(), **self._scope()).data.model_dump()
+
+    def _basis_row(self) -> BasisPlan:
+        self.session.expire_all()
+        return self.session.exec(select(BasisPlan).where(BasisPlan.planning_period_id == self.period_id)).one()
+
+    def test_split_and_assemble_round_trip(self) -> None:
+        residual, rows = split_basis_document(copy.deepcopy(DOCUMENT))
+        self.assertEqual(len(rows.availability), 3)
+        self.assertEqual(len(rows.fixed), 4)
+        self.assertEqual(len(rows.groups), 2)
+        # Shapes that do not fit the tables stay in the residual JSON
+        self.assertEqual(residual["rooms"]["7"]["allowed"], {"Di": [1, 0]})
+        self.assertEqual(residual["classes"]["extra"], "kaputt")
+        self.assertEqual(residual["fixed"], {"3": [], "4": {"kaputt": True}})
+        self.assertEqual(assemble_basis_document(residual, rows), DOCUMENT)
+
+    def test_put_stores_rows_and_get_assembles_document(self) -> None:
+        update_basisplan(BasisPlanUpdate(data=DOCUMENT), **self._scope())
+        row = self._basis_row()
+        self.assertEqual(row.storage_version, STORAGE_NORMALIZED)
+        self.assertNotIn("subjectId", row.data)
+        self.assertEqual(len(self.session.exec(select(BasisPlanFixedSlot)).all()), 4)
+
+        document = self._document()
+        for section in ("meta", "rooms", "classes", "windows", "fixed", "flexible"):
+            self.assertEqual(document[section], DOCUMENT[section])
+
+        parsed = BasisPlanParser(self.session).load_normalized(self.account_id, self.period_id)
+        self.assertEqual(parsed.room_plan[7]["Mo"][:3], [True, False, True])
+        self.assertEqual(parsed.fixed_entries, [(3, 11, "Mo", 0), (3, 12, "Di", 1), (3, 13, "Mi", 2)])
+
+    def test_patches_touch_only_affected_rows(self) -> None:
+        update_basisplan(BasisPlanUpdate(data=DOCUMENT), **self._scope())
+        residual = self._basis_row().data
+        statements = []
+
+        def before_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(self.engine, "before_cursor_execute", before_execute)
+        self.addCleanup(event.remove, self.engine, "before_cursor_execute", before_execute)
+
+        result = patch_basisplan_availability(
+            BasisPlanAvailabilityPatch(
+                changes=[
+                    {"section": "rooms", "key": "7", "day": "Mo", "slot": 1, "allowed": True},
+                    {"section": "windows", "key": "__default", "day": "Di", "slot": 2, "allowed": False},
+                ]
+            ),
+            **self._scope(),
+        )
+        self.assertEqual(result.changed, 2)
+        patch_basisplan_fixed(
+            BasisPlanFixedPatch(
+                upsert=[{"class_id": 3, "day": "mon", "slot": 0, "subject_id": 99}],
+                remove=[{"class_id": 3, "day": "tue", "slot": 1}],
+            ),
+            **self._scope(),
+        )
+        patch_basisplan_flexible(
+            BasisPlanFlexiblePatch(
+                upsert=[
+                    {"class_id": 3, "id": "flex-2", "subject_id": 12, "slots": [{"day": "fri", "slot": 4}]},
+                    {"class_id": 5, "id": "flex-3", "subject_id": 14, "slots": [{"day": "thu", "slot": 1}]},
+                ],
+                remove=[{"class_id": 3, "id": "flex-1"}],
+            ),
+            **self._scope(),
+        )
+
+        rewrites = [s for s in statements if s.lstrip().upper().startswith("UPDATE BASISPLAN ") and "data" in s]
+        self.assertEqual(rewrites, [])
+        self.assertEqual(self._basis_row().data, residual)
+
+        document = self._document()
+        self.assertEqual(document["rooms"]["7"]["allowed"]["Mo"], [True, True, True])
+        self.assertEqual(document["windows"]["__default"]["allowed"]["Di"], [True, True, False])
+        self.assertEqual(
+            document["fixed"]["3"],
+            [{"day": "wed", "slot": "2", "subjectId": 13}, "unbekannt", {"day": "mon", "slot": 0, "subjectId": 99}],
+        )
+        self.assertEqual(
+            document["flexible"],
+            {
+                "3": [{"id": "flex-2", "subjectId": 12, "slots": [{"day": "fri", "slot": 4}], "label": "AG"}],
+                "5": [{"id": "flex-3", "subjectId": 14, "slots": [{"day": "thu", "slot": 1}]}],
+            },
+        )
+        parsed = BasisPlanParser(self.session).load_normalized(self.account_id, self.period_id)
+        self.assertIn((3, 99, "Mo", 0), parsed.fixed_entries)
+
+    def test_patch_migrates_legacy_document(self) -> None:
+        self.session.add(
+            BasisPlan(account_id=self.account_id, planning_period_id=self.period_id, data=json.dumps(DOCUMENT))
+        )
+        self.session.commit()
+        before = self._document()
+
+        result = patch_basisplan_fixed(BasisPlanFixedPatch(), **self._scope())
+        self.assertEqual(result.changed, 0)
+        row = self._basis_row()
+        self.assertEqual(row.storage_version, STORAGE_NORMALIZED)
+        self.assertEqual(self._document(), before)
+        self.assertEqual(len(self.session.exec(select(BasisPlanAvailability)).all()), 3)
+        self.assertEqual(len(self.session.exec(select(BasisPlanFlexibleGroup)).all()), 2)
+
+    def test_flexible_upsert_merges_groups_with_the_same_key(self) -> None:
+        document = copy.deepcopy(DOCUMENT)
+        document["flexible"]["3"].append({"id": "flex-1", "subjectId": 13, "slots": [{"day": "fri", "slot": 0}]})
+        self.session.add(
+            BasisPlan(account_id=self.account_id, planning_period_id=self.period_id, data=json.dumps(document))
+        )
+        self.session.commit()
+
+        patch_basisplan_flexible(
+            BasisPlanFlexiblePatch(
+                upsert=[{"class_id": 3, "id": "flex-1", "subject_id": 14, "slots": [{"day": "wed", "slot": 1}]}]
+            ),
+            **self._scope(),
+        )
+        self.assertEqual(
+            self._document()["flexible"]["3"],
+            [
+                {"id": "flex-1", "subjectId": 14, "slots": [{"day": "wed", "slot": 1}]},
+                {"id": "flex-2", "subjectId": 12, "label": "AG"},
+            ],
+        )
+        self.assertEqual(len(self.session.exec(select(BasisPlanFlexibleGroup)).all()), 2)
+
+    def test_slots_beyond_the_day_are_rejected(self) -> None:
+        with self.assertRaises(ValidationError):
+            BasisPlanAvailabilityChange(section="rooms", key="7", day="Mo", slot=10**9, allowed=False)
+        with self.assertRaises(ValidationError):
+            BasisPlanFixedPatch(upsert=[{"class_id": 3, "day": "mon", "slot": BASIS_PLAN_MAX_SLOTS, "subject_id": 1}])
+
+        # models built without validation still get a 400 instead of a huge slot list
+        change = BasisPlanAvailabilityChange.model_construct(section="rooms", key="7", day="Mo", slot=10**9, allowed=False)
+        with self.assertRaises(HTTPException) as ctx:
+            patch_basisplan_availability(BasisPlanAvailabilityPatch(changes=[change]), **self._scope())
+        self.assertEqual(ctx.exception.status_code, 400)
+        self.assertEqual(self.session.exec(select(BasisPlanAvailability)).all(), [])
+
+    def test_stored_out_of_range_slots_do_not_widen_the_day(self) -> None:
+        document = copy.deepcopy(DOCUMENT)
+        document["fixed"]["3"].append({"day": "thu", "slot": 10**6, "subjectId": 11})
+        document["flexible"]["3"][0]["slots"].append({"day": "fri", "slot": 10**6})
+        update_basisplan(BasisPlanUpdate(data=document), **self._scope())
+        parsed = BasisPlanParser(self.session).load_normalized(self.account_id, self.period_id)
+        self.assertLess(parsed.base_slots_per_day, BASIS_PLAN_MAX_SLOTS)
+        self.assertNotIn((3, 11, "Do", 10**6), parsed.fixed_entries)
+        self.assertTrue(all(highest < BASIS_PLAN_MAX_SLOTS for *_, highest in parsed.flexible_entries))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import tempfile
+import unittest
+from pathlib import Path
+
+from sqlalchemy import text
+from sqlalchemy.pool import QueuePool
+
+from backend.app.config import settings
+from backend.app.database import build_engine
+
+
+class DatabaseEngineTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.url = f"sqlite:///{Path(self._tmp.name) / 'tuning.db'}"
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def test_tuned_engine_applies_sqlite_pragmas(self) -> None:
+        engine = build_engine(self.url)
+        try:
+            with engine.connect() as conn:
+                self.assertEqual(conn.execute(text("PRAGMA journal_mode")).scalar(), "wal")
+                self.assertEqual(conn.execute(text("PRAGMA synchronous")).scalar(), 1)  # NORMAL
+                self.assertEqual(
+                    conn.execute(text("PRAGMA busy_timeout")).scalar(),
+                    settings.sqlite_busy_timeout_ms,
+                )
+                self.assertEqual(conn.execute(text("PRAGMA temp_store")).scalar(), 2)  # MEMORY
+            self.assertIsInstance(engine.pool, QueuePool)
+            self.assertEqual(engine.pool.size(), settings.db_pool_size)
+        finally:
+            engine.dispose()
+
+    def test_untuned_engine_keeps_sqlite_defaults(self) -> None:
+        engine = build_engine(self.url, tuned=False)
+        try:
+            with engine.connect() as conn:
+                self.assertEqual(conn.execute(text("PRAGMA journal_mode")).scalar(), "delete")
+        finally:
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import tempfile
+import unittest
+from pathlib import Path
+
+from openpyxl import Workbook
+from sqlmodel import SQLModel, Session, create_engine, select
+
+from backend.app.models import (
+    Account,
+    Class,
+    ClassSubject,
+    DoppelstundeEnum,
+    PlanningPeriod,
+    Requirement,
+    Subject,
+    Teacher,
+)
+from backend.app.services.excel_import import (
+    ExcelImportError,
+    import_curriculum_from_excel,
+    import_requirements_from_excel,
+)
+
+
+ROWS = [
+    ("Fach", "Klasse", "Lehrer", "Wochenstunden", "Doppelstunde"),
+    ("Deutsch", 1, "We", 6, "muss"),
+    ("Mathe", 1, "We", 5, None),
+    ("Deutsch", 1, "Ka", 2, "egal"),
+    ("Mathe", 2.0, "Ka", 4, "kann"),
+    (None, None, None, None, None),
+]
+
+
+class ExcelImportTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.engine = create_engine("sqlite://", connect_args={"check_same_thread": False})
+        SQLModel.metadata.create_all(self.engine)
+        self.session = Session(self.engine)
+        other = Account(name="Andere Schule")
+        account = Account(name="Test Account")
+        self.session.add_all([other, account])
+        self.session.commit()
+        self.session.add(Class(account_id=other.id, name="1"))
+        self.session.add(Teacher(account_id=account.id, name="Frau Weber", kuerzel="We"))
+        period = PlanningPeriod(account_id=account.id, name="Periode", is_active=True)
+        self.session.add(period)
+        self.session.commit()
+        self.account_id = account.id
+        self.period_id = period.id
+
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmpdir.name) / "verteilung.xlsx"
+        self._write(ROWS)
+
+    def tearDown(self) -> None:
+        self.session.close()
+        self.engine.dispose()
+        self.tmpdir.cleanup()
+
+    def _write(self, rows) -> None:
+        workbook = Workbook()
+        for row in rows:
+            workbook.active.append(row)
+        workbook.save(self.path)
+
+    def test_requirements_import_is_scoped_and_chunked(self) -> None:
+        progress = []
+        stats = import_requirements_from_excel(
+            self.session, self.path, self.account_id, self.period_id, chunk_size=2,
+            progress=lambda s: progress.append(s.rows),
+        )
+        self.session.commit()
+
+        self.assertEqual((stats.rows, stats.chunks, stats.inserted), (4, 2, 4))
+        self.assertEqual(progress, [2, 4])
+        self.assertEqual(stats.created, {"subjects": 2, "classes": 2, "teachers": 1})
+        classes = self.session.exec(select(Class).where(Class.account_id == self.account_id)).all()
+        self.assertEqual(sorted(c.name for c in classes), ["1", "2"])
+        weber = self.session.exec(select(Teacher).where(Teacher.kuerzel == "We")).one()
+        requirements = self.session.exec(select(Requirement)).all()
+        self.assertTrue(all(r.account_id == self.account_id for r in requirements))
+        self.assertTrue(all(r.planning_period_id == self.period_id for r in requirements))
+        self.assertEqual(sum(1 for r in requirements if r.teacher_id == weber.id), 2)
+        self.assertEqual(
+            sorted(r.doppelstunde.value for r in requirements),
+            sorted([DoppelstundeEnum.muss.value, "kann", "kann", "kann"]),
+        )
+
+    def test_curriculum_import_sums_hours_per_class_and_subject(self) -> None:
+        stats = import_curriculum_from_excel(self.session, self.path, self.account_id, self.period_id, chunk_size=3)
+        self.session.commit()
+
+        self.assertEqual(stats.inserted, 3)
+        subjects = {s.id: s.name for s in self.session.exec(select(Subject)).all()}
+        classes = {c.id: c.name for c in self.session.exec(select(Class)).all()}
+        totals = {
+            (classes[cs.class_id], subjects[cs.subject_id]): cs.wochenstunden
+            for cs in self.session.exec(select(ClassSubject)).all()
+        }
+        self.assertEqual(totals, {("1", "Deutsch"): 8, ("1", "Mathe"): 5, ("2", "Mathe"): 4})
+
+    def test_missing_columns_raise(self) -> None:
+        self._write([("Fach", "Klasse")])
+        with self.assertRaises(ExcelImportError):
+            import_requirements_from_excel(self.session, self.path, self.account_id, self.period_id)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import unittest
+
+import pandas as pd
+
+from backend.app.domain.planner.result_cache import GenerationResultCache, canonical_hash
+from backend.app.schemas import GenerateParams, GenerateResponse
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _response(score: float) -> GenerateResponse:
+    return GenerateResponse(plan_id=7, status="OPTIMAL", score=score, objective_value=None, slots=[], params_used=GenerateParams())
+
+
+class GenerationCacheTests(unittest.TestCase):
+    def test_canonical_hash_ignores_ordering(self) -> None:
+        df = pd.DataFrame({"Klasse": ["1A", "2A"], "Wochenstunden": [2, 3]})
+        first = {"df": df, "pool": {"b", "a"}, "rules": {"x": 1, "y": True}, "slots": {(1, "Mo"): [0, 1]}}
+        second = {"rules": {"y": True, "x": 1}, "slots": {(1, "Mo"): [0, 1]}, "pool": {"a", "b"}, "df": df[["Wochenstunden", "Klasse"]]}
+        self.assertEqual(canonical_hash(first), canonical_hash(second))
+        changed = {**first, "df": df.assign(Wochenstunden=[2, 4])}
+        self.assertNotEqual(canonical_hash(first), canonical_hash(changed))
+
+    def test_lru_ttl_and_revision_invalidation(self) -> None:
+        clock = _Clock()
+        cache = GenerationResultCache(max_entries=2, ttl_seconds=60, clock=clock)
+        cache.put(1, (1,), "a", _response(1.0))
+        cache.put(1, (1,), "b", _response(2.0))
+        hit = cache.get(1, (1,), "a")
+        self.assertEqual(hit.score, 1.0)
+        self.assertIsNone(hit.plan_id)
+        cache.put(2, (5,), "c", _response(3.0))  # evicts "b", the least recently used
+        self.assertIsNone(cache.get(1, (1,), "b"))
+        self.assertIsNotNone(cache.get(2, (5,), "c"))
+
+        self.assertIsNone(cache.get(1, (2,), "a"))  # new revision drops the account's entries
+        self.assertIsNone(cache.get(1, (1,), "a"))
+        self.assertIsNotNone(cache.get(2, (5,), "c"))
+
+        clock.now = 61
+        self.assertIsNone(cache.get(2, (5,), "c"))
+        self.assertEqual(cache.stats(), {"entries": 0, "hits": 3, "misses": 4})
+
+        disabled = GenerationResultCache(max_entries=0)
+        disabled.put(1, (1,), "a", _response(1.0))
+        self.assertIsNone(disabled.get(1, (1,), "a"))
+
+
+if __name__ == "__main__":
+    unittest.main()
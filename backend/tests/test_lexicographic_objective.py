@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import unittest
+
+import pandas as pd
+from fastapi import HTTPException
+from ortools.sat.python import cp_model
+
+from backend.app.domain.planner.solver_presets import (
+    DEFAULT_OBJECTIVE_ORDER,
+    resolve_generate_params,
+    solver_param_inputs,
+)
+from backend.app.infrastructure.solver.executor import collect_solver_result
+from backend.app.infrastructure.solver.ortools_solver import OrToolsPlannerSolver
+from backend.app.schemas import GenerateParams
+
+
+def _inputs(**rules) -> dict:
+    df = pd.DataFrame(
+        {
+            "Wochenstunden": [3, 2, 2],
+            "Klasse": ["1A", "1A", "2A"],
+            "Lehrer": ["Frau A", "Herr B", "Frau A"],
+            "Fach": ["Mathe", "Deutsch", "Kunst"],
+            "Bandfach": [False, False, False],
+            "Participation": ["curriculum", "curriculum", "curriculum"],
+        }
+    )
+    regeln = {
+        key: False
+        for key in (
+            "stundenbegrenzung",
+            "stundenbegrenzung_erste_stunde",
+            "fach_nachmittag_regeln",
+            "mittagsschule_vormittag",
+            "doppelstundenregel",
+            "einzelstunde_nur_rand",
+        )
+    }
+    regeln.update(keine_hohlstunden=True, gleichverteilung=True)
+    regeln.update(rules)
+    return {
+        "df": df,
+        "FACH_ID": [0, 1, 2],
+        "KLASSEN": ["1A", "2A"],
+        "LEHRER": ["Frau A", "Herr B"],
+        "regeln": regeln,
+        "teacher_workdays": {},
+        "pool_teacher_names": set(),
+        "room_plan": {},
+        "fixed_slots": {},
+        "flexible_groups": [],
+        "flexible_slot_limits": {},
+        "class_windows": {},
+        "pause_slots": set(),
+        "slots_per_day": 3,
+    }
+
+
+def _solve(inputs: dict, **params):
+    resolved = resolve_generate_params(GenerateParams(multi_start=False, deterministic=True, **params))
+    return OrToolsPlannerSolver().solve({**inputs, **solver_param_inputs(resolved)})
+
+
+class LexicographicObjectiveTests(unittest.TestCase):
+    def test_order_defaults_and_rejects_duplicates(self) -> None:
+        params = resolve_generate_params(GenerateParams(objective_mode="lexicographic"))
+        self.assertEqual(params.objective_order, DEFAULT_OBJECTIVE_ORDER)
+        self.assertEqual(resolve_generate_params(GenerateParams()).objective_order, [])
+
+        with self.assertRaises(HTTPException) as ctx:
+            resolve_generate_params(
+                GenerateParams(objective_mode="lexicographic", objective_order=["class_gaps", "class_gaps"])
+            )
+        self.assertEqual(ctx.exception.status_code, 400)
+
+    def test_stages_follow_order_and_keep_the_first_optimum(self) -> None:
+        output = _solve(
+            _inputs(W_EVEN_DIST=50),
+            objective_mode="lexicographic",
+            objective_order=["class_gaps", "even_distribution"],
+        )
+        self.assertEqual(output["status"], cp_model.OPTIMAL)
+        stages = output["stats"]["stages"]
+        self.assertEqual([stage["group"] for stage in stages][:2], ["class_gaps", "even_distribution"])
+
+        # the class gaps stage reaches what class gaps alone would reach
+        alone = _solve(_inputs(gleichverteilung=False))
+        self.assertEqual(stages[0]["objective"], alone["solver"].ObjectiveValue())
+
+        result = collect_solver_result(output)
+        self.assertEqual(len(result["assignments"]), 7)
+        self.assertGreater(result["score"], 0.0)
+
+    def test_unlisted_groups_form_a_final_stage(self) -> None:
+        output = _solve(_inputs(), objective_mode="lexicographic", objective_order=["even_distribution"])
+        self.assertEqual([stage["group"] for stage in output["stats"]["stages"]], ["even_distribution", "rest"])
+
+    def test_weighted_mode_is_unchanged(self) -> None:
+        output = _solve(_inputs())
+        self.assertEqual(output["status"], cp_model.OPTIMAL)
+        self.assertNotIn("stages", output["stats"])
+
+
+if __name__ == "__main__":
+    unittest.main()
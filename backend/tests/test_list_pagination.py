@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+import json
+import unittest
+from datetime import datetime, timedelta
+
+from fastapi import HTTPException, Request, Response
+from sqlmodel import SQLModel, Session, create_engine
+
+from backend.app.core.pagination import NEXT_CURSOR_HEADER
+from backend.app.domain.plans.service import PlanQueryService
+from backend.app.models import (
+    Account,
+    Class,
+    ClassSubject,
+    DistributionVersion,
+    Plan,
+    PlanningPeriod,
+    Requirement,
+    Subject,
+    Teacher,
+)
+from backend.app.routers.curriculum import list_curriculum
+from backend.app.routers.masterdata import list_classes
+from backend.app.routers.requirements import list_requirements
+from backend.app.routers.versions import list_versions
+
+
+class KeysetPaginationTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.engine = create_engine("sqlite://", connect_args={"check_same_thread": False})
+        SQLModel.metadata.create_all(self.engine)
+        self.session = Session(self.engine)
+        account = Account(name="Test Account")
+        self.session.add(account)
+        self.session.commit()
+        self.account_id = account.id
+        period = PlanningPeriod(account_id=account.id, name="Periode", is_active=True)
+        teachers = [Teacher(account_id=account.id, name=f"Lehrkraft {idx}", kuerzel=f"L{idx}") for idx in range(2)]
+        subject = Subject(account_id=account.id, name="Deutsch")
+        classes = [Class(account_id=account.id, name=f"{idx}a") for idx in range(1, 6)]
+        self.session.add_all([period, subject, *teachers, *classes])
+        self.session.commit()
+        self.period_id = period.id
+        self.subject_id = subject.id
+        self.teacher_ids = [teacher.id for teacher in teachers]
+        self.class_ids = [cls.id for cls in classes]
+        for idx, class_id in enumerate(self.class_ids):
+            self.session.add(
+                Requirement(
+                    account_id=account.id,
+                    # legacy rows without period are claimed by the listing
+                    planning_period_id=None if idx == 0 else period.id,
+                    class_id=class_id,
+                    subject_id=subject.id,
+                    teacher_id=self.teacher_ids[idx % 2],
+                    wochenstunden=idx + 1,
+                )
+            )
+            self.session.add(
+                ClassSubject(
+                    account_id=account.id,
+                    planning_period_id=period.id,
+                    class_id=class_id,
+                    subject_id=subject.id,
+                    wochenstunden=idx + 1,
+                )
+            )
+        self.session.commit()
+
+    def tearDown(self) -> None:
+        self.session.close()
+        self.engine.dispose()
+
+    def _requirements(self, **params):
+        response = Response()
+        params.setdefault("version_id", None)
+        params.setdefault("class_id", None)
+        params.setdefault("teacher_id", None)
+        params.setdefault("subject_id", None)
+        params.setdefault("limit", None)
+        params.setdefault("cursor", None)
+        params.setdefault("fields", None)
+        rows = list_requirements(
+            response,
+            account_id=self.account_id,
+            planning_period_id=self.period_id,
+            session=self.session,
+            **params,
+        )
+        return rows, response
+
+    def test_requirements_are_paged_by_id(self) -> None:
+        rows, response = self._requirements()
+        self.assertEqual(len(rows), 5)
+        self.assertNotIn(NEXT_CURSOR_HEADER, response.headers)
+        self.assertTrue(all(row.planning_period_id == self.period_id for row in rows))
+
+        seen = []
+        cursor = None
+        pages = 0
+        while True:
+            rows, response = self._requirements(limit=2, cursor=cursor)
+            seen.extend(row.id for row in rows)
+            pages += 1
+            cursor = response.headers.get(NEXT_CURSOR_HEADER)
+            if not cursor:
+                break
+        self.assertEqual(pages, 3)
+        self.assertEqual(seen, sorted(seen))
+        self.assertEqual(len(set(seen)), 5)
+
+    def test_requirement_filters_and_projection(self) -> None:
+        rows, _ = self._requirements(teacher_id=self.teacher_ids[1])
+        self.assertEqual([row.class_id for row in rows], [self.class_ids[1], self.class_ids[3]])
+
+        rows, _ = self._requirements(class_id=self.class_ids[2])
+        self.assertEqual(len(rows), 1)
+
+        projected, _ = self._requirements(fields="class_id,wochenstunden", limit=2)
+        payload = json.loads(projected.body)
+        self.assertEqual(list(payload[0].keys()), ["id", "class_id", "wochenstunden"])
+
+        with self.assertRaises(HTTPException) as ctx:
+            self._requirements(fields="class_id,geheim")
+        self.assertEqual(ctx.exception.status_code, 400)
+        with self.assertRaises(HTTPException) as ctx:
+            self._requirements(limit=2, cursor="kein-cursor")
+        self.assertEqual(ctx.exception.status_code, 400)
+
+    def test_curriculum_and_masterdata_pages(self) -> None:
+        response = Response()
+        rows = list_curriculum(
+            response,
+            class_id=None,
+            subject_id=self.subject_id,
+            limit=4,
+            cursor=None,
+            fields=None,
+            account_id=self.account_id,
+            planning_period_id=self.period_id,
+            session=self.session,
+        )
+        self.assertEqual(len(rows), 4)
+        rest = list_curriculum(
+            Response(),
+            class_id=None,
+            subject_id=self.subject_id,
+            limit=4,
+            cursor=response.headers[NEXT_CURSOR_HEADER],
+            fields=None,
+            account_id=self.account_id,
+            planning_period_id=self.period_id,
+            session=self.session,
+        )
+        self.assertEqual(len(rest), 1)
+
+        projected = list_classes(
+            Request({"type": "http", "method": "GET", "path": "/classes", "query_string": b"fields=name", "headers": []}),
+            Response(),
+            homeroom_teacher_id=None,
+            limit=None,
+            cursor=None,
+            fields="name",
+            account_id=self.account_id,
+            session=self.session,
+        )
+        self.assertEqual([item["name"] for item in json.loads(projected.body)], ["1a", "2a", "3a", "4a", "5a"])
+
+    def test_versions_and_plans_page_by_creation_time(self) -> None:
+        base = datetime(2026, 1, 1, 8, 0)
+        for idx in range(3):
+            self.session.add(
+                DistributionVersion(
+                    account_id=self.account_id,
+                    planning_period_id=self.period_id,
+                    name=f"V{idx}",
+                    created_at=base + timedelta(days=2 - idx),
+                )
+            )
+            for offset in range(2):
+                # identical timestamps exercise the id tie-breaker
+                self.session.add(
+                    Plan(
+                        account_id=self.account_id,
+                        planning_period_id=self.period_id,
+                        name=f"Plan {idx}.{offset}",
+                        created_at=base + timedelta(hours=idx),
+                    )
+                )
+        self.session.commit()
+
+        response = Response()
+        first = list_versions(
+            response,
+            limit=2,
+            cursor=None,
+            fields=None,
+            account_id=self.account_id,
+            planning_period_id=self.period_id,
+            session=self.session,
+        )
+        second = list_versions(
+            Response(),
+            limit=2,
+            cursor=response.headers[NEXT_CURSOR_HEADER],
+            fields=None,
+            account_id=self.account_id,
+            planning_period_id=self.period_id,
+            session=self.session,
+        )
+        self.assertEqual([v.name for v in first + second], ["V2", "V1", "V0"])
+
+        service = PlanQueryService(self.session)
+        names = []
+        cursor = None
+        while True:
+            page = service.list_plans_for_request(self.account_id, self.period_id, limit=4, cursor=cursor)
+            names.extend(summary.name for summary in page.rows)
+            cursor = page.next_cursor
+            if not cursor:
+                break
+        self.assertEqual(names, ["Plan 2.1", "Plan 2.0", "Plan 1.1", "Plan 1.0", "Plan 0.1", "Plan 0.0"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import unittest
+
+import pandas as pd
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from sqlalchemy import text
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, create_engine
+
+from backend.app.core.metrics import MetricsMiddleware, install_query_counter, record_generation
+from backend.app.domain.planner.result_cache import GenerationResultCache
+from backend.app.infrastructure.solver.executor import collect_solver_result
+from backend.app.infrastructure.solver.ortools_solver import OrToolsPlannerSolver
+from backend.app.routers.metrics import get_metrics
+
+
+def _sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def _app() -> FastAPI:
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    install_query_counter()
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    def read_item(item_id: int):
+        with Session(engine) as session:
+            session.exec(text("SELECT 1"))
+            session.exec(text("SELECT 2"))
+        return {"id": item_id}
+
+    app.add_middleware(MetricsMiddleware)
+    return app
+
+
+class MetricsTests(unittest.TestCase):
+    def test_middleware_records_latency_and_queries_per_route(self) -> None:
+        labels = {"method": "GET", "route": "/items/{item_id}"}
+        before = _sample("stundenplan_http_request_duration_seconds_count", status="200", **labels)
+        queries_before = _sample("stundenplan_http_request_db_queries_sum", **labels)
+        missing_before = _sample(
+            "stundenplan_http_request_duration_seconds_count", method="GET", route="<unmatched>", status="404"
+        )
+
+        with TestClient(_app()) as client:
+            self.assertEqual(client.get("/items/1").status_code, 200)
+            self.assertEqual(client.get("/items/2").status_code, 200)
+            self.assertEqual(client.get("/nothing/here").status_code, 404)
+
+        self.assertEqual(_sample("stundenplan_http_request_duration_seconds_count", status="200", **labels) - before, 2)
+        self.assertEqual(_sample("stundenplan_http_request_db_queries_sum", **labels) - queries_before, 4)
+        self.assertEqual(
+            _sample("stundenplan_http_request_duration_seconds_count", method="GET", route="<unmatched>", status="404")
+            - missing_before,
+            1,
+        )
+
+    def test_generation_metrics_from_solver_stats(self) -> None:
+        df = pd.DataFrame(
+            {
+                "Wochenstunden": [2],
+                "Klasse": ["1A"],
+                "Lehrer": ["Frau A"],
+                "Fach": ["Mathe"],
+                "Bandfach": [False],
+                "Participation": ["curriculum"],
+            }
+        )
+        result = collect_solver_result(
+            OrToolsPlannerSolver().solve(
+                {
+                    "df": df,
+                    "FACH_ID": [0],
+                    "KLASSEN": ["1A"],
+                    "LEHRER": ["Frau A"],
+                    "regeln": {"stundenbegrenzung": False, "mittagsschule_vormittag": False},
+                    "slots_per_day": 3,
+                    "multi_start": False,
+                }
+            )
+        )
+        stats = result["stats"]
+        self.assertNotIn("progress", stats)
+        self.assertGreater(stats["variables"], 0)
+        self.assertGreater(stats["constraints"], 0)
+        self.assertGreaterEqual(stats["presolve_seconds"], 0.0)
+
+        generations = _sample("stundenplan_solver_generations_total", status="OPTIMAL")
+        builds = _sample("stundenplan_solver_build_seconds_count")
+        variables = _sample("stundenplan_solver_model_variables_sum")
+        record_generation("OPTIMAL", result["objective_value"], stats, cpu_seconds=0.1)
+        self.assertEqual(_sample("stundenplan_solver_generations_total", status="OPTIMAL") - generations, 1)
+        self.assertEqual(_sample("stundenplan_solver_build_seconds_count") - builds, 1)
+        self.assertEqual(_sample("stundenplan_solver_model_variables_sum") - variables, stats["variables"])
+
+    def test_cache_lookups_are_counted(self) -> None:
+        hits = _sample("stundenplan_cache_lookups_total", cache="generation", result="hit")
+        misses = _sample("stundenplan_cache_lookups_total", cache="generation", result="miss")
+        cache = GenerationResultCache(max_entries=4)
+        self.assertIsNone(cache.get(1, (1,), "key"))
+        self.assertEqual(_sample("stundenplan_cache_lookups_total", cache="generation", result="miss") - misses, 1)
+        self.assertEqual(_sample("stundenplan_cache_lookups_total", cache="generation", result="hit") - hits, 0)
+
+    def test_metrics_endpoint_returns_exposition_text(self) -> None:
+        response = get_metrics()
+        self.assertTrue(response.media_type.startswith("text/plain"))
+        body = response.body.decode("utf-8")
+        self.assertIn("stundenplan_http_request_duration_seconds", body)
+        self.assertIn("stundenplan_solver_queued", body)
+
+
+if __name__ == "__main__":
+    unittest.main()
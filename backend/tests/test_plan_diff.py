@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import unittest
+
+from fastapi import HTTPException
+from sqlmodel import SQLModel, Session, create_engine
+
+from backend.app.domain.plans.diff import diff_packed_plans
+from backend.app.domain.plans.matrix import pack_plan_slots
+from backend.app.domain.plans.persistence import persist_plan_with_slots
+from backend.app.domain.plans.service import PlanQueryService
+from backend.app.models import Account, Plan, PlanningPeriod
+
+
+def _slot(class_id, tag, stunde, subject_id, teacher_id, room_id=None):
+    return {
+        "class_id": class_id,
+        "tag": tag,
+        "stunde": stunde,
+        "subject_id": subject_id,
+        "teacher_id": teacher_id,
+        "room_id": room_id,
+    }
+
+
+BEFORE = [
+    _slot(1, "Mo", 1, 10, 100),
+    _slot(1, "Mo", 2, 11, 101, room_id=5),
+    _slot(1, "Di", 1, 12, 102),
+    _slot(2, "Mo", 1, 13, 103),
+    _slot(2, "Fr", 4, 14, 104),
+]
+AFTER = [
+    _slot(1, "Mo", 1, 10, 100),  # unchanged
+    _slot(1, "Mo", 2, 11, 101, room_id=6),  # other room
+    _slot(1, "Mi", 3, 12, 102),  # moved from Di 1
+    _slot(2, "Mo", 1, 15, 103),  # other subject in the same cell
+    _slot(3, "Do", 6, 16, 105),  # new class, larger grid
+]
+
+
+class PlanDiffTests(unittest.TestCase):
+    def test_diff_classifies_cells(self) -> None:
+        diff = diff_packed_plans(pack_plan_slots(BEFORE), pack_plan_slots(AFTER))
+
+        self.assertEqual(
+            diff["summary"],
+            {"unchanged": 1, "moved": 1, "added": 1, "removed": 1, "changed": 1, "room": 1},
+        )
+        [move] = diff["moves"]
+        self.assertEqual(
+            (move["class_id"], move["from_tag"], move["from_stunde"], move["to_tag"], move["to_stunde"]),
+            (1, "Di", 1, "Mi", 3),
+        )
+        self.assertEqual(
+            [(cell["class_id"], cell["tag"], cell["stunde"], cell["change"]) for cell in diff["cells"]],
+            [(1, "Mo", 2, "room"), (2, "Mo", 1, "changed"), (2, "Fr", 4, "removed"), (3, "Do", 6, "added")],
+        )
+        self.assertEqual(diff["per_class"][1]["unchanged"], 1)
+        self.assertEqual(diff["per_class"][2]["changed"], 1)
+        self.assertEqual(diff["per_teacher"], {101: 1, 102: 1, 103: 1, 104: 1, 105: 1})
+
+        same = diff_packed_plans(pack_plan_slots(BEFORE), pack_plan_slots(BEFORE))
+        self.assertEqual(same["summary"]["unchanged"], len(BEFORE))
+        self.assertEqual(same["cells"], [])
+
+    def test_service_diff_and_metric_deltas(self) -> None:
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False})
+        SQLModel.metadata.create_all(engine)
+        self.addCleanup(engine.dispose)
+        with Session(engine) as session:
+            account = Account(name="Test Account")
+            session.add(account)
+            session.commit()
+            period = PlanningPeriod(account_id=account.id, name="Periode", is_active=True)
+            session.add(period)
+            session.commit()
+            ids = [
+                persist_plan_with_slots(
+                    session,
+                    Plan(account_id=account.id, planning_period_id=period.id, name=name, status="OPTIMAL", score=score),
+                    slots,
+                )
+                for name, score, slots in (("A", 10.0, BEFORE), ("B", 12.5, AFTER))
+            ]
+            service = PlanQueryService(session)
+
+            diff = service.diff_plans(ids[0], ids[1], account, period)
+            self.assertEqual(diff.summary.moved, 1)
+            self.assertEqual(diff.score_delta, 2.5)
+            self.assertIsNone(diff.objective_delta)
+            self.assertEqual(diff.cells[0].after.room_id, 6)
+
+            with self.assertRaises(HTTPException) as ctx:
+                service.diff_plans(ids[0], 9999, account, period)
+            self.assertEqual(ctx.exception.status_code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,20 +4,30 @@ import json
 import unittest
 
 from fastapi import HTTPException
-from sqlmodel import SQLModel, Session, create_engine, select
+from sqlmodel import SQLModel, Session, create_engine, delete, select
 
+from backend.app.domain.plans.matrix import load_plan_matrices, pack_plan_slots, unpack_slot_rows
+from backend.app.domain.plans.persistence import persist_plan_with_slots
 from backend.app.domain.plans.service import PlanQueryService
 from backend.app.models import (
     Account,
     BasisPlan,
     Class,
     Plan,
+    PlanMatrix,
     PlanSlot,
     PlanningPeriod,
+    Room,
     Subject,
     Teacher,
 )
-from backend.app.schemas import PlanSlotOut, PlanSlotsUpdateRequest, PlanUpdateRequest
+from backend.app.schemas import (
+    PlanSlotCell,
+    PlanSlotOut,
+    PlanSlotsPatchRequest,
+    PlanSlotsUpdateRequest,
+    PlanUpdateRequest,
+)
 
 
 class PlanQueryServiceTests(unittest.TestCase):
@@ -135,6 +145,152 @@ class PlanQueryServiceTests(unittest.TestCase):
         self.assertEqual(len(rows), 1)
         self.assertEqual(rows[0].tag, "Di")
 
+    def test_replace_plan_slots_keeps_unchanged_rows(self) -> None:
+        original = self.session.exec(select(PlanSlot).where(PlanSlot.plan_id == self.plan.id)).one()
+        payload = PlanSlotsUpdateRequest(
+            slots=[
+                PlanSlotOut(
+                    class_id=self.school_class.id,
+                    tag="Mo",
+                    stunde=1,
+                    subject_id=self.subject.id,
+                    teacher_id=self.teacher.id,
+                ),
+                PlanSlotOut(
+                    class_id=self.school_class.id,
+                    tag="Mo",
+                    stunde=2,
+                    subject_id=self.subject.id,
+                    teacher_id=self.teacher.id,
+                ),
+            ]
+        )
+
+        self.service.replace_plan_slots(self.plan.id, payload, self.account, self.period)
+
+        rows = self.session.exec(
+            select(PlanSlot).where(PlanSlot.plan_id == self.plan.id).order_by(PlanSlot.stunde)
+        ).all()
+        self.assertEqual([row.stunde for row in rows], [1, 2])
+        self.assertEqual(rows[0].id, original.id)
+        self.assertEqual(rows[0].planning_period_id, self.period.id)
+
+    def test_replace_plan_slots_rejects_foreign_ids(self) -> None:
+        payload = PlanSlotsUpdateRequest(
+            slots=[
+                PlanSlotOut(
+                    class_id=self.school_class.id,
+                    tag="Di",
+                    stunde=2,
+                    subject_id=self.subject.id,
+                    teacher_id=9999,
+                )
+            ]
+        )
+
+        with self.assertRaises(HTTPException) as ctx:
+            self.service.replace_plan_slots(self.plan.id, payload, self.account, self.period)
+        self.assertEqual(ctx.exception.status_code, 400)
+        rows = self.session.exec(select(PlanSlot).where(PlanSlot.plan_id == self.plan.id)).all()
+        self.assertEqual(len(rows), 1)
+
+    def test_patch_plan_slots_applies_only_changed_cells(self) -> None:
+        other_subject = Subject(account_id=self.account.id, name="Deutsch")
+        self.session.add(other_subject)
+        self.session.commit()
+        payload = PlanSlotsPatchRequest(
+            slots=[
+                PlanSlotOut(
+                    class_id=self.school_class.id,
+                    tag="Mi",
+                    stunde=3,
+                    subject_id=other_subject.id,
+                    teacher_id=self.teacher.id,
+                )
+            ]
+        )
+
+        detail = self.service.patch_plan_slots(self.plan.id, payload, self.account, self.period)
+
+        self.assertEqual(len(detail.slots), 2)
+        detail = self.service.patch_plan_slots(
+            self.plan.id,
+            PlanSlotsPatchRequest(remove=[PlanSlotCell(class_id=self.school_class.id, tag="Mo", stunde=1)]),
+            self.account,
+            self.period,
+        )
+        self.assertEqual(len(detail.slots), 1)
+        self.assertEqual(detail.slots[0].subject_id, other_subject.id)
+
+    def test_replace_plan_slots_keeps_two_lessons_in_one_cell(self) -> None:
+        other_subject = Subject(account_id=self.account.id, name="Religion")
+        other_teacher = Teacher(account_id=self.account.id, name="Herr Band")
+        self.session.add_all([other_subject, other_teacher])
+        self.session.commit()
+        original = self.session.exec(select(PlanSlot).where(PlanSlot.plan_id == self.plan.id)).one()
+        band = [
+            PlanSlotOut(
+                class_id=self.school_class.id,
+                tag="Mo",
+                stunde=1,
+                subject_id=other_subject.id,
+                teacher_id=other_teacher.id,
+            ),
+            PlanSlotOut(
+                class_id=self.school_class.id,
+                tag="Mo",
+                stunde=1,
+                subject_id=self.subject.id,
+                teacher_id=self.teacher.id,
+            ),
+        ]
+
+        detail = self.service.replace_plan_slots(
+            self.plan.id, PlanSlotsUpdateRequest(slots=band), self.account, self.period
+        )
+
+        self.assertEqual(len(detail.slots), 2)
+        rows = self.session.exec(select(PlanSlot).where(PlanSlot.plan_id == self.plan.id)).all()
+        self.assertEqual(
+            sorted((row.subject_id, row.teacher_id) for row in rows),
+            sorted([(self.subject.id, self.teacher.id), (other_subject.id, other_teacher.id)]),
+        )
+        # the stored lesson is matched by subject and teacher and kept as is
+        self.assertIn(original.id, [row.id for row in rows])
+
+        # patching the cell with one lesson leaves exactly that lesson
+        detail = self.service.patch_plan_slots(
+            self.plan.id, PlanSlotsPatchRequest(slots=band[:1]), self.account, self.period
+        )
+        self.assertEqual([(slot.subject_id, slot.teacher_id) for slot in detail.slots], [(other_subject.id, other_teacher.id)])
+
+    def test_reading_an_unpackable_plan_writes_nothing(self) -> None:
+        self.session.add(
+            PlanSlot(
+                account_id=self.account.id,
+                plan_id=self.plan.id,
+                planning_period_id=self.period.id,
+                class_id=self.school_class.id,
+                subject_id=self.subject.id,
+                teacher_id=self.teacher.id,
+                tag="Mo",
+                stunde=1,
+            )
+        )
+        self.session.commit()
+        self.service.get_plan_detail(self.plan.id, self.account, self.period)  # backfills planning_period_id
+
+        commits = []
+        original_commit = self.session.commit
+        self.session.commit = lambda: commits.append(1) or original_commit()
+        try:
+            detail = self.service.get_plan_detail(self.plan.id, self.account, self.period)
+        finally:
+            self.session.commit = original_commit
+        self.assertEqual(len(detail.slots), 2)
+        self.assertEqual(commits, [])
+        self.assertIsNone(self.session.get(PlanMatrix, self.plan.id))
+
     def test_update_plan_metadata_changes_fields(self) -> None:
         payload = PlanUpdateRequest(name="Plan Neu", comment="Neuer Kommentar")
 
@@ -170,6 +326,96 @@ class PlanQueryServiceTests(unittest.TestCase):
         rows = self.session.exec(select(PlanSlot).where(PlanSlot.plan_id == self.plan.id)).all()
         self.assertEqual(len(rows), 0)
 
+    def test_persist_plan_with_slots_writes_plan_and_rows(self) -> None:
+        plan = Plan(
+            account_id=self.account.id,
+            planning_period_id=self.period.id,
+            name="Bulk",
+            status="OPTIMAL",
+        )
+        slots = [
+            {
+                "class_id": self.school_class.id,
+                "tag": tag,
+                "stunde": stunde,
+                "subject_id": self.subject.id,
+                "teacher_id": self.teacher.id,
+                "room_id": None,
+            }
+            for tag in ("Mo", "Di")
+            for stunde in (1, 2, 3)
+        ]
+
+        plan_id = persist_plan_with_slots(self.session, plan, slots)
+
+        rows = self.session.exec(select(PlanSlot).where(PlanSlot.plan_id == plan_id)).all()
+        self.assertEqual(len(rows), 6)
+        self.assertTrue(all(row.planning_period_id == self.period.id for row in rows))
+        self.assertTrue(all(row.account_id == self.account.id for row in rows))
+        packed = load_plan_matrices(self.session, [plan_id])[plan_id]
+        self.assertEqual(int(packed.occupied.sum()), 6)
+
+    def test_get_plan_detail_backfills_and_reads_matrix(self) -> None:
+        self.assertIsNone(self.session.get(PlanMatrix, self.plan.id))
+        self.service.get_plan_detail(self.plan.id, self.account, self.period)
+        self.assertIsNotNone(self.session.get(PlanMatrix, self.plan.id))
+
+        # Once packed, the detail view no longer depends on the PlanSlot rows.
+        self.session.exec(delete(PlanSlot).where(PlanSlot.plan_id == self.plan.id))
+        self.session.commit()
+        detail = self.service.get_plan_detail(self.plan.id, self.account, self.period)
+        self.assertEqual(len(detail.slots), 1)
+
+    def test_pack_plan_slots_roundtrip_and_duplicate_cells(self) -> None:
+        slots = [
+            {"class_id": 7, "tag": "Fr", "stunde": 3, "subject_id": 2, "teacher_id": 5, "room_id": None},
+            {"class_id": 3, "tag": "Mo", "stunde": 1, "subject_id": 1, "teacher_id": 4, "room_id": 9},
+        ]
+        packed = pack_plan_slots(slots)
+        self.assertEqual(packed.cells.shape, (2, 5, 3))
+        self.assertEqual(unpack_slot_rows(packed), [slots[1], slots[0]])
+        self.assertIsNone(pack_plan_slots(slots + [dict(slots[0], subject_id=8)]))
+
+    def test_get_plan_detail_matrix_format(self) -> None:
+        room = Room(account_id=self.account.id, name="Turnhalle")
+        self.session.add(room)
+        self.session.commit()
+        self.service.patch_plan_slots(
+            self.plan.id,
+            PlanSlotsPatchRequest(
+                slots=[
+                    PlanSlotOut(
+                        class_id=self.school_class.id,
+                        tag="Mi",
+                        stunde=3,
+                        subject_id=self.subject.id,
+                        teacher_id=self.teacher.id,
+                        room_id=room.id,
+                    )
+                ]
+            ),
+            self.account,
+            self.period,
+        )
+
+        detail = self.service.get_plan_detail(self.plan.id, self.account, self.period, format="matrix")
+        matrix = detail.matrix
+        self.assertEqual(matrix.days, ["Mo", "Di", "Mi", "Do", "Fr"])
+        self.assertEqual(matrix.slots_per_day, 3)
+        self.assertEqual(matrix.subject_ids, [self.subject.id])
+        self.assertEqual(matrix.room_names, ["Turnhalle"])
+        [cls] = matrix.classes
+        self.assertEqual(cls.class_id, self.school_class.id)
+        self.assertEqual(cls.subject[0], [0, -1, -1])
+        self.assertEqual(cls.subject[2], [-1, -1, 0])
+        self.assertEqual(cls.room[0][0], -1)
+        self.assertEqual(cls.room[2][2], 0)
+        self.assertEqual(detail.slots_meta[0].label, "1. Stunde")
+
+        with self.assertRaises(HTTPException) as ctx:
+            self.service.get_plan_detail(self.plan.id, self.account, self.period, format="grid")
+        self.assertEqual(ctx.exception.status_code, 400)
+
 
 if __name__ == "__main__":
     unittest.main()
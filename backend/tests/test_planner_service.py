@@ -1,13 +1,20 @@
 from __future__ import annotations
 
 import json
+import tempfile
 import unittest
+from pathlib import Path
 
 from fastapi import HTTPException
 from ortools.sat.python import cp_model
 from sqlmodel import SQLModel, Session, create_engine, select
 
+from backend.app.domain.planner.result_cache import canonical_hash
 from backend.app.domain.planner.service import PlannerService
+from backend.app.infrastructure.solver.bundles import load_model_bundle, replay_model_bundle, replay_model_proto
+from backend.app.domain.plans.service import PlanQueryService
+from backend.app.infrastructure.solver.executor import SolverBusyError
+from backend.app.infrastructure.solver.ortools_solver import OrToolsPlannerSolver
 from backend.app.models import (
     Account,
     Class,
@@ -16,11 +23,14 @@ from backend.app.models import (
     PlanningPeriod,
     Requirement,
     Room,
+    RuleProfile,
     Subject,
     Teacher,
     DoppelstundeEnum,
     NachmittagEnum,
 )
+from backend.app.core.tracing import install_trace_query_counter
+from backend.app.routers.plans import get_solver_progress
 from backend.app.schemas import GenerateParams, GenerateRequest
 
 
@@ -75,6 +85,24 @@ class _CapturingPlannerSolver(_FakePlannerSolver):
     def __init__(self) -> None:
         super().__init__()
         self.last_inputs = None
+        self.calls = 0
+
+    def solve(self, inputs):
+        self.last_inputs = inputs
+        self.calls += 1
+        return super().solve(inputs)
+
+
+class _RecordingOrToolsSolver(OrToolsPlannerSolver):
+    """OR-Tools solver that records its last inputs and counts model builds."""
+
+    def __init__(self) -> None:
+        self.last_inputs = None
+        self.builds = 0
+
+    def build_model(self, inputs):
+        self.builds += 1
+        return super().build_model(inputs)
 
     def solve(self, inputs):
         self.last_inputs = inputs
@@ -187,6 +215,23 @@ class PlannerServiceTests(unittest.TestCase):
             )
         self.assertEqual(ctx.exception.status_code, 422)
 
+    def test_generate_plan_returns_429_when_solver_is_busy(self) -> None:
+        class _FullExecutor:
+            max_workers = capacity = 1
+
+            def run(self, solver, inputs):
+                raise SolverBusyError(retry_after=12)
+
+        busy_service = PlannerService(self.session, solver=_FakePlannerSolver(), executor=_FullExecutor())
+        with self.assertRaises(HTTPException) as ctx:
+            busy_service.generate_plan(
+                GenerateRequest(name="Busy", params=GenerateParams()),
+                self.account.id,
+                self.period.id,
+            )
+        self.assertEqual(ctx.exception.status_code, 429)
+        self.assertEqual(ctx.exception.headers["Retry-After"], "12")
+
     def test_analyze_requirements_returns_class_and_teacher_counts(self) -> None:
         analysis = self.service.analyze_requirements(
             version_id=None,
@@ -221,6 +266,145 @@ class PlannerServiceTests(unittest.TestCase):
         snapshot = json.loads(plan.rules_snapshot)
         self.assertFalse(snapshot["keine_lehrerkonflikte"])
 
+    def test_generate_plan_uses_rule_profile_solver_preset(self) -> None:
+        profile = RuleProfile(account_id=self.account.id, name="Schnell", solver_preset="fast_draft")
+        self.session.add(profile)
+        self.session.commit()
+        capturing_solver = _CapturingPlannerSolver()
+        service = PlannerService(self.session, solver=capturing_solver)
+        request = GenerateRequest(
+            name="Preset Plan",
+            rule_profile_id=profile.id,
+            params=GenerateParams(max_attempts=5, solver={"symmetry_level": 1}),
+        )
+
+        response = service.generate_plan(request, self.account.id, self.period.id)
+
+        inputs = capturing_solver.last_inputs
+        self.assertEqual((inputs["time_per_attempt"], inputs["max_attempts"]), (2.0, 5))
+        self.assertEqual(inputs["search_params"]["num_workers"], 4)
+        self.assertEqual(inputs["search_params"]["symmetry_level"], 1)
+        self.assertEqual(response.params_used.preset, "fast_draft")
+        plan = self.session.get(Plan, response.plan_id)
+        self.assertEqual(json.loads(plan.params_used)["solver"]["linearization_level"], 0)
+
+    def test_identical_generation_is_answered_from_cache(self) -> None:
+        capturing_solver = _CapturingPlannerSolver()
+        service = PlannerService(self.session, solver=capturing_solver)
+        params = GenerateParams(deterministic=True)
+
+        first = service.generate_plan(GenerateRequest(name="A", dry_run=True, params=params), self.account.id, self.period.id)
+        self.assertFalse(first.cached)
+        self.assertEqual(capturing_solver.last_inputs["search_params"]["num_workers"], 1)
+        self.assertTrue(capturing_solver.last_inputs["deterministic"])
+
+        again = service.generate_plan(GenerateRequest(name="B", dry_run=True, params=params), self.account.id, self.period.id)
+        self.assertTrue(again.cached)
+        self.assertEqual(capturing_solver.calls, 1)
+        self.assertEqual(again.slots, first.slots)
+
+        saved = service.generate_plan(GenerateRequest(name="Gespeichert", params=params), self.account.id, self.period.id)
+        self.assertTrue(saved.cached)
+        self.assertIsNotNone(saved.plan_id)
+        self.assertEqual(self.session.get(Plan, saved.plan_id).name, "Gespeichert")
+        self.assertEqual(len(self.session.exec(select(PlanSlot).where(PlanSlot.plan_id == saved.plan_id)).all()), 1)
+        self.assertEqual(capturing_solver.calls, 1)
+
+        # Other params and any data change (new revision) miss the cache
+        service.generate_plan(GenerateRequest(name="C", dry_run=True), self.account.id, self.period.id)
+        self.assertEqual(capturing_solver.calls, 2)
+        self.teacher.name = "Frau Winter"
+        self.session.add(self.teacher)
+        self.session.commit()
+        fresh = service.generate_plan(GenerateRequest(name="D", dry_run=True, params=params), self.account.id, self.period.id)
+        self.assertFalse(fresh.cached)
+        self.assertEqual(capturing_solver.calls, 3)
+
+    def test_save_bundle_stores_replayable_inputs(self) -> None:
+        recording_solver = _RecordingOrToolsSolver()
+        request = GenerateRequest(
+            name="Bundle",
+            dry_run=True,
+            save_bundle=True,
+            # keep the one-requirement example feasible for the replay
+            override_rules={"stundenbegrenzung": False, "mittagsschule_vormittag": False},
+            params=GenerateParams(multi_start=False),
+        )
+        with tempfile.TemporaryDirectory() as tmp:
+            service = PlannerService(self.session, solver=recording_solver, bundle_dir=Path(tmp))
+            response = service.generate_plan(request, self.account.id, self.period.id)
+            self.assertTrue(response.bundle.startswith(f"{self.account.id}/"))
+            bundle = load_model_bundle(Path(tmp) / response.bundle)
+
+            # the model was built once, by the solve that also exported it
+            self.assertEqual(recording_solver.builds, 1)
+            self.assertEqual(bundle.manifest["result"]["status"], response.status)
+            self.assertEqual(bundle.manifest["result"]["objective_value"], response.objective_value)
+            self.assertGreater(bundle.manifest["model"]["variables"], 0)
+            self.assertIsNotNone(bundle.model_path)
+            inputs = dict(recording_solver.last_inputs)
+            self.assertEqual(inputs.pop("export_model"), str(bundle.model_path))
+            self.assertEqual(canonical_hash(bundle.solver_inputs()), canonical_hash(inputs))
+
+            replay = replay_model_bundle(bundle, bundle.params.model_copy(update={"max_attempts": 1}))
+            self.assertIn(replay["status"], ("OPTIMAL", "FEASIBLE"))
+            self.assertIsNotNone(replay["build_seconds"])
+            proto = replay_model_proto(bundle, time_limit=2.0)
+            self.assertEqual(proto["objective"], replay["objective"])
+
+            # a second bundle request solves again instead of answering from the cache
+            again = service.generate_plan(request, self.account.id, self.period.id)
+            self.assertFalse(again.cached)
+            self.assertNotEqual(again.bundle, response.bundle)
+            self.assertEqual(recording_solver.builds, 2)
+
+    def test_solver_progress_is_stored_with_the_plan(self) -> None:
+        service = PlannerService(self.session, solver=OrToolsPlannerSolver())
+        response = service.generate_plan(
+            GenerateRequest(
+                name="Mit Verlauf",
+                override_rules={"stundenbegrenzung": False, "mittagsschule_vormittag": False},
+                params=GenerateParams(multi_start=False),
+            ),
+            self.account.id,
+            self.period.id,
+        )
+        progress = get_solver_progress(
+            plan_id=response.plan_id,
+            account_id=self.account.id,
+            planning_period_id=self.period.id,
+            plan_service=PlanQueryService(self.session),
+        )
+        self.assertEqual(progress.fields, ["t", "objective", "bound", "gap"])
+        self.assertTrue(progress.events)
+        self.assertEqual(progress.events[-1][1], response.objective_value)
+
+    def test_include_timings_returns_stage_timings(self) -> None:
+        install_trace_query_counter()
+        service = PlannerService(self.session, solver=OrToolsPlannerSolver())
+        request = GenerateRequest(
+            name="Mit Zeiten",
+            include_timings=True,
+            override_rules={"stundenbegrenzung": False, "mittagsschule_vormittag": False},
+            params=GenerateParams(multi_start=False),
+        )
+        response = service.generate_plan(request, self.account.id, self.period.id)
+
+        timings = {timing.name: timing for timing in response.timings}
+        top_level = [timing.name for timing in response.timings if timing.depth == 0]
+        self.assertEqual(top_level, ["resolve_account", "prepare", "cache_lookup", "solve", "extract_slots", "persist"])
+        self.assertEqual(timings["load_requirements"].depth, 1)
+        self.assertGreater(timings["load_requirements"].queries, 0)
+        self.assertGreater(timings["persist"].queries, 0)
+        self.assertIsNone(timings["build_model"].start_ms)
+        self.assertGreaterEqual(timings["solve"].duration_ms, timings["search"].duration_ms)
+
+        without = service.generate_plan(
+            request.model_copy(update={"include_timings": False}), self.account.id, self.period.id
+        )
+        self.assertTrue(without.cached)
+        self.assertIsNone(without.timings)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import unittest
+
+from sqlmodel import SQLModel, Session, create_engine, select
+
+from backend.app.domain.planner.basis_store import load_basis_document, save_basis_document
+from backend.app.domain.plans.matrix import load_plan_matrices
+from backend.app.domain.plans.persistence import persist_plan_with_slots
+from backend.app.models import (
+    Account,
+    BasisPlan,
+    Class,
+    ClassSubject,
+    DistributionVersion,
+    Plan,
+    PlanningPeriod,
+    PlanSlot,
+    Requirement,
+    Subject,
+    Teacher,
+)
+from backend.app.routers.planning_periods import clone_planning_period
+from backend.app.schemas import PlanningPeriodCloneRequest
+
+
+class ClonePlanningPeriodTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.engine = create_engine("sqlite://", connect_args={"check_same_thread": False})
+        SQLModel.metadata.create_all(self.engine)
+        self.session = Session(self.engine)
+        self._seed_data()
+
+    def tearDown(self) -> None:
+        self.session.close()
+        self.engine.dispose()
+
+    def _seed_data(self) -> None:
+        account = Account(name="Test Account")
+        self.session.add(account)
+        self.session.commit()
+        self.account_id = account.id
+
+        period = PlanningPeriod(account_id=account.id, name="2025/26", is_active=True)
+        school_class = Class(account_id=account.id, name="5a")
+        subject = Subject(account_id=account.id, name="Mathe")
+        teacher = Teacher(account_id=account.id, name="Frau Test")
+        self.session.add_all([period, school_class, subject, teacher])
+        self.session.commit()
+        self.period_id = period.id
+
+        versions = [
+            DistributionVersion(account_id=account.id, planning_period_id=period.id, name=name)
+            for name in ("Entwurf", "Final", "Entwurf")
+        ]
+        self.session.add_all(versions)
+        self.session.add(
+            ClassSubject(account_id=account.id, planning_period_id=period.id, class_id=school_class.id,
+                         subject_id=subject.id, wochenstunden=4)
+        )
+        self.session.add(BasisPlan(account_id=account.id, planning_period_id=period.id, data="{}"))
+        self.session.commit()
+        for version in versions:
+            self.session.add(
+                Requirement(account_id=account.id, planning_period_id=period.id, class_id=school_class.id,
+                            subject_id=subject.id, teacher_id=teacher.id, wochenstunden=4, version_id=version.id)
+            )
+        self.session.commit()
+        self.version_names = {version.id: version.name for version in versions}
+
+        persist_plan_with_slots(
+            self.session,
+            Plan(account_id=account.id, planning_period_id=period.id, name="Plan A", version_id=versions[1].id),
+            [
+                {"class_id": school_class.id, "tag": "Mo", "stunde": stunde, "subject_id": subject.id,
+                 "teacher_id": teacher.id, "room_id": None}
+                for stunde in (1, 2, 3)
+            ],
+        )
+
+    def _clone(self, **options):
+        payload = PlanningPeriodCloneRequest(name="2026/27", **options)
+        return clone_planning_period(
+            period_id=self.period_id, payload=payload, account_id=self.account_id, session=self.session
+        )
+
+    def test_clone_copies_rows_and_remaps_versions(self) -> None:
+        result = self._clone(copy_plans=True)
+
+        self.assertEqual(
+            result.copied,
+            {"curriculum": 1, "versions": 3, "requirements": 3, "basisplan": 1, "plans": 1, "plan_slots": 3},
+        )
+        self.assertGreaterEqual(result.elapsed_ms, 0)
+        new_versions = {
+            v.id: v.name
+            for v in self.session.exec(
+                select(DistributionVersion).where(DistributionVersion.planning_period_id == result.id)
+            ).all()
+        }
+        self.assertEqual(
+            sorted(new_versions.values()),
+            ["Entwurf (2026/27)", "Entwurf (2026/27) (2)", "Final (2026/27)"],
+        )
+        requirements = self.session.exec(
+            select(Requirement).where(Requirement.planning_period_id == result.id)
+        ).all()
+        self.assertEqual({r.version_id for r in requirements}, set(new_versions))
+
+        plan = self.session.exec(select(Plan).where(Plan.planning_period_id == result.id)).one()
+        self.assertEqual(new_versions[plan.version_id], "Final (2026/27)")
+        slots = self.session.exec(select(PlanSlot).where(PlanSlot.plan_id == plan.id)).all()
+        self.assertEqual({slot.planning_period_id for slot in slots}, {result.id})
+        self.assertIn(plan.id, load_plan_matrices(self.session, [plan.id]))
+
+    def test_clone_without_versions_leaves_copies_unversioned(self) -> None:
+        result = self._clone(copy_versions=False, copy_basisplan=False, copy_plans=True, is_active=True)
+
+        self.assertEqual(result.copied["plans"], 1)
+        plan = self.session.exec(select(Plan).where(Plan.planning_period_id == result.id)).one()
+        self.assertIsNone(plan.version_id)
+        requirements = self.session.exec(
+            select(Requirement).where(Requirement.planning_period_id == result.id)
+        ).all()
+        self.assertEqual([r.version_id for r in requirements], [None, None, None])
+        source = self.session.get(PlanningPeriod, self.period_id)
+        self.assertFalse(source.is_active)
+
+    def test_clone_copies_normalized_basisplan_rows(self) -> None:
+        source = self.session.exec(select(BasisPlan).where(BasisPlan.planning_period_id == self.period_id)).one()
+        document = {"meta": {"version": 1}, "fixed": {"1": [{"day": "mon", "slot": 0, "subjectId": 5}]}}
+        save_basis_document(self.session, source, document)
+        self.session.commit()
+
+        result = self._clone(copy_versions=False)
+
+        target = self.session.exec(select(BasisPlan).where(BasisPlan.planning_period_id == result.id)).one()
+        self.assertNotEqual(target.id, source.id)
+        self.assertEqual(load_basis_document(self.session, target), document)
+        self.assertEqual(load_basis_document(self.session, source), document)
+
+
+if __name__ == "__main__":
+    unittest.main()
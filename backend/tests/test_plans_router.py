@@ -268,6 +268,31 @@ class PlansRouterTests(unittest.TestCase):
         self.assertEqual(resp.status_code, 200)
         self.assertEqual(resp.json()["slots"][0]["tag"], "Di")
 
+    def test_patch_plan_slots_http(self) -> None:
+        data = self._create_plan_payload()
+        payload = {
+            "slots": [
+                {
+                    "class_id": data["class_id"],
+                    "subject_id": data["subject_id"],
+                    "teacher_id": data["teacher_id"],
+                    "tag": "Fr",
+                    "stunde": 4,
+                }
+            ],
+            "remove": [{"class_id": data["class_id"], "tag": "Mo", "stunde": 1}],
+        }
+        with TestClient(app) as client:
+            resp = client.patch(
+                f"/plans/{data['plan_id']}/slots",
+                params={"account_id": self.account.id, "planning_period_id": self.period.id},
+                json=payload,
+            )
+        self.assertEqual(resp.status_code, 200)
+        slots = resp.json()["slots"]
+        self.assertEqual(len(slots), 1)
+        self.assertEqual((slots[0]["tag"], slots[0]["stunde"]), ("Fr", 4))
+
     def test_delete_plan_http(self) -> None:
         data = self._create_plan_payload()
         with TestClient(app) as client:
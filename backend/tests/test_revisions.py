@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import json
+import unittest
+
+from fastapi import Request, Response
+from sqlalchemy import event
+from sqlmodel import SQLModel, Session, create_engine, select
+
+from backend.app.models import Account, EntityRevision, PlanningPeriod, Room, Teacher
+from backend.app.routers.basisplan import get_basisplan
+from backend.app.routers.rooms import list_rooms
+from backend.app.services.revisions import bump_revision, current_revisions
+
+
+def _request(path: str, query: str = "", headers: dict | None = None) -> Request:
+    return Request(
+        {
+            "type": "http",
+            "method": "GET",
+            "path": path,
+            "query_string": query.encode("ascii"),
+            "headers": [(k.lower().encode("latin-1"), v.encode("latin-1")) for k, v in (headers or {}).items()],
+        }
+    )
+
+
+class EntityRevisionTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.engine = create_engine("sqlite://", connect_args={"check_same_thread": False})
+        SQLModel.metadata.create_all(self.engine)
+        self.session = Session(self.engine)
+        account = Account(name="Test Account")
+        self.session.add(account)
+        self.session.commit()
+        self.account_id = account.id
+        period = PlanningPeriod(account_id=account.id, name="Periode", is_active=True)
+        self.session.add(period)
+        self.session.add(Room(account_id=account.id, name="Turnhalle"))
+        self.session.commit()
+        self.period_id = period.id
+
+    def tearDown(self) -> None:
+        self.session.close()
+        self.engine.dispose()
+
+    def _revision(self, entity: str) -> int:
+        return current_revisions(self.session, self.account_id, [entity])[entity][0]
+
+    def _rooms(self, headers: dict | None = None, fields: str | None = None):
+        response = Response()
+        result = list_rooms(
+            _request("/rooms", f"fields={fields}" if fields else "", headers),
+            response,
+            limit=None,
+            cursor=None,
+            fields=fields,
+            account_id=self.account_id,
+            session=self.session,
+        )
+        return result, response
+
+    def test_orm_writes_bump_revision(self) -> None:
+        self.assertEqual(self._revision("room"), 1)
+        room = self.session.get(Room, 1)
+        room.capacity = 30
+        self.session.add(room)
+        self.session.commit()
+        self.assertEqual(self._revision("room"), 2)
+
+        # untouched objects in the session do not count as writes
+        self.session.add(room)
+        self.session.commit()
+        self.assertEqual(self._revision("room"), 2)
+
+        self.session.delete(room)
+        self.session.commit()
+        self.assertEqual(self._revision("room"), 3)
+
+        bump_revision(self.session, self.account_id, "room", "teacher")
+        self.session.commit()
+        self.assertEqual(self._revision("room"), 4)
+        self.assertGreaterEqual(self._revision("teacher"), 1)
+
+    def test_list_answers_if_none_match_with_304(self) -> None:
+        rows, response = self._rooms()
+        self.assertEqual([row.name for row in rows], ["Turnhalle"])
+        etag = response.headers["ETag"]
+        self.assertIn("Last-Modified", response.headers)
+
+        statements = []
+
+        def before_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(self.engine, "before_cursor_execute", before_execute)
+        try:
+            cached, _ = self._rooms({"If-None-Match": etag})
+        finally:
+            event.remove(self.engine, "before_cursor_execute", before_execute)
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(cached.headers["ETag"], etag)
+        self.assertFalse(any("FROM room" in statement for statement in statements))
+
+        cached, _ = self._rooms({"If-Modified-Since": response.headers["Last-Modified"]})
+        self.assertEqual(cached.status_code, 304)
+
+        # other query parameters produce another representation
+        projected, _ = self._rooms({"If-None-Match": etag}, fields="name")
+        self.assertEqual(projected.status_code, 200)
+        self.assertEqual(json.loads(projected.body), [{"id": 1, "name": "Turnhalle"}])
+        self.assertNotEqual(projected.headers["ETag"], etag)
+
+        self.session.add(Room(account_id=self.account_id, name="Werkraum"))
+        self.session.commit()
+        rows, response = self._rooms({"If-None-Match": etag})
+        self.assertEqual(len(rows), 2)
+        self.assertNotEqual(response.headers["ETag"], etag)
+
+    def test_basisplan_etag_is_scoped_to_period(self) -> None:
+        response = Response()
+        first = get_basisplan(
+            _request("/basisplan"),
+            response,
+            account_id=self.account_id,
+            planning_period_id=self.period_id,
+            session=self.session,
+        )
+        self.assertEqual(first.planning_period_id, self.period_id)
+        etag = response.headers["ETag"]
+        cached = get_basisplan(
+            _request("/basisplan", headers={"If-None-Match": etag}),
+            Response(),
+            account_id=self.account_id,
+            planning_period_id=self.period_id,
+            session=self.session,
+        )
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(self.session.get(EntityRevision, (self.account_id, "basisplan")).revision, 1)
+        pool = self.session.exec(select(Teacher).where(Teacher.kuerzel == "POOL")).all()
+        self.assertEqual(len(pool), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import threading
+import unittest
+
+from ortools.sat.python import cp_model
+
+from backend.app.infrastructure.solver.executor import (
+    SolverBusyError,
+    SolverExecutor,
+    default_worker_count,
+)
+
+
+class _Value:
+    def __init__(self, value: int) -> None:
+        self.value = value
+
+
+class _StubCpSolver:
+    def Value(self, var: _Value) -> int:
+        return var.value
+
+    def ObjectiveValue(self) -> float:
+        return 3.0
+
+
+class _StubSolver:
+    """Picklable solver stub; one cell set, one cell empty."""
+
+    def solve(self, inputs):
+        return {
+            "status": cp_model.OPTIMAL,
+            "solver": _StubCpSolver(),
+            "model": None,
+            "plan": {(1, "Mo", 0): _Value(1), (1, "Mo", 1): _Value(0)},
+            "score": 7.5,
+        }
+
+
+class _BlockingSolver(_StubSolver):
+    def __init__(self) -> None:
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def solve(self, inputs):
+        self.started.set()
+        self.release.wait(5)
+        return super().solve(inputs)
+
+
+class SolverExecutorTests(unittest.TestCase):
+    def test_worker_count_follows_cores(self) -> None:
+        self.assertEqual(default_worker_count(1), 1)
+        self.assertEqual(default_worker_count(16), 2)
+
+    def test_inline_run_returns_plain_result(self) -> None:
+        executor = SolverExecutor(max_workers=1, use_processes=False)
+        result = executor.run(_StubSolver(), {})
+        self.assertEqual(result["assignments"], [(1, "Mo", 0)])
+        self.assertEqual(result["objective_value"], 3.0)
+        self.assertEqual(executor.stats()["running"], 0)
+
+    def test_rejects_beyond_capacity_with_retry_after(self) -> None:
+        executor = SolverExecutor(max_workers=1, queue_size=0, use_processes=False)
+        solver = _BlockingSolver()
+        worker = threading.Thread(target=executor.run, args=(solver, {}))
+        worker.start()
+        self.addCleanup(worker.join)
+        self.addCleanup(solver.release.set)
+        self.assertTrue(solver.started.wait(5))
+
+        with self.assertRaises(SolverBusyError) as ctx:
+            executor.run(_StubSolver(), {})
+        self.assertGreaterEqual(ctx.exception.retry_after, 1)
+        self.assertEqual(executor.stats()["rejected"], 1)
+        self.assertEqual(executor.stats()["running"], 1)
+
+        solver.release.set()
+        worker.join(5)
+        self.assertEqual(executor.run(_StubSolver(), {})["score"], 7.5)
+
+    def test_process_pool_runs_solver_out_of_process(self) -> None:
+        executor = SolverExecutor(max_workers=1, use_processes=True)
+        self.addCleanup(executor.shutdown)
+        result = executor.run(_StubSolver(), {})
+        self.assertEqual(result["assignments"], [(1, "Mo", 0)])
+        self.assertEqual(result["status"], cp_model.OPTIMAL)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import unittest
+from unittest import mock
+
+from fastapi import HTTPException
+from ortools.sat import sat_parameters_pb2
+from ortools.sat.python import cp_model
+from pydantic import ValidationError
+
+from backend.app.config import settings
+from backend.app.domain.planner.solver_presets import resolve_generate_params, validate_solver_preset
+from backend.app.infrastructure.solver.parameters import apply_search_parameters
+from backend.app.schemas import GenerateParams
+
+
+class SolverPresetTests(unittest.TestCase):
+    def test_defaults_resolve_to_balanced_without_search_log(self) -> None:
+        params = resolve_generate_params(GenerateParams())
+        self.assertEqual(params.preset, "balanced")
+        self.assertEqual((params.time_per_attempt, params.max_attempts), (5.0, 10))
+        self.assertEqual(params.solver.num_workers, 8)
+        self.assertFalse(params.solver.log_search_progress)
+
+    def test_request_preset_wins_over_profile_and_explicit_values_over_preset(self) -> None:
+        request = GenerateParams(preset="thorough", time_per_attempt=3.0, solver={"interleave_search": True})
+        params = resolve_generate_params(request, profile_preset="fast_draft")
+        self.assertEqual(params.preset, "thorough")
+        self.assertEqual(params.time_per_attempt, 3.0)
+        self.assertEqual(params.solver.search_branching, "portfolio")
+        self.assertTrue(params.solver.interleave_search)
+
+        self.assertEqual(resolve_generate_params(GenerateParams(), "fast_draft").max_attempts, 3)
+
+    def test_server_caps_apply(self) -> None:
+        request = GenerateParams(
+            preset="thorough",
+            time_per_attempt=500.0,
+            max_attempts=99,
+            solver={"num_workers": 32, "log_search_progress": True},
+        )
+        with mock.patch.multiple(
+            settings,
+            solver_max_search_workers=2,
+            solver_max_time_per_attempt=30.0,
+            solver_max_attempts=4,
+            solver_allow_search_log=False,
+        ):
+            params = resolve_generate_params(request)
+        self.assertEqual(params.solver.num_workers, 2)
+        self.assertEqual((params.time_per_attempt, params.max_attempts), (30.0, 4))
+        self.assertFalse(params.solver.log_search_progress)
+
+    def test_invalid_values_are_rejected(self) -> None:
+        with self.assertRaises(ValidationError):
+            GenerateParams(solver={"linearization_level": 3})
+        with self.assertRaises(HTTPException) as ctx:
+            resolve_generate_params(GenerateParams(preset="turbo"))
+        self.assertEqual(ctx.exception.status_code, 400)
+        self.assertIsNone(validate_solver_preset(""))
+
+    def test_apply_search_parameters_sets_cp_sat_fields(self) -> None:
+        solver = cp_model.CpSolver()
+        params = resolve_generate_params(GenerateParams(preset="thorough", solver={"num_workers": 3}))
+        apply_search_parameters(solver, params.solver.model_dump(), randomize_search=True)
+        self.assertEqual(solver.parameters.num_workers, 3)
+        self.assertEqual(solver.parameters.linearization_level, 2)
+        self.assertEqual(solver.parameters.symmetry_level, 4)
+        self.assertEqual(solver.parameters.search_branching, sat_parameters_pb2.SatParameters.PORTFOLIO_SEARCH)
+        self.assertTrue(solver.parameters.randomize_search)
+        self.assertFalse(solver.parameters.log_search_progress)
+
+
+if __name__ == "__main__":
+    unittest.main()
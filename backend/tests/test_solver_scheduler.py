@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import threading
+import time
+import unittest
+
+from ortools.sat.python import cp_model
+
+from sqlmodel import SQLModel, Session, create_engine
+
+from backend.app.infrastructure.solver.executor import SolverExecutor
+from backend.app.infrastructure.solver.scheduler import SolverQuotaError, SolverScheduler
+from backend.app.models import Account
+from backend.app.routers.admin import solver_usage
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class _FakeExecutor(SolverExecutor):
+    """Runs ``solver(inputs)`` inline and reports a fixed CPU time per solve."""
+
+    def __init__(self, max_workers: int = 1, queue_size: int = 8, cpu_seconds: float = 1.0) -> None:
+        super().__init__(max_workers=max_workers, queue_size=queue_size, use_processes=False)
+        self.cpu_seconds = cpu_seconds
+
+    def run(self, solver, inputs):
+        solver(inputs)
+        return {"status": 4, "score": 0.0, "objective_value": None, "assignments": [], "cpu_seconds": self.cpu_seconds}
+
+
+class _Gate:
+    """Solver callable that records its label and blocks until released."""
+
+    def __init__(self, log, label, block: bool = True) -> None:
+        self.log = log
+        self.label = label
+        self.started = threading.Event()
+        self.release = threading.Event()
+        if not block:
+            self.release.set()
+
+    def __call__(self, inputs) -> None:
+        self.log.append(self.label)
+        self.started.set()
+        self.release.wait(5)
+
+
+class _CpuSolver:
+    """In-process solver that burns CPU (or sleeps) until released."""
+
+    def __init__(self, burn: bool) -> None:
+        self.burn = burn
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def solve(self, inputs):
+        self.started.set()
+        while not self.release.is_set():
+            if not self.burn:
+                self.release.wait(5)
+        return {"status": cp_model.UNKNOWN, "solver": None, "model": None, "plan": {}, "score": 0.0}
+
+
+def _wait_for(predicate) -> None:
+    deadline = time.monotonic() + 5
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not reached")
+        time.sleep(0.01)
+
+
+def _queued(scheduler: SolverScheduler, account_id: int) -> int:
+    return next((entry["queued"] for entry in scheduler.usage() if entry["account_id"] == account_id), 0)
+
+
+class SolverSchedulerTests(unittest.TestCase):
+    def _start(self, scheduler: SolverScheduler, account_id: int, gate: _Gate) -> threading.Thread:
+        thread = threading.Thread(target=scheduler.run, args=(account_id, gate, {}))
+        thread.start()
+        self.addCleanup(thread.join, 5)
+        self.addCleanup(gate.release.set)
+        return thread
+
+    def test_light_account_goes_before_heavy_account(self) -> None:
+        log = []
+        scheduler = SolverScheduler(_FakeExecutor(cpu_seconds=30.0), clock=_Clock())
+        scheduler.run(1, _Gate(log, "warmup", block=False), {})
+
+        running = _Gate(log, "running")
+        self._start(scheduler, 3, running)
+        self.assertTrue(running.started.wait(5))
+        heavy = _Gate(log, "heavy", block=False)
+        light = _Gate(log, "light", block=False)
+        self._start(scheduler, 1, heavy)
+        _wait_for(lambda: _queued(scheduler, 1) == 1)
+        self._start(scheduler, 2, light)
+        _wait_for(lambda: _queued(scheduler, 2) == 1)
+
+        running.release.set()
+        self.assertTrue(heavy.started.wait(5))
+        self.assertEqual(log, ["warmup", "running", "light", "heavy"])
+
+    def test_account_limit_lets_other_accounts_pass(self) -> None:
+        log = []
+        scheduler = SolverScheduler(_FakeExecutor(max_workers=2), account_limit=1, clock=_Clock())
+        first = _Gate(log, "a1")
+        self._start(scheduler, 1, first)
+        self.assertTrue(first.started.wait(5))
+
+        second = _Gate(log, "a2", block=False)
+        self._start(scheduler, 1, second)
+        _wait_for(lambda: _queued(scheduler, 1) == 1)
+        scheduler.run(2, _Gate(log, "b1", block=False), {})
+        self.assertEqual(log, ["a1", "b1"])
+
+        first.release.set()
+        self.assertTrue(second.started.wait(5))
+        self.assertEqual(log, ["a1", "b1", "a2"])
+
+    def test_quota_rejects_until_usage_ages_out(self) -> None:
+        clock = _Clock()
+        scheduler = SolverScheduler(_FakeExecutor(cpu_seconds=8.0), quota_seconds=10.0, clock=clock)
+        scheduler.run(1, _Gate([], "x", block=False), {})
+        clock.now += 100
+        scheduler.run(1, _Gate([], "x", block=False), {})
+        scheduler.run(2, _Gate([], "x", block=False), {})
+
+        with self.assertRaises(SolverQuotaError) as ctx:
+            scheduler.run(1, _Gate([], "x", block=False), {})
+        self.assertEqual(ctx.exception.retry_after, 3500)
+
+        clock.now += 3500
+        scheduler.run(1, _Gate([], "x", block=False), {})
+        [usage, _] = scheduler.usage()
+        self.assertEqual((usage["completed"], usage["quota_rejected"]), (3, 1))
+        self.assertEqual(usage["cpu_seconds_window"], 16.0)
+        self.assertEqual(usage["cpu_seconds_total"], 24.0)
+
+    def test_in_process_solves_are_charged_their_own_cpu_time(self) -> None:
+        scheduler = SolverScheduler(SolverExecutor(max_workers=2, use_processes=False), clock=_Clock())
+        busy, idle = _CpuSolver(burn=True), _CpuSolver(burn=False)
+        for account_id, solver in ((1, busy), (2, idle)):
+            thread = threading.Thread(target=scheduler.run, args=(account_id, solver, {}))
+            thread.start()
+            self.addCleanup(thread.join, 5)
+            self.addCleanup(solver.release.set)
+        self.assertTrue(busy.started.wait(5) and idle.started.wait(5))
+        time.sleep(0.3)
+        idle.release.set()
+        _wait_for(lambda: scheduler.usage()[1]["completed"] == 1)
+        busy.release.set()
+        _wait_for(lambda: scheduler.usage()[0]["completed"] == 1)
+
+        [busy_usage, idle_usage] = scheduler.usage()
+        # the sleeping solve ran next to a busy one but is not charged for its CPU time
+        self.assertLess(idle_usage["cpu_seconds_total"], 0.1)
+        self.assertGreater(busy_usage["cpu_seconds_total"], 0.2)
+
+    def test_admin_usage_lists_accounts(self) -> None:
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False})
+        SQLModel.metadata.create_all(engine)
+        self.addCleanup(engine.dispose)
+        scheduler = SolverScheduler(_FakeExecutor(cpu_seconds=2.5), weights={1: 2.0}, clock=_Clock())
+        with Session(engine) as session:
+            account = Account(name="Schule A")
+            session.add(account)
+            session.commit()
+            scheduler.run(account.id, _Gate([], "x", block=False), {})
+
+            result = solver_usage(session=session, scheduler=scheduler)
+        self.assertEqual(result.capacity, 9)
+        [entry] = result.accounts
+        self.assertEqual((entry.account_name, entry.completed, entry.weight), ("Schule A", 1, 2.0))
+        self.assertEqual(entry.cpu_seconds_total, 2.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
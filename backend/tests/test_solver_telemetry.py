@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import json
+import logging
+import unittest
+from unittest import mock
+
+import pandas as pd
+from ortools.sat.python import cp_model
+
+from backend.app.config import settings
+from backend.app.infrastructure.solver.ortools_solver import OrToolsPlannerSolver
+from backend.app.infrastructure.solver.telemetry import (
+    SearchProgressRecorder,
+    attach_progress_recorder,
+    encode_progress,
+)
+
+
+def _inputs() -> dict:
+    df = pd.DataFrame(
+        {
+            "Wochenstunden": [3, 2],
+            "Klasse": ["1A", "1A"],
+            "Lehrer": ["Frau A", "Herr B"],
+            "Fach": ["Mathe", "Deutsch"],
+            "Bandfach": [False, False],
+            "Participation": ["curriculum", "curriculum"],
+        }
+    )
+    return {
+        "df": df,
+        "FACH_ID": [0, 1],
+        "KLASSEN": ["1A"],
+        "LEHRER": ["Frau A", "Herr B"],
+        "regeln": {"stundenbegrenzung": False, "mittagsschule_vormittag": False, "gleichverteilung": True},
+        "slots_per_day": 3,
+        "multi_start": False,
+    }
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _feed(recorder: SearchProgressRecorder, clock: _Clock, lines) -> None:
+    for at, line in lines:
+        clock.now = at
+        recorder(line)
+
+
+class SearchProgressRecorderTests(unittest.TestCase):
+    def test_parses_solutions_and_bounds_and_samples_by_interval(self) -> None:
+        clock = _Clock()
+        recorder = SearchProgressRecorder(interval=1.0, clock=clock)
+        _feed(
+            recorder,
+            clock,
+            [
+                (0.1, "#Bound   0.04s best:inf   next:[10,563]   initial_domain"),
+                (0.2, "#Model   0.04s var:307/307 constraints:465/465"),
+                (0.3, "#1       0.06s best:41    next:[10,40]    core"),
+                (1.5, "#2       0.12s best:36    next:[16,35]    ls_restart_decay"),
+                (1.6, "#3       0.15s best:28    next:[16,27]    max_lp_sym"),
+                (1.7, "#4       0.16s best:16    next:[]         default_lp"),
+                (1.8, "#Done    0.16s default_lp"),
+            ],
+        )
+        self.assertEqual(
+            recorder.events(),
+            [
+                [0.1, None, 10.0, None],
+                [1.5, 36.0, 16.0, 0.5556],
+                # the latest line is kept although it falls into the interval
+                [1.7, 16.0, 16.0, 0.0],
+            ],
+        )
+
+    def test_thins_out_when_too_many_events(self) -> None:
+        clock = _Clock()
+        recorder = SearchProgressRecorder(interval=0.0, max_events=4, clock=clock)
+        _feed(recorder, clock, [(idx * 0.1, f"#{idx} 0.1s best:{100 - idx} next:[0,99]") for idx in range(1, 8)])
+        events = recorder.events()
+        self.assertLessEqual(len(events), 5)
+        self.assertEqual(events[-1][1], 93.0)
+        self.assertGreater(recorder.interval, 0.0)
+
+    def test_sums_presolve_time_over_solves(self) -> None:
+        recorder = SearchProgressRecorder(max_events=0)
+        self.assertIsNone(recorder.presolve_seconds)
+        recorder("Starting search at 0.25s with 8 workers.")
+        recorder("Starting search at 0.50s with 8 workers.")
+        self.assertAlmostEqual(recorder.presolve_seconds, 0.75)
+        self.assertEqual(recorder.events(), [])
+
+    def test_encode_progress_is_compact_json(self) -> None:
+        self.assertIsNone(encode_progress([]))
+        payload = json.loads(encode_progress([[0.5, 3.0, 1.0, 0.6667]]))
+        self.assertEqual(payload, {"fields": ["t", "objective", "bound", "gap"], "events": [[0.5, 3.0, 1.0, 0.6667]]})
+
+    def test_progress_off_disables_the_search_log(self) -> None:
+        solver = cp_model.CpSolver()
+        with mock.patch.object(settings, "solver_progress_max_events", 0):
+            self.assertIsNone(attach_progress_recorder(solver))
+        self.assertFalse(solver.parameters.log_search_progress)
+        self.assertFalse(solver.parameters.log_to_stdout)
+
+    def test_import_has_no_logging_side_effects(self) -> None:
+        self.assertEqual(logging.getLogger("stundenplan.solver").handlers, [])
+
+    def test_solve_reports_progress_events(self) -> None:
+        output = OrToolsPlannerSolver().solve(_inputs())
+        self.assertEqual(output["status"], cp_model.OPTIMAL)
+        progress = output["stats"]["progress"]
+        self.assertTrue(progress)
+        self.assertEqual(progress[-1][1], output["solver"].ObjectiveValue())
+        self.assertEqual(progress[-1][3], 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import tempfile
+import unittest
+from pathlib import Path
+
+import pandas as pd
+from sqlmodel import SQLModel, Session, create_engine
+
+from backend.app.domain.planner.solver_presets import (
+    available_solver_presets,
+    resolve_generate_params,
+    save_solver_preset,
+)
+from backend.app.infrastructure.solver.tuning import (
+    SolverTuner,
+    expand_grid,
+    load_tuning_inputs,
+    save_tuning_inputs,
+)
+from backend.app.models import Account
+from backend.app.schemas import GenerateParams
+
+
+def _inputs() -> dict:
+    df = pd.DataFrame(
+        {
+            "Wochenstunden": [2, 2, 1],
+            "Klasse": ["1A", "1A", "2A"],
+            "Lehrer": ["Frau A", "Herr B", "Frau A"],
+            "Fach": ["Mathe", "Deutsch", "Kunst"],
+            "Bandfach": [False, False, False],
+            "Participation": ["curriculum", "curriculum", "curriculum"],
+        }
+    )
+    return {
+        "df": df,
+        "FACH_ID": [0, 1, 2],
+        "KLASSEN": ["1A", "2A"],
+        "LEHRER": ["Frau A", "Herr B"],
+        # only the basic conflict rules, so that the tiny example stays feasible
+        "regeln": {
+            key: False
+            for key in (
+                "stundenbegrenzung",
+                "stundenbegrenzung_erste_stunde",
+                "fach_nachmittag_regeln",
+                "mittagsschule_vormittag",
+                "doppelstundenregel",
+                "einzelstunde_nur_rand",
+                "keine_hohlstunden",
+            )
+        },
+        "teacher_workdays": {},
+        "pool_teacher_names": set(),
+        "room_plan": {},
+        "fixed_slots": {},
+        "flexible_groups": [],
+        "flexible_slot_limits": {},
+        "class_windows": {},
+        "pause_slots": set(),
+        "slots_per_day": 3,
+    }
+
+
+class SolverTuningTests(unittest.TestCase):
+    def test_expand_grid_builds_nested_overrides(self) -> None:
+        candidates = expand_grid({"time_per_attempt": [1, 2], "solver.num_workers": [1, 2]})
+        self.assertEqual(len(candidates), 4)
+        self.assertIn({"time_per_attempt": 2, "solver": {"num_workers": 1}}, candidates)
+        self.assertEqual(expand_grid({}), [{}])
+
+    def test_halving_ranks_candidates_and_winner_becomes_preset(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "inputs.pkl"
+            save_tuning_inputs({**_inputs(), "max_attempts": 99}, path)
+            inputs = load_tuning_inputs(path)
+        self.assertNotIn("max_attempts", inputs)
+
+        tuner = SolverTuner(inputs, base_params=GenerateParams(max_attempts=1, multi_start=False), processes=0)
+        candidates = expand_grid({"time_per_attempt": [0.5, 1.0], "solver.num_workers": [1, 2], "base_seed": [1, 2]})
+        results = tuner.run(candidates, strategy="halving", eta=2)
+
+        self.assertEqual(len(results), 1)
+        self.assertEqual([entry["round"] for entry in tuner.history].count(0), 8)
+        winner = results[0]
+        self.assertTrue(winner["metrics"]["feasible"])
+        self.assertIsNotNone(winner["metrics"]["first_feasible_seconds"])
+        self.assertEqual(winner["metrics"]["gap"], 0.0)
+        self.assertEqual(winner["budget"], 1.0)
+        self.assertEqual(winner["params"]["time_per_attempt"], winner["overrides"]["time_per_attempt"])
+
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False})
+        SQLModel.metadata.create_all(engine)
+        self.addCleanup(engine.dispose)
+        with Session(engine) as session:
+            account = Account(name="Schule")
+            session.add(account)
+            session.commit()
+            save_solver_preset(session, account.id, "getunt", GenerateParams(**winner["params"]), winner["metrics"])
+            with self.assertRaises(ValueError):
+                save_solver_preset(session, account.id, "balanced", GenerateParams())
+
+            presets = available_solver_presets(session, account.id)
+            params = resolve_generate_params(GenerateParams(preset="getunt"), presets=presets)
+        self.assertEqual(params.preset, "getunt")
+        self.assertEqual(params.base_seed, winner["params"]["base_seed"])
+        self.assertEqual(params.solver.num_workers, winner["params"]["solver"]["num_workers"])
+
+    def test_grid_runs_in_worker_processes(self) -> None:
+        tuner = SolverTuner(_inputs(), base_params=GenerateParams(max_attempts=1, time_per_attempt=1.0), processes=2)
+        results = tuner.run(expand_grid({"solver.num_workers": [1, 2]}))
+        self.assertEqual(len(results), 2)
+        self.assertTrue(all(entry["metrics"]["feasible"] for entry in results))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import unittest
+
+from sqlalchemy import event
+from sqlmodel import SQLModel, Session, create_engine, select
+
+from backend.app.models import (
+    Account,
+    Class,
+    ClassSubject,
+    DoppelstundeEnum,
+    NachmittagEnum,
+    PlanningPeriod,
+    Requirement,
+    RequirementConfigSourceEnum,
+    RequirementParticipationEnum,
+    Subject,
+    Teacher,
+)
+from backend.app.services.subject_config import (
+    apply_subject_defaults,
+    sync_requirements_for_class_subject,
+    sync_requirements_for_class_subjects,
+    sync_requirements_for_subject,
+)
+
+
+class SubjectConfigSyncTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.engine = create_engine("sqlite://", connect_args={"check_same_thread": False})
+        SQLModel.metadata.create_all(self.engine)
+        self.session = Session(self.engine)
+        account = Account(name="Test Account")
+        self.session.add(account)
+        self.session.commit()
+        self.account_id = account.id
+        period = PlanningPeriod(account_id=account.id, name="Periode", is_active=True)
+        teacher = Teacher(account_id=account.id, name="Frau Weber", kuerzel="We")
+        deutsch = Subject(
+            account_id=account.id,
+            name="Deutsch",
+            default_doppelstunde=DoppelstundeEnum.soll,
+            default_nachmittag=NachmittagEnum.nein,
+        )
+        mathe = Subject(account_id=account.id, name="Mathe")
+        self.session.add_all([period, teacher, deutsch, mathe])
+        self.session.commit()
+        self.period_id = period.id
+        self.teacher_id = teacher.id
+        self.deutsch_id = deutsch.id
+        self.mathe_id = mathe.id
+
+        classes = [Class(account_id=account.id, name=str(idx)) for idx in range(1, 5)]
+        self.session.add_all(classes)
+        self.session.commit()
+        self.class_ids = [cls.id for cls in classes]
+
+    def tearDown(self) -> None:
+        self.session.close()
+        self.engine.dispose()
+
+    def _requirement(self, class_id: int, subject_id: int, **values) -> int:
+        req = Requirement(
+            account_id=self.account_id,
+            class_id=class_id,
+            subject_id=subject_id,
+            teacher_id=self.teacher_id,
+            planning_period_id=values.pop("planning_period_id", self.period_id),
+            wochenstunden=4,
+            **values,
+        )
+        self.session.add(req)
+        self.session.commit()
+        return req.id
+
+    def _get(self, requirement_id: int) -> Requirement:
+        self.session.expire_all()
+        return self.session.get(Requirement, requirement_id)
+
+    def _count_statements(self):
+        statements = []
+
+        def before_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(self.engine, "before_cursor_execute", before_execute)
+        self.addCleanup(event.remove, self.engine, "before_cursor_execute", before_execute)
+        return statements
+
+    def test_subject_sync_matches_apply_subject_defaults(self) -> None:
+        override_class, plain_class, manual_class, legacy_class = self.class_ids
+        self.session.add(
+            ClassSubject(
+                account_id=self.account_id,
+                planning_period_id=self.period_id,
+                class_id=override_class,
+                subject_id=self.deutsch_id,
+                wochenstunden=4,
+                doppelstunde=DoppelstundeEnum.muss,
+                participation=RequirementParticipationEnum.ag,
+            )
+        )
+        self.session.add(
+            ClassSubject(
+                account_id=self.account_id,
+                class_id=legacy_class,
+                subject_id=self.deutsch_id,
+                wochenstunden=4,
+                nachmittag=NachmittagEnum.muss,
+            )
+        )
+        self.session.commit()
+        override_req = self._requirement(override_class, self.deutsch_id)
+        plain_req = self._requirement(plain_class, self.deutsch_id)
+        manual_req = self._requirement(
+            manual_class,
+            self.deutsch_id,
+            doppelstunde=DoppelstundeEnum.nein,
+            config_source=RequirementConfigSourceEnum.manual,
+        )
+        legacy_req = self._requirement(legacy_class, self.deutsch_id)
+        other_req = self._requirement(plain_class, self.mathe_id, doppelstunde=DoppelstundeEnum.muss)
+
+        expected = {}
+        for req_id in (override_req, plain_req, legacy_req):
+            req = apply_subject_defaults(self.session, self._get(req_id))
+            expected[req_id] = (req.doppelstunde, req.nachmittag, req.participation)
+        self.session.rollback()
+
+        statements = self._count_statements()
+        updated = sync_requirements_for_subject(self.session, self.deutsch_id)
+        self.assertEqual(updated, 3)
+        self.assertLessEqual(len([s for s in statements if s.lstrip().upper().startswith("UPDATE")]), 2)
+
+        for req_id, values in expected.items():
+            req = self._get(req_id)
+            self.assertEqual((req.doppelstunde, req.nachmittag, req.participation), values)
+            self.assertEqual(req.config_source, RequirementConfigSourceEnum.subject)
+        self.assertEqual(
+            expected[override_req],
+            (DoppelstundeEnum.muss, NachmittagEnum.nein, RequirementParticipationEnum.ag),
+        )
+        self.assertEqual(
+            expected[legacy_req],
+            (DoppelstundeEnum.soll, NachmittagEnum.muss, RequirementParticipationEnum.curriculum),
+        )
+        self.assertEqual(self._get(manual_req).doppelstunde, DoppelstundeEnum.nein)
+        self.assertEqual(self._get(other_req).doppelstunde, DoppelstundeEnum.muss)
+
+        legacy_cs = self.session.exec(
+            select(ClassSubject).where(ClassSubject.class_id == legacy_class)
+        ).one()
+        self.assertEqual(legacy_cs.planning_period_id, self.period_id)
+
+    def test_class_subject_batch_updates_all_pairs_at_once(self) -> None:
+        first, second, third, untouched = self.class_ids
+        for class_id, doppel in ((first, DoppelstundeEnum.muss), (second, DoppelstundeEnum.nein)):
+            self.session.add(
+                ClassSubject(
+                    account_id=self.account_id,
+                    class_id=class_id,
+                    subject_id=self.mathe_id,
+                    wochenstunden=5,
+                    doppelstunde=doppel,
+                )
+            )
+        self.session.commit()
+        first_req = self._requirement(first, self.mathe_id, planning_period_id=None)
+        second_req = self._requirement(second, self.mathe_id)
+        third_req = self._requirement(third, self.mathe_id, doppelstunde=DoppelstundeEnum.soll)
+        untouched_req = self._requirement(untouched, self.mathe_id, doppelstunde=DoppelstundeEnum.soll)
+
+        statements = self._count_statements()
+        updated = sync_requirements_for_class_subjects(
+            self.session,
+            self.account_id,
+            [(first, self.mathe_id), (second, self.mathe_id), (third, self.mathe_id)],
+            planning_period_id=self.period_id,
+        )
+        self.assertEqual(updated, 3)
+        self.assertEqual(len([s for s in statements if s.lstrip().upper().startswith("UPDATE")]), 2)
+
+        self.assertEqual(self._get(first_req).doppelstunde, DoppelstundeEnum.muss)
+        self.assertEqual(self._get(first_req).planning_period_id, self.period_id)
+        self.assertEqual(self._get(second_req).doppelstunde, DoppelstundeEnum.nein)
+        self.assertEqual(self._get(third_req).doppelstunde, DoppelstundeEnum.kann)
+        self.assertEqual(self._get(untouched_req).doppelstunde, DoppelstundeEnum.soll)
+        periods = self.session.exec(select(ClassSubject.planning_period_id)).all()
+        self.assertEqual(set(periods), {self.period_id})
+
+    def test_single_class_subject_sync_skips_manual(self) -> None:
+        class_id = self.class_ids[0]
+        manual = self._requirement(
+            class_id,
+            self.deutsch_id,
+            doppelstunde=DoppelstundeEnum.muss,
+            config_source=RequirementConfigSourceEnum.manual,
+        )
+        updated = sync_requirements_for_class_subject(
+            self.session, self.account_id, class_id, self.deutsch_id, self.period_id
+        )
+        self.assertEqual(updated, 0)
+        self.assertEqual(self._get(manual).doppelstunde, DoppelstundeEnum.muss)
+        self.assertEqual(sync_requirements_for_class_subjects(self.session, self.account_id, []), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, create_engine
+
+from backend.app.core.tracing import (
+    TraceFileSink,
+    TracingMiddleware,
+    current_trace,
+    install_trace_query_counter,
+    record_span,
+    span,
+    start_trace,
+)
+
+
+def _engine():
+    install_trace_query_counter()
+    return create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+
+
+class TracingTests(unittest.TestCase):
+    def test_spans_nest_and_count_queries(self) -> None:
+        engine = _engine()
+        with start_trace("job") as trace:
+            with span("outer"):
+                with Session(engine) as session:
+                    session.exec(text("SELECT 1"))
+                    with span("inner"):
+                        session.exec(text("SELECT 2"))
+                        record_span("external", 0.25)
+            with span("after"):
+                pass
+        self.assertIsNone(current_trace())
+        self.assertEqual(
+            [(s["name"], s["depth"], s["queries"]) for s in trace.timings()],
+            [("outer", 0, 2), ("inner", 1, 1), ("external", 2, 0), ("after", 0, 0)],
+        )
+        self.assertEqual(trace.timings()[2]["duration_ms"], 250.0)
+        self.assertIsNone(trace.timings()[2]["start_ms"])
+        self.assertEqual(trace.queries, 2)
+        self.assertIsNotNone(trace.duration_ms)
+
+    def test_nested_start_trace_reuses_the_active_trace(self) -> None:
+        with start_trace("request") as outer:
+            with start_trace("generate") as inner:
+                with span("solve"):
+                    pass
+        self.assertIs(inner, outer)
+        self.assertEqual([(s["name"], s["depth"]) for s in outer.timings()], [("generate", 0), ("solve", 1)])
+
+    def test_span_without_trace_is_a_no_op(self) -> None:
+        with span("alone") as entry:
+            record_span("external", 1.0)
+        self.assertIsNone(entry)
+
+    def test_middleware_sets_server_timing_and_writes_traces(self) -> None:
+        engine = _engine()
+        app = FastAPI()
+
+        @app.get("/work/{item_id}")
+        def work(item_id: int):
+            with span("load"), Session(engine) as session:
+                session.exec(text("SELECT 1"))
+            return {"id": item_id}
+
+        @app.get("/quick")
+        def quick():
+            return {}
+
+        with tempfile.TemporaryDirectory() as tmp:
+            sink = TraceFileSink(Path(tmp))
+            app.add_middleware(TracingMiddleware, sink=sink, slow_ms=10_000)
+            with TestClient(app) as client:
+                resp = client.get("/work/7")
+                quick_resp = client.get("/quick")
+            self.assertEqual(resp.status_code, 200)
+            header = resp.headers["Server-Timing"]
+            self.assertTrue(header.startswith("total;dur="))
+            self.assertIn('db;desc="1 queries"', header)
+            self.assertIn("load;dur=", header)
+            self.assertIn("total;dur=", quick_resp.headers["Server-Timing"])
+
+            # only the request with spans is written, the fast one without is not
+            files = list(Path(tmp).glob("traces-*.jsonl"))
+            self.assertEqual(len(files), 1)
+            records = [json.loads(line) for line in files[0].read_text(encoding="utf-8").splitlines()]
+        self.assertEqual(len(records), 1)
+        self.assertEqual(records[0]["name"], "GET /work/{item_id}")
+        self.assertEqual(records[0]["status"], 200)
+        self.assertEqual(records[0]["queries"], 1)
+        self.assertEqual(records[0]["spans"][0]["name"], "load")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -83,6 +83,17 @@ export async function updatePlanSlots(planId, slots) {
   return res.json();
 }
 
+export async function patchPlanSlots(planId, { slots = [], remove = [] } = {}) {
+  const query = withPlanningPeriod();
+  const res = await fetch(`/plans/${planId}/slots${query}`, {
+    method: 'PATCH',
+    headers: JSON_HEADERS,
+    body: JSON.stringify({ slots, remove }),
+  });
+  if (!res.ok) throw new Error(await res.text());
+  return res.json();
+}
+
 export async function deletePlan(planId) {
   const query = withPlanningPeriod();
   const res = await fetch(`/plans/${planId}${query}`, {
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Replay Model Bundle CLI
+-----------------------
+Usage:
+    python scripts/replay_bundle.py BUNDLE [--preset NAME] [--param KEY=VALUE ...]
+                                    [--repeat 3] [--proto [--time-limit S]] [--json]
+
+Replays a bundle written by /plans/generate with "save_bundle": true (see
+STUNDENPLAN_SOLVER_BUNDLE_DIR) without a database. By default the CP model is
+rebuilt from the stored requirements, basis context and rules and solved with
+the stored params; --preset starts from a built-in preset instead and
+--param overrides single GenerateParams fields (solver.<name> for CP-SAT
+parameters, e.g. solver.num_workers=4). --proto solves the exported
+CpModelProto as is, which isolates the CP-SAT time from model building.
+
+Every run prints build, first-solution and solve times, CPU time, status and
+objective; with --repeat the min/median/max over all runs follow.
+
+Example:
+    python scripts/replay_bundle.py solver_bundles/1/20261019-101500-1a2b3c4d \\
+        --param time_per_attempt=10 --param solver.num_workers=8 --repeat 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from backend.app.domain.planner.solver_presets import resolve_generate_params
+from backend.app.infrastructure.solver.bundles import (
+    load_model_bundle,
+    replay_model_bundle,
+    replay_model_proto,
+    summarize_runs,
+)
+from backend.app.infrastructure.solver.tuning import expand_grid
+from backend.app.schemas import GenerateParams
+
+BUILD_KEYS = ["build_seconds", "first_solution_seconds", "solve_seconds", "wall_seconds", "cpu_seconds", "objective"]
+PROTO_KEYS = ["wall_seconds", "cpu_seconds", "deterministic_time", "conflicts", "branches", "objective"]
+
+
+def _parse_overrides(items) -> dict:
+    grid = {}
+    for item in items or []:
+        key, _, raw = item.partition("=")
+        if not key or not raw:
+            raise SystemExit(f"Ungültiger Parameter: {item!r} (erwartet KEY=VALUE)")
+        try:
+            value = json.loads(raw)
+        except json.JSONDecodeError:
+            value = raw
+        grid[key.strip()] = [value]
+    return expand_grid(grid)[0]
+
+
+def _replay_params(bundle, preset, overrides: dict) -> GenerateParams:
+    values = {"preset": preset} if preset else bundle.params.model_dump(exclude={"preset"})
+    solver_values = {**values.pop("solver", {}), **overrides.get("solver", {})}
+    values.update({key: value for key, value in overrides.items() if key != "solver"})
+    return resolve_generate_params(GenerateParams(**values, solver=solver_values))
+
+
+def _fmt(value, digits: int = 3) -> str:
+    if value is None:
+        return "-"
+    if isinstance(value, float):
+        return f"{value:.{digits}f}"
+    return str(value)
+
+
+def _print_runs(runs: list, keys: list) -> None:
+    print(f"{'Lauf':>4} {'Status':<10} " + " ".join(f"{key:>22}" for key in keys))
+    for idx, run in enumerate(runs, start=1):
+        print(f"{idx:>4} {run['status']:<10} " + " ".join(f"{_fmt(run.get(key)):>22}" for key in keys))
+
+
+def _print_summary(summary: dict) -> None:
+    print(f"{'':>22} {'min':>12} {'median':>12} {'max':>12}")
+    for key, values in summary.items():
+        print(f"{key:>22} {_fmt(values['min']):>12} {_fmt(values['median']):>12} {_fmt(values['max']):>12}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replay a saved model bundle and print timing statistics.")
+    parser.add_argument("bundle", type=Path, help="Bundle directory")
+    parser.add_argument("--preset", type=str, default=None, help="Start from this built-in preset instead of the stored params")
+    parser.add_argument("--param", action="append", help="KEY=VALUE (repeatable, e.g. solver.num_workers=4)")
+    parser.add_argument("--repeat", type=int, default=1, help="Number of runs (default: 1)")
+    parser.add_argument("--proto", action="store_true", help="Solve the exported CpModelProto instead of rebuilding the model")
+    parser.add_argument("--time-limit", type=float, default=None, help="--proto: seconds (default: time_per_attempt)")
+    parser.add_argument("--json", action="store_true", help="Print runs and summary as JSON")
+    args = parser.parse_args()
+
+    bundle = load_model_bundle(args.bundle)
+    params = _replay_params(bundle, args.preset, _parse_overrides(args.param))
+    manifest = bundle.manifest
+    model = manifest.get("model") or {}
+    if not args.json:
+        print(
+            f"Bundle {bundle.path} vom {manifest.get('created_at')}: {len(bundle.df)} Requirements, "
+            f"{model.get('variables')} Variablen, {model.get('constraints')} Constraints"
+        )
+        if manifest.get("result"):
+            print(f"Ursprünglicher Lauf: {json.dumps(manifest['result'], ensure_ascii=False)}")
+
+    runs = []
+    for _ in range(max(1, args.repeat)):
+        if args.proto:
+            runs.append(replay_model_proto(bundle, params, args.time_limit))
+        else:
+            runs.append(replay_model_bundle(bundle, params))
+    keys = PROTO_KEYS if args.proto else BUILD_KEYS
+    summary = summarize_runs(runs, keys)
+
+    if args.json:
+        print(json.dumps({"params": params.model_dump(), "runs": runs, "summary": summary}, indent=2, ensure_ascii=False))
+        return
+    _print_runs(runs, keys)
+    if len(runs) > 1:
+        _print_summary(summary)
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        sys.exit(130)
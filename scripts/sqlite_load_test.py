@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+SQLite Load Test
+----------------
+Usage:
+    python scripts/sqlite_load_test.py [--seconds 5] [--readers 8] [--writers 2] [--slots 1200]
+
+Runs a concurrent read/write workload against a temporary SQLite database twice:
+once with the plain engine (SQLAlchemy defaults, rollback journal) and once with
+the tuned engine from backend.app.database.build_engine (WAL, busy_timeout, mmap,
+pool). Writers persist whole plans (~slots rows each) like /plans/generate,
+readers run the plan-list query. Every reader/writer is a separate process, as
+with multi-worker uvicorn. Prints operations per second and lock errors.
+"""
+
+from __future__ import annotations
+
+import argparse
+import multiprocessing as mp
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy.exc import OperationalError
+from sqlmodel import SQLModel, Session, create_engine, select
+
+from backend.app.database import build_engine
+from backend.app.domain.plans.persistence import persist_plan_with_slots
+from backend.app.models import Account, Class, Plan, PlanningPeriod, Subject, Teacher
+
+
+def _seed(engine) -> dict:
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        account = Account(name="Load")
+        session.add(account)
+        session.commit()
+        period = PlanningPeriod(account_id=account.id, name="Periode", is_active=True)
+        cls = Class(account_id=account.id, name="1A")
+        subject = Subject(account_id=account.id, name="Mathe")
+        teacher = Teacher(account_id=account.id, name="Frau Last")
+        session.add_all([period, cls, subject, teacher])
+        session.commit()
+        return {
+            "account_id": account.id,
+            "period_id": period.id,
+            "class_id": cls.id,
+            "subject_id": subject.id,
+            "teacher_id": teacher.id,
+        }
+
+
+def _make_engine(profile: str, url: str):
+    if profile == "tuned":
+        return build_engine(url)
+    return create_engine(url)
+
+
+def _slot_rows(ids: dict, slots: int) -> list[dict]:
+    return [
+        {
+            "class_id": ids["class_id"],
+            "tag": ["Mo", "Di", "Mi", "Do", "Fr"][i % 5],
+            "stunde": (i // 5) % 8 + 1,
+            "subject_id": ids["subject_id"],
+            "teacher_id": ids["teacher_id"],
+            "room_id": None,
+        }
+        for i in range(slots)
+    ]
+
+
+def _worker(role: str, profile: str, url: str, ids: dict, slots: int, stop, done, locked) -> None:
+    # Each worker is its own process with its own engine, like a uvicorn worker.
+    engine = _make_engine(profile, url)
+    slot_rows = _slot_rows(ids, slots)
+    while not stop.is_set():
+        try:
+            with Session(engine) as session:
+                if role == "reader":
+                    session.exec(
+                        select(Plan)
+                        .where(Plan.account_id == ids["account_id"], Plan.planning_period_id == ids["period_id"])
+                        .order_by(Plan.created_at.desc())
+                        .limit(50)
+                    ).all()
+                else:
+                    plan = Plan(
+                        account_id=ids["account_id"],
+                        planning_period_id=ids["period_id"],
+                        name="Load Plan",
+                        status="OPTIMAL",
+                    )
+                    persist_plan_with_slots(session, plan, slot_rows)
+            with done.get_lock():
+                done.value += 1
+        except OperationalError:
+            with locked.get_lock():
+                locked.value += 1
+    engine.dispose()
+
+
+def _run_workload(profile: str, url: str, ids: dict, seconds: float, readers: int, writers: int, slots: int) -> dict:
+    ctx = mp.get_context("spawn")
+    stop = ctx.Event()
+    reads, writes, locked = ctx.Value("i", 0), ctx.Value("i", 0), ctx.Value("i", 0)
+    procs = [
+        ctx.Process(target=_worker, args=("reader", profile, url, ids, slots, stop, reads, locked))
+        for _ in range(readers)
+    ]
+    procs += [
+        ctx.Process(target=_worker, args=("writer", profile, url, ids, slots, stop, writes, locked))
+        for _ in range(writers)
+    ]
+    for proc in procs:
+        proc.start()
+    time.sleep(seconds)
+    stop.set()
+    for proc in procs:
+        proc.join()
+    return {
+        "reads_per_s": reads.value / seconds,
+        "writes_per_s": writes.value / seconds,
+        "locked_errors": locked.value,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Concurrent SQLite read/write load test.")
+    parser.add_argument("--seconds", type=float, default=5.0, help="Laufzeit je Profil (default: 5)")
+    parser.add_argument("--readers", type=int, default=8, help="Anzahl Lese-Prozesse (default: 8)")
+    parser.add_argument("--writers", type=int, default=2, help="Anzahl Schreib-Prozesse (default: 2)")
+    parser.add_argument("--slots", type=int, default=1200, help="Slots pro geschriebenem Plan (default: 1200)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for label in ("default", "tuned"):
+            url = f"sqlite:///{Path(tmp) / f'{label}.db'}"
+            engine = _make_engine(label, url)
+            ids = _seed(engine)
+            engine.dispose()
+            result = _run_workload(label, url, ids, args.seconds, args.readers, args.writers, args.slots)
+            print(
+                f"{label:>8}: reads/s={result['reads_per_s']:.1f} "
+                f"writes/s={result['writes_per_s']:.1f} locked={result['locked_errors']}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Solver Tuning CLI
+-----------------
+Usage:
+    python scripts/tune_solver.py [--account 1] [--period 1] [--version ID] [--rule-profile ID]
+                                  [--inputs inputs.pkl] [--save-inputs inputs.pkl]
+                                  [--grid grid.json | --param KEY=V1,V2 ...]
+                                  [--strategy grid|halving] [--eta 3] [--processes 2]
+                                  [--save-as NAME]
+
+Builds the solver inputs of a generation (requirements, basis context, rules)
+from backend.db, or loads them from a file written earlier with --save-inputs,
+and solves them with every parameter combination of the grid. Combinations
+run in parallel worker processes; "halving" drops the weaker candidates after
+short runs (successive halving). For each candidate the time to the first
+feasible solution, the final objective and the gap to the best bound are
+printed. --save-as stores the winner as a solver preset of the account that
+/plans/generate accepts via params.preset or a rule profile's solver_preset.
+
+Example grid (grid.json):
+{
+    "time_per_attempt": [2, 5],
+    "max_attempts": [1, 3],
+    "base_seed": [42, 7],
+    "solver.num_workers": [4, 8],
+    "solver.linearization_level": [0, 1, 2]
+}
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from sqlmodel import Session, SQLModel, create_engine
+
+from backend.app.domain.accounts.service import resolve_account, resolve_planning_period
+from backend.app.domain.planner.service import PlannerService
+from backend.app.domain.planner.solver_presets import available_solver_presets, save_solver_preset
+from backend.app.infrastructure.solver.executor import default_worker_count
+from backend.app.infrastructure.solver.tuning import (
+    TUNING_STRATEGIES,
+    SolverTuner,
+    expand_grid,
+    load_tuning_inputs,
+    save_tuning_inputs,
+)
+from backend.app.schemas import GenerateParams, GenerateRequest
+
+
+def _parse_value(raw: str):
+    try:
+        return json.loads(raw)
+    except json.JSONDecodeError:
+        return raw
+
+
+def _load_grid(args: argparse.Namespace) -> dict:
+    grid = json.loads(args.grid.read_text(encoding="utf-8")) if args.grid else {}
+    for item in args.param or []:
+        key, _, values = item.partition("=")
+        if not key or not values:
+            raise SystemExit(f"Ungültiger Parameter: {item!r} (erwartet KEY=V1,V2)")
+        grid[key.strip()] = [_parse_value(value.strip()) for value in values.split(",")]
+    return grid
+
+
+def _fmt(value, digits: int = 2) -> str:
+    if value is None:
+        return "-"
+    if isinstance(value, float):
+        return f"{value:.{digits}f}"
+    return str(value)
+
+
+def _print_results(results: list) -> None:
+    print(f"{'Kandidat':<8} {'Runde':>5} {'Budget':>6} {'Status':<10} {'1. Lösung s':>11} {'Ziel':>10} {'Gap':>7} {'Zeit s':>7}  Parameter")
+    for entry in results:
+        metrics = entry["metrics"]
+        print(
+            f"{entry['name']:<8} {entry['round']:>5} {_fmt(entry['budget']):>6} {metrics['status']:<10} "
+            f"{_fmt(metrics['first_feasible_seconds']):>11} {_fmt(metrics['objective'], 1):>10} "
+            f"{_fmt(metrics['gap'], 3):>7} {_fmt(metrics['wall_seconds']):>7}  {json.dumps(entry['overrides'])}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Tune CP-SAT parameters for a saved generation input.")
+    parser.add_argument("--account", type=int, default=1, help="Account ID (default: 1)")
+    parser.add_argument("--period", type=int, default=None, help="Planning period ID (default: active period)")
+    parser.add_argument("--version", type=int, default=None, help="Distribution version ID")
+    parser.add_argument("--rule-profile", type=int, default=None, help="Rule profile ID")
+    parser.add_argument("--database", type=str, default="backend.db", help="SQLite database path (default: backend.db)")
+    parser.add_argument("--inputs", type=Path, help="Load solver inputs from this file instead of the database")
+    parser.add_argument("--save-inputs", type=Path, help="Write the solver inputs to this file and continue")
+    parser.add_argument("--preset", type=str, default=None, help="Preset the candidates start from (default: balanced)")
+    parser.add_argument("--grid", type=Path, help="JSON file: parameter -> list of values")
+    parser.add_argument("--param", action="append", help="KEY=V1,V2 (repeatable, e.g. solver.num_workers=4,8)")
+    parser.add_argument("--strategy", choices=TUNING_STRATEGIES, default="grid")
+    parser.add_argument("--eta", type=int, default=3, help="Halving: keep 1/eta per round (default: 3)")
+    parser.add_argument("--processes", type=int, default=default_worker_count(), help="Parallel solver processes")
+    parser.add_argument("--save-as", type=str, help="Store the winner as solver preset NAME of the account")
+    parser.add_argument("--json", action="store_true", help="Print all results as JSON")
+    args = parser.parse_args()
+
+    engine = create_engine(f"sqlite:///{args.database}", connect_args={"check_same_thread": False})
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        account = resolve_account(session, args.account)
+        presets = available_solver_presets(session, account.id)
+        if args.inputs:
+            inputs = load_tuning_inputs(args.inputs)
+        else:
+            period = resolve_planning_period(session, account, args.period)
+            request = GenerateRequest(
+                name="Tuning",
+                rule_profile_id=args.rule_profile,
+                version_id=args.version,
+                dry_run=True,
+            )
+            inputs = PlannerService(session).prepare_generation(request, account, period).solver_inputs
+        if args.save_inputs:
+            save_tuning_inputs(inputs, args.save_inputs)
+            print(f"Solver-Eingaben gespeichert: {args.save_inputs}")
+
+        base = GenerateParams(preset=args.preset) if args.preset else GenerateParams()
+        tuner = SolverTuner(inputs, base_params=base, presets=presets, processes=args.processes)
+        candidates = expand_grid(_load_grid(args))
+        print(f"{len(candidates)} Kandidaten, Strategie {args.strategy}, {args.processes} Prozesse …")
+        results = tuner.run(candidates, strategy=args.strategy, eta=args.eta)
+
+        if args.json:
+            print(json.dumps(tuner.history, indent=2, ensure_ascii=False))
+        else:
+            _print_results(tuner.history)
+        winner = results[0]
+        if not winner["metrics"]["feasible"]:
+            print("Kein Kandidat hat eine zulässige Lösung gefunden.")
+            sys.exit(1)
+        print(f"Bester Kandidat: {winner['name']} {json.dumps(winner['overrides'])}")
+        if args.save_as:
+            row = save_solver_preset(
+                session,
+                account.id,
+                args.save_as,
+                GenerateParams(**winner["params"]),
+                metrics={"strategy": args.strategy, "candidates": len(candidates), **winner["metrics"]},
+            )
+            print(f"Preset '{row.name}' für Account {account.id} gespeichert.")
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        sys.exit(130)
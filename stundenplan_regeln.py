@@ -22,6 +22,7 @@ def add_constraints(
     pool_teacher_names=None,
     slots_per_day=8,
     pause_slots=None,
+    objective_groups=None,
 ):
     """
     Baut alle Constraints und (falls aktiv) Soft-Objectives auf.
@@ -57,6 +58,10 @@ def add_constraints(
     Zusätzlich (NEU): Gewichte für Soft-Objectives – kommen aus regeln, haben Defaults:
       - W_GAPS_START, W_GAPS_INSIDE, W_EVEN_DIST, W_EINZEL_KANN, W_EINZEL_SOLL
       - TEACHER_GAPS_DAY_MAX, TEACHER_GAPS_WEEK_MAX, W_TEACHER_GAPS
+
+    objective_groups (Dict, optional): wird mit den Soft-Termen je Zielgruppe
+    befüllt ('class_gaps', 'teacher_gaps', 'doppelstunden', 'even_distribution',
+    'band_optional'), z.B. für eine lexikographische Optimierung.
     """
 
     def _str_val(row, col, default=""):
@@ -73,6 +78,12 @@ def add_constraints(
     W_BAND_OPTIONAL = int(regeln.get("W_BAND_OPTIONAL", 6))  # Optionales Bandfach nicht eingeplant
 
     obj_terms = []
+    if objective_groups is None:
+        objective_groups = {}
+
+    def _add_objective(group, term):
+        obj_terms.append(term)
+        objective_groups.setdefault(group, []).append(term)
 
     fid_participation: dict[int, str] = {}
     fid_canonical_subject: dict[int, tuple[int | None, str]] = {}
@@ -383,7 +394,8 @@ def add_constraints(
         for klasse in KLASSEN:
             for tag in TAGE:
                 occ = _occ_vars_for_klasse_tag(klasse, tag, teaching_slots_list)
-                obj_terms += _add_no_gap_soft(occ)
+                for term in _add_no_gap_soft(occ):
+                    _add_objective("class_gaps", term)
 
     # -------- 6b) Lehrer-Hohlstunden (Soft) --------
     if enforce_teacher_gaps_soft and W_TEACHER_GAPS > 0:
@@ -441,7 +453,7 @@ def add_constraints(
                 model.Add(excess_day >= gaps_var - max_day_gaps)
                 model.Add(excess_day >= 0)
                 model.Add(excess_day <= gaps_var)
-                obj_terms.append(W_TEACHER_GAPS * excess_day)
+                _add_objective("teacher_gaps", W_TEACHER_GAPS * excess_day)
 
             if week_gap_vars:
                 week_total = model.NewIntVar(0, max_possible_week_gaps, f"tgap_week_total_{idx}")
@@ -450,7 +462,7 @@ def add_constraints(
                 model.Add(excess_week >= week_total - max_week_gaps)
                 model.Add(excess_week >= 0)
                 model.Add(excess_week <= week_total)
-                obj_terms.append(W_TEACHER_GAPS * excess_week)
+                _add_objective("teacher_gaps", W_TEACHER_GAPS * excess_week)
 
     # -------- 6) Doppelstunden 'muss/kann/nein' inkl. max. 2 in Folge --------
     if regeln.get("doppelstundenregel", True):
@@ -526,7 +538,7 @@ def add_constraints(
                 if W_EINZEL_KANN > 0:
                     single_total = sum(single_vars)
                     pair_total = sum(pair_vars)
-                    obj_terms.append(W_EINZEL_KANN * (pair_total * 2 - single_total))
+                    _add_objective("doppelstunden", W_EINZEL_KANN * (pair_total * 2 - single_total))
 
             elif ds_rule == "soll":
                 max_pairs = anzahl_stunden // 2
@@ -536,7 +548,7 @@ def add_constraints(
                     model.Add(missing_pairs >= 0)
                     model.Add(missing_pairs <= max_pairs)
                     if W_EINZEL_SOLL > 0:
-                        obj_terms.append(W_EINZEL_SOLL * missing_pairs)
+                        _add_objective("doppelstunden", W_EINZEL_SOLL * missing_pairs)
 
                 if W_EINZEL_SOLL > 0:
                     allowed_single = anzahl_stunden % 2
@@ -545,7 +557,7 @@ def add_constraints(
                     model.Add(extra_single >= sum(single_vars) - allowed_single)
                     model.Add(extra_single >= 0)
                     model.Add(extra_single <= max_single)
-                    obj_terms.append(W_EINZEL_SOLL * extra_single)
+                    _add_objective("doppelstunden", W_EINZEL_SOLL * extra_single)
 
         # Begrenze Alias-Fächer (z.B. Deutsch + Leseband) auf max. 2 Slots pro Tag
         canonical_map: dict[tuple[str, str], list[int]] = {}
@@ -718,7 +730,7 @@ def add_constraints(
                 tage=tage_required,
             )
             if penalty is not None:
-                obj_terms.append(penalty)
+                _add_objective("band_optional", penalty)
             # Optional: Modelle mit unterschiedlichen Wochenstunden ignorieren einfach;
             # Debug lässt sich über Solver-Logs nachvollziehen.
 
@@ -742,7 +754,7 @@ def add_constraints(
             for tag in TAGE:
                 diff = model.NewIntVar(0, slots_per_day, f"abweichung_{klasse}_{tag}")
                 model.AddAbsEquality(diff, belegte_stunden_klasse_tag[(klasse, tag)] - avg)
-                obj_terms.append(W_EVEN_DIST * diff)
+                _add_objective("even_distribution", W_EVEN_DIST * diff)
 
     # -------- Objective setzen --------
     if obj_terms: